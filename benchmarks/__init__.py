@@ -0,0 +1 @@
+"""离线性能基准（python -m benchmarks.<name> 运行）"""
@@ -0,0 +1,72 @@
+"""
+bench_ci_jobs.py
+
+模块 C 的 CI job 计时采集与统计：
+- 首次采集：对全部已完成运行并发请求 actions/runs/{id}/jobs
+- 重复采集：jobs 已按运行缓存，只请求新完成的运行（--new 个）
+- 统计：在全部缓存条目上计算运行耗时分位数与排队时间
+
+SimulatedGitHub（bench_github_backends）作为传输层，每个请求附加 --latency 秒的往返延迟。
+
+用法:
+    python -m benchmarks.bench_ci_jobs
+    python -m benchmarks.bench_ci_jobs --runs 5000 --new 50 --latency 0.1
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+
+from benchmarks import bench_github_backends
+from scripts.github_async import AsyncGitHub
+from scripts.module_c import ci_jobs
+
+
+async def run_collect(transport, runs: list[dict], data_dir) -> dict:
+    """加载缓存 -> 采集 -> 写回缓存，返回耗时与请求数"""
+    base = f"{bench_github_backends.API}/repos/{bench_github_backends.OWNER}/{bench_github_backends.NAME}"
+    async with AsyncGitHub({}, transport=transport) as gh:
+        start = time.perf_counter()
+        cache = ci_jobs.load_cache(data_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = await ci_jobs.collect(gh, base, runs, cache, max_new=0)
+        ci_jobs.save_cache(data_dir, cache, "gzip")
+        return {"seconds": time.perf_counter() - start, "requests": gh.requests, **counts}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="模块 C 的 CI job 计时采集与统计")
+    parser.add_argument("--runs", type=int, default=2000, help="已完成的 workflow run 数")
+    parser.add_argument("--new", type=int, default=20, help="重复采集前新完成的运行数")
+    parser.add_argument("--latency", type=float, default=0.05, help="模拟每个请求的往返延迟（秒）")
+    parser.add_argument("--bandwidth-mbps", type=float, default=200, help="模拟下载带宽（Mbit/s）")
+    args = parser.parse_args()
+
+    simulated = bench_github_backends.SimulatedGitHub(0, 0, 0, args.latency, args.bandwidth_mbps, runs=args.runs)
+    runs = simulated.rest["actions/runs"]
+    # 按时间倒序：最新的 --new 个运行在首次采集时尚未完成
+    older = runs[args.new:]
+    print(f"[Info] simulated: {args.runs:,} runs, {len(simulated.jobs[runs[0]['id']])} jobs/run, "
+          f"latency {args.latency * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        print(f"\n{'pass':<10}{'seconds':>10}{'requests':>10}{'fetched':>10}{'cached':>10}")
+        for label, batch in (("cold", older), ("repeat", runs)):
+            r = asyncio.run(run_collect(simulated, batch, data_dir))
+            print(f"{label:<10}{r['seconds']:>10.2f}{r['requests']:>10}{r['fetched']:>10,}{r['cached']:>10,}")
+
+        entries = list(ci_jobs.load_cache(data_dir).values())
+        start = time.perf_counter()
+        stats = ci_jobs.timing_stats(entries)
+        elapsed = time.perf_counter() - start
+
+    run, queue = stats["run_duration"], stats["queue"]
+    print(f"\n[OK] timing_stats: {stats['runs']:,} runs / {stats['jobs']:,} jobs in {elapsed * 1000:.0f} ms")
+    print(f"     run duration p50 {run['p50']:.0f}s  p90 {run['p90']:.0f}s  p95 {run['p95']:.0f}s; "
+          f"queue p50 {queue['p50']:.0f}s  p90 {queue['p90']:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+bench_github_backends.py
+
+对比模块 C 的 REST 与 GraphQL 采集后端（不含两者共用的 workflow runs）：
+请求数、下载字节数与耗时。
+
+默认离线运行：SimulatedGitHub 作为 AsyncGitHub 的传输层，按 synthetic.py 生成的数据应答 REST 分页与
+GraphQL 查询，每个请求附加 --latency 秒的往返延迟，所有响应共享 --bandwidth-mbps 的下载带宽。REST 响应按
+GitHub 实际返回的结构补齐 URL 字段与用户 / 仓库对象，字节数与真实接口大致相当。
+--live 时使用 GITHUB_TOKEN 直接请求 project 仓库（API 地址取 github_api_url，可指向 mock_github_server）。
+
+用法:
+    python -m benchmarks.bench_github_backends
+    python -m benchmarks.bench_github_backends --commits 5000 --prs 800 --latency 0.15 --repeat 3
+    python -m benchmarks.bench_github_backends --live
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import re
+import time
+from urllib.parse import urlparse
+
+from benchmarks import synthetic
+from scripts.config_utils import load_config
+from scripts.github_async import AsyncGitHub, GitHubResponse
+from scripts.module_c import get_git_data, graphql_backend
+from scripts.module_utils import github_api_url, github_headers, load_github_token
+
+OWNER, NAME = "apache", "rocketmq"
+API = "https://api.github.com"
+
+
+# =========================
+# REST 响应的完整结构
+# =========================
+
+def _user(login: str) -> dict:
+    url = f"{API}/users/{login}"
+    return {
+        "login": login, "id": 1, "node_id": "MDQ6VXNlcjE=",
+        "avatar_url": "https://avatars.githubusercontent.com/u/1?v=4", "gravatar_id": "",
+        "url": url, "html_url": f"https://github.com/{login}",
+        "followers_url": f"{url}/followers", "following_url": f"{url}/following{{/other_user}}",
+        "gists_url": f"{url}/gists{{/gist_id}}", "starred_url": f"{url}/starred{{/owner}}{{/repo}}",
+        "subscriptions_url": f"{url}/subscriptions", "organizations_url": f"{url}/orgs",
+        "repos_url": f"{url}/repos", "events_url": f"{url}/events{{/privacy}}",
+        "received_events_url": f"{url}/received_events", "type": "User", "site_admin": False,
+    }
+
+
+def _repo() -> dict:
+    url = f"{API}/repos/{OWNER}/{NAME}"
+    links = ["forks", "keys", "collaborators", "teams", "hooks", "issue_events", "events", "assignees",
+             "branches", "tags", "blobs", "git_tags", "git_refs", "trees", "statuses", "languages",
+             "stargazers", "contributors", "subscribers", "subscription", "commits", "git_commits",
+             "comments", "issue_comment", "contents", "compare", "merges", "archive", "downloads",
+             "issues", "pulls", "milestones", "notifications", "labels", "releases", "deployments"]
+    return {
+        "id": 6896, "node_id": "MDEwOlJlcG9zaXRvcnk2ODk2", "name": NAME, "full_name": f"{OWNER}/{NAME}",
+        "private": False, "owner": _user(OWNER), "html_url": f"https://github.com/{OWNER}/{NAME}",
+        "description": "Apache RocketMQ is a cloud native messaging and streaming platform",
+        "fork": False, "url": url, **{f"{k}_url": f"{url}/{k}" for k in links},
+        "created_at": "2016-11-30T08:00:00Z", "updated_at": "2026-01-01T00:00:00Z",
+        "pushed_at": "2026-01-01T00:00:00Z", "stargazers_count": 21000, "forks_count": 11000,
+        "default_branch": "develop", "license": {"key": "apache-2.0", "spdx_id": "Apache-2.0"},
+    }
+
+
+def rest_commit(c: dict) -> dict:
+    url = f"{API}/repos/{OWNER}/{NAME}"
+    author = c["commit"]["author"]
+    return {
+        "sha": c["sha"], "node_id": "C_kwDOAGu0", "url": f"{url}/commits/{c['sha']}",
+        "html_url": f"https://github.com/{OWNER}/{NAME}/commit/{c['sha']}",
+        "comments_url": f"{url}/commits/{c['sha']}/comments",
+        "commit": {
+            "author": {**author, "email": "dev@example.com"},
+            "committer": {**author, "email": "noreply@github.com"},
+            "message": c["commit"]["message"],
+            "tree": {"sha": c["sha"], "url": f"{url}/git/trees/{c['sha']}"},
+            "url": f"{url}/git/commits/{c['sha']}", "comment_count": 0,
+            "verification": {"verified": False, "reason": "unsigned", "signature": None, "payload": None},
+        },
+        "author": _user(author["name"]), "committer": _user("web-flow"),
+        "parents": [{"sha": c["sha"], "url": f"{url}/commits/{c['sha']}",
+                     "html_url": f"https://github.com/{OWNER}/{NAME}/commit/{c['sha']}"}],
+    }
+
+
+def rest_pr(pr: dict, repo: dict) -> dict:
+    url = f"{API}/repos/{OWNER}/{NAME}"
+    n = pr["number"]
+    return {
+        "url": f"{url}/pulls/{n}", "id": n, "node_id": "PR_kwDOAGu0", "number": n,
+        "html_url": f"https://github.com/{OWNER}/{NAME}/pull/{n}",
+        "diff_url": f"https://github.com/{OWNER}/{NAME}/pull/{n}.diff",
+        "patch_url": f"https://github.com/{OWNER}/{NAME}/pull/{n}.patch",
+        "issue_url": f"{url}/issues/{n}", "state": pr["state"], "locked": False,
+        "title": "[ISSUE #1024] Polish consumer offset logic", "user": _user("dev1"), "body": pr["body"],
+        "created_at": pr["updated_at"], "updated_at": pr["updated_at"], "closed_at": pr["closed_at"],
+        "merged_at": pr["closed_at"], "merge_commit_sha": f"{n:040x}",
+        "assignee": pr["assignee"], "assignees": [], "requested_reviewers": pr["requested_reviewers"],
+        "requested_teams": [], "labels": [{"id": 1, "node_id": "LA_1", "url": f"{url}/labels/{lb['name']}",
+                                           "name": lb["name"], "color": "d73a4a", "default": True,
+                                           "description": "Something isn't working"} for lb in pr["labels"]],
+        "milestone": None, "draft": False, "commits_url": f"{url}/pulls/{n}/commits",
+        "review_comments_url": f"{url}/pulls/{n}/comments", "comments_url": f"{url}/issues/{n}/comments",
+        "statuses_url": f"{url}/statuses/{n:040x}",
+        "head": {"label": "dev1:branch", "ref": "branch", "sha": f"{n:040x}", "user": _user("dev1"), "repo": repo},
+        "base": {"label": "apache:develop", "ref": "develop", "sha": f"{n:040x}", "user": _user(OWNER), "repo": repo},
+        "author_association": "CONTRIBUTOR", "auto_merge": None, "active_lock_reason": None,
+    }
+
+
+def rest_release(r: dict, i: int) -> dict:
+    url = f"{API}/repos/{OWNER}/{NAME}/releases/{i}"
+    return {
+        "url": url, "assets_url": f"{url}/assets", "upload_url": f"{url}/assets{{?name,label}}",
+        "html_url": f"https://github.com/{OWNER}/{NAME}/releases/tag/{r['tag_name']}", "id": i,
+        "author": _user("release-bot"), "node_id": "RE_kwDOAGu0", "tag_name": r["tag_name"],
+        "target_commitish": "develop", "name": r["tag_name"], "draft": False, "prerelease": False,
+        "created_at": r["published_at"], "published_at": r["published_at"], "assets": [],
+        "tarball_url": f"{API}/repos/{OWNER}/{NAME}/tarball/{r['tag_name']}",
+        "zipball_url": f"{API}/repos/{OWNER}/{NAME}/zipball/{r['tag_name']}",
+        "body": "## What's Changed\n* Polish consumer offset logic\n" * 20,
+    }
+
+
+# =========================
+# 模拟服务（AsyncGitHub 传输层）
+# =========================
+
+class SimulatedGitHub:
+    """按合成数据应答 REST 与 GraphQL 请求，每个请求计入往返延迟，并发响应排队共享下载带宽"""
+    name = "simulated"
+    transient_errors = ()
+
+    def __init__(self, commits: int, prs: int, releases: int, latency: float, bandwidth_mbps: float, runs: int = 0):
+        self.latency = latency
+        self.bytes_per_sec = bandwidth_mbps * 1_000_000 / 8
+        self.commits = synthetic.github_commits(commits)
+        self.prs = synthetic.github_prs(prs)
+        self.releases = synthetic.github_releases(releases)
+        repo = _repo()
+        self.rest = {
+            "commits": [rest_commit(c) for c in self.commits],
+            "pulls": [rest_pr(pr, repo) for pr in self.prs],
+            "releases": [rest_release(r, i) for i, r in enumerate(self.releases)],
+            "actions/runs": synthetic.github_runs(runs),
+        }
+        self.jobs = synthetic.github_jobs(self.rest["actions/runs"])
+        self.repo = repo
+        self._link_free_at = 0.0
+
+    async def request(self, method, url, headers, params, body, timeout) -> GitHubResponse:
+        path = urlparse(url).path
+        if path == "/graphql":
+            payload, link = {"data": self._graphql(body["query"], body["variables"])}, None
+        else:
+            payload, link = self._rest(path, params or {})
+            if payload is None:
+                return await self._respond(url, {"message": "Not Found"}, None, status=404)
+        return await self._respond(url, payload, link)
+
+    async def _respond(self, url, payload, link, status=200) -> GitHubResponse:
+        content = json.dumps(payload).encode()
+        now = time.perf_counter()
+        start = max(now + self.latency, self._link_free_at)
+        self._link_free_at = start + len(content) / self.bytes_per_sec
+        await asyncio.sleep(self._link_free_at - now)
+        return GitHubResponse(url, status, {"Link": link} if link else {}, content)
+
+    def _rest(self, path: str, params: dict):
+        prefix = f"/repos/{OWNER}/{NAME}"
+        resource = path[len(prefix):].strip("/")
+        if resource == "":
+            return self.repo, None
+        if resource.startswith("contents/"):
+            file_path = resource[len("contents/"):]
+            return ({"name": file_path, "content": ""} if synthetic.FILES_STATUS.get(file_path) else None), None
+        if resource.startswith("actions/runs/") and resource.endswith("/jobs"):
+            jobs = self.jobs.get(int(resource.split("/")[2]))
+            return ({"total_count": len(jobs), "jobs": jobs} if jobs is not None else None), None
+        items = self.rest[resource]
+        per_page, page = int(params.get("per_page", 30)), int(params.get("page", 1))
+        last = max(1, -(-len(items) // per_page))
+        link = f'<{API}{path}?per_page={per_page}&page={last}>; rel="last"' if last > 1 else None
+        page_items = items[(page - 1) * per_page: page * per_page]
+        if resource == "actions/runs":
+            return {"total_count": len(items), "workflow_runs": page_items}, link
+        return page_items, link
+
+    def _graphql(self, query: str, v: dict) -> dict:
+        def connection(nodes, after):
+            start = int(after or 0)
+            end = start + graphql_backend.PAGE_SIZE
+            return {"pageInfo": {"hasNextPage": end < len(nodes), "endCursor": str(end)}, "nodes": nodes[start:end]}
+
+        repo = {"defaultBranchRef": {"name": "develop"}}
+        if v["withRepo"]:
+            repo.update({"nameWithOwner": f"{OWNER}/{NAME}", "licenseInfo": {"spdxId": "Apache-2.0"}})
+            for alias, file_path in re.findall(r'(file_\d+): object\(expression: "HEAD:([^"]+)"\)', query):
+                repo[alias] = {"__typename": "Blob", "text": ""} if synthetic.FILES_STATUS.get(file_path) else None
+        if v["withCommits"]:
+            nodes = [{"oid": c["sha"], "message": c["commit"]["message"],
+                      "author": {**c["commit"]["author"], "email": "dev@example.com"},
+                      "parents": {"nodes": [{"oid": c["sha"]}]}} for c in self.commits]
+            repo["defaultBranchRef"]["target"] = {"history": connection(nodes, v["commitsAfter"])}
+        if v["withPrs"]:
+            nodes = [{"number": pr["number"], "body": pr["body"], "createdAt": pr["updated_at"],
+                      "updatedAt": pr["updated_at"], "closedAt": pr["closed_at"], "mergedAt": pr["closed_at"],
+                      "assignees": {"nodes": []}, "reviewRequests": {"nodes": []},
+                      "labels": {"nodes": [{"name": lb["name"]} for lb in pr["labels"]]}} for pr in self.prs]
+            repo["pullRequests"] = connection(nodes, v["prsAfter"])
+        if v["withReleases"]:
+            nodes = [{"databaseId": i, "tagName": r["tag_name"], "publishedAt": r["published_at"]}
+                     for i, r in enumerate(self.releases)]
+            repo["releases"] = connection(nodes, v["releasesAfter"])
+        return {"repository": repo}
+
+    async def aclose(self) -> None:
+        pass
+
+
+# =========================
+# 计时
+# =========================
+
+async def run_backend(backend: str, headers: dict, transport, owner: str, name: str, sinces: dict) -> dict:
+    async with AsyncGitHub(headers, transport=transport) as gh:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if backend == "graphql":
+                collected = await graphql_backend.collect(gh, owner, name, sinces, get_git_data.FILES_TO_CHECK)
+            else:
+                collected = await get_git_data.collect_rest(gh, github_api_url(f"/repos/{owner}/{name}"), sinces)
+        return {
+            "backend": backend,
+            "seconds": time.perf_counter() - start,
+            "requests": gh.requests,
+            "kib": gh.bytes_received / 1024,
+            "commits": len(collected["commits"]),
+            "prs": len(collected["prs"]),
+            "releases": len(collected["releases"]),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="模块 C 的 REST / GraphQL 采集后端对比")
+    parser.add_argument("--commits", type=int, default=2000)
+    parser.add_argument("--prs", type=int, default=500)
+    parser.add_argument("--releases", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.1, help="模拟每个请求的往返延迟（秒）")
+    parser.add_argument("--bandwidth-mbps", type=float, default=50, help="模拟下载带宽（Mbit/s）")
+    parser.add_argument("--since", default="2013-01-01", help="采集窗口起点")
+    parser.add_argument("--repeat", type=int, default=1, help="每个后端重复次数（取最小耗时）")
+    parser.add_argument("--live", action="store_true", help="直接请求 api.github.com（需要 GITHUB_TOKEN）")
+    args = parser.parse_args()
+
+    since = args.since + "T00:00:00Z"
+    sinces = {resource: since for resource in get_git_data.RESOURCES}
+
+    if args.live:
+        project = load_config().get("project", {})
+        owner, name = project.get("repo_owner", OWNER), project.get("repo_name", NAME)
+        headers = github_headers(load_github_token(missing_hint="--live 需要在 scripts/.env 中填写 GITHUB_TOKEN"))
+        make_transport = lambda: None
+        print(f"[Info] live: {owner}/{name} since {since}")
+    else:
+        owner, name, headers = OWNER, NAME, {}
+        start = time.perf_counter()
+        simulated = SimulatedGitHub(args.commits, args.prs, args.releases, args.latency, args.bandwidth_mbps)
+        make_transport = lambda: simulated
+        print(f"[Info] simulated: {args.commits:,} commits, {args.prs:,} PRs, {args.releases} releases, "
+              f"latency {args.latency * 1000:.0f} ms, {args.bandwidth_mbps:g} Mbit/s "
+              f"(generated in {time.perf_counter() - start:.1f}s)")
+
+    print(f"\n{'backend':<10}{'seconds':>10}{'requests':>10}{'KiB':>12}{'commits':>10}{'prs':>8}{'releases':>10}")
+    for backend in ("rest", "graphql"):
+        runs = [asyncio.run(run_backend(backend, headers, make_transport(), owner, name, sinces))
+                for _ in range(max(1, args.repeat))]
+        r = min(runs, key=lambda x: x["seconds"])
+        print(f"{backend:<10}{r['seconds']:>10.2f}{r['requests']:>10}{r['kib']:>12,.0f}"
+              f"{r['commits']:>10,}{r['prs']:>8,}{r['releases']:>10,}")
+
+
+if __name__ == "__main__":
+    main()
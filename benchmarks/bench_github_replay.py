@@ -0,0 +1,154 @@
+"""
+bench_github_replay.py
+
+离线测量模块 C 采集（REST / GraphQL 后端 + workflow runs）的吞吐、重试与限流开销：
+在本地启动 mock_github_server 回放录制的响应，GITHUB_API_URL 指向该服务，AsyncGitHub 使用真实的 HTTP 传输层。
+服务端按参数注入每个请求的延迟、随机 5xx 与配额耗尽，同一组夹具在不同场景下的结果可直接对比。
+
+夹具来源：
+- 默认读取 github.replay.dir（需先录制）
+- --record：转发到 api.github.com 录制一次（需要 GITHUB_TOKEN），之后即可离线回放
+- --simulate：用 bench_github_backends 的合成数据生成夹具，无需网络与 Token
+
+用法:
+    python -m benchmarks.bench_github_replay --simulate
+    python -m benchmarks.bench_github_replay --simulate --latency 0.1 --error-rate 0.05
+    python -m benchmarks.bench_github_replay --simulate --rate-limit 20 --rate-limit-window 2
+    python -m benchmarks.bench_github_replay --record && python -m benchmarks.bench_github_replay --latency 0.1
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlparse
+
+from benchmarks import bench_github_backends
+from scripts import github_recorder, mock_github_server
+from scripts.config_utils import load_config
+from scripts.github_async import AsyncGitHub
+from scripts.module_c import get_git_data, graphql_backend
+from scripts.module_utils import DEFAULT_API_URL, github_api_url, github_headers, load_github_token
+
+
+class RecordingTransport:
+    """包装另一个传输层，把每个响应按 mock_github_server 的键写入夹具目录"""
+
+    def __init__(self, inner, directory: Path, upstream: str):
+        self.inner = inner
+        self.directory = directory
+        self.upstream = upstream
+        self.name = f"recording ({getattr(inner, 'name', type(inner).__name__)})"
+        self.transient_errors = getattr(inner, "transient_errors", ())
+
+    async def request(self, method, url, headers, params, body, timeout):
+        resp = await self.inner.request(method, url, headers, params, body, timeout)
+        path = urlparse(url).path
+        query = urlencode(params or {})
+        content = None if body is None else json.dumps(body).encode()
+        github_recorder.record(
+            github_recorder.fixture_key(method, path, query, content),
+            method=method, path=path, query=query, status=resp.status_code, headers=resp.headers,
+            content=resp.content, upstream=self.upstream, directory=self.directory,
+        )
+        return resp
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+async def run_fetch(backend: str, headers: dict, owner: str, name: str, sinces: dict, transport=None) -> dict:
+    """按 module_c.get_git_data.fetch 的请求组合采集一次（不写文件），返回耗时与计数"""
+    async with AsyncGitHub(headers, transport=transport) as gh:
+        base = github_api_url(f"/repos/{owner}/{name}")
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if backend == "graphql":
+                collect = graphql_backend.collect(gh, owner, name, sinces, get_git_data.FILES_TO_CHECK)
+            else:
+                collect = get_git_data.collect_rest(gh, base, sinces)
+            runs = gh.paginate(f"{base}/actions/runs", {"created": f">={sinces['workflow_runs'][:10]}"},
+                               item_key="workflow_runs")
+            collected, runs = await asyncio.gather(collect, runs)
+        return {
+            "seconds": time.perf_counter() - start,
+            "requests": gh.requests,
+            "commits": len(collected["commits"]),
+            "prs": len(collected["prs"]),
+            "runs": len(runs),
+        }
+
+
+def simulate_fixtures(directory: Path, owner: str, name: str, sinces: dict) -> None:
+    """以合成数据生成两个后端所需的全部夹具"""
+    simulated = bench_github_backends.SimulatedGitHub(2000, 500, 60, latency=0.0, bandwidth_mbps=10_000, runs=1000)
+    for backend in ("rest", "graphql"):
+        transport = RecordingTransport(simulated, directory, bench_github_backends.API)
+        asyncio.run(run_fetch(backend, {}, owner, name, sinces, transport))
+
+
+def main() -> None:
+    cfg = load_config()
+    parser = argparse.ArgumentParser(description="基于本地回放服务的模块 C 采集压测")
+    parser.add_argument("--fixtures", default=None, help="夹具目录（默认 github.replay.dir）")
+    parser.add_argument("--record", action="store_true", help="先从 api.github.com 录制夹具（需要 GITHUB_TOKEN）")
+    parser.add_argument("--simulate", action="store_true", help="用合成数据生成夹具到临时目录")
+    parser.add_argument("--since", default=cfg.get("module_c", {}).get("since_date", "2024-01-01"))
+    parser.add_argument("--backends", default="rest,graphql")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回 502 的比例")
+    parser.add_argument("--rate-limit", type=int, default=0, help="每个窗口的请求配额（0 表示不限）")
+    parser.add_argument("--rate-limit-window", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    project = cfg.get("project", {})
+    if args.simulate:
+        owner, name = bench_github_backends.OWNER, bench_github_backends.NAME
+    else:
+        owner, name = project.get("repo_owner", "apache"), project.get("repo_name", "rocketmq")
+    since = args.since + "T00:00:00Z"
+    sinces = {resource: since for resource in get_git_data.RESOURCES}
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+
+    if args.simulate:
+        fixtures = Path(tempfile.mkdtemp(prefix="github_fixtures_"))
+        simulate_fixtures(fixtures, owner, name, sinces)
+    else:
+        fixtures = Path(args.fixtures) if args.fixtures else github_recorder.fixtures_dir()
+
+    headers = {}
+    if args.record:
+        headers = github_headers(load_github_token(missing_hint="--record 需要在 scripts/.env 中填写 GITHUB_TOKEN"))
+        recorder = mock_github_server.start_server(fixtures=fixtures, upstream=DEFAULT_API_URL)
+        os.environ["GITHUB_API_URL"] = recorder.base_url
+        for backend in backends:
+            asyncio.run(run_fetch(backend, headers, owner, name, sinces))
+        recorder.shutdown()
+        print(f"[OK] 已录制 {recorder.recorded} 个响应到 {fixtures}")
+
+    print(f"[Info] {owner}/{name} since {since}, fixtures={fixtures} ({len(list(fixtures.glob('*.json')))} files)")
+    print(f"[Info] latency={args.latency}s, error_rate={args.error_rate}, "
+          f"rate_limit={args.rate_limit or 'off'}/{args.rate_limit_window:g}s")
+    print(f"\n{'backend':<10}{'seconds':>10}{'requests':>10}{'errors':>8}{'limited':>9}{'misses':>8}"
+          f"{'commits':>9}{'prs':>7}{'runs':>7}")
+    for backend in backends:
+        server = mock_github_server.start_server(
+            fixtures=fixtures, latency=args.latency, error_rate=args.error_rate,
+            rate_limit=args.rate_limit, rate_limit_window=args.rate_limit_window, seed=args.seed,
+        )
+        os.environ["GITHUB_API_URL"] = server.base_url
+        try:
+            r = asyncio.run(run_fetch(backend, headers, owner, name, sinces))
+        finally:
+            server.shutdown()
+        print(f"{backend:<10}{r['seconds']:>10.2f}{r['requests']:>10}{server.errors:>8}{server.rate_limited:>9}"
+              f"{server.misses:>8}{r['commits']:>9,}{r['prs']:>7,}{r['runs']:>7,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+bench_llm_stage.py
+
+离线压测模块 D 的 LLM 阶段：在本地启动模拟大模型服务，
+以指定并发多次运行 LLMClient.generate_report，统计吞吐、首 token 延迟与 token 用量。
+
+用法:
+    python -m benchmarks.bench_llm_stage                       # 使用 data/module_d/AGGREGATED_REPORT.md
+    python -m benchmarks.bench_llm_stage --runs 20 --concurrency 4 --ttft 0.3 --chunks-per-sec 200
+    python -m benchmarks.bench_llm_stage --synthetic-kb 400    # 使用合成聚合报告（触发 map-reduce）
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from scripts.module_d import llm_client
+from scripts.module_d import mock_llm_server
+from scripts.module_d.aggregator import AGGREGATED_REPORT_PATH, MODULE_TITLES
+
+
+def synthetic_report(size_kb: int) -> str:
+    """按模块均分大小的合成聚合报告"""
+    lines = ["# Aggregated Engineering Analysis Report\n\n## 0. Pipeline Execution Overview\n\n---\n\n"]
+    per_module = size_kb * 1024 // len(MODULE_TITLES)
+    for name, title in MODULE_TITLES.items():
+        body, i = [], 0
+        while sum(len(b.encode("utf-8")) for b in body) < per_module:
+            body.append(f"| {name} | 指标 {i} | 圈复杂度 {i % 50} | 提交 {i * 7} |\n")
+            i += 1
+        lines.append(f"## {title}\n\n### Figures Index\n\n- `figures/{name}/chart.png`\n\n" + "".join(body) + "\n---\n\n")
+    return "".join(lines)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))] if values else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="模块 D LLM 阶段离线压测")
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--ttft", type=float, default=0.2, help="模拟首 token 延迟（秒）")
+    parser.add_argument("--chunks-per-sec", type=float, default=500, help="模拟流式速率")
+    parser.add_argument("--chunk-chars", type=int, default=8)
+    parser.add_argument("--synthetic-kb", type=int, default=0, help="使用指定大小的合成聚合报告")
+    parser.add_argument("--no-stream", action="store_true")
+    args = parser.parse_args()
+
+    if args.synthetic_kb or not AGGREGATED_REPORT_PATH.exists():
+        content = synthetic_report(args.synthetic_kb or 64)
+    else:
+        content = AGGREGATED_REPORT_PATH.read_text(encoding="utf-8")
+
+    server = mock_llm_server.start_server(
+        ttft=args.ttft, chunks_per_sec=args.chunks_per_sec, chunk_chars=args.chunk_chars
+    )
+    os.environ.setdefault("LLM_API_KEY", "mock")
+    client = llm_client.LLMClient({
+        **llm_client.CONFIG.get("module_d", {}).get("llm", {}),
+        "base_url": f"http://127.0.0.1:{server.server_port}/v1",
+        "stream": not args.no_stream,
+        "cache": {"enabled": False},
+        "replay": {"mode": "off"},
+    })
+
+    out_dir = Path(tempfile.mkdtemp(prefix="bench_llm_"))
+    latencies = []
+
+    def run(i):
+        start = time.perf_counter()
+        client.generate_report(content, out_dir / f"FINAL_REPORT_{i}.md")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run, range(args.runs)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    reduce_calls = [m for m in client.metrics if m["label"] == "reduce"]
+    ttfts = [m["ttft_sec"] for m in reduce_calls if m["ttft_sec"] is not None]
+    completion = sum(m["completion_tokens"] for m in client.metrics)
+
+    print(f"[Info] 聚合报告 {len(content):,} 字符, {args.runs} 次运行, 并发 {args.concurrency}, "
+          f"{len(client.metrics)} 次 LLM 调用, 服务端收到 {server.requests} 个请求")
+    print(f"{'metric':<28}{'value':>12}")
+    print(f"{'reports/min':<28}{args.runs / elapsed * 60:>12.1f}")
+    print(f"{'latency p50 (s)':<28}{statistics.median(latencies):>12.2f}")
+    print(f"{'latency p95 (s)':<28}{percentile(latencies, 0.95):>12.2f}")
+    if ttfts:
+        print(f"{'reduce TTFT p50 (s)':<28}{statistics.median(ttfts):>12.2f}")
+    print(f"{'completion tokens/s':<28}{completion / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+bench_pipeline.py
+
+模块 A / B / C 各阶段的离线基准：用 synthetic.py 生成指定规模的合成数据，
+对清洗、加载、评分、报告生成与每张图表分别计时，结果按 git commit 保存，便于跨提交对比。
+
+用法:
+    python -m benchmarks.bench_pipeline                            # 默认 10k,100k
+    python -m benchmarks.bench_pipeline --scales 10k,1m,10m --repeat 3
+    python -m benchmarks.bench_pipeline --stages b.clean,c.calculate --no-plots
+    python -m benchmarks.bench_pipeline --compare 1aba45d          # 与该提交的结果对比
+
+结果写入 benchmarks/results/<commit>.json（同一提交多次运行时按 stage+scale 覆盖）。
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pandas as pd
+
+from benchmarks import synthetic
+from scripts.module_a import report_generator as a_report
+from scripts.module_a import visualizer as a_viz
+from scripts.module_b import clean_git_data as b_clean
+from scripts.module_b import report_generator as b_report
+from scripts.module_b import visualizer as b_viz
+from scripts.module_c import clean_git_data as c_clean
+from scripts.module_c import report_generator as c_report
+from scripts.module_c import visualizer as c_viz
+
+ROOT = Path(__file__).resolve().parent.parent
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+FIGURES_REL_DIR = "../../figures/bench"
+
+
+# =========================
+# 各模块的基准阶段
+# =========================
+# 每个阶段为 (名称, 函数, 前置阶段)：--stages 过滤掉的前置阶段在计时前执行一次，不计入结果
+
+Stage = tuple[str, Callable, tuple[str, ...]]
+
+
+def module_b_stages(n: int, work: Path, plots: bool) -> list[Stage]:
+    raw, clean = work / "commits.csv", work / "clean_commits.csv"
+    synthetic.commits_csv(str(raw), n)
+    state: dict = {}
+
+    def load():
+        state["df"] = b_viz.load_and_process_data(str(clean))
+
+    stages = [
+        ("b.clean_commits_csv", lambda: b_clean.clean_commits_csv(str(raw), str(clean)), ()),
+        ("b.load_and_process_data", load, ("b.clean_commits_csv",)),
+        ("b.build_markdown", lambda: b_report.build_markdown(state["df"], figures_rel_dir=FIGURES_REL_DIR),
+         ("b.load_and_process_data",)),
+    ]
+    if plots:
+        for plot in (b_viz.plot_holiday_overtime_pie, b_viz.plot_workday_overtime_pie,
+                     b_viz.plot_workday_hourly_bar, b_viz.plot_heatmap, b_viz.plot_daily_trend):
+            stages.append((f"b.{plot.__name__}", lambda plot=plot: plot(state["df"], str(work)),
+                           ("b.load_and_process_data",)))
+    return stages
+
+
+def module_a_stages(n: int, work: Path, plots: bool) -> list[Stage]:
+    files = synthetic.python_files(max(1, n // 10))
+    bandit = synthetic.bandit_results(n)
+    lizard = synthetic.lizard_results(n)
+
+    stages = [
+        ("a.build_markdown", lambda: a_report.build_markdown(files, bandit, lizard, figures_rel_dir=FIGURES_REL_DIR),
+         ()),
+    ]
+    if plots:
+        stages += [
+            ("a.plot_bandit_severity", lambda: a_viz.plot_bandit_severity(bandit, str(work)), ()),
+            ("a.plot_bandit_issues", lambda: a_viz.plot_bandit_issues(bandit, str(work)), ()),
+            ("a.plot_complexity_distribution", lambda: a_viz.plot_complexity_distribution(lizard, str(work)), ()),
+            ("a.plot_top_complex_functions", lambda: a_viz.plot_top_complex_functions(lizard, str(work)), ()),
+            ("a.plot_repository_comparison", lambda: a_viz.plot_repository_comparison(bandit, lizard, str(work)), ()),
+        ]
+    return stages
+
+
+def module_c_stages(n: int, work: Path, plots: bool) -> list[Stage]:
+    commits = synthetic.github_commits(n)
+    prs = synthetic.github_prs(max(1, n // 10))
+    runs = synthetic.github_runs(max(1, n // 2))
+    releases = synthetic.github_releases(50)
+    data = synthetic.score_data()
+
+    stages = [
+        ("c.calculate_scores", lambda: c_clean.calculate_scores(
+            commits, prs, runs, releases, synthetic.FILES_STATUS, generated_at="2026-01-01 00:00:00"), ()),
+        ("c.build_markdown", lambda: c_report.build_markdown(data, figures_rel_dir=FIGURES_REL_DIR), ()),
+    ]
+    if plots:
+        stages += [
+            ("c.plot_radar", lambda: c_viz.plot_radar(data, str(work / "radar_chart.png")), ()),
+            ("c.plot_breakdown", lambda: c_viz.plot_breakdown(data, str(work / "breakdown_chart.png")), ()),
+        ]
+    return stages
+
+
+STAGE_BUILDERS = {"a": module_a_stages, "b": module_b_stages, "c": module_c_stages}
+
+
+# =========================
+# 计时与结果保存
+# =========================
+
+def prepare(name: str, stages: list[Stage], done: set[str]) -> None:
+    """按依赖顺序执行 name 尚未执行的前置阶段（不计时）"""
+    by_name = {stage[0]: stage for stage in stages}
+    for required in by_name[name][2]:
+        if required not in done:
+            prepare(required, stages, done)
+            by_name[required][1]()
+            done.add(required)
+
+
+def run(scales: list[int], selected: list[str], repeat: int, plots: bool) -> list[dict]:
+    results = []
+    for n in scales:
+        print(f"\n[Info] scale = {n:,} rows")
+        for module, builder in STAGE_BUILDERS.items():
+            if selected and not any(s.split(".")[0] == module for s in selected):
+                continue
+            with tempfile.TemporaryDirectory() as tmp:
+                start = time.perf_counter()
+                stages = builder(n, Path(tmp), plots)
+                print(f"[Info] module {module}: generated synthetic data in {time.perf_counter() - start:.2f}s")
+
+                done: set[str] = set()
+                for name, fn, _ in stages:
+                    if selected and not any(name.startswith(s) for s in selected):
+                        continue
+                    prepare(name, stages, done)
+                    timings = []
+                    for _ in range(repeat):
+                        t0 = time.perf_counter()
+                        fn()
+                        timings.append(time.perf_counter() - t0)
+                    done.add(name)
+                    best = min(timings)
+                    results.append({"stage": name, "scale": n, "seconds": round(best, 4),
+                                    "rows_per_sec": round(n / best) if best else None})
+                    print(f"  {name:<34}{best:>10.3f}s{n / best if best else 0:>16,.0f} rows/s")
+    return results
+
+
+def git_commit() -> tuple[str, bool]:
+    """当前 HEAD 的短哈希与工作区是否有未提交修改"""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def save(results: list[dict]) -> Path:
+    sha, dirty = git_commit()
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{sha}.json"
+
+    previous = json.loads(path.read_text(encoding="utf-8")).get("results", []) if path.exists() else []
+    keys = {(r["stage"], r["scale"]) for r in results}
+    merged = [r for r in previous if (r["stage"], r["scale"]) not in keys] + results
+
+    path.write_text(json.dumps({
+        "commit": sha,
+        "dirty": dirty,
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "results": sorted(merged, key=lambda r: (r["scale"], r["stage"])),
+    }, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def compare(results: list[dict], baseline: str) -> None:
+    path = RESULTS_DIR / f"{baseline}.json"
+    if not path.exists():
+        print(f"[Warn] 未找到基线结果: {path}")
+        return
+    base = {(r["stage"], r["scale"]): r["seconds"] for r in json.loads(path.read_text(encoding="utf-8"))["results"]}
+
+    print(f"\n[Info] 与 {baseline} 对比（>1 表示变慢）")
+    print(f"{'stage':<34}{'scale':>12}{'baseline':>11}{'current':>11}{'ratio':>8}")
+    for r in results:
+        old = base.get((r["stage"], r["scale"]))
+        if old:
+            print(f"{r['stage']:<34}{r['scale']:>12,}{old:>10.3f}s{r['seconds']:>10.3f}s{r['seconds'] / old:>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="模块 A / B / C 各阶段的离线基准")
+    parser.add_argument("--scales", default="10k,100k", help="逗号分隔的数据规模，如 10k,1m,10m")
+    parser.add_argument("--stages", default="", help="只运行名称以这些前缀开头的阶段，如 b.clean,c.")
+    parser.add_argument("--repeat", type=int, default=1, help="每个阶段重复次数（取最小值）")
+    parser.add_argument("--no-plots", action="store_true", help="跳过图表阶段")
+    parser.add_argument("--compare", default=None, help="与 benchmarks/results/<commit>.json 对比")
+    parser.add_argument("--no-save", action="store_true", help="不保存结果")
+    args = parser.parse_args()
+
+    scales = [synthetic.parse_scale(s) for s in args.scales.split(",") if s.strip()]
+    selected = [s.strip() for s in args.stages.split(",") if s.strip()]
+
+    results = run(scales, selected, max(1, args.repeat), plots=not args.no_plots)
+    if not args.no_save:
+        print(f"\n[OK] 结果已保存: {save(results)}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
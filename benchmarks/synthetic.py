@@ -0,0 +1,244 @@
+"""
+synthetic.py
+
+基准测试用的合成数据生成器（离线、可复现）：
+- commits_csv：模块 B 的 commits.csv（与 get_git_data.py 的表头一致）
+- python_files / bandit_results / lizard_results：模块 A 的扫描结果
+- github_commits / github_prs / github_runs / github_releases：模块 C 评分使用的 GitHub API 对象
+- github_jobs：workflow run 的 job / step 计时（模块 C 的 CI 耗时统计）
+- score_data：模块 C 的 clean_scores.json
+
+列数据用 numpy 向量化生成（1M 行的 commits.csv 约 10 秒，主要耗时在写 CSV）。
+"""
+import numpy as np
+import pandas as pd
+
+REPOSITORIES = ["apache/rocketmq", "apache/rocketmq-dashboard", "apache/rocketmq-client-python"]
+AUTHORS = [f"dev{i}" for i in range(200)]
+SUBJECTS = [
+    "feat: add message trace",
+    "fix(broker): avoid NPE on shutdown",
+    "[ISSUE #1024] Polish consumer offset logic",
+    "Merge pull request #100 from dev/branch",
+    "Merge branch 'develop'",
+    "update README",
+    "docs: fix typo",
+]
+SEVERITIES = ["LOW", "MEDIUM", "HIGH"]
+BANDIT_ISSUES = [
+    ("B101", "assert_used"), ("B105", "hardcoded_password_string"), ("B311", "blacklist"),
+    ("B404", "blacklist"), ("B603", "subprocess_without_shell_equals_true"), ("B110", "try_except_pass"),
+]
+CONCLUSIONS = ["success", "success", "success", "failure", "cancelled", "skipped"]
+
+# 2013-03-15 起约 12 年的时间范围（秒）
+_START = np.datetime64("2013-03-15T00:00:00")
+_SPAN_SECONDS = 12 * 365 * 24 * 3600
+
+
+def parse_scale(text: str) -> int:
+    """'10k' / '1m' / '2500' -> 行数"""
+    text = text.strip().lower().replace("_", "")
+    units = {"k": 1_000, "m": 1_000_000}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _times(rng: np.random.Generator, n: int) -> np.ndarray:
+    return np.sort(_START + rng.integers(0, _SPAN_SECONDS, n).astype("timedelta64[s]"))
+
+
+def _iso(times: np.ndarray) -> np.ndarray:
+    """GitHub API 的时间格式：2024-01-01T00:00:00Z"""
+    return np.char.add(np.datetime_as_string(times, unit="s"), "Z")
+
+
+# =========================
+# 模块 B
+# =========================
+
+def commits_frame(n: int, seed: int = 42) -> pd.DataFrame:
+    """commits.csv 的内容（authored_utc, sha, author_name, author_email, subject）"""
+    rng = np.random.default_rng(seed)
+    authors = np.array(AUTHORS)[rng.integers(0, len(AUTHORS), n)]
+    return pd.DataFrame({
+        "authored_utc": _iso(_times(rng, n)),
+        "sha": [f"{i:040x}" for i in range(n)],
+        "author_name": authors,
+        "author_email": np.char.add(authors, "@example.com"),
+        "subject": np.array(SUBJECTS)[rng.integers(0, len(SUBJECTS), n)],
+    })
+
+
+def commits_csv(path: str, n: int, seed: int = 42) -> str:
+    """写出 n 行的 commits.csv，返回路径"""
+    commits_frame(n, seed).to_csv(path, index=False)
+    return path
+
+
+# =========================
+# 模块 A
+# =========================
+
+def python_files(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    repos = np.array(REPOSITORIES)[rng.integers(0, len(REPOSITORIES), n)]
+    rel = [f"pkg{i % 97}/module_{i}.py" for i in range(n)]
+    return pd.DataFrame({
+        "repository": repos,
+        "absolute_path": [f"/tmp/{r}/{p}" for r, p in zip(repos, rel)],
+        "relative_path": rel,
+        "file_size": rng.integers(100, 50_000, n),
+    })
+
+
+def bandit_results(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    issue = rng.integers(0, len(BANDIT_ISSUES), n)
+    return pd.DataFrame({
+        "repository": np.array(REPOSITORIES)[rng.integers(0, len(REPOSITORIES), n)],
+        "file": [f"pkg/module_{i % 5000}.py" for i in range(n)],
+        "line_number": rng.integers(1, 2000, n),
+        "issue_type": np.array([t for t, _ in BANDIT_ISSUES])[issue],
+        "issue_name": np.array([name for _, name in BANDIT_ISSUES])[issue],
+        "severity": np.array(SEVERITIES)[rng.choice(3, n, p=[0.6, 0.3, 0.1])],
+        "confidence": np.array(SEVERITIES)[rng.choice(3, n, p=[0.2, 0.3, 0.5])],
+        "code": "assert x",
+        "description": "Use of assert detected.",
+    })
+
+
+def lizard_results(n: int, seed: int = 42) -> pd.DataFrame:
+    """lizard_scanner.analyze_complexity 之后的结果（含问题标记列）"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "repository": np.array(REPOSITORIES)[rng.integers(0, len(REPOSITORIES), n)],
+        "nloc": rng.geometric(0.05, n),
+        "ccn": rng.geometric(0.25, n),
+        "token": rng.integers(10, 2000, n),
+        "param": rng.poisson(2, n),
+        "function": [f"func_{i}" for i in range(n)],
+        "file": [f"pkg/module_{i % 5000}.py" for i in range(n)],
+    })
+    df["high_complexity"] = df["ccn"] > 15
+    df["too_long"] = df["nloc"] > 80
+    df["too_many_params"] = df["param"] > 5
+    return df
+
+
+# =========================
+# 模块 C
+# =========================
+
+def github_commits(n: int, seed: int = 42) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    times = _iso(_times(rng, n)[::-1]).tolist()
+    subjects = np.array(SUBJECTS)[rng.integers(0, len(SUBJECTS), n)]
+    bodies = rng.random(n) < 0.3
+    return [
+        {
+            "sha": f"{i:040x}",
+            "commit": {
+                "author": {"name": "dev", "date": t},
+                "message": s + ("\n\nSigned-off-by: dev <dev@example.com>" if b else ""),
+            },
+        }
+        for i, (t, s, b) in enumerate(zip(times, subjects, bodies))
+    ]
+
+
+def github_prs(n: int, seed: int = 42) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    times = _iso(_times(rng, n)[::-1]).tolist()
+    has_body = rng.random(n) < 0.7
+    has_label = rng.random(n) < 0.4
+    return [
+        {
+            "number": i,
+            "state": "closed",
+            "closed_at": t,
+            "updated_at": t,
+            "body": "This PR fixes the broker shutdown ordering." if body else "",
+            "labels": [{"name": "bug"}] if label else [],
+            "assignee": None,
+            "requested_reviewers": [],
+        }
+        for i, (t, body, label) in enumerate(zip(times, has_body, has_label))
+    ]
+
+
+def github_runs(n: int, seed: int = 42) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    times = _iso(_times(rng, n)[::-1]).tolist()
+    conclusions = np.array(CONCLUSIONS)[rng.integers(0, len(CONCLUSIONS), n)]
+    return [
+        {"id": i, "created_at": t, "conclusion": c, "status": "completed"}
+        for i, (t, c) in enumerate(zip(times, conclusions))
+    ]
+
+
+CI_JOBS = ["build", "unit-test", "integration-test"]
+
+
+def github_jobs(runs: list[dict], seed: int = 42) -> dict[int, list[dict]]:
+    """run id -> 该运行的 jobs（排队与执行耗时服从对数正态分布，每个 job 两个 step）"""
+    rng = np.random.default_rng(seed)
+    n = len(runs) * len(CI_JOBS)
+    created = np.repeat(np.array([r["created_at"][:-1] for r in runs], dtype="datetime64[s]"), len(CI_JOBS))
+    queue = rng.lognormal(3.0, 1.0, n).astype("timedelta64[s]")
+    duration = rng.lognormal(6.0, 0.6, n).astype("timedelta64[s]")
+    started = created + queue
+    completed = started + duration
+    setup = started + (duration // 10)
+    created, started, setup, completed = (_iso(t).tolist() for t in (created, started, setup, completed))
+
+    jobs: dict[int, list[dict]] = {}
+    for i in range(n):
+        run = runs[i // len(CI_JOBS)]
+        conclusion = str(run["conclusion"])
+        jobs.setdefault(run["id"], []).append({
+            "id": i,
+            "run_id": run["id"],
+            "name": CI_JOBS[i % len(CI_JOBS)],
+            "status": "completed",
+            "conclusion": conclusion,
+            "created_at": created[i],
+            "started_at": started[i],
+            "completed_at": completed[i],
+            "steps": [
+                {"name": "Set up job", "conclusion": "success", "started_at": started[i], "completed_at": setup[i]},
+                {"name": "Run mvn verify", "conclusion": conclusion, "started_at": setup[i],
+                 "completed_at": completed[i]},
+            ],
+        })
+    return jobs
+
+
+def github_releases(n: int, seed: int = 42) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    times = _iso(_times(rng, n)[::-1]).tolist()
+    return [{"tag_name": f"v{i}", "published_at": t} for i, t in enumerate(times)]
+
+
+FILES_STATUS = {
+    ".github/workflows": True,
+    "LICENSE": True,
+    "README.md": True,
+    "CONTRIBUTING.md": True,
+    "CODE_OF_CONDUCT.md": False,
+    "pom.xml": True,
+    ".editorconfig": False,
+}
+
+
+def score_data() -> dict:
+    """clean_scores.json 的典型内容"""
+    return {
+        "version_control": {"total": 17.5, "commit_norm": 7.5, "pr_process": 10.0},
+        "ci_health": {"total": 17.0, "run_rate": 12.0, "config_exist": 5, "stats": "800/1000"},
+        "governance": {"total": 26.25, "docs": 11.25, "release_cycle": 15},
+        "code_quality": {"total": 25, "test_config": 10, "style_config": 15},
+        "total_score": 85.75,
+        "generated_at": "2026-01-01 00:00:00",
+    }
@@ -4,28 +4,19 @@ from pathlib import Path
 def run():
     """
     项目统一入口脚本。
-    实际上是 Module D (scripts/module_d/main.py) 的快捷方式。
+    实际上是 Module D (scripts/module_d/main.py) 的快捷方式，
+    等价于 python -m scripts.module_d.main（pip install 之后也可直接使用 rocketmq-analysis 命令）。
     """
-    # 获取项目根目录
-    project_root = Path(__file__).resolve().parent
-    
-    # 将 scripts/module_d 加入 Python 搜索路径 (sys.path)
-    # 这样 module_d 内部的 import (如 import runner) 才能找到同级文件
-    module_d_path = project_root / "scripts" / "module_d"
-    sys.path.insert(0, str(module_d_path))
-
+    # 以脚本方式运行时项目根目录即 sys.path[0]，scripts 包可以直接按包名导入
     try:
-        # 直接导入 Module D 的 main 函数
-        # 注意：这里已经是 "from main" 了，因为我们把 module_d 加到了 path[0]
-        from main import main as module_d_main
-        
-        # 执行
-        module_d_main()
-        
+        from scripts.module_d.main import cli
     except ImportError as e:
         print(f"[Error] 无法加载 Module D: {e}")
-        print(f"请检查目录结构是否完整: {module_d_path}")
+        print(f"请检查目录结构是否完整: {Path(__file__).resolve().parent / 'scripts'}")
         sys.exit(1)
+
+    try:
+        cli()
     except Exception as e:
         print(f"[Error] 运行过程中发生未捕获异常: {e}")
         sys.exit(1)
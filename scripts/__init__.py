@@ -0,0 +1,11 @@
+"""
+RocketMQ 工程分析工具包
+
+- module_a：Python 静态分析（Bandit / Lizard）
+- module_b：提交时间与加班分析
+- module_c：工程规范性评分
+- module_d：统一入口、交付物收集与 LLM 报告
+
+源码检出中以 scripts 包的形式使用（python -m scripts.module_d.main），
+pip install 之后包名为 rocketmq_analysis，并提供 rocketmq-analysis 命令。
+"""
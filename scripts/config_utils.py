@@ -1,25 +1,96 @@
+import functools
+import os
 import yaml
 from pathlib import Path
 
+# 源码检出（含可编辑安装）中包目录的上一级即项目根目录
 ROOT_DIR = Path(__file__).parent.parent
 
+# 显式指定项目根目录（config.yaml、data/、figures/、docs/ 所在目录）的环境变量
+ROOT_ENV = 'RMQ_PROJECT_ROOT'
+
+# 影响配置内容的环境变量（fleet 模式的调度参数），取值不同则分别缓存
+_ENV_OVERRIDES = ('RMQ_REPO_OWNER', 'RMQ_REPO_NAME', 'RMQ_FLEET_NAMESPACE')
+
+
+def find_project_root(config_file="config.yaml"):
+    """
+    定位项目根目录，依次尝试：
+    1. 环境变量 RMQ_PROJECT_ROOT
+    2. 包目录的上一级（源码检出或可编辑安装）
+    3. 从当前工作目录向上查找含 config_file 的目录（安装到 site-packages 时）
+    都找不到时返回包目录的上一级，由 load_config 报告配置缺失
+    """
+    env_root = os.getenv(ROOT_ENV)
+    if env_root:
+        return Path(env_root).resolve()
+    if (ROOT_DIR / config_file).exists():
+        return ROOT_DIR
+    cwd = Path.cwd().resolve()
+    for directory in (cwd, *cwd.parents):
+        if (directory / config_file).exists():
+            return directory
+    return ROOT_DIR
+
+
 def load_config(config_file="config.yaml"):
-    """加载配置并注入绝对路径。"""
-    config_path = ROOT_DIR / config_file
+    """
+    加载配置并注入绝对路径。
+
+    每个进程只解析一次 YAML：同一配置文件、项目根目录与环境变量组合返回同一个配置对象（调用方不应修改）。
+    """
+    return _load_config(config_file, find_project_root(config_file), *(os.getenv(key) for key in _ENV_OVERRIDES))
+
+
+def load_repo_config(repo_owner, repo_name, namespace=None, config_file="config.yaml"):
+    """
+    按指定仓库与输出命名空间加载配置，效果等同于设置 RMQ_REPO_OWNER / RMQ_REPO_NAME / RMQ_FLEET_NAMESPACE
+    （fleet 模式在同一进程内为多个仓库采集数据时使用）
+    """
+    return _load_config(config_file, find_project_root(config_file), repo_owner, repo_name, namespace)
+
+
+def config_parse_count():
+    """本进程实际解析 config.yaml 的次数"""
+    return _load_config.cache_info().misses
+
+
+def clear_config_cache():
+    """清除已解析的配置（修改 config.yaml 后需要在同一进程内重新加载时使用）"""
+    _load_config.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config(config_file, root, repo_owner, repo_name, namespace):
+    config_path = root / config_file
     
     if not config_path.exists():
-        raise FileNotFoundError(f"Config not found at: {config_path}")
+        raise FileNotFoundError(f"Config not found at: {config_path} "
+                                f"(在项目根目录下运行，或通过 {ROOT_ENV} 指定项目根目录)")
 
     with open(config_path, 'r', encoding='utf-8') as f:
         config = yaml.safe_load(f) or {}
         
     # 注入绝对路径
-    config.setdefault('paths', {})['root'] = str(ROOT_DIR)
+    config.setdefault('paths', {})['root'] = str(root)
     
     output = config.get('output', {})
     for key, val in [('data', 'data_dir'), ('figures', 'figures_dir'), ('docs', 'docs_dir')]:
-        config['paths'][key] = str(ROOT_DIR / output.get(val, key))
-        
+        config['paths'][key] = str(root / output.get(val, key))
+
+    warehouse = config.get('warehouse', {})
+    config['paths']['warehouse'] = str(root / warehouse.get('path', 'data/warehouse.db'))
+
+    # fleet 模式：调度进程通过环境变量指定目标仓库，并把输出隔离到命名空间目录
+    if repo_owner and repo_name:
+        project = config.setdefault('project', {})
+        project['repo_owner'] = repo_owner
+        project['repo_name'] = repo_name
+
+    if namespace:
+        for key in ('data', 'figures'):
+            config['paths'][key] = str(Path(config['paths'][key]) / 'fleet' / namespace)
+
     return config
 
 if __name__ == "__main__":
@@ -0,0 +1,275 @@
+"""
+github_async.py
+
+基于 asyncio 的 GitHub API 客户端（模块 B / C 的采集与 fleet 预取共用）：
+- 所有请求共享一个并发信号量（github.concurrency），单线程内可同时挂起数百个请求
+- 安装 httpx 时使用 httpx.AsyncClient，同时安装 h2 时启用 HTTP/2 多路复用（github.http2）；
+  未安装 httpx 时退回到线程池中执行 requests，连接池大小与并发度一致
+- 所有 GitHub 请求的唯一重试入口：超时 / 连接错误 / 5xx 指数退避重试 github.retries 次，
+  限流时等待 Retry-After 或到配额重置（超过 github.max_rate_limit_wait 秒直接失败）
+- paginate 先请求第 1 页并从 Link 头得到总页数，其余页并发拉取，结果按页序拼接
+- graphql 以 POST 调用 GraphQL API，响应中的 errors 抛出 GraphQLError
+- 以 / 开头的路径按 module_utils.github_api_url 补全，GraphQL 地址为 <api_url>/graphql
+
+用法:
+    async with AsyncGitHub(headers) as gh:
+        repo = await gh.get_json(url)
+        commits = await gh.paginate(url, {"since": since})
+"""
+
+import asyncio
+import functools
+import importlib.util
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .config_utils import load_config
+from .module_utils import (
+    RETRY_STATUS,
+    backoff_delay,
+    consume_api_budget,
+    github_api_url,
+    parse_last_page,
+    rate_limit_wait,
+)
+from .tracing import span
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+HTTP2_AVAILABLE = httpx is not None and importlib.util.find_spec("h2") is not None
+
+
+class GraphQLError(RuntimeError):
+    """GraphQL 响应中带有 errors（HTTP 状态码仍为 200）"""
+
+    def __init__(self, errors: list):
+        self.errors = errors
+        super().__init__("; ".join(str(e.get("message", e)) for e in errors[:3]))
+
+
+class GitHubResponse:
+    """与传输实现无关的响应（status_code / headers / json() / raise_for_status()，与 requests 保持一致）"""
+
+    def __init__(self, url: str, status_code: int, headers, content: bytes, http_version: str = "HTTP/1.1"):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.http_version = http_version
+
+    def json(self) -> Any:
+        return json.loads(self.content) if self.content else None
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class _HttpxTransport:
+    """httpx.AsyncClient：单线程内多路复用，HTTP/2 时多个请求共用一条连接"""
+
+    def __init__(self, concurrency: int, http2: bool):
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        self._client = httpx.AsyncClient(http2=http2, limits=limits)
+        self.name = f"httpx ({'HTTP/2' if http2 else 'HTTP/1.1'})"
+        self.transient_errors = (httpx.TransportError,)
+
+    async def request(self, method, url, headers, params, body, timeout) -> GitHubResponse:
+        resp = await self._client.request(method, url, headers=headers, params=params, json=body, timeout=timeout)
+        return GitHubResponse(str(resp.url), resp.status_code, resp.headers, resp.content, resp.http_version)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class _ThreadTransport:
+    """未安装 httpx 时的回退：requests.Session 在专用线程池中执行，事件循环不被阻塞"""
+
+    def __init__(self, concurrency: int):
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=concurrency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="github")
+        self.name = "requests (HTTP/1.1, thread pool)"
+        self.transient_errors = (requests.ConnectionError, requests.Timeout)
+
+    async def request(self, method, url, headers, params, body, timeout) -> GitHubResponse:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(
+            self._session.request, method, url, headers=headers, params=params, json=body, timeout=timeout
+        )
+        resp = await loop.run_in_executor(self._pool, call)
+        return GitHubResponse(resp.url, resp.status_code, resp.headers, resp.content)
+
+    async def aclose(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+
+
+class AsyncGitHub:
+    """
+    异步 GitHub API 客户端
+
+    concurrency / http2 默认取 config.yaml 的 github 配置；transport 供测试注入；
+    budget_key 为 fleet 共享配额的键（默认取环境变量 GITHUB_API_BUDGET_KEY）
+    """
+
+    def __init__(
+        self,
+        headers: dict[str, str],
+        *,
+        concurrency: int | None = None,
+        http2: bool | None = None,
+        transport=None,
+        budget_key: str | None = None,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ):
+        cfg = load_config().get("github", {})
+        self.headers = headers
+        self.concurrency = max(1, int(concurrency or cfg.get("concurrency", 16)))
+        self.retries = int(cfg.get("retries", 3))
+        self.backoff = float(cfg.get("backoff_seconds", 2))
+        self.max_wait = float(cfg.get("max_rate_limit_wait", 900))
+        self.budget_key = budget_key
+        self.requests = 0
+        self.bytes_received = 0
+        self._sleep = sleep
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        if transport is None:
+            if httpx is not None:
+                use_http2 = HTTP2_AVAILABLE and (cfg.get("http2", True) if http2 is None else http2)
+                transport = _HttpxTransport(self.concurrency, use_http2)
+            else:
+                transport = _ThreadTransport(self.concurrency)
+        self._transport = transport
+
+    @property
+    def transport_name(self) -> str:
+        return getattr(self._transport, "name", type(self._transport).__name__)
+
+    async def __aenter__(self) -> "AsyncGitHub":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    async def get(self, url: str, params: dict[str, Any] | None = None, timeout: int = 30) -> GitHubResponse:
+        """GET 请求，返回完整响应"""
+        return await self.request("GET", url, params=params, timeout=timeout)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        body: Any = None,
+        timeout: int = 30,
+    ) -> GitHubResponse:
+        """发送请求并按重试与限流规则处理响应；重试与限流等待期间不占用并发名额"""
+        url = github_api_url(url)
+        page = (params or {}).get("page")
+        transient = getattr(self._transport, "transient_errors", ())
+
+        attempt = 0
+        while True:
+            attempt += 1
+            consume_api_budget(self.budget_key)
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    with span(f"github_{method.lower()}", url=url, page=page, attempt=attempt):
+                        resp = await self._transport.request(method, url, self.headers, params, body, timeout)
+                    self.bytes_received += len(resp.content or b"")
+            except transient as e:
+                if attempt > self.retries:
+                    raise
+                delay = backoff_delay(self.backoff, attempt)
+                print(f"[Warn] GitHub 请求失败 ({type(e).__name__})，{delay:.1f}s 后重试 [{attempt}/{self.retries}]: {url}")
+                await self._sleep(delay)
+                continue
+
+            wait = rate_limit_wait(resp)
+            if wait is not None and attempt <= self.retries and wait <= self.max_wait:
+                print(f"[Warn] GitHub API 限流，等待 {wait:.0f}s 后重试 [{attempt}/{self.retries}]")
+                await self._sleep(wait)
+                continue
+            if resp.status_code in RETRY_STATUS and attempt <= self.retries:
+                delay = backoff_delay(self.backoff, attempt)
+                print(f"[Warn] GitHub 返回 {resp.status_code}，{delay:.1f}s 后重试 [{attempt}/{self.retries}]: {url}")
+                await self._sleep(delay)
+                continue
+
+            resp.raise_for_status()
+            return resp
+
+    async def get_json(self, url: str, params: dict[str, Any] | None = None, timeout: int = 30) -> Any:
+        return (await self.get(url, params=params, timeout=timeout)).json()
+
+    async def graphql(self, query: str, variables: dict[str, Any] | None = None, timeout: int = 30) -> dict:
+        """执行 GraphQL 查询，返回 data 字段"""
+        resp = await self.request("POST", "/graphql", body={"query": query, "variables": variables or {}},
+                                  timeout=timeout)
+        payload = resp.json() or {}
+        if payload.get("errors"):
+            raise GraphQLError(payload["errors"])
+        return payload.get("data") or {}
+
+    async def paginate(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        *,
+        item_key: str | None = None,
+        window: int = 4,
+        stop: Callable[[list], bool] | None = None,
+        timeout: int = 30,
+    ) -> list:
+        """
+        拉取分页接口的全部数据，结果按页序拼接
+
+        item_key: 响应为对象时，列表所在的字段（如 workflow_runs）
+        stop: 对某一页数据返回 True 时不再拉取后续页（用于按时间倒序、无服务端过滤的接口）；
+              设置 stop 时每批只并发拉取 window 页，避免越过窗口起点后多拉数据，否则其余页一次性并发
+        """
+        base_params = {"per_page": 100, **(params or {})}
+
+        async def fetch(page: int) -> tuple[list, str | None]:
+            resp = await self.get(url, params={**base_params, "page": page}, timeout=timeout)
+            data = resp.json()
+            items = (data or {}).get(item_key, []) if item_key else (data or [])
+            return items, resp.headers.get("Link")
+
+        first, link = await fetch(1)
+        items = list(first)
+        last_page = parse_last_page(link) or 1
+        if stop and stop(first):
+            return items
+
+        batch_size = max(1, window) if stop else max(1, last_page - 1)
+        next_page = 2
+        while next_page <= last_page:
+            batch = range(next_page, min(next_page + batch_size, last_page + 1))
+            pages = await asyncio.gather(*(fetch(p) for p in batch))
+            next_page = batch[-1] + 1
+
+            for page_items, _ in pages:
+                items.extend(page_items)
+                if stop and stop(page_items):
+                    return items
+                if not page_items:
+                    return items
+
+        return items
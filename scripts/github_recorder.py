@@ -0,0 +1,119 @@
+"""
+github_recorder.py
+
+GitHub API 响应的录制夹具（由 mock_github_server 的 record / replay 模式使用）：
+- 每个响应保存为 <dir>/<key>.json：请求方法、路径、查询参数，响应状态码、响应体，
+  以及 Link / ETag / Last-Modified / X-RateLimit-* / Retry-After 等影响客户端行为的响应头
+- 键由方法、路径、排序后的查询参数与请求体计算；随运行时间变化的参数（VOLATILE_PARAMS）不参与计算，
+  否则每次运行的请求都无法命中录制
+- 不保存请求头，Authorization 等凭据不会写入夹具；夹具不设过期时间，可作为离线数据提交或分享
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qsl
+
+from .config_utils import load_config
+
+# 回放时需要保留的响应头（小写）
+RECORDED_HEADERS = (
+    "content-type",
+    "link",
+    "etag",
+    "last-modified",
+    "retry-after",
+    "x-ratelimit-limit",
+    "x-ratelimit-remaining",
+    "x-ratelimit-reset",
+    "x-ratelimit-used",
+    "x-ratelimit-resource",
+)
+
+# 每次运行取值不同的查询参数（模块 B 以当前时间作为 until）
+VOLATILE_PARAMS = ("until",)
+
+
+def fixtures_dir(replay_cfg: Optional[dict] = None) -> Path:
+    """夹具目录：github.replay.dir（相对项目根目录），默认 data/github_fixtures"""
+    config = load_config()
+    if replay_cfg is None:
+        replay_cfg = config.get("github", {}).get("replay", {})
+    configured = replay_cfg.get("dir") or "data/github_fixtures"
+    path = Path(configured)
+    return path if path.is_absolute() else Path(config["paths"]["root"]) / path
+
+
+def fixture_key(method: str, path: str, query: str = "", body: bytes | None = None) -> str:
+    """请求的夹具键（查询参数排序，请求体按 JSON 规范化）"""
+    params = sorted((k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    payload: Any = None
+    if body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = body.decode("utf-8", errors="replace")
+    raw = json.dumps([method.upper(), path.rstrip("/"), params, payload], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def record(
+    key: str,
+    *,
+    method: str,
+    path: str,
+    query: str,
+    status: int,
+    headers: dict[str, str],
+    content: bytes,
+    upstream: str,
+    directory: Path,
+) -> Path:
+    """保存一次响应；upstream 为录制时的 API 地址，回放时用于改写 Link 头"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    kept = {k.lower(): v for k, v in headers.items() if k.lower() in RECORDED_HEADERS}
+    try:
+        body, encoding = (json.loads(content) if content else None), "json"
+    except ValueError:
+        body, encoding = content.decode("utf-8", errors="replace"), "text"
+
+    path_out = directory / f"{key}.json"
+    tmp = directory / f"{key}.json.tmp"
+    tmp.write_text(
+        json.dumps(
+            {
+                "method": method.upper(),
+                "path": path,
+                "query": query,
+                "upstream": upstream,
+                "status": status,
+                "headers": kept,
+                "encoding": encoding,
+                "body": body,
+            },
+            ensure_ascii=False,
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    tmp.replace(path_out)
+    return path_out
+
+
+def lookup(key: str, directory: Path) -> Optional[dict]:
+    """读取录制的响应，未录制返回 None"""
+    path = Path(directory) / f"{key}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def encode_body(fixture: dict) -> bytes:
+    """夹具中的响应体还原为字节"""
+    if fixture.get("encoding") == "text":
+        return (fixture.get("body") or "").encode("utf-8")
+    if fixture.get("body") is None:
+        return b""
+    return json.dumps(fixture["body"], ensure_ascii=False).encode("utf-8")
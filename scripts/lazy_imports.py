@@ -0,0 +1,80 @@
+"""
+lazy_imports.py
+
+延迟导入重量级依赖（pandas / matplotlib / seaborn / openai 等）：
+- lazy_import(name) 立即返回一个代理模块，第一次访问其属性时才真正导入
+- 每次真正导入的耗时记录在 IMPORT_TIMINGS 中，供 main.py --timings 打印
+
+用法:
+    pd = lazy_import("pandas")                     # 此时不导入
+    df = pd.read_csv(path)                         # 第一次使用时导入
+    visualizer = lazy_import(".visualizer", __package__)   # 包内相对导入
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+import types
+from typing import Dict
+
+# 模块名 -> 真正导入耗时（秒）
+IMPORT_TIMINGS: Dict[str, float] = {}
+
+_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    """第一次访问属性时导入目标模块的代理"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> types.ModuleType:
+        target = self.__dict__["_lazy_target"]
+        if target is None:
+            with _lock:
+                target = self.__dict__["_lazy_target"]
+                if target is None:
+                    target = timed_import(self.__name__)
+                    self.__dict__["_lazy_target"] = target
+        return target
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, package: str | None = None) -> types.ModuleType:
+    """返回延迟导入的模块；模块已导入时直接返回该模块（name 以 "." 开头时相对于 package）"""
+    if name.startswith("."):
+        name = importlib.util.resolve_name(name, package)
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return _LazyModule(name)
+
+
+def timed_import(name: str) -> types.ModuleType:
+    """导入模块并记录耗时（已导入的模块不重复计时）"""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMINGS.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """代理模块是否已经真正导入"""
+    if isinstance(module, _LazyModule):
+        return module.__dict__["_lazy_target"] is not None
+    return True
@@ -0,0 +1,271 @@
+"""
+memory_profile.py
+
+流水线各阶段的内存画像（按需开启）：
+- measure(stage, module=...) 记录阶段前后的 RSS、阶段内的峰值 RSS（后台线程按 RSS_SAMPLE_INTERVAL 采样），
+  以及 tracemalloc 统计的 Python 堆峰值与新增内存最多的代码位置
+- 进程启动以来的峰值（ru_maxrss）单独记为 process_peak_rss_mb：多个阶段在同一进程内运行时，
+  最重的阶段之后的每个阶段都会报告同一个值，因此不参与回归检测
+- 仅在设置环境变量 RMQ_MEMORY_PROFILE（画像目录）时启用；未设置时 measure 不做任何事
+- 每个进程把记录写入 <目录>/memory-<pid>.json；阶段开始时即写入 "running" 记录，
+  进程被 OOM 终止时也能看出死在哪个阶段
+- summarize 汇总各进程的记录，并与上一次运行对比找出峰值上涨的阶段
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROFILE_DIR_ENV = "RMQ_MEMORY_PROFILE"
+
+# 每个阶段记录的新增内存最多的代码位置数
+TOP_ALLOCATIONS = 5
+
+# 阶段内 RSS 采样间隔（秒）
+RSS_SAMPLE_INTERVAL = 0.05
+
+_records: List[dict] = []
+_lock = threading.Lock()
+
+_MB = 1024 * 1024
+
+
+def enabled() -> bool:
+    """当前进程是否记录内存画像"""
+    return bool(os.getenv(PROFILE_DIR_ENV))
+
+
+@contextmanager
+def measure(stage: str, *, module: str = ""):
+    """
+    记录一个阶段的内存占用
+
+    用法:
+        with measure("数据清洗 (clean_git_data)", module="Module B"):
+            ...
+    """
+    if not enabled():
+        yield
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+
+    module = module or Path(sys.argv[0]).parent.name
+    namespace = os.getenv("RMQ_FLEET_NAMESPACE")
+    record = {
+        "module": f"{namespace}/{module}" if namespace else module,
+        "stage": stage,
+        "pid": os.getpid(),
+        "status": "running",
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rss_before_mb": _mb(current_rss()),
+    }
+    _append(record)
+
+    sampler = _RssSampler(RSS_SAMPLE_INTERVAL)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        yield
+        record["status"] = "ok"
+    except BaseException as e:
+        record["status"] = f"error: {type(e).__name__}"
+        raise
+    finally:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        record.update({
+            "duration_sec": round(time.perf_counter() - start, 3),
+            "rss_after_mb": _mb(current_rss()),
+            "peak_rss_mb": _mb(sampler.stop()),
+            "process_peak_rss_mb": _mb(peak_rss()),
+            "traced_peak_mb": _mb(traced_peak),
+            "top_allocations": _top_allocations(before, after),
+        })
+        _flush()
+
+
+class _RssSampler(threading.Thread):
+    """在后台按固定间隔采样当前 RSS，stop() 返回阶段内观测到的最大值"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._observe(current_rss())
+
+    def stop(self) -> int | None:
+        self._stopped.set()
+        self.join()
+        self._observe(current_rss())
+        return self.peak
+
+    def _observe(self, rss: int | None) -> None:
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+
+def current_rss() -> int | None:
+    """当前进程的常驻内存（字节），无法获取时返回 None"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss() -> int | None:
+    """进程启动以来的峰值常驻内存（字节），无法获取时返回 None"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", None)
+    return None
+
+
+def load_records(profile_dir: Path) -> List[dict]:
+    """读取目录下各进程的画像记录"""
+    records: List[dict] = []
+    for path in sorted(Path(profile_dir).glob("memory-*.json")):
+        try:
+            records.extend(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as e:
+            print(f"[Warn] 无法读取内存画像 {path}: {e}")
+    records.sort(key=lambda r: r.get("started_at", ""))
+    return records
+
+
+def summarize(records: List[dict], previous: Dict[str, dict] | None = None, regression_pct: float = 20.0) -> dict:
+    """
+    汇总各阶段的内存画像
+
+    previous 为上一次运行 summarize 结果中的 stages，用于找出阶段峰值上涨超过 regression_pct% 的阶段
+    （只比较阶段内的 peak_rss_mb 与 traced_peak_mb，不比较进程级的 process_peak_rss_mb）
+
+    Returns:
+        {
+            "stages": {"Module B / 数据清洗 (clean_git_data)": {...}, ...},
+            "max_peak_rss_mb": 812.4,
+            "incomplete": ["Module B / 可视化 (visualizer)"],
+            "regressions": [{"stage": ..., "metric": "peak_rss_mb", "previous": ..., "current": ...}]
+        }
+    """
+    stages: Dict[str, dict] = {}
+    for r in records:
+        key = f"{r.get('module')} / {r.get('stage')}"
+        stages[key] = {
+            k: r.get(k)
+            for k in ("status", "duration_sec", "rss_before_mb", "rss_after_mb",
+                      "peak_rss_mb", "process_peak_rss_mb", "traced_peak_mb", "top_allocations")
+        }
+
+    regressions = []
+    for key, current in stages.items():
+        prev = (previous or {}).get(key)
+        if not prev:
+            continue
+        for metric in ("peak_rss_mb", "traced_peak_mb"):
+            old, new = prev.get(metric), current.get(metric)
+            if old and new and new > old * (1 + regression_pct / 100):
+                regressions.append({"stage": key, "metric": metric, "previous": old, "current": new})
+
+    peaks = [s["peak_rss_mb"] for s in stages.values() if s.get("peak_rss_mb") is not None]
+    return {
+        "stages": stages,
+        "max_peak_rss_mb": max(peaks) if peaks else None,
+        "incomplete": [key for key, s in stages.items() if s.get("status") == "running"],
+        "regressions": regressions,
+    }
+
+
+def format_summary(summary: dict) -> str:
+    """内存画像的文本表格"""
+    stages = summary.get("stages", {})
+    if not stages:
+        return "(no stages recorded)"
+
+    width = min(max(len(k) for k in stages), 60)
+    lines = [
+        f"{'peak RSS':>10}  {'py peak':>9}  {'ΔRSS':>8}  {'status':<8}  stage",
+        f"{'-' * 10}  {'-' * 9}  {'-' * 8}  {'-' * 8}  {'-' * width}",
+    ]
+    for key, s in stages.items():
+        delta = (
+            s["rss_after_mb"] - s["rss_before_mb"]
+            if s.get("rss_after_mb") is not None and s.get("rss_before_mb") is not None
+            else None
+        )
+        lines.append(
+            f"{_fmt(s.get('peak_rss_mb')):>10}  {_fmt(s.get('traced_peak_mb')):>9}  "
+            f"{_fmt(delta):>8}  {str(s.get('status'))[:8]:<8}  {key[:width]}"
+        )
+    return "\n".join(lines)
+
+
+# =========================
+# 辅助函数
+# =========================
+
+def _top_allocations(before, after) -> List[dict]:
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+    return [
+        {"location": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "size_diff_mb": _mb(s.size_diff)}
+        for s in stats[:TOP_ALLOCATIONS]
+        if s.size_diff > 0
+    ]
+
+
+def _append(record: dict) -> None:
+    with _lock:
+        _records.append(record)
+    _flush()
+
+
+def _flush() -> None:
+    profile_dir = os.getenv(PROFILE_DIR_ENV)
+    if not profile_dir:
+        return
+    directory = Path(profile_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        payload = json.dumps(_records, ensure_ascii=False)
+    tmp = directory / f"memory-{os.getpid()}.json.tmp"
+    tmp.write_text(payload, encoding="utf-8")
+    tmp.replace(directory / f"memory-{os.getpid()}.json")
+
+
+def _mb(value) -> float | None:
+    return round(value / _MB, 1) if value is not None else None
+
+
+def _fmt(value) -> str:
+    return f"{value:.1f}MB" if value is not None else "-"
@@ -0,0 +1,250 @@
+"""
+mock_github_server.py
+
+本地 GitHub API 回放服务，用于离线、可重复地测试与压测模块 B / C 的数据采集：
+- replay 模式：按 github_recorder 录制的夹具应答 REST（GET）与 GraphQL（POST /graphql）请求，
+  未录制的请求返回 501；请求带 If-None-Match 且与录制的 ETag 一致时返回 304（与 GitHub 一致，不计入配额）
+- record 模式：把请求转发到 --upstream（默认 https://api.github.com），原样返回并录制响应
+- 可注入每个请求的延迟、按比例随机返回的 5xx 错误，以及按窗口计数的配额耗尽（403 + X-RateLimit-Remaining: 0），
+  分别用于测量吞吐、重试与限流等待
+- Link 头中的录制地址改写为本服务地址，客户端按 Link 翻页时不会访问真实接口
+
+用法:
+    # 录制：在 scripts/.env 中填写 GITHUB_TOKEN 后照常运行采集
+    python -m scripts.mock_github_server --record --port 8766
+    GITHUB_API_URL=http://127.0.0.1:8766 python -m scripts.module_c.get_git_data
+    # 回放：每个请求 100ms 延迟，5% 返回 502，每 60 秒限 500 次
+    python -m scripts.mock_github_server --latency 0.1 --error-rate 0.05 --rate-limit 500 --rate-limit-window 60
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+from . import github_recorder
+from .config_utils import load_config
+from .module_utils import DEFAULT_API_URL
+
+# 录制模式转发给上游的请求头
+_FORWARD_HEADERS = ("Authorization", "Accept", "X-GitHub-Api-Version", "If-None-Match", "Content-Type")
+
+
+class MockGitHubHandler(BaseHTTPRequestHandler):
+    server_version = "MockGitHub/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        parts = urlsplit(self.path)
+        server = self.server
+
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        with server.lock:
+            failed = server.error_rate > 0 and server.rng.random() < server.error_rate
+            server.errors += failed
+        if failed:
+            self._send(server.error_status, {"message": "Injected error"}, {})
+            return
+
+        key = github_recorder.fixture_key(method, parts.path, parts.query, body)
+        if server.upstream:
+            fixture = self._forward(method, key, parts, body)
+        else:
+            fixture = self._lookup(key)
+        if fixture is None:
+            with server.lock:
+                server.misses += 1
+            self._send(501, {"message": f"No recorded response for {method} {self.path}"}, {})
+            return
+
+        headers = dict(fixture.get("headers") or {})
+        etag = headers.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            with server.lock:
+                server.not_modified += 1
+            self._send_bytes(304, b"", {"etag": etag})
+            return
+
+        limited = self._rate_limit(headers)
+        if limited is not None:
+            self._send(403, {"message": "API rate limit exceeded (mock)"}, limited)
+            return
+
+        if "link" in headers and fixture.get("upstream"):
+            headers["link"] = headers["link"].replace(fixture["upstream"].rstrip("/"), server.base_url)
+        self._send_bytes(int(fixture.get("status", 200)), github_recorder.encode_body(fixture), headers)
+
+    def _lookup(self, key):
+        """读取夹具（进程内缓存，避免每次请求重新解析 JSON 影响吞吐测量）"""
+        cache = self.server.cache
+        if key not in cache:
+            cache[key] = github_recorder.lookup(key, self.server.fixtures)
+        return cache[key]
+
+    def _forward(self, method, key, parts, body):
+        """record 模式：转发到上游并录制（304 不录制，避免覆盖完整响应）"""
+        server = self.server
+        headers = {h: self.headers[h] for h in _FORWARD_HEADERS if self.headers.get(h)}
+        resp = requests.request(method, server.upstream + self.path, headers=headers, data=body, timeout=60)
+        if resp.status_code == 304:
+            kept = {k: v for k, v in resp.headers.items() if k.lower() in github_recorder.RECORDED_HEADERS}
+            self._send_bytes(304, b"", kept)
+            return None
+        github_recorder.record(
+            key, method=method, path=parts.path, query=parts.query, status=resp.status_code,
+            headers=resp.headers, content=resp.content, upstream=server.upstream, directory=server.fixtures,
+        )
+        with server.lock:
+            server.recorded += 1
+        return github_recorder.lookup(key, server.fixtures)
+
+    def _rate_limit(self, headers):
+        """按窗口计数模拟配额；耗尽时返回 403 的响应头，否则改写响应中的 X-RateLimit-* 并返回 None"""
+        server = self.server
+        if not server.rate_limit:
+            return None
+        with server.lock:
+            now = time.time()
+            if now >= server.window_reset:
+                server.window_reset = now + server.rate_limit_window
+                server.window_used = 0
+            reset = str(math.ceil(server.window_reset))
+            if server.window_used >= server.rate_limit:
+                server.rate_limited += 1
+                return {"x-ratelimit-limit": str(server.rate_limit), "x-ratelimit-remaining": "0",
+                        "x-ratelimit-reset": reset}
+            server.window_used += 1
+            headers.update({
+                "x-ratelimit-limit": str(server.rate_limit),
+                "x-ratelimit-remaining": str(server.rate_limit - server.window_used),
+                "x-ratelimit-used": str(server.window_used),
+                "x-ratelimit-reset": reset,
+            })
+        return None
+
+    def _send(self, status, payload, headers):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send_bytes(status, body, {**headers, "content-type": "application/json; charset=utf-8"})
+
+    def _send_bytes(self, status, body, headers):
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                if name.lower() not in ("content-length", "transfer-encoding", "content-encoding"):
+                    self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    *,
+    fixtures: Path | None = None,
+    upstream: str | None = None,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 502,
+    rate_limit: int = 0,
+    rate_limit_window: float = 60.0,
+    seed: int = 0,
+    verbose: bool = False,
+) -> ThreadingHTTPServer:
+    """
+    在后台线程启动回放服务（port=0 时自动分配端口），返回 server；
+    upstream 非空时为 record 模式。将 GITHUB_API_URL 设为 server.base_url 即可让采集脚本访问本服务，
+    用完调用 server.shutdown()。server.requests / errors / misses / not_modified / rate_limited / recorded 为计数
+    """
+    server = ThreadingHTTPServer((host, port), MockGitHubHandler)
+    server.daemon_threads = True
+    server.base_url = f"http://{host}:{server.server_port}"
+    server.fixtures = Path(fixtures) if fixtures else github_recorder.fixtures_dir()
+    server.upstream = upstream.rstrip("/") if upstream else None
+    server.latency = latency
+    server.error_rate = error_rate
+    server.error_status = error_status
+    server.rate_limit = rate_limit
+    server.rate_limit_window = rate_limit_window
+    server.window_reset = 0.0
+    server.window_used = 0
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.rng = random.Random(seed)
+    server.cache = {}
+    for counter in ("requests", "errors", "misses", "not_modified", "rate_limited", "recorded"):
+        setattr(server, counter, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    cfg = load_config().get("github", {}).get("mock_server", {})
+    parser = argparse.ArgumentParser(description="本地 GitHub API 录制 / 回放服务")
+    parser.add_argument("--host", default=cfg.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(cfg.get("port", 8766)))
+    parser.add_argument("--fixtures", default=None, help="夹具目录（默认读取 github.replay.dir）")
+    parser.add_argument("--record", action="store_true", help="转发到 --upstream 并录制响应")
+    parser.add_argument("--upstream", default=DEFAULT_API_URL, help="录制模式的上游 API 地址")
+    parser.add_argument("--latency", type=float, default=float(cfg.get("latency_seconds", 0)),
+                        help="每个请求附加的延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=float(cfg.get("error_rate", 0)),
+                        help="随机返回 5xx 的比例（0~1）")
+    parser.add_argument("--error-status", type=int, default=int(cfg.get("error_status", 502)))
+    parser.add_argument("--rate-limit", type=int, default=int(cfg.get("rate_limit", 0)),
+                        help="每个窗口允许的请求数，超出返回 403 限流（0 表示不限）")
+    parser.add_argument("--rate-limit-window", type=float, default=float(cfg.get("rate_limit_window_seconds", 60)),
+                        help="配额窗口（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="错误注入的随机种子")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    fixtures = Path(args.fixtures) if args.fixtures else github_recorder.fixtures_dir()
+    server = start_server(
+        args.host, args.port,
+        fixtures=fixtures, upstream=args.upstream if args.record else None,
+        latency=args.latency, error_rate=args.error_rate, error_status=args.error_status,
+        rate_limit=args.rate_limit, rate_limit_window=args.rate_limit_window,
+        seed=args.seed, verbose=args.verbose,
+    )
+    mode = f"record <- {server.upstream}" if args.record else "replay"
+    print(f"[Info] Mock GitHub API ({mode}) listening on {server.base_url}")
+    print(f"[Info] fixtures={fixtures}, latency={args.latency}s, error_rate={args.error_rate}, "
+          f"rate_limit={args.rate_limit or 'off'}/{args.rate_limit_window:g}s")
+    print(f"[Info] 设置 GITHUB_API_URL={server.base_url} 后运行采集脚本")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n[OK] Mock GitHub API stopped: {server.requests} requests, {server.recorded} recorded, "
+              f"{server.misses} misses, {server.errors} injected errors, {server.rate_limited} rate limited")
+
+
+if __name__ == "__main__":
+    main()
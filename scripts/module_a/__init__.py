@@ -0,0 +1 @@
+"""模块 A：Python 静态分析"""
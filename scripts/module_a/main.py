@@ -3,16 +3,20 @@ import sys
 import argparse
 from pathlib import Path
 
-# 将 scripts 目录添加到路径以导入 config_utils
-sys.path.append(str(Path(__file__).parent.parent))
-from config_utils import load_config
-from module_utils import ensure_local_repo
+from ..config_utils import load_config
+from ..module_utils import ensure_local_repo
+from ..memory_profile import measure
+from ..tracing import span
+from .. import warehouse
 
-import file_scanner
-import bandit_scanner
-import lizard_scanner
-import visualizer
-import report_generator
+from ..lazy_imports import lazy_import
+
+# 扫描、可视化与报告模块依赖 pandas / matplotlib，执行到对应步骤时才导入
+file_scanner = lazy_import(".file_scanner", __package__)
+bandit_scanner = lazy_import(".bandit_scanner", __package__)
+lizard_scanner = lazy_import(".lizard_scanner", __package__)
+visualizer = lazy_import(".visualizer", __package__)
+report_generator = lazy_import(".report_generator", __package__)
 
 # 加载配置
 CONFIG = load_config()
@@ -132,8 +136,9 @@ def run_all():
     figs_path = Path(CONFIG['paths']['figures']) / "module_a"
 
     try:
-        df_files = file_scanner.scan_python_files(target_strs)
-        df_files.to_csv(data_path / "python_files.csv", index=False, encoding='utf-8-sig')
+        with span("file_scan", targets=len(target_strs)), measure("文件扫描 (file_scanner)", module="Module A"):
+            df_files = file_scanner.scan_python_files(target_strs)
+            df_files.to_csv(data_path / "python_files.csv", index=False, encoding='utf-8-sig')
     except Exception as e:
         print(f"[Error] 文件扫描失败: {e}")
         return
@@ -141,11 +146,12 @@ def run_all():
     # Step 3: Bandit安全扫描
     print("\n[步骤 3/6] 运行Bandit安全扫描...")
     try:
-        raw_bandit_path = data_path / "bandit_raw.json"
-        raw_bandit = bandit_scanner.run_bandit_scan(target_strs, str(raw_bandit_path))
-        df_bandit = bandit_scanner.parse_bandit_results(raw_bandit)
-        df_bandit.to_csv(data_path / "bandit_results.csv", index=False, encoding='utf-8-sig')
-        bandit_scanner.analyze_bandit_results(df_bandit)
+        with span("bandit_scan"), measure("Bandit 安全扫描", module="Module A"):
+            raw_bandit_path = data_path / "bandit_raw.json"
+            raw_bandit = bandit_scanner.run_bandit_scan(target_strs, str(raw_bandit_path))
+            df_bandit = bandit_scanner.parse_bandit_results(raw_bandit)
+            df_bandit.to_csv(data_path / "bandit_results.csv", index=False, encoding='utf-8-sig')
+            bandit_scanner.analyze_bandit_results(df_bandit)
     except Exception as e:
          print(f"[Error] Bandit扫描失败: {e}")
          df_bandit = None
@@ -153,23 +159,39 @@ def run_all():
     # Step 4: Lizard复杂度分析
     print("\n[步骤 4/6] 运行Lizard复杂度分析...")
     try:
-        df_lizard = lizard_scanner.run_lizard_scan(target_strs, str(data_path / "lizard_raw.csv"))
-        df_analyzed = lizard_scanner.analyze_complexity(df_lizard)
-        df_analyzed.to_csv(data_path / "lizard_results.csv", index=False, encoding='utf-8-sig')
+        with span("lizard_scan"), measure("Lizard 复杂度分析", module="Module A"):
+            df_lizard = lizard_scanner.run_lizard_scan(target_strs, str(data_path / "lizard_raw.csv"))
+            df_analyzed = lizard_scanner.analyze_complexity(df_lizard)
+            df_analyzed.to_csv(data_path / "lizard_results.csv", index=False, encoding='utf-8-sig')
     except Exception as e:
         print(f"[Error] Lizard扫描失败: {e}")
         df_analyzed = None
+
+    # 扫描结果同步写入共享分析库
+    conn = warehouse.open_if_enabled()
+    if conn is not None:
+        try:
+            if df_bandit is not None and not df_bandit.empty:
+                warehouse.replace_findings(conn, df_bandit.to_dict('records'))
+            if df_analyzed is not None and not df_analyzed.empty:
+                warehouse.replace_functions(conn, df_analyzed.to_dict('records'))
+            print(f"[OK] 扫描结果已写入分析库: {warehouse.default_path()}")
+        except Exception as e:
+            print(f"[Warn] 写入分析库失败: {e}")
+        finally:
+            conn.close()
     
     # Step 5: 生成可视化图表
     print("\n[步骤 5/6] 生成可视化图表...")
     try:
         if df_bandit is not None and df_analyzed is not None:
-             visualizer.plot_bandit_severity(df_bandit, str(figs_path))
-             visualizer.plot_bandit_issues(df_bandit, str(figs_path))
-             visualizer.plot_complexity_distribution(df_analyzed, str(figs_path))
-             visualizer.plot_top_complex_functions(df_analyzed, str(figs_path))
-             # Visualizer might need update if it depends on specific 'Repository' column matching hardcoded names
-             visualizer.plot_repository_comparison(df_bandit, df_analyzed, str(figs_path))
+            with measure("可视化 (visualizer)", module="Module A"):
+                visualizer.plot_bandit_severity(df_bandit, str(figs_path))
+                visualizer.plot_bandit_issues(df_bandit, str(figs_path))
+                visualizer.plot_complexity_distribution(df_analyzed, str(figs_path))
+                visualizer.plot_top_complex_functions(df_analyzed, str(figs_path))
+                # Visualizer might need update if it depends on specific 'Repository' column matching hardcoded names
+                visualizer.plot_repository_comparison(df_bandit, df_analyzed, str(figs_path))
     except Exception as e:
         print(f"[Warn] 可视化生成部分失败: {e}")
 
@@ -178,7 +200,8 @@ def run_all():
     # Report generator needs to be config aware too, but let's assume it finds files by relative path or we update it later.
     # For now, it seems report_generator.main() is self-contained.
     try:
-        report_generator.main()
+        with span("report_generator"), measure("子报告生成 (report_generator)", module="Module A"):
+            report_generator.main()
     except Exception as e:
         print(f"[Warn] 报告生成失败: {e}")
     
@@ -196,14 +219,19 @@ def run_all():
     print("  子报告:")
     print("    - REPORT.md")
 
-if __name__ == "__main__":
+def main(argv=None) -> int:
+    """命令行入口；返回退出码（供模块 D 在同一进程内调用）"""
     parser = argparse.ArgumentParser(description='模块A：Python静态分析')
     parser.add_argument('--step', type=str, choices=['scan', 'bandit', 'lizard', 'viz', 'all'],
                         default='all', help='运行特定步骤或完整流程')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if args.step == 'all':
         run_all()
     elif args.step == 'scan':
-        print("运行文件扫描...")
\ No newline at end of file
+        print("运行文件扫描...")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,10 @@
 import os
-import sys
 from typing import Iterable, Tuple
 
 import pandas as pd
 
-scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if scripts_dir not in sys.path:
-    sys.path.insert(0, scripts_dir)
-
-from report_utils import get_repo_root, now_str, write_text
-from module_utils import write_report
+from ..report_utils import get_repo_root, now_str
+from ..module_utils import write_report
 
 
 def _safe_pct(numerator: int, denominator: int) -> float:
@@ -8,6 +8,8 @@ import os
 import warnings
 from matplotlib.font_manager import FontProperties, findfont, FontManager
 
+from ..tracing import traced
+
 import matplotlib
 matplotlib.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'SimHei', 'KaiTi', 'SimSun']
 matplotlib.rcParams['axes.unicode_minus'] = False
@@ -17,6 +19,7 @@ warnings.filterwarnings('ignore', category=UserWarning, message='.*Glyph.*missin
 sns.set_style("whitegrid")
 sns.set_palette("husl")
 
+@traced()
 def plot_bandit_severity(df_bandit, output_dir):
     """绘制 Bandit 问题严重程度分布"""
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
@@ -34,6 +37,7 @@ def plot_bandit_severity(df_bandit, output_dir):
     print(f"Generated: bandit_severity_distribution.png")
     plt.close()
 
+@traced()
 def plot_bandit_issues(df_bandit, output_dir):
     """绘制 Top 10 Bandit 问题类型"""
     fig, ax = plt.subplots(figsize=(12, 8))
@@ -54,6 +58,7 @@ def plot_bandit_issues(df_bandit, output_dir):
     print(f"Generated: bandit_top_issues.png")
     plt.close()
 
+@traced()
 def plot_complexity_distribution(df_lizard, output_dir):
     """绘制代码复杂度分布"""
     fig, axes = plt.subplots(2, 2, figsize=(14, 12))
@@ -94,6 +99,7 @@ def plot_complexity_distribution(df_lizard, output_dir):
     print(f"Generated: complexity_distribution.png")
     plt.close()
 
+@traced()
 def plot_top_complex_functions(df_lizard, output_dir, top_n=10):
     """绘制最复杂的函数排名"""
     fig, ax = plt.subplots(figsize=(12, 8))
@@ -121,6 +127,7 @@ def plot_top_complex_functions(df_lizard, output_dir, top_n=10):
     print(f"Generated: top_complex_functions.png")
     plt.close()
 
+@traced()
 def plot_repository_comparison(df_bandit, df_lizard, output_dir):
     """Compare code quality between two repositories"""
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
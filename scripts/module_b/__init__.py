@@ -0,0 +1 @@
+"""模块 B：提交时间与加班分析"""
@@ -1,18 +1,16 @@
 import os
-import sys
 from pathlib import Path
 import pandas as pd
 
-# Add scripts directory to path
-sys.path.append(str(Path(__file__).parent.parent))
-from config_utils import load_config
+from ..config_utils import load_config
+from .. import warehouse
 
 CONFIG = load_config()
 
 def clean_commits_csv(csv_path: str, clean_csv_path: str) -> None:
     """清洗 commits.csv 数据，保留需要的列并处理时间格式"""
     if not os.path.exists(csv_path):
-        raise RuntimeError("请先运行scripts/module_b/get_git_data.py获取数据")
+        raise RuntimeError("请先运行 python -m scripts.module_b.get_git_data 获取数据")
 
 
     cols = ["authored_utc", "author_name", "subject"]
@@ -35,5 +33,14 @@ def main() -> None:
     clean_commits_csv(str(csv_path), str(clean_csv_path))
     print(f"[OK] 已清洗数据并保存至: {clean_csv_path}")
 
+    # 同步清洗口径到分析库：Merge 提交不参与 SQL 聚合
+    conn = warehouse.open_if_enabled()
+    if conn is not None:
+        project = CONFIG.get('project', {})
+        repo_key = f"{project.get('repo_owner', 'apache')}/{project.get('repo_name', 'rocketmq')}"
+        marked = warehouse.mark_merge_subjects(conn, repo_key)
+        conn.close()
+        print(f"[OK] 分析库已标记 Merge 提交: {marked}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
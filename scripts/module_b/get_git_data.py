@@ -1,63 +1,118 @@
+import asyncio
 import os
 import csv
-import sys
+import json
 from pathlib import Path
 from datetime import datetime, timezone
 
-# 增加 scripts 目录到环境变量
-sys.path.append(str(Path(__file__).parent.parent))
-from config_utils import load_config
-from module_utils import github_get_json, github_headers, load_github_token, repo_root_from
+from ..config_utils import load_config
+from ..github_async import AsyncGitHub
+from ..module_utils import (
+    file_ready,
+    github_api_url,
+    github_headers,
+    load_github_token,
+    parse_last_page,
+)
+from .. import warehouse
 
 CONFIG = load_config()
 
+COLUMNS = ["authored_utc", "sha", "author_name", "author_email", "subject"]
+
+# 断点文件：记录已完成的最后一页及 commits.csv.partial 中已提交的字节数
+CHECKPOINT_FILE = "commits.checkpoint.json"
+
+# 采集窗口文件：commits.csv 对应的 since / until（分析库中还有模块 C 写入的提交，按此窗口对齐口径）
+WINDOW_FILE = "commits.window.json"
+
+
 def main() -> None:
     """运行 Module B 的数据抓取流程"""
     token = load_github_token(missing_hint="请在scripts/.env填写GITHUB_TOKEN", caller_file=__file__)
+    headers = github_headers(token)
+
+    async def run():
+        async with AsyncGitHub(headers) as gh:
+            await crawl(gh, CONFIG)
+
+    asyncio.run(run())
+
 
-    project = CONFIG.get('project', {})
+async def crawl(gh: AsyncGitHub, config: dict) -> int:
+    """
+    采集 config 指定仓库的全部非合并提交，返回写入的提交数
+
+    数据先写入 commits.csv.partial，每完成一页就落盘并更新断点；全部完成后才原子替换为
+    commits.csv，因此中途失败不会留下看似完整的 commits.csv。再次运行时从断点的下一页继续
+    （沿用断点记录的 until，并按 sha 去重），无需从第一页重新拉取。
+
+    第一页之后按 Link 头得到的总页数，每批并发请求 module_b.max_workers 页，再按页序写入，
+    因此断点始终指向连续完成的最后一页。
+    """
+    project = config.get('project', {})
     owner = project.get('repo_owner', 'apache')
     repo = project.get('repo_name', 'rocketmq')
+    repo_key = f"{owner}/{repo}"
     
     # 获取配置中的其实时间
-    since = CONFIG.get('module_b', {}).get('since_date', "2013-01-01") + "T00:00:00Z"
+    since = config.get('module_b', {}).get('since_date', "2013-01-01") + "T00:00:00Z"
     if len(since) > 20: # 简单检查用户是否提供了完整时间
          # If config has T... keep it, else append
          pass 
 
-    until = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-
-    headers = github_headers(token)
-
-    page = 1
-    total = 0
+    window = max(1, int(config.get('module_b', {}).get('max_workers', 4)))
+    url = github_api_url(f"/repos/{owner}/{repo}/commits")
 
-    data_dir = Path(CONFIG['paths']['data']) / "module_b"
+    data_dir = Path(config['paths']['data']) / "module_b"
     out_path = data_dir / "commits.csv"
+    partial_path = data_dir / "commits.csv.partial"
+    checkpoint_path = data_dir / CHECKPOINT_FILE
     os.makedirs(data_dir, exist_ok=True)
 
-    print(f"===开始采集数据 [{owner}/{repo}]===")
-
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
+    print(f"===开始采集数据 [{repo_key}]===")
+
+    checkpoint = load_checkpoint(checkpoint_path, repo_key, since, partial_path)
+    if checkpoint:
+        # 丢弃断点之后写了一半的内容
+        with open(partial_path, "r+b") as f:
+            f.truncate(checkpoint["offset"])
+        seen = read_shas(partial_path)
+        until = checkpoint["until"]
+        page = checkpoint["page"] + 1
+        print(f"[Info] 从断点恢复：已完成 {checkpoint['page']} 页 / {len(seen)} 条，从第 {page} 页继续")
+    else:
+        seen = set()
+        until = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        page = 1
+
+    def fetch(p: int):
+        return gh.get(url, params={"since": since, "until": until, "per_page": 100, "page": p}, timeout=30)
+
+    total = len(seen)
+    conn = warehouse.open_if_enabled()
+
+    with open(partial_path, "a" if checkpoint else "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerow(["authored_utc", "sha", "author_name", "author_email", "subject"])
-
-        while True:
-            items = github_get_json(
-                f"https://api.github.com/repos/{owner}/{repo}/commits",
-                headers=headers,
-                params={"since": since, "until": until, "per_page": 100, "page": page},
-                timeout=30,
-            )
+        if not checkpoint:
+            writer.writerow(COLUMNS)
+
+        def write_page(resp) -> bool:
+            """写入一页并更新断点；空页（已到末尾）返回 False"""
+            nonlocal page, total
+            items = resp.json()
             if not items:
-                break
+                return False
 
+            page_rows = []
             for c in items:
                 sha = c.get("sha")
                 parents = c.get("parents", [])
                 is_merge = len(parents) > 1
-                if is_merge:
+                # 断点续传时分页可能发生偏移，已写入的提交按 sha 跳过
+                if is_merge or sha in seen:
                     continue
+                seen.add(sha)
 
                 author = (c.get("commit", {}).get("author") or {})
                 authored_utc = author.get("date")
@@ -68,12 +123,103 @@ def main() -> None:
                 subject = msg.splitlines()[0] if msg else ""
 
                 writer.writerow([authored_utc, sha, author_name, author_email, subject])
+                page_rows.append({
+                    "sha": sha,
+                    "authored_utc": authored_utc,
+                    "author_name": author_name,
+                    "author_email": author_email,
+                    "subject": subject,
+                })
                 total += 1
 
+            f.flush()
+            os.fsync(f.fileno())
+
+            if conn is not None:
+                warehouse.upsert_commits(conn, repo_key, page_rows)
+
+            save_checkpoint(checkpoint_path, {
+                "repo": repo_key,
+                "since": since,
+                "until": until,
+                "page": page,
+                "rows": total,
+                "offset": f.tell(),
+                "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            })
             page += 1
+            return True
+
+        first = await fetch(page)
+        last_page = parse_last_page(first.headers.get("Link")) or page
+        pending, error = [first], None
+
+        while pending or error:
+            if not all(write_page(resp) for resp in pending):
+                break
+            # 批内某页失败时，先写入它之前已成功的页再抛出，断点停在连续完成的最后一页
+            if error is not None:
+                raise error
+            batch = range(page, min(page + window, last_page + 1))
+            results = await asyncio.gather(*(fetch(p) for p in batch), return_exceptions=True)
+            failed = [i for i, r in enumerate(results) if isinstance(r, BaseException)]
+            pending = results[:failed[0]] if failed else results
+            error = results[failed[0]] if failed else None
+
+    if conn is not None:
+        conn.close()
+
+    os.replace(partial_path, out_path)
+    save_checkpoint(data_dir / WINDOW_FILE, {"repo": repo_key, "since": since, "until": until})
+    checkpoint_path.unlink(missing_ok=True)
+
+    print(f"[OK] [{repo_key}] 总记录数: {total}")
+    return total
+
+
+def needs_crawl(config: dict) -> bool:
+    """commits.csv 尚未生成，或上次采集中断留下了断点"""
+    data_dir = Path(config['paths']['data']) / "module_b"
+    return (data_dir / CHECKPOINT_FILE).exists() or not file_ready(str(data_dir / "commits.csv"))
+
+
+def load_window(data_dir: Path, repo_key: str) -> dict | None:
+    """commits.csv 的采集窗口 {since, until}；文件缺失或属于其他仓库时返回 None"""
+    try:
+        window = json.loads((Path(data_dir) / WINDOW_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return window if window.get("repo") == repo_key else None
+
+
+def load_checkpoint(checkpoint_path: Path, repo_key: str, since: str, partial_path: Path) -> dict | None:
+    """读取与当前仓库、起始时间一致且 partial 文件仍在的断点，否则返回 None"""
+    try:
+        checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if checkpoint.get("repo") != repo_key or checkpoint.get("since") != since:
+        print(f"[Info] 断点属于 {checkpoint.get('repo')} (since {checkpoint.get('since')})，重新开始采集")
+        return None
+    if not partial_path.exists() or partial_path.stat().st_size < checkpoint.get("offset", 0):
+        print("[Warn] 断点对应的 commits.csv.partial 缺失或不完整，重新开始采集")
+        return None
+    return checkpoint
+
+
+def save_checkpoint(checkpoint_path: Path, checkpoint: dict) -> None:
+    """原子写入断点（先写临时文件再替换）"""
+    tmp = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+    tmp.write_text(json.dumps(checkpoint, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, checkpoint_path)
+
 
-    print(f"[OK] 总记录数: {total}")
+def read_shas(csv_path: Path) -> set:
+    """读取已写入的提交 sha"""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return {row["sha"] for row in csv.DictReader(f) if row.get("sha")}
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,29 +1,19 @@
 import sys
 import os
+from pathlib import Path
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if scripts_dir not in sys.path:
-    sys.path.insert(0, scripts_dir)
-if current_dir not in sys.path:
-    sys.path.insert(0, current_dir)
-
-try:
-    from pathlib import Path
-    sys.path.append(str(Path(__file__).parent.parent))
-    from config_utils import load_config
-    
-    import get_git_data
-    import clean_git_data
-    import visualizer
-    import report_generator
-    from module_utils import repo_root_from, run_four_step_pipeline
-except ImportError as e:
-    print(f"[Error] 模块导入失败: {e}")
-    sys.exit(1)
+from ..config_utils import load_config
+from ..lazy_imports import lazy_import
+from ..module_utils import run_four_step_pipeline
 
 CONFIG = load_config()
 
+# 各步骤模块在执行到该步骤时才导入（可视化依赖 matplotlib / seaborn，清洗依赖 pandas）
+get_git_data = lazy_import(".get_git_data", __package__)
+clean_git_data = lazy_import(".clean_git_data", __package__)
+visualizer = lazy_import(".visualizer", __package__)
+report_generator = lazy_import(".report_generator", __package__)
+
 def run_pipeline():
     """运行 Module B 的完整分析流水线（数据抓取 -> 清洗 -> 可视化 -> 报告）"""
     data_dir = Path(CONFIG['paths']['data']) / "module_b"
@@ -33,16 +23,24 @@ def run_pipeline():
     
     commits_path = data_dir / "commits.csv"
 
+    # 上次采集中断留下断点时继续采集，而不是沿用旧的 commits.csv
+    resume = (data_dir / get_git_data.CHECKPOINT_FILE).exists()
+    if resume:
+        print("[Info] 检测到未完成的采集断点，将继续采集")
+
     return run_four_step_pipeline(
         module_label="Module B",
-        data_path_to_skip_fetch=str(commits_path),
-        fetch_func=get_git_data.main,
-        clean_func=clean_git_data.main,
-        visualize_func=visualizer.main,
-        report_func=report_generator.main,
+        data_path_to_skip_fetch=None if resume else str(commits_path),
+        fetch_func=lambda: get_git_data.main(),
+        clean_func=lambda: clean_git_data.main(),
+        visualize_func=lambda: visualizer.main(),
+        report_func=lambda: report_generator.main(),
     )
 
+def main(argv=None) -> int:
+    """命令行入口；返回退出码（供模块 D 在同一进程内调用）"""
+    return 0 if run_pipeline() else 1
+
 if __name__ == "__main__":
-    success = run_pipeline()
-    if not success:
-        sys.exit(1)
+    sys.exit(main())
+
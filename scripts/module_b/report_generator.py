@@ -1,16 +1,13 @@
 import os
-import sys
 from typing import Iterable
 
 import pandas as pd
 from chinese_calendar import is_workday
 
-from report_utils import get_repo_root, now_str, write_text
-from module_utils import write_report
+from ..config_utils import load_config
+from ..report_utils import now_str
+from ..module_utils import write_report
 
-scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if scripts_dir not in sys.path:
-    sys.path.insert(0, scripts_dir)
 
 def _safe_pct(numerator: int, denominator: int) -> float:
     return (numerator / denominator * 100.0) if denominator else 0.0
@@ -178,11 +175,12 @@ def build_markdown(df: pd.DataFrame, *, figures_rel_dir: str) -> str:
 
 
 def main() -> None:
-    repo_root = get_repo_root(__file__)
-    clean_csv_path = os.path.join(repo_root, "data", "module_b", "clean_commits.csv")
-    report_path = os.path.join(repo_root, "data", "module_b", "REPORT.md")
+    paths = load_config()["paths"]
+    data_dir = os.path.join(paths["data"], "module_b")
+    clean_csv_path = os.path.join(data_dir, "clean_commits.csv")
+    report_path = os.path.join(data_dir, "REPORT.md")
 
-    figures_rel_dir = "../../figures/module_b"
+    figures_rel_dir = os.path.relpath(os.path.join(paths["figures"], "module_b"), data_dir).replace(os.sep, "/")
 
     df = load_data(clean_csv_path)
     md = build_markdown(df, figures_rel_dir=figures_rel_dir)
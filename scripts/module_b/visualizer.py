@@ -1,5 +1,4 @@
 import os
-import sys
 from pathlib import Path
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -8,9 +7,10 @@ from chinese_calendar import is_workday
 from matplotlib.patches import Patch
 import matplotlib.dates as mdates
 
-# Add scripts directory to path
-sys.path.append(str(Path(__file__).parent.parent))
-from config_utils import load_config
+from ..config_utils import load_config
+from .. import warehouse
+from ..tracing import traced
+from .get_git_data import load_window
 
 CONFIG = load_config()
 
@@ -20,6 +20,7 @@ def setup_style():
     plt.rcParams['axes.unicode_minus'] = False
     sns.set_theme(style="whitegrid", font="SimHei")
 
+@traced()
 def load_and_process_data(csv_path):
     """读取并预处理数据"""
     if not os.path.exists(csv_path):
@@ -46,6 +47,7 @@ def load_and_process_data(csv_path):
     
     return df
 
+@traced()
 def plot_holiday_overtime_pie(df, output_dir):
     """绘制节假日加班占比饼图"""
     print("绘制: 节假日加班占比...")
@@ -78,6 +80,7 @@ def plot_holiday_overtime_pie(df, output_dir):
     plt.savefig(os.path.join(output_dir, "overtime_holiday_pie.png"), dpi=300)
     plt.close()
 
+@traced()
 def plot_workday_overtime_pie(df, output_dir):
     """绘制工作日加班占比饼图"""
     print("绘制: 工作日加班占比...")
@@ -108,6 +111,7 @@ def plot_workday_overtime_pie(df, output_dir):
     plt.savefig(os.path.join(output_dir, "overtime_workday_pie.png"), dpi=300)
     plt.close()
 
+@traced()
 def plot_workday_hourly_bar(df, output_dir):
     """绘制工作日提交小时分布柱状图"""
     print("绘制: 工作日小时分布...")
@@ -152,11 +156,15 @@ def plot_workday_hourly_bar(df, output_dir):
     plt.savefig(os.path.join(output_dir, "overtime_workday_bar.png"), dpi=300)
     plt.close()
 
-def plot_heatmap(df, output_dir):
-    """绘制周x小时热力图"""
+@traced()
+def plot_heatmap(df, output_dir, counts=None):
+    """绘制周x小时热力图（counts 为分析库的 SQL 聚合结果时不再扫描明细）"""
     print("绘制: 提交热力图...")
     
-    heatmap_data = pd.crosstab(df['weekday'], df['hour'])
+    if counts:
+        heatmap_data = pd.DataFrame(counts).pivot(index='weekday', columns='hour', values='commits')
+    else:
+        heatmap_data = pd.crosstab(df['weekday'], df['hour'])
     heatmap_data = heatmap_data.reindex(index=range(7), columns=range(24), fill_value=0)
     
     weekday_labels = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
@@ -172,12 +180,19 @@ def plot_heatmap(df, output_dir):
     plt.savefig(os.path.join(output_dir, "commit_heatmap.png"), dpi=300)
     plt.close()
 
-def plot_daily_trend(df, output_dir):
+@traced()
+def plot_daily_trend(df, output_dir, counts=None):
     """绘制日提交趋势堆叠图(区分工作日/节假日)"""
     print("绘制: 每日提交趋势...")
     
-    # 按日期聚合
-    daily_stats = df.groupby(['date', 'is_workday']).size().unstack(fill_value=0)
+    # 按日期聚合（counts 为分析库按日期聚合的结果）
+    if counts:
+        daily = pd.DataFrame(counts)
+        daily['date'] = pd.to_datetime(daily['date']).dt.date
+        daily['is_workday'] = daily['date'].map(is_workday)
+        daily_stats = daily.pivot_table(index='date', columns='is_workday', values='commits', aggfunc='sum', fill_value=0)
+    else:
+        daily_stats = df.groupby(['date', 'is_workday']).size().unstack(fill_value=0)
     
     if True not in daily_stats.columns: daily_stats[True] = 0
     if False not in daily_stats.columns: daily_stats[False] = 0
@@ -204,6 +219,43 @@ def plot_daily_trend(df, output_dir):
     plt.savefig(os.path.join(output_dir, "daily_commit_trend.png"), dpi=300)
     plt.close()
 
+def commit_window(df, data_dir):
+    """
+    clean_commits.csv 对应的 UTC 时间窗口：优先取采集时记录的 since / until，
+    缺失时（旧数据）以 module_b.since_date 与 CSV 中最晚的提交为界
+    """
+    project = CONFIG.get('project', {})
+    repo_key = f"{project.get('repo_owner', 'apache')}/{project.get('repo_name', 'rocketmq')}"
+    window = load_window(Path(data_dir), repo_key)
+    if window:
+        return window["since"], window["until"]
+
+    since = CONFIG.get('module_b', {}).get('since_date', "2013-01-01") + "T00:00:00Z"
+    if df.empty:
+        return since, None
+    latest = df['time'].max() - pd.Timedelta(hours=8)
+    return since, latest.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def load_warehouse_counts(since=None, until=None):
+    """
+    从共享分析库读取 SQL 聚合结果（与 clean_commits.csv 相同的时间窗口与 Merge 口径），
+    不可用时返回 (None, None)
+    """
+    conn = warehouse.open_if_enabled()
+    if conn is None:
+        return None, None
+
+    project = CONFIG.get('project', {})
+    repo_key = f"{project.get('repo_owner', 'apache')}/{project.get('repo_name', 'rocketmq')}"
+    try:
+        # 模块 C 在模块 B 清洗之后写入的提交尚未按 subject 标记 Merge
+        warehouse.mark_merge_subjects(conn, repo_key)
+        window = {"since": since, "until": until}
+        return (warehouse.commit_heatmap(conn, repo_key, **window),
+                warehouse.daily_commit_counts(conn, repo_key, **window))
+    finally:
+        conn.close()
+
 def main():
     setup_style()
     
@@ -215,12 +267,13 @@ def main():
     
     try:
         df = load_and_process_data(str(csv_path))
+        heatmap_counts, daily_counts = load_warehouse_counts(*commit_window(df, data_dir))
         
         plot_holiday_overtime_pie(df, output_dir)
         plot_workday_overtime_pie(df, output_dir)
         plot_workday_hourly_bar(df, output_dir)
-        plot_heatmap(df, output_dir)
-        plot_daily_trend(df, output_dir)
+        plot_heatmap(df, output_dir, counts=heatmap_counts)
+        plot_daily_trend(df, output_dir, counts=daily_counts)
         
         print(f"\n[OK] 所有图表已生成至: {output_dir}")
         
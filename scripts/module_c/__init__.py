@@ -0,0 +1 @@
+"""模块 C：工程规范性评分"""
@@ -0,0 +1,170 @@
+"""
+ci_jobs.py
+
+模块 C 的 CI job / step 计时：
+- 采集：对已完成的 workflow run 并发请求 actions/runs/{id}/jobs（并发度受 github.concurrency 限制）
+- 缓存：已完成的运行不会再变化，jobs 按 "<run id>:<run_attempt>" 缓存在 <data>/module_c/ci_jobs.ndjson[.gz|.zst]，
+  重复运行只请求新完成的运行（重新运行产生新的 run_attempt，会重新采集）
+- 统计：在 columnar.job_table / step_table 的列式表上按列计算运行耗时分位数、排队时间与最慢的 job / step
+
+用法:
+    cache = load_cache(data_dir)
+    await collect(gh, base, runs, cache)
+    save_cache(data_dir, cache)
+    stats = timing_stats(list(cache.values()), since="2024-01-01T00:00:00Z")
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from . import raw_store
+from .columnar import IGNORED_CONCLUSIONS, job_table, step_table
+
+CACHE_NAME = "ci_jobs"
+
+# 缓存保留的 job 字段（点分路径，见 raw_store.project）
+JOB_FIELDS = [
+    "id",
+    "name",
+    "conclusion",
+    "created_at",
+    "started_at",
+    "completed_at",
+    "steps.name",
+    "steps.conclusion",
+    "steps.started_at",
+    "steps.completed_at",
+]
+
+PERCENTILES = (0.5, 0.9, 0.95)
+
+
+def run_key(run: dict) -> str:
+    return f"{run['id']}:{run.get('run_attempt') or 1}"
+
+
+# =========================
+# 缓存
+# =========================
+
+def load_cache(data_dir: str | Path) -> dict[str, dict]:
+    """run key -> {run_id, run_attempt, workflow, created_at, conclusion, jobs}；缓存文件不存在时返回空缓存"""
+    if raw_store.find_records(data_dir, CACHE_NAME) is None:
+        return {}
+    return {run_key({"id": e["run_id"], "run_attempt": e["run_attempt"]}): e
+            for e in raw_store.iter_records(data_dir, CACHE_NAME)}
+
+
+def save_cache(data_dir: str | Path, cache: dict[str, dict], compression: str | None = None) -> Path:
+    entries = sorted(cache.values(), key=lambda e: (e.get("created_at") or "", e["run_id"]), reverse=True)
+    return raw_store.write_records(entries, data_dir, CACHE_NAME, compression)
+
+
+# =========================
+# 采集
+# =========================
+
+async def collect(gh, base: str, runs: list[dict], cache: dict[str, dict], *, max_new: int = 500) -> dict[str, int]:
+    """
+    并发拉取缓存中没有的已完成运行的 jobs（按创建时间从新到旧，单次最多 max_new 个，其余留给下次采集），
+    cache 就地更新；单个运行失败时跳过，下次重试
+    """
+    completed = [r for r in runs if r.get("status") == "completed" and r.get("id") is not None]
+    new = [r for r in completed if run_key(r) not in cache]
+    new.sort(key=lambda r: r.get("created_at") or "", reverse=True)
+    pending = new[max_new:] if max_new > 0 else []
+    new = new[:max_new] if max_new > 0 else new
+
+    async def fetch(run):
+        jobs = await gh.paginate(f"{base}/actions/runs/{run['id']}/jobs", item_key="jobs")
+        return run, jobs
+
+    results = await asyncio.gather(*(fetch(r) for r in new), return_exceptions=True)
+    failed = [r for r in results if isinstance(r, BaseException)]
+    for result in results:
+        if isinstance(result, BaseException):
+            continue
+        run, jobs = result
+        cache[run_key(run)] = {
+            "run_id": run["id"],
+            "run_attempt": run.get("run_attempt") or 1,
+            "workflow": run.get("name"),
+            "created_at": run.get("created_at"),
+            "conclusion": run.get("conclusion"),
+            "jobs": raw_store.project_all(jobs, JOB_FIELDS),
+        }
+    if failed:
+        print(f"[Warn] {len(failed)} 个运行的 jobs 拉取失败，下次采集重试: {failed[0]}")
+
+    return {
+        "completed": len(completed),
+        "fetched": len(new) - len(failed),
+        "cached": len(completed) - len(new) - len(pending),
+        "failed": len(failed),
+        "pending": len(pending),
+    }
+
+
+# =========================
+# 统计
+# =========================
+
+def _seconds(delta: pd.Series) -> pd.Series:
+    return delta.dt.total_seconds().dropna()
+
+
+def _describe(seconds: pd.Series) -> dict[str, float]:
+    """秒数序列 -> {count, mean, p50, p90, p95, max}（秒，保留一位小数）"""
+    if seconds.empty:
+        return {"count": 0}
+    q = seconds.quantile(list(PERCENTILES))
+    return {
+        "count": int(seconds.size),
+        "mean": round(float(seconds.mean()), 1),
+        **{f"p{round(p * 100)}": round(float(q[p]), 1) for p in PERCENTILES},
+        "max": round(float(seconds.max()), 1),
+    }
+
+
+def _slowest(df: pd.DataFrame, by: str, top: int) -> list[dict]:
+    """按 by 分组的执行耗时中位数从大到小取 top 个"""
+    if df.empty:
+        return []
+    durations = df.assign(seconds=(df["completed"] - df["started"]).dt.total_seconds()).dropna(subset=["seconds"])
+    grouped = durations.groupby(by, observed=True)["seconds"]
+    table = pd.DataFrame({"count": grouped.size(), "p50": grouped.median(), "p90": grouped.quantile(0.9)})
+    table = table.sort_values("p50", ascending=False).head(top).round(1)
+    return [{"name": str(name), "count": int(row["count"]), "p50": row["p50"], "p90": row["p90"]}
+            for name, row in table.iterrows()]
+
+
+def timing_stats(entries: list[dict], since: str | None = None, *, top: int = 5) -> dict[str, Any]:
+    """
+    CI 计时统计（秒）：
+    - run_duration：每个运行第一个 job 开始到最后一个 job 结束的时长
+    - job_duration：单个 job 的执行时长
+    - queue：job 创建到开始执行的排队时长
+    - slowest_jobs / slowest_steps：执行耗时中位数最大的 job / step
+    cancelled / skipped / neutral 的 job 不计入执行耗时，但计入排队时长
+    """
+    if since:
+        entries = [e for e in entries if (e.get("created_at") or "") >= since]
+    jobs = job_table(entries)
+    effective = jobs[~jobs["conclusion"].isin(IGNORED_CONCLUSIONS)]
+
+    per_run = effective.groupby("run_id").agg(started=("started", "min"), completed=("completed", "max"))
+    steps = step_table(entries)
+    steps = steps[~steps["conclusion"].isin(IGNORED_CONCLUSIONS)]
+
+    return {
+        "runs": len(entries),
+        "jobs": len(jobs),
+        "run_duration": _describe(_seconds(per_run["completed"] - per_run["started"])),
+        "job_duration": _describe(_seconds(effective["completed"] - effective["started"])),
+        "queue": _describe(_seconds(jobs["started"] - jobs["created"]).clip(lower=0)),
+        "slowest_jobs": _slowest(effective, "name", top),
+        "slowest_steps": _slowest(steps.assign(name=steps["job"] + " / " + steps["name"]), "name", top),
+    }
@@ -1,8 +1,19 @@
 import os
 import json
-import re
 from datetime import datetime
 
+from ..config_utils import load_config
+from .columnar import (
+    commit_table,
+    compliant_pr_mask,
+    pr_table,
+    run_masks,
+    run_table,
+    valid_commit_mask,
+)
+from . import ci_jobs, raw_store
+from .. import warehouse
+
 
 def calculate_scores(
     commits: list[dict],
@@ -15,38 +26,23 @@ def calculate_scores(
 ) -> dict:
     # --- 维度 1: 版本控制 (25分) ---
     # 1.1 Commit 规范性检查 (15分)
-    valid_commits = 0
-    pattern = re.compile(
-        r"^((feat|fix|docs|style|refactor|test|chore|perf|build|ci|revert)(\(.+\))?:|\[ISSUE #\d+\])",
-        re.IGNORECASE,
-    )
-    for c in commits or []:
-        msg = (c.get("commit", {}) or {}).get("message", "")
-        msg_first_line = msg.splitlines()[0].strip() if msg else ""
-        if pattern.match(msg_first_line):
-            valid_commits += 1
-    score_vc_commit = (valid_commits / len(commits)) * 15 if commits else 0
+    commit_df = commit_table(commits)
+    valid_commits = int(valid_commit_mask(commit_df["message"]).sum())
+    score_vc_commit = (valid_commits / len(commit_df)) * 15 if len(commit_df) else 0
 
     # 1.2 PR 流程规范性检查 (10分)
-    valid_prs = 0
-    for pr in prs or []:
-        has_body = pr.get("body") and len((pr.get("body", "") or "").strip()) > 10
-        has_meta = pr.get("assignee") or pr.get("requested_reviewers") or pr.get("labels")
-        if has_body or has_meta:
-            valid_prs += 1
-    score_vc_pr = (valid_prs / len(prs)) * 10 if prs else 0
+    pr_df = pr_table(prs)
+    valid_prs = int(compliant_pr_mask(pr_df["body"], pr_df["has_meta"]).sum())
+    score_vc_pr = (valid_prs / len(pr_df)) * 10 if len(pr_df) else 0
 
     score_version_control = score_vc_commit + score_vc_pr
 
     # --- 维度 2: 持续集成 (20分) ---
     # 2.1 Workflow 运行健康度 (15分)
-    effective_runs = [
-        r
-        for r in (runs or [])
-        if (r.get("conclusion") or "").lower() not in ["cancelled", "skipped", "neutral"]
-    ]
-    success_runs = sum(1 for r in effective_runs if (r.get("conclusion") or "").lower() == "success")
-    score_ci_health = (success_runs / len(effective_runs)) * 15 if effective_runs else 0
+    effective, success = run_masks(run_table(runs)["conclusion"])
+    effective_runs = int(effective.sum())
+    success_runs = int(success.sum())
+    score_ci_health = (success_runs / effective_runs) * 15 if effective_runs else 0
 
     # 2.2 CI 配置检查 (5分)
     score_ci_config = 5 if files_status.get(".github/workflows") else 0
@@ -76,12 +72,21 @@ def calculate_scores(
     score_governance = score_gov_docs + score_gov_release
 
     # --- 维度 4: 代码质量 (25分) ---
+    # 有多模块 pom.xml 分析结果时按配置了测试框架 / 代码风格插件的模块比例计分，
+    # 否则只看根 pom.xml 是否存在
+    pom_analysis = files_status.get("pom_analysis")
+
     # 4.1 测试配置检查 (10分)
-    score_cq_test = 10 if files_status.get("pom.xml") else 0
+    if pom_analysis:
+        score_cq_test = round(pom_analysis["test_coverage"] * 10, 2)
+    else:
+        score_cq_test = 10 if files_status.get("pom.xml") else 0
 
     # 4.2 代码规范配置检查 (15分)
     if files_status.get(".editorconfig"):
         score_cq_style = 15
+    elif pom_analysis:
+        score_cq_style = round(pom_analysis["style_coverage"] * 15, 2)
     elif files_status.get("pom.xml"):
         score_cq_style = 15
     else:
@@ -102,7 +107,7 @@ def calculate_scores(
             "total": round(score_ci, 2),
             "run_rate": round(score_ci_health, 2),
             "config_exist": score_ci_config,
-            "stats": f"{success_runs}/{len(effective_runs)}",
+            "stats": f"{success_runs}/{effective_runs}",
         },
         "governance": {
             "total": round(score_governance, 2),
@@ -113,6 +118,7 @@ def calculate_scores(
             "total": round(score_quality, 2),
             "test_config": score_cq_test,
             "style_config": score_cq_style,
+            **({"modules": pom_analysis} if pom_analysis else {}),
         },
         "total_score": round(score_version_control + score_ci + score_governance + score_quality, 2),
         "generated_at": generated_at,
@@ -120,31 +126,93 @@ def calculate_scores(
     return final_data
 
 
+def load_window_from_warehouse() -> dict | None:
+    """从共享分析库读取 module_c.since_date 起的评分窗口，库不可用或无数据时返回 None"""
+    conn = warehouse.open_if_enabled()
+    if conn is None:
+        return None
+
+    config = load_config()
+    project = config.get("project", {})
+    repo_key = f"{project.get('repo_owner', 'apache')}/{project.get('repo_name', 'rocketmq')}"
+    since = config.get("module_c", {}).get("since_date", "2024-01-01") + "T00:00:00Z"
+    try:
+        window = warehouse.load_module_c_window(conn, repo_key, since)
+    finally:
+        conn.close()
+
+    return window if window["commits"] else None
+
+
+def update_trend(final_data: dict, files_status: dict, data_dir: str) -> None:
+    """
+    按 module_c.timeseries 配置增量更新评分时间序列，
+    完整序列写入 score_series.csv 供绘图，最近 12 个窗口写入 final_data["trend"] 供报告引用
+    """
+    config = load_config()
+    ts_cfg = config.get("module_c", {}).get("timeseries", {})
+    if not ts_cfg.get("enabled", False):
+        return
+
+    conn = warehouse.open_if_enabled()
+    if conn is None:
+        print("[Warn] 评分时间序列依赖共享分析库，已跳过")
+        return
+
+    from . import score_series
+
+    project = config.get("project", {})
+    repo_key = f"{project.get('repo_owner', 'apache')}/{project.get('repo_name', 'rocketmq')}"
+    since = config.get("module_c", {}).get("since_date", "2024-01-01") + "T00:00:00Z"
+    try:
+        series = score_series.update_series(conn, repo_key, since, files_status, freq=ts_cfg.get("freq", "M"))
+    finally:
+        conn.close()
+
+    series_path = os.path.join(data_dir, "score_series.csv")
+    series.to_csv(series_path, index=False)
+    print(f"[OK] 评分时间序列已保存至: {series_path}")
+
+    final_data["trend"] = [
+        {"window_start": row["window_start"], "total_score": row["total_score"]}
+        for row in series.tail(12).to_dict("records")
+    ]
+
+
 def main() -> None:
     # 1. 基础路径配置
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-    data_dir = os.path.join(repo_root, "data", "module_c")
+    data_dir = os.path.join(load_config()["paths"]["data"], "module_c")
 
     # 2. 加载原始数据
-    commits_path = os.path.join(data_dir, "commits.json")
-    prs_path = os.path.join(data_dir, "pull_requests.json")
-    runs_path = os.path.join(data_dir, "workflow_runs.json")
-    releases_path = os.path.join(data_dir, "releases.json")
     files_path = os.path.join(data_dir, "files_structure.json")
 
     # 检查数据完整性
-    if not os.path.exists(commits_path):
-        raise RuntimeError(f"数据文件缺失: {commits_path}，请先运行 get_git_data.py")
+    if not os.path.exists(files_path):
+        raise RuntimeError(f"数据文件缺失: {files_path}，请先运行 get_git_data.py")
 
-    with open(commits_path, "r", encoding="utf-8") as f: commits = json.load(f)
-    with open(prs_path, "r", encoding="utf-8") as f: prs = json.load(f)
-    with open(runs_path, "r", encoding="utf-8") as f: runs = json.load(f)
-    with open(releases_path, "r", encoding="utf-8") as f: releases = json.load(f)
     with open(files_path, "r", encoding="utf-8") as f: files_status = json.load(f)
 
+    # 优先从分析库读取完整评分窗口（多次增量采集的累积结果），否则回退到本次采集的原始数据
+    window = load_window_from_warehouse()
+    if window is not None:
+        commits, prs, runs, releases = window["commits"], window["prs"], window["runs"], window["releases"]
+        print(f"[INFO] 评分窗口数据来自分析库: commits={len(commits)}, prs={len(prs)}, "
+              f"runs={len(runs)}, releases={len(releases)}")
+    else:
+        commits = raw_store.read_records(data_dir, "commits")
+        prs = raw_store.read_records(data_dir, "pull_requests")
+        runs = raw_store.read_records(data_dir, "workflow_runs")
+        releases = raw_store.read_records(data_dir, "releases")
+
     print("===开始数据清洗与评分计算===")
 
     final_data = calculate_scores(commits, prs, runs, releases, files_status)
+
+    # CI job / step 计时（get_git_data 按运行缓存的 jobs，统计评分窗口内的运行）
+    jobs_cache = ci_jobs.load_cache(data_dir)
+    if jobs_cache:
+        since = load_config().get("module_c", {}).get("since_date", "2024-01-01") + "T00:00:00Z"
+        final_data["ci_health"]["timing"] = ci_jobs.timing_stats(list(jobs_cache.values()), since)
     
     print(f"[INFO] 评分结果: {final_data['total_score']:.2f} / 100")
     
@@ -156,6 +224,10 @@ def main() -> None:
     print(f"2. 持续集成:     {final_data['ci_health']['total']:>6.2f} / 20")
     print(f"   - 运行成功率: {final_data['ci_health']['run_rate']:>6.2f} / 15 (Success: {final_data['ci_health']['stats']})")
     print(f"   - CI配置:     {final_data['ci_health']['config_exist']:>6.2f} /  5")
+    timing = final_data["ci_health"].get("timing")
+    if timing and timing["run_duration"]["count"]:
+        print(f"   - 运行时长:   P50 {timing['run_duration']['p50']:.0f}s / P90 {timing['run_duration']['p90']:.0f}s, "
+              f"排队 P50 {timing['queue']['p50']:.0f}s ({timing['runs']} runs)")
     
     print(f"3. 社区治理:     {final_data['governance']['total']:>6.2f} / 30")
     print(f"   - 关键文档:   {final_data['governance']['docs']:>6.2f} / 15")
@@ -166,12 +238,21 @@ def main() -> None:
     print(f"   - 代码规范:   {final_data['code_quality']['style_config']:>6.2f} / 15")
     print("-" * 45)
 
+    update_trend(final_data, files_status, data_dir)
+
     out_path = os.path.join(data_dir, "clean_scores.json")
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump(final_data, f, indent=2, ensure_ascii=False)
 
     print(f"[OK] 已清洗数据并保存至: {out_path}")
 
+    conn = warehouse.open_if_enabled()
+    if conn is not None:
+        project = load_config().get("project", {})
+        repo_key = f"{project.get('repo_owner', 'apache')}/{project.get('repo_name', 'rocketmq')}"
+        warehouse.insert_score(conn, repo_key, final_data)
+        conn.close()
+
 
 if __name__ == "__main__":
     main()
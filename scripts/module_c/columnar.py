@@ -0,0 +1,135 @@
+"""
+columnar.py
+
+模块 C 评分的列式计算内核：
+- 把 GitHub 对象列表转换为列式表（commits / prs / runs / releases，以及 CI job / step 计时）
+- 用 pandas 字符串内核对整列做规范性判定，替代逐条 Python 循环
+- 安装了 pyarrow 时字符串列使用 Arrow 存储，正则匹配走 Arrow 计算内核
+"""
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = "string"
+
+
+# Conventional Commits 前缀或 Apache 社区 Issue 格式（大小写不敏感）
+COMMIT_PREFIX = r"^((feat|fix|docs|style|refactor|test|chore|perf|build|ci|revert)(\(.+\))?:|\[ISSUE #\d+\])"
+COMMIT_PATTERN = re.compile(COMMIT_PREFIX, re.IGNORECASE)
+
+# 不计入 CI 成功率统计的运行结论
+IGNORED_CONCLUSIONS = ["cancelled", "skipped", "neutral"]
+
+# 与 str.splitlines() 一致的行分隔符（使用字面字符，Python re 与 Arrow RE2 均可解析）
+_LINE_BREAKS = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+
+# 直接作用于完整提交信息的等价规则：跳过首行前导空白后匹配前缀，且前缀不跨行。
+# 一次正则扫描即可完成"取首行 -> strip -> match"，避免逐列多次遍历
+MESSAGE_PATTERN = (
+    rf"^[^\S{_LINE_BREAKS}]*"
+    rf"((feat|fix|docs|style|refactor|test|chore|perf|build|ci|revert)(\([^{_LINE_BREAKS}]+\))?:|\[ISSUE #\d+\])"
+)
+
+
+# =========================
+# 列式表构建
+# =========================
+
+def _strings(values: list) -> pd.Series:
+    return pd.Series(values, dtype=STRING_DTYPE)
+
+
+def _times(values: list) -> pd.Series:
+    return pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce").dt.tz_localize(None)
+
+
+def commit_table(commits: list[dict]) -> pd.DataFrame:
+    """commit 对象 -> [time, message]"""
+    infos = [c.get("commit") or {} for c in commits or []]
+    return pd.DataFrame({
+        "time": _times([(i.get("author") or {}).get("date") for i in infos]),
+        "message": _strings([i.get("message") or "" for i in infos]),
+    })
+
+
+def pr_table(prs: list[dict]) -> pd.DataFrame:
+    """PR 对象 -> [time, body, has_meta]"""
+    prs = prs or []
+    return pd.DataFrame({
+        "time": _times([pr.get("closed_at") or pr.get("updated_at") for pr in prs]),
+        "body": _strings([pr.get("body") or "" for pr in prs]),
+        "has_meta": pd.Series(
+            [bool(pr.get("assignee") or pr.get("requested_reviewers") or pr.get("labels")) for pr in prs],
+            dtype=bool,
+        ),
+    })
+
+
+def run_table(runs: list[dict]) -> pd.DataFrame:
+    """workflow run 对象 -> [time, conclusion]"""
+    runs = runs or []
+    return pd.DataFrame({
+        "time": _times([r.get("created_at") for r in runs]),
+        "conclusion": _strings([r.get("conclusion") or "" for r in runs]).str.lower(),
+    })
+
+
+def release_table(releases: list[dict]) -> pd.DataFrame:
+    """release 对象 -> [time]"""
+    return pd.DataFrame({"time": _times([r.get("published_at") for r in releases or []])})
+
+
+def job_table(entries: list[dict]) -> pd.DataFrame:
+    """
+    ci_jobs 缓存条目 -> 每个 job 一行 [run_id, name, conclusion, created, started, completed]；
+    job 缺少 created_at（旧数据）时以所属 run 的创建时间计算排队
+    """
+    rows = [(e["run_id"], e.get("created_at"), j) for e in entries or [] for j in e.get("jobs") or []]
+    return pd.DataFrame({
+        "run_id": pd.Series([r for r, _, _ in rows], dtype="int64"),
+        "name": _strings([j.get("name") or "" for _, _, j in rows]),
+        "conclusion": _strings([j.get("conclusion") or "" for _, _, j in rows]).str.lower(),
+        "created": _times([j.get("created_at") or created for _, created, j in rows]),
+        "started": _times([j.get("started_at") for _, _, j in rows]),
+        "completed": _times([j.get("completed_at") for _, _, j in rows]),
+    })
+
+
+def step_table(entries: list[dict]) -> pd.DataFrame:
+    """ci_jobs 缓存条目 -> 每个 step 一行 [job, name, conclusion, started, completed]"""
+    rows = [(j.get("name") or "", st) for e in entries or [] for j in e.get("jobs") or [] for st in j.get("steps") or []]
+    return pd.DataFrame({
+        "job": _strings([job for job, _ in rows]),
+        "name": _strings([st.get("name") or "" for _, st in rows]),
+        "conclusion": _strings([st.get("conclusion") or "" for _, st in rows]).str.lower(),
+        "started": _times([st.get("started_at") for _, st in rows]),
+        "completed": _times([st.get("completed_at") for _, st in rows]),
+    })
+
+
+# =========================
+# 判定内核
+# =========================
+
+def valid_commit_mask(messages: pd.Series) -> pd.Series:
+    """提交信息首行（去除首尾空白）是否符合规范"""
+    # 使用 case=False 而非 re.IGNORECASE，Arrow 存储下可走 Arrow 正则内核
+    return messages.fillna("").str.match(MESSAGE_PATTERN, case=False).astype(bool)
+
+
+def compliant_pr_mask(bodies: pd.Series, has_meta: pd.Series) -> pd.Series:
+    """PR 描述超过 10 个字符或带有 assignee / reviewer / label"""
+    long_body = bodies.fillna("").str.strip().str.len() > 10
+    return (long_body.astype(bool) | has_meta.astype(bool)).astype(bool)
+
+
+def run_masks(conclusions: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """返回 (有效运行, 成功运行) 两个掩码"""
+    conclusions = conclusions.fillna("")
+    effective = (~conclusions.isin(IGNORED_CONCLUSIONS)).astype(bool)
+    success = (effective & (conclusions == "success")).astype(bool)
+    return effective, success
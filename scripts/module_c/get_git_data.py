@@ -1,116 +1,292 @@
+import asyncio
+import base64
 import os
 import json
-import sys
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-# Add scripts directory to path
-sys.path.append(str(Path(__file__).parent.parent))
-from config_utils import load_config
-from module_utils import (
-    github_get_json,
+from ..config_utils import load_config
+from ..github_async import AsyncGitHub
+from . import ci_jobs, graphql_backend, local_tree, pom_analyzer, raw_store
+from ..module_utils import (
+    github_api_url,
     github_headers,
     load_github_token,
-    repo_root_from,
     write_json,
 )
+from .. import warehouse
 
 CONFIG = load_config()
 
+# 按水位增量采集的资源（与分析库 watermarks 表的 resource 一致）
+RESOURCES = ("commits", "pull_requests", "workflow_runs", "releases")
+
+# 关键文件检查（有本地克隆时由 local_tree 直接回答，否则与其他资源一起经 API 并发检查）
+FILES_TO_CHECK = [
+    "LICENSE", 
+    "README.md", 
+    "CONTRIBUTING.md", 
+    "CODE_OF_CONDUCT.md", 
+    "pom.xml", 
+    ".editorconfig",
+    ".github/workflows"
+]
+
+def _window_start(conn, repo_key: str, resource: str, since: str) -> str:
+    """
+    增量采集的起点：取配置窗口起点与上次水位中较晚者。
+    水位回退 1 天，避免边界上的数据遗漏（重复数据由分析库按主键去重）。
+    """
+    if conn is None:
+        return since
+    watermark = warehouse.get_watermark(conn, repo_key, resource)
+    if not watermark:
+        return since
+    overlap = datetime.strptime(watermark, "%Y-%m-%dT%H:%M:%SZ") - timedelta(days=1)
+    return max(since, overlap.strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+
+def _older_than(field: str, since: str):
+    """分页提前终止条件：按时间倒序的页中，最后一条已早于窗口起点"""
+    def stop(items: list) -> bool:
+        return bool(items) and (items[-1].get(field) or "") < since
+    return stop
+
+
 def main() -> None:
+    """运行 Module C 的数据采集流程"""
     token = load_github_token(missing_hint="请在scripts/.env填写GITHUB_TOKEN", caller_file=__file__)
+    headers = github_headers(token)
+
+    async def run():
+        async with AsyncGitHub(headers) as gh:
+            await fetch(gh, CONFIG)
+
+    asyncio.run(run())
+
+
+async def fetch(gh: AsyncGitHub, config: dict) -> None:
+    """
+    采集 config 指定仓库的仓库信息、commits、PRs、workflow runs、releases 与关键文件
 
-    project = CONFIG.get('project', {})
+    module_c.backend 为 "graphql"（默认）时除 workflow runs 外一次查询取回全部资源，
+    GraphQL 失败（如 Token 权限不足）时回退到 REST；为 "rest" 时各资源分别并发请求。
+    写入分析库与推进水位在全部资源成功后进行。
+    """
+    project = config.get('project', {})
     owner = project.get('repo_owner', 'apache')
     repo = project.get('repo_name', 'rocketmq')
+    repo_key = f"{owner}/{repo}"
+
+    module_cfg = config.get('module_c', {})
+    since = module_cfg.get('since_date', "2024-01-01") + "T00:00:00Z"
+    max_workers = int(module_cfg.get('max_workers', 4))
+    ci_branch = module_cfg.get('ci_branch', "main")
+    backend = module_cfg.get('backend', "graphql")
+    fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
     
-    headers = github_headers(token)
-    
-    data_dir = Path(CONFIG['paths']['data']) / "module_c"
+    data_dir = Path(config['paths']['data']) / "module_c"
     out_dir = str(data_dir)
     os.makedirs(out_dir, exist_ok=True)
 
-    print(f"===开始采集数据 [{owner}/{repo}]===")
+    conn = warehouse.open_if_enabled()
+    sinces = {resource: _window_start(conn, repo_key, resource, since) for resource in RESOURCES}
+
+    print(f"===开始采集数据 [{repo_key}] 窗口起点: {since} ({backend}, {gh.transport_name})===")
+    base = github_api_url(f"/repos/{owner}/{repo}")
+
+    # 有本地克隆时关键文件检查不经过 API
+    tree = local_tree.open_local_tree(owner, repo, config)
+    files = [] if tree is not None else FILES_TO_CHECK
+
+    async def collect():
+        if backend == "graphql":
+            try:
+                collected = await graphql_backend.collect(gh, owner, repo, sinces, files)
+                print(f"GraphQL: {collected['round_trips']} round trip(s)")
+                return collected
+            except Exception as e:
+                print(f"[Warn] GraphQL 采集失败，回退到 REST: {e}")
+        return await collect_rest(gh, base, sinces, window=max_workers, files=files)
+
+    # 4. Workflow Runs（没有 GraphQL 接口；服务端 created 过滤），随后并发拉取新完成运行的 job / step 计时
+    jobs_cfg = module_cfg.get('ci_jobs', {})
+    jobs_counts: dict[str, int] = {}
+
+    async def fetch_runs():
+        runs_since = sinces["workflow_runs"]
+        print(f"Fetch: {base}/actions/runs (created >= {runs_since[:10]})")
+        runs = await gh.paginate(
+            f"{base}/actions/runs",
+            {"branch": ci_branch, "created": f">={runs_since[:10]}"},
+            item_key="workflow_runs",
+        )
+        if jobs_cfg.get('enabled', True):
+            cache = ci_jobs.load_cache(data_dir)
+            counts = await ci_jobs.collect(gh, base, runs, cache, max_new=int(jobs_cfg.get('max_new_runs', 500)))
+            ci_jobs.save_cache(data_dir, cache, module_cfg.get('raw_storage', {}).get('compression'))
+            jobs_counts.update(counts)
+            print(f"CI jobs: {counts['fetched']} new run(s), {counts['cached']} cached, "
+                  f"{counts['pending']} deferred, {counts['failed']} failed")
+        return runs
+
+    # 多模块 pom.xml 分析（本地克隆或 API，按 blob SHA 缓存）
+    async def analyze_poms():
+        if not module_cfg.get('pom_analysis', True):
+            return None
+        source = pom_analyzer.LocalPomSource(tree) if tree is not None else pom_analyzer.ApiPomSource(gh, base)
+        cache_path = data_dir / "pom_cache.json"
+        cache = pom_analyzer.load_cache(cache_path)
+        try:
+            result = await pom_analyzer.analyze(source, cache)
+        except Exception as e:
+            print(f"[Warn] pom.xml 模块分析失败，代码质量按根 pom.xml 是否存在评分: {e}")
+            return None
+        pom_analyzer.save_cache(cache_path, cache)
+        return result
+
+    collected, runs, poms = await asyncio.gather(collect(), fetch_runs(), analyze_poms())
+    if tree is not None:
+        start = time.perf_counter()
+        try:
+            collected["file_status"] = local_tree.check_files(tree, FILES_TO_CHECK)
+            print(f"[Info] 关键文件检查使用本地仓库 {tree.repo} @ {tree.commit[:10]} "
+                  f"({(time.perf_counter() - start) * 1000:.0f} ms, 0 API requests)")
+        except (OSError, subprocess.CalledProcessError, local_tree.MissingBlobError) as e:
+            print(f"[Warn] 本地仓库 {tree.repo} 的关键文件检查失败，改用 API: {e}")
+            collected["file_status"] = await check_files(gh, base, FILES_TO_CHECK)
+    if poms is not None:
+        write_json(poms, os.path.join(out_dir, "pom_analysis.json"))
+        collected["file_status"]["pom_analysis"] = poms["summary"]
+        print(f"POM: {poms['summary']['modules']} modules, parsed {poms['parsed']}, "
+              f"cached {poms['cache_hits']} ({poms['requests']} requests)")
+
+    # 只保留评分与分析库用到的字段，按行压缩存储
+    storage_cfg = module_cfg.get('raw_storage', {})
+    compression = raw_store.resolve_compression(storage_cfg.get('compression'))
+    records = {
+        "commits": collected["commits"],
+        "pull_requests": collected["prs"],
+        "workflow_runs": runs,
+        "releases": collected["releases"],
+    }
+    write_json(collected["repo_info"], os.path.join(out_dir, "repo_info.json"))
+    for resource, items in records.items():
+        records[resource] = raw_store.project_all(items, raw_store.fields_for(resource, storage_cfg))
+        path = raw_store.write_records(records[resource], data_dir, resource, compression)
+        print(f"  - {resource}: {len(items)} -> {path.name} ({os.path.getsize(path) / 1024:.0f} KiB)")
+    commits, prs, releases = records["commits"], records["pull_requests"], records["releases"]
+    runs = records["workflow_runs"]
+    print("Files:")
+    for fpath, exists in collected["file_status"].items():
+        if fpath != "pom_analysis":
+            print(f"  - {fpath}: {exists}")
+    write_json(collected["file_status"], os.path.join(out_dir, "files_structure.json"))
+
+    # 增量写入分析库，全部成功后再推进水位
+    if conn is not None:
+        warehouse.upsert_commits(conn, repo_key, commits)
+        warehouse.upsert_pull_requests(conn, repo_key, prs)
+        warehouse.upsert_workflow_runs(conn, repo_key, runs)
+        warehouse.upsert_releases(conn, repo_key, releases)
+        # 有推迟或失败的 CI jobs 时不推进 workflow_runs 水位，下次采集的运行列表仍包含这些运行
+        jobs_backlog = jobs_counts.get("pending", 0) + jobs_counts.get("failed", 0)
+        for resource in RESOURCES:
+            if resource == "workflow_runs" and jobs_backlog:
+                print(f"[Info] {jobs_backlog} 个运行的 CI jobs 留待下次采集，workflow_runs 水位保持不变")
+                continue
+            warehouse.set_watermark(conn, repo_key, resource, fetched_at)
+        conn.close()
+        print(f"[OK] 已增量写入分析库: {warehouse.default_path()}")
+
+    print(f"[OK] [{repo_key}] 数据采集完成 ({gh.requests} requests, {gh.bytes_received / 1024:.0f} KiB)")
+
+
+async def collect_rest(
+    gh: AsyncGitHub,
+    base: str,
+    sinces: dict[str, str],
+    *,
+    window: int = 4,
+    files: list[str] = FILES_TO_CHECK,
+) -> dict:
+    """REST 后端：仓库信息、commits、PRs、releases 与关键文件（files 为空时不检查）各自分页，全部并发请求"""
 
     # 1. Repo Info
-    url_repo = f"https://api.github.com/repos/{owner}/{repo}"
-    print(f"Fetch: {url_repo}")
-    repo_info = github_get_json(url_repo, headers=headers, timeout=30)
-    write_json(os.path.join(out_dir, "repo_info.json"), repo_info)
-
-    # 2. Recent Commits
-    url_commits = f"https://api.github.com/repos/{owner}/{repo}/commits"
-    params_commits = {"per_page": 100, "page": 1}
-    print(f"Fetch: {url_commits}")
-    commits = github_get_json(url_commits, headers=headers, params=params_commits, timeout=30)
-    write_json(os.path.join(out_dir, "commits.json"), commits)
-
-    # 3. Pull Requests
-    url_prs = f"https://api.github.com/repos/{owner}/{repo}/pulls"
-    params_prs = {
-        "state": "closed",
-        "per_page": 20,
-        "page": 1,
-        "sort": "updated",
-        "direction": "desc"
+    async def fetch_repo_info():
+        print(f"Fetch: {base}")
+        return await gh.get_json(base, timeout=30)
+
+    # 2. Commits（服务端 since 过滤，全部页并发拉取）
+    async def fetch_commits():
+        print(f"Fetch: {base}/commits (since {sinces['commits']})")
+        return await gh.paginate(f"{base}/commits", {"since": sinces["commits"]})
+
+    # 3. Pull Requests（无服务端时间过滤，按 updated 倒序分页至窗口起点）
+    async def fetch_prs():
+        prs_since = sinces["pull_requests"]
+        print(f"Fetch: {base}/pulls (updated since {prs_since})")
+        prs = await gh.paginate(
+            f"{base}/pulls",
+            {"state": "closed", "sort": "updated", "direction": "desc"},
+            window=window,
+            stop=_older_than("updated_at", prs_since),
+        )
+        return [pr for pr in prs if (pr.get("updated_at") or "") >= prs_since]
+
+    # 5. Releases（接口按创建时间倒序，分页至创建时间早于窗口起点；草稿的 published_at 为空，不能用作终点）
+    async def fetch_releases():
+        releases_since = sinces["releases"]
+        print(f"Fetch: {base}/releases (published since {releases_since})")
+        releases = await gh.paginate(
+            f"{base}/releases",
+            window=window,
+            stop=_older_than("created_at", releases_since),
+        )
+        return [r for r in releases if (r.get("published_at") or "") >= releases_since]
+
+    repo_info, commits, prs, releases, file_status = await asyncio.gather(
+        fetch_repo_info(), fetch_commits(), fetch_prs(), fetch_releases(), check_files(gh, base, files),
+    )
+    return {
+        "repo_info": repo_info,
+        "commits": commits,
+        "prs": prs,
+        "releases": releases,
+        "file_status": file_status,
     }
-    print(f"Fetch: {url_prs}")
-    prs = github_get_json(url_prs, headers=headers, params=params_prs, timeout=30)
-    write_json(os.path.join(out_dir, "pull_requests.json"), prs)
-
-    # 4. Workflow Runs
-    url_runs = f"https://api.github.com/repos/{owner}/{repo}/actions/runs"
-    params_runs = {"branch": "main", "per_page": 50, "page": 1}
-    print(f"Fetch: {url_runs}")
-    runs_resp = github_get_json(url_runs, headers=headers, params=params_runs, timeout=30)
-    runs = (runs_resp or {}).get("workflow_runs", [])
-    write_json(os.path.join(out_dir, "workflow_runs.json"), runs)
-    
-    # 5. Releases
-    url_releases = f"https://api.github.com/repos/{owner}/{repo}/releases"
-    params_releases = {"per_page": 20, "page": 1}
-    print(f"Fetch: {url_releases}")
-    releases = github_get_json(url_releases, headers=headers, params=params_releases, timeout=30)
-    write_json(os.path.join(out_dir, "releases.json"), releases)
-
-    # 6. Check Critical Files
-    files_to_check = [
-        "LICENSE", 
-        "README.md", 
-        "CONTRIBUTING.md", 
-        "CODE_OF_CONDUCT.md", 
-        "pom.xml", 
-        ".editorconfig",
-        ".github/workflows"
-    ]
-    file_status = {}
-    print("Checking files...")
-    for fpath in files_to_check:
-        url_file = f"https://api.github.com/repos/{owner}/{repo}/contents/{fpath}"
+
+
+async def check_files(gh: AsyncGitHub, base: str, files: list[str] = FILES_TO_CHECK) -> dict:
+    """并发检查关键文件是否存在；pom.xml 存在时检查是否配置了 Checkstyle / Spotless"""
+
+    async def contents(fpath: str):
         try:
-            github_get_json(url_file, headers=headers, timeout=10)
-            file_status[fpath] = True
+            return await gh.get_json(f"{base}/contents/{fpath}", timeout=10)
         except Exception:
-            file_status[fpath] = False
-        print(f"  - {fpath}: {file_status[fpath]}")
+            return None
+
+    objects = await asyncio.gather(*(contents(fpath) for fpath in files))
+
+    file_status = {}
+    for fpath, obj in zip(files, objects):
+        file_status[fpath] = obj is not None
         
         if fpath == "pom.xml" and file_status[fpath]:
             try:
-                pom_obj = github_get_json(url_file, headers=headers, timeout=10)
-                content_b64 = (pom_obj or {}).get("content", "")
-                import base64
+                content_b64 = (obj or {}).get("content", "")
                 if content_b64:
                     content_str = base64.b64decode(content_b64).decode("utf-8", errors="ignore")
                     has_checkstyle = "maven-checkstyle-plugin" in content_str
                     has_spotless = "spotless-maven-plugin" in content_str
                     file_status["pom_style_check"] = has_checkstyle or has_spotless
-                    print(f"    > Checkstyle/Spotless configured: {file_status['pom_style_check']}")
             except Exception as e:
                 print(f"    > Failed to parse pom.xml: {e}")
                 file_status["pom_style_check"] = False
 
-    write_json(os.path.join(out_dir, "files_structure.json"), file_status)
-
-    print("[OK] 数据采集完成")
+    return file_status
 
 
 if __name__ == "__main__":
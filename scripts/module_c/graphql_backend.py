@@ -0,0 +1,249 @@
+"""
+graphql_backend.py
+
+模块 C 的 GraphQL 采集后端：
+- 一次查询同时取回仓库信息、默认分支的提交历史、已关闭的 PR、releases 与关键文件是否存在
+  （object(expression: "HEAD:<path>") 探测），只请求 calculate_scores 与分析库用到的字段
+- 各连接按游标分页，后续轮次只查询仍有下一页的连接，一轮请求推进所有连接
+- 结果转换为与 REST 接口相同结构的对象，清洗与评分代码无需区分来源
+- workflow runs 没有 GraphQL 接口，仍由 REST 采集
+
+用法:
+    collected = await collect(gh, "apache", "rocketmq", sinces, files)
+"""
+
+import functools
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from ..github_async import AsyncGitHub, GraphQLError
+
+# 单页条数（GraphQL 连接的上限）
+PAGE_SIZE = 100
+
+_QUERY = """
+query($owner: String!, $name: String!, $withRepo: Boolean!,
+      $withCommits: Boolean!, $commitsSince: GitTimestamp, $commitsAfter: String,
+      $withPrs: Boolean!, $prsAfter: String,
+      $withReleases: Boolean!, $releasesAfter: String) {
+  rateLimit { cost remaining }
+  repository(owner: $owner, name: $name) {
+    nameWithOwner @include(if: $withRepo)
+    description @include(if: $withRepo)
+    stargazerCount @include(if: $withRepo)
+    forkCount @include(if: $withRepo)
+    isArchived @include(if: $withRepo)
+    createdAt @include(if: $withRepo)
+    pushedAt @include(if: $withRepo)
+    licenseInfo @include(if: $withRepo) { spdxId }
+    defaultBranchRef {
+      name
+      target @include(if: $withCommits) {
+        ... on Commit {
+          history(first: %(page)d, since: $commitsSince, after: $commitsAfter) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              message
+              author { name email date }
+              parents(first: 2) { nodes { oid } }
+            }
+          }
+        }
+      }
+    }
+    pullRequests(first: %(page)d, after: $prsAfter, states: [CLOSED, MERGED],
+                 orderBy: {field: UPDATED_AT, direction: DESC}) @include(if: $withPrs) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        body
+        createdAt
+        updatedAt
+        closedAt
+        mergedAt
+        assignees(first: 1) { nodes { login } }
+        reviewRequests(first: 10) {
+          nodes { requestedReviewer { ... on User { login } ... on Team { slug } ... on Mannequin { login } } }
+        }
+        labels(first: 10) { nodes { name } }
+      }
+    }
+    releases(first: %(page)d, after: $releasesAfter,
+             orderBy: {field: CREATED_AT, direction: DESC}) @include(if: $withReleases) {
+      pageInfo { hasNextPage endCursor }
+      nodes { databaseId tagName createdAt publishedAt }
+    }
+%(files)s
+  }
+}
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def build_query(files: tuple[str, ...]) -> str:
+    """生成查询语句；文件探测只在第一轮执行，pom.xml 额外取回内容用于检查风格插件"""
+    fields = []
+    for i, path in enumerate(files):
+        extra = " ... on Blob { text }" if path == "pom.xml" else ""
+        expression = json.dumps(f"HEAD:{path}")
+        fields.append(f"    file_{i}: object(expression: {expression}) @include(if: $withRepo) {{ __typename{extra} }}")
+    return _QUERY % {"page": PAGE_SIZE, "files": "\n".join(fields)}
+
+
+async def collect(
+    gh: AsyncGitHub,
+    owner: str,
+    name: str,
+    sinces: dict[str, str],
+    files: list[str],
+) -> dict[str, Any]:
+    """
+    采集 commits / PRs / releases / 仓库信息 / 文件状态
+
+    sinces: {"commits": ..., "pull_requests": ..., "releases": ...}，各资源的窗口起点
+    Returns:
+        {"repo_info", "commits", "prs", "releases", "file_status", "round_trips"}
+    """
+    query = build_query(tuple(files))
+    cursors: dict[str, str | None] = {"commits": None, "prs": None, "releases": None}
+    pending = {"commits", "prs", "releases"}
+    collected: dict[str, list] = {"commits": [], "prs": [], "releases": []}
+    repo_info: dict = {}
+    file_status: dict = {}
+    round_trips = 0
+
+    while pending or round_trips == 0:
+        data = await gh.graphql(query, {
+            "owner": owner,
+            "name": name,
+            "withRepo": round_trips == 0,
+            "withCommits": "commits" in pending,
+            "commitsSince": sinces["commits"],
+            "commitsAfter": cursors["commits"],
+            "withPrs": "prs" in pending,
+            "prsAfter": cursors["prs"],
+            "withReleases": "releases" in pending,
+            "releasesAfter": cursors["releases"],
+        })
+        round_trips += 1
+
+        repo = data.get("repository")
+        if repo is None:
+            raise GraphQLError([{"message": f"Could not resolve to a Repository with the name '{owner}/{name}'."}])
+
+        if round_trips == 1:
+            repo_info = _repo_info(repo)
+            file_status = _file_status(repo, files)
+
+        pages = {
+            "commits": (((repo.get("defaultBranchRef") or {}).get("target") or {}).get("history")
+                        if "commits" in pending else None),
+            "prs": repo.get("pullRequests") if "prs" in pending else None,
+            "releases": repo.get("releases") if "releases" in pending else None,
+        }
+        stops = {
+            "commits": None,
+            "prs": ("updatedAt", sinces["pull_requests"]),
+            # 按创建时间排序，草稿等未发布的 release 没有 publishedAt，只能以 createdAt 判断翻页终点
+            "releases": ("createdAt", sinces["releases"]),
+        }
+        for key in list(pending):
+            page = pages[key]
+            if not page:
+                # 空仓库没有默认分支
+                pending.discard(key)
+                continue
+            nodes = page.get("nodes") or []
+            collected[key].extend(nodes)
+            cursors[key] = page["pageInfo"]["endCursor"]
+
+            # PR / release 按时间倒序，越过窗口起点后不再翻页
+            stop = stops[key]
+            past_window = bool(stop and nodes and (nodes[-1].get(stop[0]) or "") < stop[1])
+            if not page["pageInfo"]["hasNextPage"] or past_window:
+                pending.discard(key)
+
+    prs = [_pull_request(n) for n in collected["prs"] if (n.get("updatedAt") or "") >= sinces["pull_requests"]]
+    releases = [_release(n) for n in collected["releases"] if (n.get("publishedAt") or "") >= sinces["releases"]]
+
+    return {
+        "repo_info": repo_info,
+        "commits": [_commit(n) for n in collected["commits"]],
+        "prs": prs,
+        "releases": releases,
+        "file_status": file_status,
+        "round_trips": round_trips,
+    }
+
+
+# =========================
+# 转换为 REST 结构
+# =========================
+
+def _repo_info(repo: dict) -> dict:
+    return {
+        "full_name": repo.get("nameWithOwner"),
+        "description": repo.get("description"),
+        "stargazers_count": repo.get("stargazerCount"),
+        "forks_count": repo.get("forkCount"),
+        "archived": repo.get("isArchived"),
+        "created_at": repo.get("createdAt"),
+        "pushed_at": repo.get("pushedAt"),
+        "default_branch": (repo.get("defaultBranchRef") or {}).get("name"),
+        "license": {"spdx_id": (repo.get("licenseInfo") or {}).get("spdxId")} if repo.get("licenseInfo") else None,
+    }
+
+
+def _file_status(repo: dict, files: list[str]) -> dict:
+    status = {}
+    for i, path in enumerate(files):
+        obj = repo.get(f"file_{i}")
+        status[path] = obj is not None
+        if path == "pom.xml" and obj is not None:
+            text = obj.get("text") or ""
+            status["pom_style_check"] = "maven-checkstyle-plugin" in text or "spotless-maven-plugin" in text
+    return status
+
+
+def _utc(timestamp: str | None) -> str | None:
+    """GitTimestamp 保留作者本地时区（如 2026-01-02T08:00:00+08:00），统一为与 REST 相同的 UTC "...Z" 格式"""
+    if not timestamp:
+        return timestamp
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _commit(node: dict) -> dict:
+    author = dict(node.get("author") or {})
+    if "date" in author:
+        author["date"] = _utc(author["date"])
+    return {
+        "sha": node.get("oid"),
+        "commit": {"author": author, "message": node.get("message") or ""},
+        "parents": [{"sha": p.get("oid")} for p in (node.get("parents") or {}).get("nodes") or []],
+    }
+
+
+def _pull_request(node: dict) -> dict:
+    assignees = (node.get("assignees") or {}).get("nodes") or []
+    reviewers = [
+        r.get("requestedReviewer") or {} for r in (node.get("reviewRequests") or {}).get("nodes") or []
+    ]
+    return {
+        "number": node.get("number"),
+        "state": "closed",
+        "body": node.get("body"),
+        "created_at": node.get("createdAt"),
+        "updated_at": node.get("updatedAt"),
+        "closed_at": node.get("closedAt"),
+        "merged_at": node.get("mergedAt"),
+        "assignee": assignees[0] if assignees else None,
+        "requested_reviewers": [{"login": r.get("login") or r.get("slug")} for r in reviewers if r],
+        "labels": [{"name": lb.get("name")} for lb in (node.get("labels") or {}).get("nodes") or []],
+    }
+
+
+def _release(node: dict) -> dict:
+    return {"id": node.get("databaseId"), "tag_name": node.get("tagName"), "published_at": node.get("publishedAt")}
@@ -0,0 +1,185 @@
+"""
+local_tree.py
+
+从本地克隆回答模块 C 的关键文件检查，不消耗 GitHub API 配额：
+- 仓库来源：module_c.local_repo 指定的工作区或裸镜像，否则为模块 A 克隆的 temp_repos/<仓库名>
+  （origin 指向其他仓库时不使用）
+- 新鲜度：git ls-remote 取 origin 默认分支的最新提交（不消耗 API 配额），本地 HEAD 落后时先 git fetch，
+  读取拉取到的提交；拉取失败时回退到 API，无法访问 origin 时使用本地 HEAD 并给出警告
+- 一次 git ls-tree -r 列出该提交的完整文件树，文件与目录是否存在直接查表
+- 文件内容通过一个 git cat-file --batch 进程批量读取（根目录与所有子模块的 pom.xml）
+- 读取的是提交对象而非工作区，裸镜像与有未提交修改的工作区结果一致
+
+用法:
+    tree = open_local_tree("apache", "rocketmq", CONFIG)
+    if tree is not None:
+        file_status = check_files(tree, FILES_TO_CHECK)
+"""
+
+import os
+import re
+import subprocess
+from pathlib import Path, PurePosixPath
+from typing import Iterable
+
+# pom.xml 中表示已配置代码风格检查的插件
+STYLE_PLUGINS = ("maven-checkstyle-plugin", "spotless-maven-plugin")
+
+# ls-remote / fetch 访问 origin 的超时（秒）
+REMOTE_TIMEOUT = 60
+
+
+class MissingBlobError(Exception):
+    """本地仓库缺少需要读取的文件内容"""
+
+
+def _git(repo: Path, *args: str, timeout: float | None = None) -> bytes:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        timeout=timeout, env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    ).stdout
+
+
+class GitTree:
+    """某个提交的完整文件树（只读）"""
+
+    def __init__(self, repo: str | Path, rev: str = "HEAD"):
+        self.repo = Path(repo)
+        self.commit = _git(self.repo, "rev-parse", "--verify", f"{rev}^{{commit}}").decode().strip()
+        self.blobs: dict[str, str] = {}
+        self.dirs: set[str] = set()
+
+        # 每条记录为 "<mode> <type> <sha>\t<path>\0"；子模块（gitlink）的类型为 commit
+        for record in _git(self.repo, "ls-tree", "-r", "-z", "--full-tree", self.commit).split(b"\0"):
+            if not record:
+                continue
+            meta, path = record.split(b"\t", 1)
+            _, kind, sha = meta.split()
+            path = path.decode("utf-8", errors="surrogateescape")
+            if kind == b"blob":
+                self.blobs[path] = sha.decode()
+            for parent in PurePosixPath(path).parents:
+                if str(parent) == ".":
+                    break
+                self.dirs.add(str(parent))
+
+    def exists(self, path: str) -> bool:
+        path = path.strip("/")
+        return path in self.blobs or path in self.dirs
+
+    def find(self, filename: str) -> list[str]:
+        """文件名为 filename 的全部路径（按路径排序，根目录优先）"""
+        return sorted((p for p in self.blobs if PurePosixPath(p).name == filename), key=lambda p: (p.count("/"), p))
+
+    def read(self, paths: Iterable[str]) -> dict[str, bytes]:
+        """批量读取文件内容（一个 cat-file 进程）；部分克隆（--filter=blob:none）中缺失的 blob 不在结果中"""
+        paths = [p for p in paths if p in self.blobs]
+        if not paths:
+            return {}
+        request = "".join(f"{self.blobs[p]}\n" for p in paths).encode()
+        out = subprocess.run(
+            ["git", "-C", str(self.repo), "cat-file", "--batch"],
+            input=request, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        ).stdout
+
+        contents, pos = {}, 0
+        for path in paths:
+            header_end = out.index(b"\n", pos)
+            header = out[pos:header_end].split()
+            # 缺失的对象只有一行 "<sha> missing"
+            if header[1] == b"missing":
+                pos = header_end + 1
+                continue
+            size = int(header[2])
+            contents[path] = out[header_end + 1: header_end + 1 + size]
+            pos = header_end + 1 + size + 1
+        return contents
+
+
+def _origin_matches(repo: Path, owner: str, name: str) -> bool:
+    try:
+        url = _git(repo, "config", "--get", "remote.origin.url").decode().strip()
+    except subprocess.CalledProcessError:
+        return False
+    match = re.search(r"[/:]([^/:]+)/([^/]+?)(?:\.git)?/?$", url)
+    return bool(match) and (match.group(1).lower(), match.group(2).lower()) == (owner.lower(), name.lower())
+
+
+def find_local_repo(owner: str, name: str, config: dict) -> Path | None:
+    """
+    本地仓库路径：module_c.local_repo（显式指定，不校验 origin），
+    否则 temp_repos/<name>（origin 必须指向 owner/name）；都不可用时返回 None
+    """
+    module_cfg = config.get("module_c", {})
+    if not module_cfg.get("local_checks", True):
+        return None
+    root = config.get("paths", {}).get("root")
+
+    configured = module_cfg.get("local_repo")
+    if configured:
+        path = Path(configured)
+        return path if path.is_absolute() or not root else Path(root) / path
+    if not root:
+        return None
+
+    clone = Path(root) / "temp_repos" / name
+    if clone.exists() and _origin_matches(clone, owner, name):
+        return clone
+    return None
+
+
+def _error_text(e: Exception) -> str:
+    stderr = getattr(e, "stderr", b"") or b""
+    return stderr.decode(errors="ignore").strip() or str(e)
+
+
+def remote_head(repo: str | Path) -> str | None:
+    """origin 默认分支的最新提交 SHA（git ls-remote origin HEAD）；无法访问 origin 时返回 None"""
+    try:
+        out = _git(Path(repo), "ls-remote", "origin", "HEAD", timeout=REMOTE_TIMEOUT).decode()
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        print(f"[Warn] 无法获取 {repo} 的 origin 默认分支: {_error_text(e)}")
+        return None
+    return out.split()[0] if out.strip() else None
+
+
+def open_local_tree(owner: str, name: str, config: dict) -> GitTree | None:
+    """
+    打开本地仓库中 origin 默认分支的最新提交（本地落后时先 git fetch）；
+    没有可用的本地仓库、拉取或读取失败时返回 None（调用方回退到 API）
+    """
+    repo = find_local_repo(owner, name, config)
+    if repo is None:
+        return None
+    try:
+        tree = GitTree(repo)
+        head = remote_head(repo)
+        if head is None:
+            print(f"[Warn] 无法确认本地仓库 {repo} 是否为最新，使用本地 HEAD {tree.commit[:10]}")
+        elif head != tree.commit:
+            print(f"[Info] 本地仓库 {repo} @ {tree.commit[:10]} 落后于 origin ({head[:10]})，git fetch...")
+            _git(repo, "fetch", "--quiet", "origin", "HEAD", timeout=REMOTE_TIMEOUT)
+            tree = GitTree(repo, "FETCH_HEAD")
+        return tree
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        print(f"[Warn] 无法读取本地仓库 {repo}，关键文件检查改用 API: {_error_text(e)}")
+        return None
+
+
+def check_files(tree: GitTree, files: list[str]) -> dict:
+    """
+    与 get_git_data.check_files 结构相同的文件状态；pom_style_check 检查根目录与所有子模块的 pom.xml，
+    任一配置了 Checkstyle / Spotless 即为 True
+    """
+    file_status = {path: tree.exists(path) for path in files}
+
+    poms = tree.find("pom.xml")
+    if poms:
+        contents = tree.read(poms)
+        if len(contents) < len(poms):
+            raise MissingBlobError(f"本地仓库缺少 {len(poms) - len(contents)} 个 pom.xml 的内容（部分克隆？）")
+        styled = [p for p, text in contents.items() if any(plugin.encode() in text for plugin in STYLE_PLUGINS)]
+        file_status["pom_style_check"] = bool(styled)
+        file_status["pom_files"] = len(poms)
+        file_status["pom_style_files"] = len(styled)
+    return file_status
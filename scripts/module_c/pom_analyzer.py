@@ -0,0 +1,258 @@
+"""
+pom_analyzer.py
+
+Maven 多模块工程的 pom.xml 分析（代码质量维度的数据来源）：
+- 流式解析：ElementTree.iterparse 逐个元素读取坐标、<modules>、构建插件与依赖，处理完即清空元素，不构建完整 DOM
+- 从根 pom.xml 出发按 <modules>（含 profiles 中声明的模块）逐层解析模块树，同一层的子 POM 并发读取
+- POM 来源：本地克隆（local_tree.GitTree，一个 cat-file 进程批量读取）或 GitHub API
+  （一次 git/trees 递归列表得到各文件的 blob SHA，再并发请求 git/blobs）
+- 解析结果按 blob SHA 缓存（内容不变则 SHA 不变），重复运行只解析改动过的 POM
+- 子模块继承父 POM 的 <build><plugins> 与 <dependencies>（<parent> 指向模块树中的上级时），
+  按模块统计测试框架、代码风格插件与覆盖率插件的配置情况
+
+用法:
+    result = await analyze(LocalPomSource(tree), cache)
+    result["summary"]  # {"modules", "code_modules", "test_coverage", "style_coverage", "jacoco_coverage"}
+"""
+
+import asyncio
+import base64
+import io
+import json
+import os
+import posixpath
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any
+
+# 解析结果的格式版本；变化时旧缓存全部失效
+CACHE_VERSION = 1
+
+STYLE_PLUGINS = {"maven-checkstyle-plugin", "spotless-maven-plugin"}
+COVERAGE_PLUGINS = {"jacoco-maven-plugin"}
+TEST_GROUPS = {"junit", "org.junit.jupiter", "org.junit.vintage", "org.testng", "org.mockito"}
+
+# 需要收集文本的元素路径（去掉命名空间，profiles/profile 下的同名路径一并收集）
+_COORDS = {
+    ("project", "artifactId"): "artifact_id",
+    ("project", "groupId"): "group_id",
+    ("project", "packaging"): "packaging",
+    ("project", "parent", "artifactId"): "parent",
+}
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_pom(content: bytes) -> dict[str, Any]:
+    """
+    流式解析单个 POM：坐标、声明的子模块、<build><plugins> 中的插件与 <dependencies> 中的依赖
+    （pluginManagement / dependencyManagement 只声明版本，不计入）
+    """
+    info: dict[str, Any] = {
+        "artifact_id": None, "group_id": None, "packaging": "jar", "parent": None,
+        "modules": [], "plugins": [], "dependencies": [],
+    }
+    path: list[str] = []
+    dependency: dict[str, str] = {}
+
+    for event, elem in ET.iterparse(io.BytesIO(content), events=("start", "end")):
+        if event == "start":
+            path.append(_local(elem.tag))
+            continue
+
+        # profiles/profile/X 与 X 等价
+        key = tuple(path)
+        if key[1:3] == ("profiles", "profile"):
+            key = key[:1] + key[3:]
+        text = (elem.text or "").strip()
+
+        if key in _COORDS and len(path) == len(key):
+            info[_COORDS[key]] = text or info[_COORDS[key]]
+        elif key == ("project", "modules", "module") and text:
+            info["modules"].append(text)
+        elif key == ("project", "build", "plugins", "plugin", "artifactId") and text:
+            info["plugins"].append(text)
+        elif key[:3] == ("project", "dependencies", "dependency") and len(key) == 4:
+            dependency[key[3]] = text
+        elif key == ("project", "dependencies", "dependency"):
+            info["dependencies"].append({
+                "group_id": dependency.get("groupId", ""),
+                "artifact_id": dependency.get("artifactId", ""),
+                "scope": dependency.get("scope", "compile"),
+            })
+            dependency = {}
+
+        path.pop()
+        elem.clear()
+
+    return info
+
+
+def _is_test_dependency(dep: dict) -> bool:
+    return dep["group_id"] in TEST_GROUPS or dep["artifact_id"].startswith(("junit", "testng", "mockito"))
+
+
+def _module_pom(pom_path: str, module: str) -> str:
+    """<module> 声明的相对路径 -> 子 POM 的仓库路径"""
+    target = posixpath.normpath(posixpath.join(posixpath.dirname(pom_path), module))
+    if target == ".":
+        return "pom.xml"
+    return target if target.endswith(".xml") else posixpath.join(target, "pom.xml")
+
+
+# =========================
+# POM 来源
+# =========================
+
+class LocalPomSource:
+    """本地克隆（GitTree）：blob SHA 直接来自文件树，内容由一个 cat-file 进程批量读取"""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.requests = 0
+
+    async def shas(self) -> dict[str, str]:
+        return self.tree.blobs
+
+    async def read(self, paths: list[str]) -> dict[str, bytes]:
+        return await asyncio.to_thread(self.tree.read, paths)
+
+
+class ApiPomSource:
+    """GitHub API：一次 git/trees 递归请求得到 blob SHA，缓存未命中的 POM 并发请求 git/blobs"""
+
+    def __init__(self, gh, base: str, ref: str = "HEAD"):
+        self.gh = gh
+        self.base = base
+        self.ref = ref
+        self.requests = 0
+        self._shas: dict[str, str] | None = None
+
+    async def shas(self) -> dict[str, str]:
+        if self._shas is None:
+            data = await self.gh.get_json(f"{self.base}/git/trees/{self.ref}", params={"recursive": 1})
+            self.requests += 1
+            if data.get("truncated"):
+                print("[Warn] 文件树过大被截断，部分子模块 POM 可能无法定位")
+            self._shas = {e["path"]: e["sha"] for e in data.get("tree", []) if e.get("type") == "blob"}
+        return self._shas
+
+    async def read(self, paths: list[str]) -> dict[str, bytes]:
+        shas = await self.shas()
+
+        async def blob(path):
+            data = await self.gh.get_json(f"{self.base}/git/blobs/{shas[path]}")
+            return path, base64.b64decode(data.get("content") or "")
+
+        self.requests += len(paths)
+        return dict(await asyncio.gather(*(blob(p) for p in paths)))
+
+
+# =========================
+# 缓存
+# =========================
+
+def load_cache(path: str | Path) -> dict[str, dict]:
+    """blob SHA -> parse_pom 结果；版本不一致或文件损坏时返回空缓存"""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("entries", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(path: str | Path, cache: dict[str, dict]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, "entries": cache}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# =========================
+# 模块树分析
+# =========================
+
+async def analyze(source, cache: dict[str, dict], root: str = "pom.xml") -> dict[str, Any] | None:
+    """
+    解析模块树并统计各模块的配置覆盖率；仓库没有根 pom.xml 时返回 None。
+    cache 会被就地更新（新解析的 POM 按 blob SHA 写入）
+    """
+    shas = await source.shas()
+    if root not in shas:
+        return None
+
+    poms: dict[str, dict] = {}
+    tree_parent: dict[str, str | None] = {root: None}
+    level, parsed, hits = [root], 0, 0
+
+    while level:
+        missing = [p for p in level if shas[p] not in cache]
+        contents = await source.read(missing) if missing else {}
+        for path in missing:
+            try:
+                cache[shas[path]] = parse_pom(contents[path])
+            except (ET.ParseError, KeyError) as e:
+                print(f"[Warn] 无法解析 {path}: {e}")
+                cache[shas[path]] = None
+        parsed += len(missing)
+        hits += len(level) - len(missing)
+
+        next_level = []
+        for path in level:
+            info = cache[shas[path]]
+            if info is None:
+                continue
+            poms[path] = info
+            for module in info["modules"]:
+                child = _module_pom(path, module)
+                if child in shas and child not in tree_parent:
+                    tree_parent[child] = path
+                    next_level.append(child)
+        level = next_level
+
+    modules = []
+    effective: dict[str, tuple[set, list]] = {}
+    for path, info in poms.items():  # 按层序遍历，父模块总在子模块之前
+        plugins, deps = set(info["plugins"]), list(info["dependencies"])
+        parent_path = tree_parent.get(path)
+        if parent_path in effective and info["parent"] == poms[parent_path]["artifact_id"]:
+            parent_plugins, parent_deps = effective[parent_path]
+            plugins |= parent_plugins
+            deps = parent_deps + deps
+        effective[path] = (plugins, deps)
+        modules.append({
+            "path": path,
+            "artifact_id": info["artifact_id"],
+            "packaging": info["packaging"],
+            "tests": any(_is_test_dependency(d) for d in deps),
+            "style": bool(plugins & STYLE_PLUGINS),
+            "jacoco": bool(plugins & COVERAGE_PLUGINS),
+            "plugins": sorted(plugins),
+        })
+
+    return {
+        "summary": summarize(modules),
+        "modules": modules,
+        "parsed": parsed,
+        "cache_hits": hits,
+        "requests": source.requests,
+    }
+
+
+def summarize(modules: list[dict]) -> dict[str, Any]:
+    """覆盖率按含代码的模块（packaging 不是 pom）计算；只有聚合 POM 时按全部模块计算"""
+    code = [m for m in modules if m["packaging"] != "pom"] or modules
+
+    def coverage(key):
+        return round(sum(1 for m in code if m[key]) / len(code), 4) if code else 0.0
+
+    return {
+        "modules": len(modules),
+        "code_modules": len(code),
+        "test_coverage": coverage("tests"),
+        "style_coverage": coverage("style"),
+        "jacoco_coverage": coverage("jacoco"),
+    }
@@ -0,0 +1,206 @@
+"""
+raw_store.py
+
+模块 C 原始数据的存储格式：
+- 采集时按 module_c.raw_storage.fields 只保留评分与分析库用到的字段（字段投影），
+  GitHub 对象中嵌套的完整 repo / user 对象与各类 *_url 不再落盘
+- 每条记录一行紧凑 JSON（NDJSON），按 compression 压缩：auto（安装 zstandard 时用 zstd，否则 gzip）/ zstd / gzip / none
+- 读取时逐行解析，兼容旧版整文件的 <name>.json
+
+用法:
+    records = project_all(commits, fields_for("commits"))
+    write_records(records, data_dir, "commits")
+    commits = read_records(data_dir, "commits")
+"""
+
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from ..config_utils import load_config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 评分（columnar.py）与分析库（warehouse.upsert_*）用到的字段；列表字段对每个元素取子路径
+DEFAULT_FIELDS: dict[str, list[str]] = {
+    "commits": [
+        "sha",
+        "commit.author.name",
+        "commit.author.email",
+        "commit.author.date",
+        "commit.message",
+        "parents.sha",
+    ],
+    "pull_requests": [
+        "number",
+        "state",
+        "body",
+        "created_at",
+        "updated_at",
+        "closed_at",
+        "merged_at",
+        "assignee.login",
+        "requested_reviewers.login",
+        "labels.name",
+    ],
+    "workflow_runs": [
+        "id",
+        "name",
+        "head_branch",
+        "event",
+        "status",
+        "conclusion",
+        "created_at",
+        "updated_at",
+        "run_started_at",
+        "run_attempt",
+    ],
+    "releases": ["id", "tag_name", "published_at"],
+}
+
+# 按读取优先级排列的文件后缀
+SUFFIXES = {"zstd": ".ndjson.zst", "gzip": ".ndjson.gz", "none": ".ndjson"}
+_LEGACY_SUFFIX = ".json"
+
+
+def storage_config() -> dict:
+    return load_config().get("module_c", {}).get("raw_storage", {})
+
+
+def fields_for(resource: str, cfg: dict | None = None) -> list[str] | None:
+    """资源的投影字段；配置为空列表或 "*" 时返回 None（保留完整对象）"""
+    cfg = storage_config() if cfg is None else cfg
+    configured = (cfg.get("fields") or {}).get(resource, DEFAULT_FIELDS.get(resource))
+    if not configured or configured == "*":
+        return None
+    return list(configured)
+
+
+def resolve_compression(name: str | None = None) -> str:
+    """auto 时优先 zstd；指定 zstd 但未安装 zstandard 时退回 gzip"""
+    name = (name or storage_config().get("compression") or "auto").lower()
+    if name in ("auto", "zstd"):
+        if zstandard is not None:
+            return "zstd"
+        if name == "zstd":
+            print("[Warn] 未安装 zstandard，原始数据改用 gzip 压缩 (pip install zstandard)")
+        return "gzip"
+    if name not in SUFFIXES:
+        raise ValueError(f"不支持的压缩格式: {name}（可选 auto / zstd / gzip / none）")
+    return name
+
+
+# =========================
+# 字段投影
+# =========================
+
+def _tree(fields: list[str]) -> dict:
+    tree: dict = {}
+    for field in fields:
+        node = tree
+        for part in field.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _project(value: Any, tree: dict) -> Any:
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_project(v, tree) for v in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: _project(value[key], sub) for key, sub in tree.items() if key in value}
+
+
+def project(record: dict, fields: list[str] | None) -> dict:
+    """按点分路径保留字段，缺失的字段不补齐；fields 为 None 时原样返回"""
+    return record if fields is None else _project(record, _tree(fields))
+
+
+def project_all(records: Iterable[dict], fields: list[str] | None) -> list[dict]:
+    if fields is None:
+        return list(records)
+    tree = _tree(fields)
+    return [_project(r, tree) for r in records]
+
+
+# =========================
+# 读写
+# =========================
+
+def _open(path: Path, mode: str):
+    """按后缀打开文本流（mode 为 "r" 或 "w"）"""
+    name = path.name
+    if name.endswith(SUFFIXES["zstd"]):
+        if zstandard is None:
+            raise RuntimeError(f"读取 {path} 需要安装 zstandard")
+        raw = open(path, mode + "b")
+        if mode == "w":
+            stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    if name.endswith(SUFFIXES["gzip"]):
+        if mode == "w":
+            # 压缩级别 6：与默认的 9 相比体积相差很小，速度快数倍
+            return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_records(records: Iterable[dict], data_dir: str | Path, name: str, compression: str | None = None) -> Path:
+    """
+    写入 <data_dir>/<name>.ndjson[.gz|.zst]（先写临时文件再替换），并删除其他格式的旧文件，
+    避免读取到过期数据
+    """
+    data_dir = Path(data_dir)
+    compression = resolve_compression(compression)
+    path = data_dir / f"{name}{SUFFIXES[compression]}"
+    tmp = data_dir / f"{name}.tmp{SUFFIXES[compression]}"
+
+    with _open(tmp, "w") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+    os.replace(tmp, path)
+
+    for suffix in (*SUFFIXES.values(), _LEGACY_SUFFIX):
+        stale = data_dir / f"{name}{suffix}"
+        if stale != path and stale.exists():
+            stale.unlink()
+    return path
+
+
+def find_records(data_dir: str | Path, name: str) -> Path | None:
+    """已存在的原始数据文件（NDJSON 优先，其次旧版 JSON）"""
+    for suffix in (*SUFFIXES.values(), _LEGACY_SUFFIX):
+        path = Path(data_dir) / f"{name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def iter_records(data_dir: str | Path, name: str) -> Iterator[dict]:
+    """逐条读取原始数据；文件不存在时抛出 FileNotFoundError"""
+    path = find_records(data_dir, name)
+    if path is None:
+        raise FileNotFoundError(f"数据文件缺失: {Path(data_dir) / name}.ndjson*")
+    if path.suffix == _LEGACY_SUFFIX:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+    with _open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_records(data_dir: str | Path, name: str) -> list[dict]:
+    return list(iter_records(data_dir, name))
@@ -1,13 +1,9 @@
 import os
-import sys
 import json
 
-scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if scripts_dir not in sys.path:
-    sys.path.insert(0, scripts_dir)
-
-from report_utils import get_repo_root, now_str, write_text
-from module_utils import write_report
+from ..config_utils import load_config
+from ..report_utils import now_str
+from ..module_utils import write_report
 
 def load_data(json_path: str) -> dict:
     if not os.path.exists(json_path):
@@ -31,6 +27,17 @@ def build_markdown(data: dict, *, figures_rel_dir: str) -> str:
 
     fig = lambda filename: f"{figures_rel_dir}/{filename}"
 
+    # CI 计时（有 ci_jobs 缓存时由 clean_git_data 写入）
+    ci_timing: list[str] = []
+    timing = data["ci_health"].get("timing")
+    if timing and timing["run_duration"]["count"]:
+        run, queue = timing["run_duration"], timing["queue"]
+        ci_timing = [
+            f"- **CI 耗时**: 运行时长 P50 {run['p50'] / 60:.1f} 分钟 / P90 {run['p90'] / 60:.1f} 分钟"
+            f"（{run['count']} 次运行），排队 P50 {queue['p50']:.0f} 秒 / P90 {queue['p90']:.0f} 秒",
+            "  - 最慢的 job：" + "、".join(f"`{j['name']}` {j['p50'] / 60:.1f} 分钟" for j in timing["slowest_jobs"][:3]),
+        ]
+
     lines: list[str] = [
         "# RocketMQ 仓库规范性评估报告 (Module C)",
         "",
@@ -67,6 +74,7 @@ def build_markdown(data: dict, *, figures_rel_dir: str) -> str:
         f"  - 统计：成功/总数 = {data['ci_health']['stats']}（已过滤 Cancelled 状态）",
         f"- **CI 配置文件**: {data['ci_health']['config_exist']:.2f} / 5.0",
         "  - 说明：检查 `.github/workflows` 目录及其内容。",
+        *ci_timing,
         "",
         "### 2.3 社区治理 (Governance)",
         f"**得分**: {data['governance']['total']} / 30.0",
@@ -84,11 +92,40 @@ def build_markdown(data: dict, *, figures_rel_dir: str) -> str:
         f"- **代码规范配置**: {data['code_quality']['style_config']:.2f} / 15.0",
         "  - 说明：检查 Checkstyle/Spotless 等代码风格检查插件的配置。",
         "",
+    ]
+
+    modules = data["code_quality"].get("modules")
+    if modules:
+        lines[-1:-1] = [
+            f"- **模块覆盖**: {modules['code_modules']} 个代码模块中，"
+            f"测试框架 {modules['test_coverage']:.0%}、代码风格插件 {modules['style_coverage']:.0%}、"
+            f"JaCoCo {modules['jacoco_coverage']:.0%}",
+            "  - 说明：逐个解析根 `pom.xml` 声明的子模块（含继承自父 POM 的插件与依赖）。",
+        ]
+
+    trend = data.get("trend") or []
+    if trend:
+        lines.extend([
+            "### 2.5 评分趋势",
+            "",
+            f"![评分趋势图]({fig('score_trend.png')})",
+            "",
+            "| 窗口起点 | 综合得分 |",
+            "| :--- | :---: |",
+        ])
+        lines.extend(f"| {t['window_start']} | {t['total_score']:.2f} |" for t in trend)
+        lines.extend([
+            "",
+            "  - 说明：按时间窗口分别计算提交、PR、CI 与发布周期得分；文件类指标取当前快照。",
+            "",
+        ])
+
+    lines.extend([
         "---",
         "",
         "## 3. 改进建议",
         "",
-    ]
+    ])
 
     suggestions: list[str] = []
     if data["version_control"]["commit_norm"] < 10:
@@ -107,11 +144,12 @@ def build_markdown(data: dict, *, figures_rel_dir: str) -> str:
     return "\n".join(lines) + "\n"
 
 def main() -> None:
-    repo_root = get_repo_root(__file__)
-    json_path = os.path.join(repo_root, "data", "module_c", "clean_scores.json")
-    report_path = os.path.join(repo_root, "data", "module_c", "REPORT.md")
+    paths = load_config()["paths"]
+    data_dir = os.path.join(paths["data"], "module_c")
+    json_path = os.path.join(data_dir, "clean_scores.json")
+    report_path = os.path.join(data_dir, "REPORT.md")
 
-    figures_rel_dir = "../../figures/module_c"
+    figures_rel_dir = os.path.relpath(os.path.join(paths["figures"], "module_c"), data_dir).replace(os.sep, "/")
 
     data = load_data(json_path)
     md = build_markdown(data, figures_rel_dir=figures_rel_dir)
@@ -0,0 +1,146 @@
+"""
+score_series.py
+
+模块 C 评分的时间序列引擎：
+- 按滑动窗口（默认按月）在一次向量化计算中得到每个窗口的各项子得分
+- 规则与 clean_git_data.calculate_scores 保持一致；文件/配置类得分为当前快照，对所有窗口相同
+- 结果按窗口持久化到共享分析库，重复运行时只重算最近一个（可能未结束的）窗口及之后的新窗口
+"""
+import pandas as pd
+
+from .clean_git_data import calculate_scores
+from .columnar import (
+    commit_table,
+    compliant_pr_mask,
+    pr_table,
+    release_table,
+    run_masks,
+    run_table,
+    valid_commit_mask,
+)
+from .. import warehouse
+
+
+SERIES_COLUMNS = [
+    "window_start", "window_end",
+    "commits", "valid_commits", "commit_norm",
+    "prs", "valid_prs", "pr_process",
+    "effective_runs", "success_runs", "run_rate", "config_exist",
+    "docs", "release_cycle",
+    "test_config", "style_config",
+    "total_score",
+]
+
+
+def to_frames(window: dict) -> dict[str, pd.DataFrame]:
+    """将 load_module_c_window 的结果转换为列式表"""
+    return {
+        "commits": commit_table(window["commits"]),
+        "prs": pr_table(window["prs"]),
+        "runs": run_table(window["runs"]),
+        "releases": release_table(window["releases"]),
+    }
+
+
+def _release_cycle_scores(releases: pd.DataFrame) -> pd.DataFrame:
+    """
+    每次发布时刻的发布周期得分：取截至该次发布的最近 10 个版本的平均间隔（与快照评分口径一致）
+    """
+    rel = releases.dropna(subset=["time"]).sort_values("time").reset_index(drop=True)
+    if rel.empty:
+        return pd.DataFrame({"time": pd.Series(dtype="datetime64[ns]"), "release_cycle": pd.Series(dtype=float)})
+
+    gaps = rel["time"].diff().dt.days
+    avg_days = gaps.rolling(9, min_periods=1).mean()
+    score = (15 - (avg_days - 90) * 0.1).clip(lower=0, upper=15)
+    score = score.where(avg_days > 90, 15.0)
+    score.iloc[0] = 10.0  # 仅有一个版本时的口径
+    return pd.DataFrame({"time": rel["time"], "release_cycle": score})
+
+
+def compute_window_scores(frames: dict[str, pd.DataFrame], files_status: dict, *, freq: str = "M") -> pd.DataFrame:
+    """
+    一次向量化计算所有窗口的子得分
+
+    Args:
+        frames: to_frames() 的结果
+        files_status: files_structure.json 的内容（文件类得分对所有窗口相同）
+        freq: pandas Period 频率，如 "M"（月）、"W"（周）、"Q"（季度）
+    """
+    commits, prs, runs = frames["commits"], frames["prs"], frames["runs"]
+
+    times = pd.concat([commits["time"], prs["time"], runs["time"]]).dropna()
+    if times.empty:
+        return pd.DataFrame(columns=SERIES_COLUMNS)
+
+    periods = pd.period_range(times.min().to_period(freq), times.max().to_period(freq), freq=freq)
+    out = pd.DataFrame(index=periods)
+
+    # 1.1 Commit 规范性：首行匹配 Conventional Commits / [ISSUE #n]
+    grouped = valid_commit_mask(commits["message"]).groupby(commits["time"].dt.to_period(freq))
+    out["commits"] = grouped.size()
+    out["valid_commits"] = grouped.sum()
+
+    # 1.2 PR 流程：描述超过 10 个字符或带有 assignee / reviewer / label
+    grouped = compliant_pr_mask(prs["body"], prs["has_meta"]).groupby(prs["time"].dt.to_period(freq))
+    out["prs"] = grouped.size()
+    out["valid_prs"] = grouped.sum()
+
+    # 2.1 CI 成功率：排除 cancelled / skipped / neutral
+    effective, success = run_masks(runs["conclusion"])
+    run_period = runs["time"].dt.to_period(freq)
+    out["effective_runs"] = effective.groupby(run_period).sum()
+    out["success_runs"] = success.groupby(run_period).sum()
+
+    out = out.fillna(0).astype(int)
+    out["commit_norm"] = (out["valid_commits"] / out["commits"].where(out["commits"] > 0) * 15).fillna(0)
+    out["pr_process"] = (out["valid_prs"] / out["prs"].where(out["prs"] > 0) * 10).fillna(0)
+    out["run_rate"] = (out["success_runs"] / out["effective_runs"].where(out["effective_runs"] > 0) * 15).fillna(0)
+
+    # 3.2 发布周期：取窗口结束时刻之前最近一次发布的滚动得分
+    out["window_start"] = out.index.start_time
+    out["window_end"] = out.index.end_time
+    cycle = _release_cycle_scores(frames["releases"])
+    out = pd.merge_asof(
+        out.sort_values("window_end"), cycle.rename(columns={"time": "window_end"}),
+        on="window_end", direction="backward",
+    )
+    out["release_cycle"] = out["release_cycle"].fillna(0)
+
+    # 文件 / 配置类得分：当前快照
+    snapshot = calculate_scores([], [], [], [], files_status, generated_at="")
+    out["config_exist"] = snapshot["ci_health"]["config_exist"]
+    out["docs"] = snapshot["governance"]["docs"]
+    out["test_config"] = snapshot["code_quality"]["test_config"]
+    out["style_config"] = snapshot["code_quality"]["style_config"]
+
+    out["total_score"] = out[
+        ["commit_norm", "pr_process", "run_rate", "config_exist", "docs", "release_cycle", "test_config", "style_config"]
+    ].sum(axis=1)
+
+    out["window_start"] = out["window_start"].dt.strftime("%Y-%m-%d")
+    out["window_end"] = out["window_end"].dt.strftime("%Y-%m-%d")
+    return out[SERIES_COLUMNS].round(2)
+
+
+def update_series(conn, repo: str, since: str, files_status: dict, *, freq: str = "M") -> pd.DataFrame:
+    """
+    增量更新某仓库的评分时间序列并返回完整序列
+
+    只加载最近一个已存窗口起点之后的 commits / PRs / runs（该窗口可能未结束，需要重算）；
+    发布周期依赖历史版本，因此 releases 始终从窗口起点 since 加载。
+    """
+    last_start = warehouse.last_score_window(conn, repo, freq)
+    start = max(since, f"{last_start}T00:00:00Z") if last_start else since
+
+    window = warehouse.load_module_c_window(conn, repo, start)
+    window["releases"] = warehouse.load_releases(conn, repo, since)
+
+    series = compute_window_scores(to_frames(window), files_status, freq=freq)
+    if last_start:
+        series = series[series["window_start"] >= last_start]
+
+    warehouse.upsert_score_windows(conn, repo, freq, series.to_dict("records"))
+    print(f"[OK] 评分时间序列已更新: {len(series)} 个窗口 (freq={freq}, 起点 {start[:10]})")
+
+    return pd.DataFrame(warehouse.load_score_windows(conn, repo, freq), columns=SERIES_COLUMNS)
@@ -1,9 +1,13 @@
 import os
 import json
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from ..config_utils import load_config
+from ..tracing import traced
+
 def setup_style():
     """配置绘图风格和中文字体"""
     plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
@@ -16,6 +20,7 @@ def load_data(json_path):
     with open(json_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+@traced()
 def plot_radar(data, save_path):
     """绘制雷达图展示四大维度得分占比"""
 
@@ -55,6 +60,7 @@ def plot_radar(data, save_path):
     plt.close()
     print(f"[OK] 雷达图已保存: {save_path}")
 
+@traced()
 def plot_breakdown(data, save_path):
     """绘制详细指标得分条形图"""
 
@@ -125,11 +131,41 @@ def plot_breakdown(data, save_path):
     plt.close()
     print(f"[OK] 细分指标图已保存: {save_path}")
 
-import os
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
-from config_utils import load_config
+@traced()
+def plot_score_trend(csv_path, save_path):
+    """评分时间序列：综合得分与四个维度得分随窗口的变化"""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    if df.empty:
+        print("[Warn] 评分时间序列为空，跳过趋势图")
+        return
+
+    x = pd.to_datetime(df['window_start'])
+    dims = {
+        '版本控制': df['commit_norm'] + df['pr_process'],
+        '持续集成': df['run_rate'] + df['config_exist'],
+        '社区治理': df['docs'] + df['release_cycle'],
+        '代码质量': df['test_config'] + df['style_config'],
+    }
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.plot(x, df['total_score'], color='#1f77b4', linewidth=2.5, marker='o', label='综合得分')
+    for name, values in dims.items():
+        ax.plot(x, values, linewidth=1.2, alpha=0.8, label=name)
+
+    ax.set_ylim(0, 100)
+    ax.set_xlabel('窗口起点', fontsize=12)
+    ax.set_ylabel('得分', fontsize=12)
+    ax.set_title('评分时间序列', fontsize=15)
+    ax.grid(True, linestyle='--', alpha=0.5)
+    ax.legend(loc='upper left', ncol=5, fontsize=9)
+    fig.autofmt_xdate()
+
+    plt.tight_layout()
+    plt.savefig(save_path, dpi=300)
+    plt.close()
+    print(f"[OK] 评分趋势图已保存: {save_path}")
 
 CONFIG = load_config()
 
@@ -150,6 +186,9 @@ def main():
         data = load_data(str(data_path))
         plot_radar(data, os.path.join(fig_dir, "radar_chart.png"))
         plot_breakdown(data, os.path.join(fig_dir, "breakdown_chart.png"))
+        series_path = data_dir / "score_series.csv"
+        if series_path.exists():
+            plot_score_trend(str(series_path), os.path.join(fig_dir, "score_trend.png"))
     except Exception as e:
         print(f"[Error] 可视化失败: {str(e)}")
 
@@ -0,0 +1 @@
+"""模块 D：统一入口、交付物收集与 LLM 报告"""
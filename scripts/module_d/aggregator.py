@@ -10,7 +10,7 @@ aggregator.py
 from pathlib import Path
 from typing import Dict, List
 from datetime import datetime
-from utils import DATA_DIR, PROJECT_ROOT
+from .utils import DATA_DIR, PROJECT_ROOT
 
 
 # =========================
@@ -20,6 +20,13 @@ from utils import DATA_DIR, PROJECT_ROOT
 AGGREGATED_REPORT_PATH = DATA_DIR / "module_d/AGGREGATED_REPORT.md"
 
 
+MODULE_TITLES = {
+    "module_a": "Module A – Code Quality & Risk",
+    "module_b": "Module B – Development Efficiency & Rhythm",
+    "module_c": "Module C – Governance & Engineering Practice",
+}
+
+
 # =========================
 # 核心函数
 # =========================
@@ -50,6 +57,29 @@ def generate_aggregated_report(collected: Dict[str, dict]) -> Path:
     return AGGREGATED_REPORT_PATH
 
 
+def split_sections(report_text: str) -> Dict[str, str]:
+    """
+    将 AGGREGATED_REPORT.md 按模块拆分
+
+    只识别 MODULE_TITLES 对应的二级标题，模块原始报告内部的标题不会被误拆。
+
+    Returns:
+        {"overview": 报告头与执行概览, "module_a": ..., "module_b": ..., "module_c": ...}
+    """
+    headings = {f"## {title}": name for name, title in MODULE_TITLES.items()}
+    sections: Dict[str, List[str]] = {"overview": []}
+    current = "overview"
+
+    for line in report_text.splitlines(keepends=True):
+        name = headings.get(line.rstrip())
+        if name:
+            current = name
+            sections[current] = []
+        sections[current].append(line)
+
+    return {name: "".join(lines) for name, lines in sections.items()}
+
+
 # =========================
 # 写作函数
 # =========================
@@ -92,13 +122,7 @@ def _write_module_section(f, module_name: str, info: dict):
     """
     写单个模块的完整证据区块
     """
-    title_map = {
-        "module_a": "Module A – Code Quality & Risk",
-        "module_b": "Module B – Development Efficiency & Rhythm",
-        "module_c": "Module C – Governance & Engineering Practice",
-    }
-
-    f.write(f"## {title_map.get(module_name, module_name)}\n\n")
+    f.write(f"## {MODULE_TITLES.get(module_name, module_name)}\n\n")
 
     # 状态块（固定结构）
     f.write("### Status\n\n")
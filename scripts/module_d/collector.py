@@ -9,7 +9,7 @@ collector.py
 
 from pathlib import Path
 from typing import Dict, List
-from utils import DATA_DIR, FIGURES_DIR
+from .utils import DATA_DIR, FIGURES_DIR
 
 
 # =========================
@@ -0,0 +1,211 @@
+"""
+evidence.py
+
+职责：
+- 从模块 A / B / C 的结构化输出（CSV / JSON）直接计算关键指标
+- 生成紧凑、去重的 EVIDENCE_BUNDLE.json：指标、判定阈值、图表引用与模块状态
+- 与 AGGREGATED_REPORT.md 记录同一批事实，但不含 Markdown 排版，
+  作为 LLM 输入时占用的 token 远少于拼接的 REPORT.md 原文
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+from .utils import DATA_DIR, PROJECT_ROOT
+from ..lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+
+# =========================
+# 路径与阈值约定
+# =========================
+
+EVIDENCE_BUNDLE_PATH = DATA_DIR / "module_d/EVIDENCE_BUNDLE.json"
+
+# 与模块 A lizard_scanner / report_generator 的判定口径一致
+MODULE_A_THRESHOLDS = {"ccn": 15, "nloc": 80, "param": 5}
+
+# 与模块 B report_generator 的加班口径一致：工作日核心时段 [10:00, 19:00)
+MODULE_B_THRESHOLDS = {"core_hours_start": 10, "core_hours_end": 19, "timezone": "Asia/Shanghai"}
+
+# 模块 C 各子项满分
+MODULE_C_MAX_POINTS = {
+    "version_control": {"total": 25, "commit_norm": 15, "pr_process": 10},
+    "ci_health": {"total": 20, "run_rate": 15, "config_exist": 5},
+    "governance": {"total": 30, "docs": 15, "release_cycle": 15},
+    "code_quality": {"total": 25, "test_config": 10, "style_config": 15},
+}
+
+
+# =========================
+# 核心函数
+# =========================
+
+def build_evidence_bundle(collected: Dict[str, dict]) -> dict:
+    """
+    根据 collector 的输出与各模块的结构化数据构建证据包
+
+    单个模块的数据缺失或解析失败时记录在该模块的 issues 中，不影响其他模块。
+    """
+    builders = {
+        "module_a": _module_a_metrics,
+        "module_b": _module_b_metrics,
+        "module_c": _module_c_metrics,
+    }
+
+    modules = {}
+    for name, builder in builders.items():
+        info = collected.get(name, {})
+        issues = list(info.get("issues", []))
+        try:
+            metrics = builder(DATA_DIR / name)
+        except Exception as e:
+            metrics = None
+            issues.append(f"structured data unavailable: {e}")
+
+        modules[name] = {
+            "status": {"executed": info.get("executed"), "success": info.get("success")},
+            "issues": issues,
+            "metrics": metrics,
+            "figures": [_rel(fig) for fig in info.get("figures", [])],
+        }
+
+    return {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "thresholds": {
+            "module_a": MODULE_A_THRESHOLDS,
+            "module_b": MODULE_B_THRESHOLDS,
+            "module_c_max_points": MODULE_C_MAX_POINTS,
+        },
+        "modules": modules,
+    }
+
+
+def write_evidence_bundle(collected: Dict[str, dict]) -> Path:
+    """生成 EVIDENCE_BUNDLE.json 并返回其路径"""
+    bundle = build_evidence_bundle(collected)
+    EVIDENCE_BUNDLE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EVIDENCE_BUNDLE_PATH.write_text(json.dumps(bundle, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print("\n[Module D] Evidence bundle generated at:")
+    print(f"  {EVIDENCE_BUNDLE_PATH}")
+    return EVIDENCE_BUNDLE_PATH
+
+
+def to_llm_payload(bundle: dict) -> str:
+    """LLM 输入用的紧凑表示：去掉生成时间与缩进"""
+    payload = {k: v for k, v in bundle.items() if k != "generated_at"}
+    return (
+        "以下为结构化证据包（JSON），字段含义：thresholds 为各指标的判定阈值 / 满分，"
+        "modules.<模块>.metrics 为指标值，figures 为图表路径。\n\n"
+        "```json\n" + json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n```\n"
+    )
+
+
+# =========================
+# 各模块指标
+# =========================
+
+def _module_a_metrics(data_dir: Path) -> dict:
+    df_files = pd.read_csv(data_dir / "python_files.csv")
+    df_bandit = pd.read_csv(data_dir / "bandit_results.csv")
+    df_lizard = pd.read_csv(data_dir / "lizard_results.csv")
+
+    t = MODULE_A_THRESHOLDS
+    high_ccn = df_lizard["ccn"] > t["ccn"] if not df_lizard.empty else pd.Series(dtype=bool)
+
+    per_repo = {}
+    if "repository" in df_files.columns:
+        files = df_files.groupby("repository").size()
+        issues = df_bandit.groupby("repository").size() if not df_bandit.empty else pd.Series(dtype=int)
+        funcs = df_lizard.groupby("repository").size() if not df_lizard.empty else pd.Series(dtype=int)
+        for repo in files.index:
+            per_repo[str(repo).split("/")[-1]] = {
+                "files": int(files.get(repo, 0)),
+                "issues": int(issues.get(repo, 0)),
+                "functions": int(funcs.get(repo, 0)),
+            }
+
+    return {
+        "python_files": int(len(df_files)),
+        "bandit": {
+            "issues": int(len(df_bandit)),
+            "by_severity": _counts(df_bandit, "severity"),
+            "by_confidence": _counts(df_bandit, "confidence"),
+            "top_issue_types": _counts(df_bandit, "issue_name", top=5),
+        },
+        "lizard": {
+            "functions": int(len(df_lizard)),
+            "high_complexity": int(high_ccn.sum()),
+            "too_long": int((df_lizard["nloc"] > t["nloc"]).sum()) if not df_lizard.empty else 0,
+            "too_many_params": int((df_lizard["param"] > t["param"]).sum()) if not df_lizard.empty else 0,
+            "avg_ccn": _round(df_lizard["ccn"].mean()) if not df_lizard.empty else 0.0,
+            "avg_nloc": _round(df_lizard["nloc"].mean()) if not df_lizard.empty else 0.0,
+            "max_ccn": int(df_lizard["ccn"].max()) if not df_lizard.empty else 0,
+        },
+        "per_repository": per_repo,
+    }
+
+
+def _module_b_metrics(data_dir: Path) -> dict:
+    from ..module_b.report_generator import load_data
+
+    df = load_data(str(data_dir / "clean_commits.csv"))
+    if df.empty:
+        return {"commits": 0}
+
+    total = int(len(df))
+    workday = df[df["is_workday"]]
+    core = (workday["hour"] >= MODULE_B_THRESHOLDS["core_hours_start"]) & (
+        workday["hour"] < MODULE_B_THRESHOLDS["core_hours_end"]
+    )
+    authors = df["name"].dropna().astype(str).str.strip()
+    authors = authors[authors != ""]
+
+    return {
+        "commits": total,
+        "authors": int(authors.nunique()),
+        "time_range": [df["time"].min().isoformat(), df["time"].max().isoformat()],
+        "holiday_or_weekend_pct": _pct((~df["is_workday"]).sum(), total),
+        "overtime_pct": _pct(df["is_overtime"].sum(), total),
+        "workday_off_core_hours_pct": _pct((~core).sum(), len(workday)),
+        "top_hours": {int(h): int(c) for h, c in df["hour"].value_counts().head(5).items()},
+        "top_authors": {str(a): int(c) for a, c in authors.value_counts().head(10).items()},
+    }
+
+
+def _module_c_metrics(data_dir: Path) -> dict:
+    scores = json.loads((data_dir / "clean_scores.json").read_text(encoding="utf-8"))
+    scores.pop("generated_at", None)
+    return scores
+
+
+# =========================
+# 辅助函数
+# =========================
+
+def _counts(df: "pd.DataFrame", column: str, top: int | None = None) -> Dict[str, int]:
+    if df.empty or column not in df.columns:
+        return {}
+    counts = df[column].value_counts()
+    if top:
+        counts = counts.head(top)
+    return {str(k): int(v) for k, v in counts.items()}
+
+
+def _pct(numerator, denominator) -> float:
+    return round(float(numerator) / denominator * 100, 1) if denominator else 0.0
+
+
+def _round(value) -> float:
+    return round(float(value), 2)
+
+
+def _rel(path: str) -> str:
+    try:
+        return Path(path).relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
@@ -0,0 +1,378 @@
+"""
+fleet.py
+
+多仓库（fleet）模式：
+- 从 config.yaml 的 fleet.repositories 读取待分析仓库列表
+- 按 fleet.workers 并发度把仓库分发到工作槽，每个仓库在独立子进程中依次运行模块 B / C
+- fleet.executor 为 "subprocess"（默认）时每个模块各起一个 python -m 子进程；
+  为 "spawn" 时使用 spawn 方式的进程池，每个仓库一个工作进程，模块 B / C 在其中按包名导入运行；
+  为 "asyncio" 时先在调度进程的一个事件循环中并发采集所有仓库的 B / C 数据（共享一个异步客户端），
+  再以跳过拉取的方式按 subprocess 方式运行其余步骤
+- 各仓库输出隔离在 data/fleet/<owner>__<name>/ 与 figures/fleet/<owner>__<name>/
+- 所有子进程共享同一个 GitHub API 配额（记录在分析库文件中，不受 warehouse.enabled 影响）
+- 汇总生成 FLEET_REPORT.md 对比各仓库得分
+"""
+
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from .utils import CONFIG, DATA_DIR, PROJECT_ROOT
+from .. import warehouse
+from ..config_utils import load_repo_config
+from ..module_utils import SKIP_FETCH_ENV
+from .. import tracing
+from ..tracing import span
+
+
+# =========================
+# 路径约定
+# =========================
+
+# 顶层包名（源码检出中为 scripts，安装后为 rocketmq_analysis）
+PACKAGE = __package__.rpartition(".")[0]
+
+FLEET_MODULES = [
+    ("module_b", f"{PACKAGE}.module_b.main"),
+    ("module_c", f"{PACKAGE}.module_c.main"),
+]
+
+FLEET_REPORT_PATH = DATA_DIR / "module_d/FLEET_REPORT.md"
+
+
+# =========================
+# 核心函数
+# =========================
+
+def load_fleet_repos() -> List[dict]:
+    """
+    读取 fleet.repositories，未配置时回退到 project 主仓库
+    """
+    repos = CONFIG.get("fleet", {}).get("repositories") or []
+    if not repos:
+        project = CONFIG.get("project", {})
+        repos = [{"owner": project.get("repo_owner", "apache"), "name": project.get("repo_name", "rocketmq")}]
+    return [r for r in repos if r.get("owner") and r.get("name")]
+
+
+def namespace_of(repo: dict) -> str:
+    """仓库对应的输出命名空间"""
+    return f"{repo['owner']}__{repo['name']}"
+
+
+def run_fleet(workers: int | None = None) -> Dict[str, dict]:
+    """
+    并发运行所有仓库的 B / C 流水线并生成对比报告
+
+    Returns:
+        {
+            "apache/rocketmq": {
+                "success": True,
+                "duration_sec": 42.1,
+                "modules": {"module_b": 0, "module_c": 0},
+                "log_path": ".../pipeline.log"
+            },
+            ...
+        }
+    """
+    fleet_cfg = CONFIG.get("fleet", {})
+    repos = load_fleet_repos()
+    workers = max(1, workers or int(fleet_cfg.get("workers", os.cpu_count() or 4)))
+
+    budget_key = None
+    if fleet_cfg.get("api_budget"):
+        # 配额需要跨进程共享，始终记录在分析库文件中（与 warehouse.enabled 无关）
+        budget_key = f"fleet-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        if not warehouse.is_enabled():
+            print(f"[Info] warehouse.enabled 为 false，fleet.api_budget 仍使用 {warehouse.default_path()} 记录共享配额")
+        conn = warehouse.connect()
+        warehouse.set_api_budget(conn, budget_key, int(fleet_cfg["api_budget"]))
+        conn.close()
+
+    print("=" * 60)
+    print(f"[Module D] Fleet mode: {len(repos)} repositories, {workers} workers")
+    if budget_key:
+        print(f"[Module D] Shared GitHub API budget: {fleet_cfg['api_budget']} requests ({budget_key})")
+    print("=" * 60)
+
+    results: Dict[str, dict] = {}
+    start_time = time.time()
+    executor = fleet_cfg.get("executor", "subprocess")
+
+    if executor == "asyncio":
+        # 采集失败的仓库不再运行后续步骤
+        for key, error in _prefetch(repos, budget_key).items():
+            if error:
+                results[key] = {"success": False, "duration_sec": 0, "modules": {"prefetch": -1}, "error": error}
+                print(f"[Module D] {key}: FAILED (prefetch: {error})")
+        repos_to_run = [r for r in repos if f"{r['owner']}/{r['name']}" not in results]
+    else:
+        repos_to_run = repos
+
+    if executor == "spawn":
+        # 每个工作进程只处理一个仓库：配置在导入时按仓库环境变量解析，不能跨仓库复用
+        if sys.version_info >= (3, 11):
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=1,
+            )
+            run_repo = _run_repo_in_worker
+        else:
+            # Python 3.10 的 ProcessPoolExecutor 不支持 max_tasks_per_child：每个仓库单独起一个单进程池
+            pool = ThreadPoolExecutor(max_workers=workers)
+            run_repo = _run_repo_in_fresh_worker
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        run_repo = _run_repo
+
+    with pool:
+        futures = {
+            pool.submit(run_repo, repo, budget_key, skip_fetch=executor == "asyncio"): repo
+            for repo in repos_to_run
+        }
+        for future in as_completed(futures):
+            repo = futures[future]
+            key = f"{repo['owner']}/{repo['name']}"
+            results[key] = future.result()
+            status = "SUCCESS" if results[key]["success"] else "FAILED"
+            print(f"[Module D] {key}: {status} ({results[key]['duration_sec']}s)")
+
+    elapsed = time.time() - start_time
+    print(f"\n[Module D] Fleet finished in {elapsed:.1f}s "
+          f"({len(repos) / elapsed * 60 if elapsed else 0:.1f} repos/min)")
+
+    if budget_key:
+        conn = warehouse.connect()
+        usage = warehouse.api_budget_usage(conn, budget_key)
+        conn.close()
+        print(f"[Module D] API budget used: {usage['total'] - usage['remaining']} / {usage['total']}")
+
+    generate_fleet_report(repos, results)
+    return results
+
+
+def generate_fleet_report(repos: List[dict], results: Dict[str, dict]) -> Path:
+    """
+    生成多仓库对比报告
+    """
+    conn = warehouse.open_if_enabled()
+
+    rows = []
+    for repo in repos:
+        key = f"{repo['owner']}/{repo['name']}"
+        info = results.get(key, {})
+        scores = _load_scores(repo)
+        commits = warehouse.commit_count(conn, key) if conn is not None else None
+        rows.append((key, info, scores, commits))
+
+    if conn is not None:
+        conn.close()
+
+    # 按综合得分降序，缺失得分的仓库排在最后
+    rows.sort(key=lambda r: -(r[2] or {}).get("total_score", -1))
+
+    FLEET_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with FLEET_REPORT_PATH.open("w", encoding="utf-8") as f:
+        f.write("# Fleet Comparison Report\n\n")
+        f.write(f"生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write("| 仓库 | 状态 | 耗时 (s) | 提交数 | 综合得分 | 版本控制 | 持续集成 | 社区治理 | 代码质量 |\n")
+        f.write("|------|------|----------|--------|----------|----------|----------|----------|----------|\n")
+
+        for key, info, scores, commits in rows:
+            status = "SUCCESS" if info.get("success") else "FAILED"
+            if scores:
+                cells = [
+                    scores.get("total_score"),
+                    scores["version_control"]["total"],
+                    scores["ci_health"]["total"],
+                    scores["governance"]["total"],
+                    scores["code_quality"]["total"],
+                ]
+            else:
+                cells = ["-"] * 5
+            f.write(
+                f"| {key} | {status} | {info.get('duration_sec', '-')} | "
+                f"{commits if commits is not None else '-'} | "
+                + " | ".join(str(c) for c in cells)
+                + " |\n"
+            )
+
+        f.write("\n各仓库的完整报告位于 `data/fleet/<owner>__<name>/module_x/REPORT.md`。\n")
+
+    print("\n[Module D] Fleet report generated at:")
+    print(f"  {FLEET_REPORT_PATH}")
+    return FLEET_REPORT_PATH
+
+
+# =========================
+# 辅助函数
+# =========================
+
+def _prefetch(repos: List[dict], budget_key: str | None) -> Dict[str, str | None]:
+    """
+    asyncio 执行方式的采集阶段：所有仓库的 B / C 采集在同一个事件循环中并发执行，
+    共享一个 AsyncGitHub 客户端（同一个并发信号量与连接池）
+
+    Returns:
+        {"apache/rocketmq": None, "apache/other": "HTTPError: ..."}，值为采集失败的原因
+    """
+    from ..github_async import AsyncGitHub
+    from ..module_b import get_git_data as module_b_fetch
+    from ..module_c import get_git_data as module_c_fetch
+    from ..module_utils import github_headers, load_github_token
+
+    headers = github_headers(load_github_token(missing_hint="请在scripts/.env填写GITHUB_TOKEN"))
+
+    async def fetch_repo(gh: AsyncGitHub, repo: dict) -> None:
+        namespace = namespace_of(repo)
+        config = load_repo_config(repo["owner"], repo["name"], namespace)
+        jobs = [module_c_fetch.fetch(gh, config)]
+        if module_b_fetch.needs_crawl(config):
+            jobs.append(module_b_fetch.crawl(gh, config))
+        with span(f"{namespace}/prefetch"):
+            await asyncio.gather(*jobs)
+
+    async def run() -> Dict[str, str | None]:
+        async with AsyncGitHub(headers, budget_key=budget_key) as gh:
+            print(f"[Module D] Prefetching {len(repos)} repositories "
+                  f"(concurrency {gh.concurrency}, {gh.transport_name})")
+            start = time.time()
+            outcomes = await asyncio.gather(*(fetch_repo(gh, r) for r in repos), return_exceptions=True)
+            print(f"[Module D] Prefetch finished in {time.time() - start:.1f}s ({gh.requests} requests)")
+
+        return {
+            f"{repo['owner']}/{repo['name']}": (
+                f"{type(outcome).__name__}: {outcome}" if isinstance(outcome, BaseException) else None
+            )
+            for repo, outcome in zip(repos, outcomes)
+        }
+
+    with span("fleet/prefetch", repos=len(repos)):
+        return asyncio.run(run())
+
+
+def _run_repo(repo: dict, budget_key: str | None, skip_fetch: bool = False) -> dict:
+    """
+    在独立子进程中依次运行单个仓库的 B / C 流水线，输出写入命名空间下的日志
+
+    skip_fetch 为 True 时数据已预先采集，子进程跳过拉取步骤
+    """
+    namespace = namespace_of(repo)
+    log_path = _log_path(namespace)
+
+    env = dict(os.environ)
+    env.update(_repo_env(repo, budget_key))
+    env["PYTHONIOENCODING"] = "utf-8"
+    if skip_fetch:
+        env[SKIP_FETCH_ENV] = "1"
+
+    start_time = time.time()
+    exit_codes = {}
+    with log_path.open("w", encoding="utf-8") as log:
+        for name, entry in FLEET_MODULES:
+            try:
+                with span(f"{namespace}/{name}"):
+                    proc = subprocess.run(
+                        [sys.executable, "-m", entry],
+                        stdout=log,
+                        stderr=subprocess.STDOUT,
+                        env=env,
+                        cwd=PROJECT_ROOT,
+                    )
+                exit_codes[name] = proc.returncode
+            except Exception as e:
+                log.write(f"[ERROR] Failed to execute {name}: {e}\n")
+                exit_codes[name] = -1
+
+    return {
+        "success": all(code == 0 for code in exit_codes.values()),
+        "duration_sec": round(time.time() - start_time, 2),
+        "modules": exit_codes,
+        "log_path": str(log_path),
+    }
+
+
+def _run_repo_in_worker(repo: dict, budget_key: str | None, skip_fetch: bool = False) -> dict:
+    """
+    spawn 进程池的任务：设置仓库环境变量后在本进程内依次运行 B / C 的 main()
+
+    必须是模块顶层函数，spawn 的工作进程按包名重新导入本模块后才能找到它
+    """
+    from .runner import run_in_process
+
+    namespace = namespace_of(repo)
+    log_path = _log_path(namespace)
+    os.environ.update(_repo_env(repo, budget_key))
+    if skip_fetch:
+        os.environ[SKIP_FETCH_ENV] = "1"
+
+    start_time = time.time()
+    exit_codes = {}
+    with log_path.open("w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        for name, entry in FLEET_MODULES:
+            try:
+                with span(f"{namespace}/{name}"):
+                    exit_codes[name] = run_in_process(entry)
+            except Exception as e:
+                log.write(f"[ERROR] Failed to execute {name}: {e}\n")
+                exit_codes[name] = -1
+
+    # 进程池的工作进程退出时不执行 atexit，追踪区间需要主动写出
+    tracing.flush()
+
+    return {
+        "success": all(code == 0 for code in exit_codes.values()),
+        "duration_sec": round(time.time() - start_time, 2),
+        "modules": exit_codes,
+        "log_path": str(log_path),
+    }
+
+
+def _run_repo_in_fresh_worker(repo: dict, budget_key: str | None, skip_fetch: bool = False) -> dict:
+    """在新建的单进程 spawn 进程池中运行 _run_repo_in_worker（Python 3.10 下代替 max_tasks_per_child=1）"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_repo_in_worker, repo, budget_key, skip_fetch=skip_fetch).result()
+
+
+def _repo_env(repo: dict, budget_key: str | None) -> Dict[str, str]:
+    """指定目标仓库与输出命名空间的环境变量"""
+    env = {
+        "RMQ_REPO_OWNER": repo["owner"],
+        "RMQ_REPO_NAME": repo["name"],
+        "RMQ_FLEET_NAMESPACE": namespace_of(repo),
+    }
+    if budget_key:
+        env["GITHUB_API_BUDGET_KEY"] = budget_key
+    return env
+
+
+def _log_path(namespace: str) -> Path:
+    log_dir = DATA_DIR / "fleet" / namespace
+    log_dir.mkdir(parents=True, exist_ok=True)
+    return log_dir / "pipeline.log"
+
+
+def _load_scores(repo: dict) -> dict | None:
+    """
+    读取某仓库命名空间下模块 C 的评分结果
+    """
+    path = DATA_DIR / "fleet" / namespace_of(repo) / "module_c" / "clean_scores.json"
+    if not path.exists():
+        return None
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    run_fleet()
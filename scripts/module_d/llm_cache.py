@@ -0,0 +1,89 @@
+"""
+llm_cache.py
+
+LLM 响应的内容寻址缓存：
+- 以 (model, temperature, messages) 的 sha256 作为键，输入不变即命中
+- 计算键时忽略各报告中的"生成时间"行，证据不变的重复运行同样命中
+- 每个条目存为 data/module_d/llm_cache/<key>.json，记录创建时间与 token 用量
+- 超过 TTL 的条目视为未命中，并在每次运行开始时清理
+"""
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+from .utils import DATA_DIR, setup_logging
+
+logger = setup_logging()
+
+CACHE_DIR = DATA_DIR / "module_d" / "llm_cache"
+
+# 每次运行都会变化、但不影响证据内容的行
+_VOLATILE_LINE = re.compile(r"^.*生成时间[:：].*$", re.MULTILINE)
+
+
+def cache_key(model: str, temperature: float, messages: list) -> str:
+    """请求内容的 sha256"""
+    normalized = [
+        {**m, "content": _VOLATILE_LINE.sub("", m.get("content") or "")} for m in messages
+    ]
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": normalized},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get(key: str, ttl_hours: float, cache_dir: Path = CACHE_DIR) -> Optional[dict]:
+    """
+    读取未过期的缓存条目
+
+    Returns:
+        {"text": ..., "usage": {...}, "created_at": ...}，未命中返回 None
+    """
+    path = Path(cache_dir) / f"{key}.json"
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logger.info(f"[cache] miss {key[:12]}")
+        return None
+
+    age_hours = (time.time() - entry.get("created_at", 0)) / 3600
+    if ttl_hours and age_hours > ttl_hours:
+        logger.info(f"[cache] expired {key[:12]} ({age_hours:.1f}h > {ttl_hours}h)")
+        return None
+
+    logger.info(f"[cache] hit {key[:12]} ({age_hours:.1f}h old, saved {entry.get('usage', {})})")
+    return entry
+
+
+def put(key: str, text: str, usage: Optional[dict] = None, cache_dir: Path = CACHE_DIR) -> None:
+    """写入缓存条目（先写临时文件再替换，避免并发读到半个文件）"""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    entry = {"created_at": time.time(), "usage": usage or {}, "text": text}
+
+    tmp = cache_dir / f"{key}.json.tmp"
+    tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(cache_dir / f"{key}.json")
+
+
+def evict_expired(ttl_hours: float, cache_dir: Path = CACHE_DIR) -> int:
+    """删除过期条目，返回删除数量"""
+    cache_dir = Path(cache_dir)
+    if not ttl_hours or not cache_dir.exists():
+        return 0
+
+    removed = 0
+    cutoff = time.time() - ttl_hours * 3600
+    for path in cache_dir.glob("*.json"):
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+            removed += 1
+    if removed:
+        logger.info(f"[cache] evicted {removed} expired entries")
+    return removed
@@ -1,73 +1,513 @@
-import openai
-import os
-from utils import get_env, PROJECT_ROOT, setup_logging, CONFIG
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .aggregator import MODULE_TITLES, split_sections
+from . import llm_cache
+from . import llm_recorder
+from . import token_budget
+from .utils import get_env, setup_logging, CONFIG
+from ..lazy_imports import lazy_import
+from ..tracing import span
+
+# openai 导入耗时较长，首次创建客户端或处理其异常时才真正导入
+openai = lazy_import("openai")
 
 logger = setup_logging()
 
-def call_llm(content):
-    # 1. 获取配置
-    api_key = get_env("LLM_API_KEY") or get_env("OPENAI_API_KEY")
-    
-    # 优先从 Config 读取
-    llm_cfg = CONFIG.get('module_d', {}).get('llm', {})
-    
-    base_url = llm_cfg.get('base_url')
-    model = llm_cfg.get('model', "gpt-4-turbo")
-
-    if not api_key:
-        logger.error("未找到 LLM_API_KEY / OPENAI_API_KEY，请检查 .env 文件")
-        return "错误：未配置 API Key，无法生成 AI 洞察。"
-
-    # 2. 初始化客户端 (设置超时时间)
-    client = openai.OpenAI(
-        api_key=api_key, 
-        base_url=base_url,
-        timeout=120.0  # 增加超时时间到 2 分钟
-    )
-    
-    # 3. 读取提示词文件并增加安全检查
-    prompt_dir = PROJECT_ROOT / "scripts" / "module_d" / "prompts"
-    system_file = prompt_dir / "system.md"
-    user_file = prompt_dir / "user_template.md"
+PROMPT_DIR = Path(__file__).parent / "prompts"
 
-    if not system_file.exists() or not user_file.exists():
-        logger.error(f"提示词文件不存在: {prompt_dir}")
-        return "错误：提示词模板文件缺失。"
+# 各提示词模板及其必需的占位符
+PROMPT_PLACEHOLDERS = {
+    "system": [],
+    "user_template": ["{aggregated_content}"],
+    "section_summary": ["{module_title}", "{section_content}"],
+}
 
-    system_prompt = system_file.read_text(encoding="utf-8")
-    user_tmpl = user_file.read_text(encoding="utf-8")
+# 降低随机性，保证报告严谨
+TEMPERATURE = 0.2
 
-    # 4. 安全替换内容 (避免 .format() 因为内容中的 {} 报错)
-    if "{aggregated_content}" not in user_tmpl:
-        logger.error("用户提示词模板中缺少 {aggregated_content} 占位符")
-        return "错误：用户提示词模板格式错误，缺少 {aggregated_content} 占位符。"
+# 可重试的瞬时错误：网络 / 超时、限流、服务端 5xx（为 None 时使用 openai 的对应异常）
+TRANSIENT_ERRORS: tuple | None = None
 
-    # 使用 replace 替代 format 更加安全
-    user_content = user_tmpl.replace("{aggregated_content}", content)
+# 续写请求使用的提示：要求模型从中断处接着输出
+RESUME_PROMPT = "上一次输出因连接中断而停止。请从中断处直接继续输出，不要重复已输出的内容，也不要添加任何说明。"
+PARTIAL_NOTICE = "\n\n> ⚠️ 连接中断，以上为已生成的部分内容。\n"
 
-    # 5. Token 长度简单预估 (字符数，非精确 token)
-    if len(user_content) > 40000: # 粗略估计
-        logger.warning("报告内容过长，可能触发模型上下文限制，正在截断...")
-        user_content = user_content[:40000] + "\n\n(内容因过长被截断...)"
 
-    try:
-        logger.info(f"正在发送请求至模型: {model}...")
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
-            temperature=0.2, # 降低随机性，保证报告严谨
-            stream=False
+class LLMConfigError(Exception):
+    """API Key 或提示词模板配置错误，重试无法恢复"""
+
+
+class LLMClient:
+    """
+    可复用的大模型客户端
+
+    - 构造时读取一次配置与 API Key，创建一个长期存活的 openai.OpenAI（复用其连接池）
+    - 提示词模板只加载并校验一次
+    - 瞬时错误按指数退避重试（SDK 自带重试关闭，统一由这里控制并计入指标）
+    - 每次调用记录耗时、重试次数、token 用量与是否命中缓存，见 self.metrics
+    - replay.mode 为 record 时录制每次真实调用；为 replay 时不访问网络，只返回录制的响应
+    """
+
+    def __init__(self, llm_cfg: dict | None = None, prompt_dir: Path = PROMPT_DIR):
+        self.cfg = llm_cfg if llm_cfg is not None else CONFIG.get('module_d', {}).get('llm', {})
+        self.model = self.cfg.get('model', "gpt-4-turbo")
+        self.stream = self.cfg.get('stream', True)
+        self.retries = int(self.cfg.get('retries', 3))
+        self.backoff = float(self.cfg.get('backoff_seconds', 2.0))
+        self.max_backoff = float(self.cfg.get('max_backoff_seconds', 30.0))
+
+        cache_cfg = self.cfg.get('cache', {})
+        self.cache_enabled = cache_cfg.get('enabled', True)
+        self.ttl_hours = float(cache_cfg.get('ttl_hours', 168))
+
+        replay_cfg = self.cfg.get('replay', {})
+        self.replay_mode = replay_cfg.get('mode', "off")
+        self.recordings = llm_recorder.recordings_dir(replay_cfg)
+
+        self.metrics: list[dict] = []
+        self._lock = threading.Lock()
+
+        self.prompts = load_prompts(prompt_dir)
+
+        if self.cache_enabled:
+            llm_cache.evict_expired(self.ttl_hours)
+
+        self.client = None
+        if self.replay_mode == "replay":
+            logger.info(f"LLM 回放模式：只使用 {self.recordings} 中录制的响应")
+            return
+
+        api_key = get_env("LLM_API_KEY") or get_env("OPENAI_API_KEY")
+        if not api_key:
+            raise LLMConfigError("未找到 LLM_API_KEY / OPENAI_API_KEY，请检查 .env 文件")
+
+        # 流式模式下超时针对两次数据到达之间的间隔
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            base_url=self.cfg.get('base_url'),
+            timeout=float(self.cfg.get('timeout', 120.0)),
+            max_retries=0,
         )
-        return response.choices[0].message.content
+
+    # ---------- 单次调用 ----------
+
+    def complete(self, messages: list[dict], *, label: str = "complete") -> tuple[str, dict]:
+        """非流式调用，返回 (文本, usage)；命中缓存或回放时 usage 为空"""
+        key = self._request_key(messages)
+        entry = self._lookup(key)
+        if entry:
+            self._record(label, 0.0, 0, {}, cached=True)
+            return entry["text"], {}
+
+        start = time.perf_counter()
+        try:
+            with span(f"llm.{label}", model=self.model):
+                response, attempts = self._with_retries(lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=TEMPERATURE,
+                    stream=False
+                ))
+        except Exception as e:
+            self._record(label, time.perf_counter() - start, getattr(e, "attempts", 1), {}, error=str(e))
+            raise
+        text, usage = response.choices[0].message.content, _usage_of(response)
+        self._record(label, time.perf_counter() - start, attempts, usage)
+
+        self._store(key, messages, text, usage)
+        return text, usage
+
+    def stream_to(self, messages: list[dict], output_path=None, *, label: str = "stream") -> str:
+        """流式调用，token 到达即写入 output_path"""
+        key = self._request_key(messages)
+        entry = self._lookup(key)
+        if entry:
+            self._record(label, 0.0, 0, {}, cached=True)
+            return _write(output_path, entry["text"])
+
+        attempts = [0]
+
+        def create(msgs):
+            try:
+                response, n = self._with_retries(lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=msgs,
+                    temperature=TEMPERATURE,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ))
+            except Exception as e:
+                attempts[0] += getattr(e, "attempts", 1)
+                raise
+            attempts[0] += n
+            return response
+
+        metrics: dict = {}
+        start = time.perf_counter()
+        try:
+            with span(f"llm.{label}", model=self.model, stream=True):
+                result = stream_completion(
+                    create,
+                    messages,
+                    output_path=output_path,
+                    max_resumes=int(self.cfg.get('max_resumes', 2)),
+                    metrics=metrics,
+                )
+        except Exception as e:
+            self._record(label, time.perf_counter() - start, attempts[0], {}, error=str(e))
+            raise
+        self._record(label, metrics["elapsed"], attempts[0], metrics["usage"], ttft=metrics["ttft"])
+
+        # 中断后仅保留部分内容的结果不写入缓存
+        if not result.endswith(PARTIAL_NOTICE):
+            self._store(key, messages, result, metrics["usage"])
+        return result
+
+    # ---------- 报告生成 ----------
+
+    def generate_report(self, content: str, output_path=None) -> str:
+        """
+        基于聚合证据报告生成最终报告
+
+        聚合报告超出模型的输入 token 预算时，先并发对各模块证据区块做摘要 (map)，
+        再以摘要代替原文进行最终综合 (reduce)；仍超出时按区块优先级分配预算后截断。
+        """
+        system_prompt = self.prompts["system"]
+        user_tmpl = self.prompts["user_template"]
+        first_metric = len(self.metrics)
+        start = time.perf_counter()
+
+        # 按 token 预算组织输入：超出时先分段摘要，仍超出则按优先级分配预算
+        budget = max(0, token_budget.prompt_budget(self.model) - token_budget.estimate_tokens(
+            system_prompt + user_tmpl.replace("{aggregated_content}", ""), self.model
+        ))
+        content_tokens = token_budget.estimate_tokens(content, self.model)
+        logger.info(f"聚合报告约 {content_tokens} tokens，输入预算 {budget} tokens ({self.model})")
+
+        if content_tokens > budget:
+            sections = split_sections(content)
+            if self.cfg.get('map_reduce', True):
+                logger.info("超出输入预算，改用分段摘要 (map-reduce)...")
+                sections = summarize_sections(
+                    lambda msgs: self.complete(msgs, label="map"),
+                    system_prompt,
+                    self.prompts["section_summary"],
+                    sections,
+                    model=self.model,
+                    max_workers=int(self.cfg.get('map_workers', 3)),
+                )
+            packed = token_budget.pack_sections(sections, budget, self.model)
+            truncated = [name for name in sections if packed[name] != sections[name]]
+            if truncated:
+                logger.warning(f"以下区块超出分配的 token 预算，已截断: {', '.join(truncated)}")
+            content = "".join(packed.values())
+
+        # 使用 replace 替代 format 更加安全 (避免内容中的 {} 报错)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_tmpl.replace("{aggregated_content}", content)}
+        ]
+
+        logger.info(f"正在发送请求至模型: {self.model} (stream={self.stream})...")
+        if self.stream:
+            result = self.stream_to(messages, output_path, label="reduce")
+        else:
+            text, _ = self.complete(messages, label="reduce")
+            result = _write(output_path, text)
+
+        _log_usage(self.metrics[first_metric:], time.perf_counter() - start)
+        return result
+
+    # ---------- 内部工具 ----------
+
+    def _request_key(self, messages):
+        return llm_cache.cache_key(self.model, TEMPERATURE, messages)
+
+    def _lookup(self, key):
+        """依次查找响应缓存与录制的响应；回放模式下未录制的请求抛出 LLMConfigError"""
+        entry = llm_cache.get(key, self.ttl_hours) if self.cache_enabled else None
+        if entry is None and self.replay_mode == "replay":
+            entry = llm_recorder.lookup(key, self.recordings)
+            if entry is None:
+                raise LLMConfigError(f"回放模式下未找到录制的响应: {key[:12]}（请先以 record 模式运行）")
+        return entry
+
+    def _store(self, key, messages, text, usage):
+        if self.cache_enabled:
+            llm_cache.put(key, text, usage)
+        if self.replay_mode == "record":
+            llm_recorder.record(key, self.model, messages, text, usage, self.recordings)
+
+    def _with_retries(self, fn):
+        return with_retries(fn, retries=self.retries, backoff=self.backoff, max_backoff=self.max_backoff)
+
+    def _record(self, label, latency, attempts, usage, *, cached=False, ttft=None, error=None):
+        metric = {
+            "label": label,
+            "latency_sec": round(latency, 3),
+            "ttft_sec": ttft,
+            "attempts": attempts,
+            "cached": cached,
+            "prompt_tokens": (usage or {}).get("prompt_tokens", 0),
+            "completion_tokens": (usage or {}).get("completion_tokens", 0),
+            "error": error,
+        }
+        with self._lock:
+            self.metrics.append(metric)
+        if cached:
+            logger.info(f"[llm] {label}: cache hit")
+        elif error:
+            logger.info(f"[llm] {label}: failed after {latency:.1f}s, {attempts} attempt(s)")
+        else:
+            logger.info(
+                f"[llm] {label}: {metric['latency_sec']}s, {attempts} attempt(s), "
+                f"{metric['prompt_tokens']}+{metric['completion_tokens']} tokens"
+            )
+
+
+_default_client: LLMClient | None = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """进程内共享的 LLMClient（首次调用时创建）"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = LLMClient()
+        return _default_client
+
+
+def call_llm(content, output_path=None):
+    """
+    调用大模型生成最终报告
+
+    Args:
+        content: 聚合证据报告正文
+        output_path: 报告输出路径；流式模式下 token 到达即写入该文件，
+            连接中断时保留已写入的部分内容
+
+    Returns:
+        模型输出的完整文本（或错误说明）
+    """
+    try:
+        return get_client().generate_report(content, output_path)
+    except LLMConfigError as e:
+        logger.error(str(e))
+        return _write(output_path, f"错误：{e}")
     except openai.APIConnectionError as e:
         logger.error(f"网络连接失败: {e}")
-        return "错误：无法连接到大模型服务，请检查网络。"
+        return _write(output_path, "错误：无法连接到大模型服务，请检查网络。")
     except openai.AuthenticationError:
         logger.error("API Key 错误")
-        return "错误：身份验证失败，请检查 API Key。"
+        return _write(output_path, "错误：身份验证失败，请检查 API Key。")
     except Exception as e:
         logger.error(f"LLM 调用发生未知错误: {str(e)}")
-        return f"AI 分析生成失败：{str(e)}"
\ No newline at end of file
+        return _write(output_path, f"AI 分析生成失败：{str(e)}")
+
+
+def load_prompts(prompt_dir: Path = PROMPT_DIR) -> dict[str, str]:
+    """加载并校验全部提示词模板，缺文件或缺占位符时抛出 LLMConfigError"""
+    prompts = {}
+    for name, placeholders in PROMPT_PLACEHOLDERS.items():
+        path = Path(prompt_dir) / f"{name}.md"
+        if not path.exists():
+            raise LLMConfigError(f"提示词模板文件缺失: {path}")
+        text = path.read_text(encoding="utf-8")
+        missing = [p for p in placeholders if p not in text]
+        if missing:
+            raise LLMConfigError(f"提示词模板 {path.name} 缺少占位符: {', '.join(missing)}")
+        prompts[name] = text
+    return prompts
+
+
+def with_retries(fn, *, retries=3, backoff=2.0, max_backoff=30.0, sleep=time.sleep):
+    """
+    执行 fn，遇到瞬时错误时按指数退避（带抖动）重试
+
+    Returns:
+        (fn 的返回值, 尝试次数)；最终失败时尝试次数记录在异常的 attempts 属性上
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return fn(), attempt
+        except _transient_errors() as e:
+            if attempt > retries:
+                e.attempts = attempt
+                raise
+            delay = min(max_backoff, backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            logger.warning(f"LLM 请求失败 ({type(e).__name__})，{delay:.1f}s 后重试 ({attempt}/{retries})...")
+            sleep(delay)
+        except Exception as e:
+            e.attempts = attempt
+            raise
+
+
+def _transient_errors() -> tuple:
+    return TRANSIENT_ERRORS or (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+
+def summarize_sections(complete, system_prompt, section_tmpl, sections, *, model="", max_workers=3, usages=None):
+    """
+    map 阶段：并发摘要各模块证据区块
+
+    执行概览原样保留；单个模块摘要失败时保留该模块原文，由后续的预算分配决定截断。
+
+    Args:
+        complete: 接收 messages、返回 (文本, usage) 的函数
+        sections: aggregator.split_sections() 的结果
+        max_workers: 并发请求数上限
+        usages: 若提供，追加每次调用的 usage
+
+    Returns:
+        与 sections 键相同、模块区块替换为摘要的字典
+    """
+    modules = [name for name in MODULE_TITLES if sections.get(name)]
+    # 单个摘要请求本身也不能超出模型的输入预算
+    section_budget = max(0, token_budget.prompt_budget(model) - token_budget.estimate_tokens(system_prompt + section_tmpl, model))
+
+    def summarize(name):
+        title = MODULE_TITLES[name]
+        evidence = token_budget.truncate_to_tokens(sections[name], section_budget, model)
+        prompt = section_tmpl.replace("{module_title}", title).replace("{section_content}", evidence)
+        started = time.perf_counter()
+        try:
+            text, usage = complete([
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ])
+            logger.info(f"[map] {name} 摘要完成: {len(sections[name])} -> {len(text)} 字符, {time.perf_counter() - started:.1f}s")
+            return text.strip() + "\n\n---\n\n", usage
+        except Exception as e:
+            logger.warning(f"[map] {name} 摘要失败，保留原文: {e}")
+            return sections[name], {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = dict(zip(modules, pool.map(summarize, modules)))
+
+    if usages is not None:
+        usages.extend(usage for _, usage in results.values())
+
+    return {name: results[name][0] if name in results else text for name, text in sections.items()}
+
+
+def stream_completion(create, messages, *, output_path=None, max_resumes=2, metrics=None):
+    """
+    消费流式响应：token 到达即追加写入 output_path，并统计首 token 延迟与吞吐
+
+    连接在输出中途断开时，携带已生成的内容发起续写请求（最多 max_resumes 次）；
+    仍失败则保留部分结果并附加提示。首个 token 之前的错误直接抛出，由调用方处理。
+
+    Args:
+        create: 接收 messages、返回 chunk 迭代器的函数
+        messages: 初始对话消息
+        metrics: 若提供，写入 ttft / tokens / elapsed / resumes / usage
+    """
+    parts: list[str] = []
+    prompt_tokens = 0
+    completion_tokens = 0
+    chunks = 0
+    resumes = 0
+    start = time.perf_counter()
+    first_token_at = None
+
+    sink = None
+    if output_path is not None:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        sink = open(output_path, "w", encoding="utf-8")
+
+    try:
+        while True:
+            request_messages = messages
+            if parts:
+                request_messages = messages + [
+                    {"role": "assistant", "content": "".join(parts)},
+                    {"role": "user", "content": RESUME_PROMPT},
+                ]
+            try:
+                for chunk in create(request_messages):
+                    usage = getattr(chunk, "usage", None)
+                    if usage is not None and getattr(usage, "completion_tokens", None):
+                        prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                        completion_tokens += usage.completion_tokens
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    if not delta:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        logger.info(f"首 token 延迟 (TTFT): {first_token_at - start:.2f}s")
+                    chunks += 1
+                    parts.append(delta)
+                    if sink is not None:
+                        sink.write(delta)
+                        sink.flush()
+                break
+            except Exception as e:
+                if not parts:
+                    raise
+                if resumes >= max_resumes:
+                    logger.error(f"流式输出中断且续写次数已用尽，保留部分结果: {e}")
+                    parts.append(PARTIAL_NOTICE)
+                    if sink is not None:
+                        sink.write(PARTIAL_NOTICE)
+                    break
+                resumes += 1
+                logger.warning(f"流式输出中断 ({e})，正在从 {len(''.join(parts))} 字符处续写 ({resumes}/{max_resumes})...")
+    finally:
+        if sink is not None:
+            sink.close()
+
+    elapsed = time.perf_counter() - start
+    # 服务端未返回 usage 时以 chunk 数近似 token 数
+    tokens = completion_tokens or chunks
+    generation = elapsed - (first_token_at - start) if first_token_at else 0
+    rate = tokens / generation if generation > 0 else 0
+    logger.info(
+        f"流式输出完成: {tokens} tokens{'' if completion_tokens else ' (按 chunk 估算)'}, "
+        f"总耗时 {elapsed:.1f}s, {rate:.1f} tokens/s, 续写 {resumes} 次"
+    )
+
+    if metrics is not None:
+        metrics.update({
+            "ttft": round(first_token_at - start, 3) if first_token_at else None,
+            "tokens": tokens,
+            "elapsed": round(elapsed, 3),
+            "resumes": resumes,
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": tokens},
+        })
+    return "".join(parts)
+
+
+def _usage_of(response) -> dict:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+def _log_usage(metrics: list[dict], elapsed: float) -> None:
+    prompt = sum(m.get("prompt_tokens", 0) for m in metrics)
+    completion = sum(m.get("completion_tokens", 0) for m in metrics)
+    hits = sum(1 for m in metrics if m.get("cached"))
+    logger.info(
+        f"LLM 阶段完成: {len(metrics)} 次调用 (缓存命中 {hits}), 总耗时 {elapsed:.1f}s, "
+        f"prompt {prompt} tokens, completion {completion} tokens"
+    )
+
+
+def _write(output_path, text):
+    """非流式结果或错误信息一次性写入输出文件"""
+    if output_path is not None:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(output_path).write_text(text, encoding="utf-8")
+    return text
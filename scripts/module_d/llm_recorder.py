@@ -0,0 +1,51 @@
+"""
+llm_recorder.py
+
+LLM 请求 / 响应的录制与回放：
+- record 模式：真实调用完成后，将请求与响应保存为 <dir>/<key>.json
+- replay 模式：LLMClient 不访问网络，直接按请求键返回录制的响应；未录制的请求视为错误
+- 键与响应缓存一致（llm_cache.cache_key），录制文件不设过期时间，可作为离线夹具提交或分享
+"""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+from .utils import CONFIG, DATA_DIR
+
+
+def recordings_dir(replay_cfg: Optional[dict] = None) -> Path:
+    """录制目录：module_d.llm.replay.dir（相对项目根目录），默认 data/module_d/llm_recordings"""
+    if replay_cfg is None:
+        replay_cfg = CONFIG.get("module_d", {}).get("llm", {}).get("replay", {})
+    configured = replay_cfg.get("dir")
+    if configured:
+        path = Path(configured)
+        return path if path.is_absolute() else Path(CONFIG["paths"]["root"]) / path
+    return DATA_DIR / "module_d" / "llm_recordings"
+
+
+def record(key: str, model: str, messages: list, text: str, usage: Optional[dict], directory: Path) -> Path:
+    """保存一次请求与响应"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{key}.json"
+    tmp = directory / f"{key}.json.tmp"
+    tmp.write_text(
+        json.dumps(
+            {"model": model, "messages": messages, "text": text, "usage": usage or {}},
+            ensure_ascii=False,
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    tmp.replace(path)
+    return path
+
+
+def lookup(key: str, directory: Path) -> Optional[dict]:
+    """读取录制的响应，未录制返回 None"""
+    path = Path(directory) / f"{key}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
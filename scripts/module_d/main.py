@@ -4,25 +4,54 @@ main.py
 模块 D 统一入口：
 - 串行运行模块 A / B / C
 - 校验并收集交付物
-- 生成聚合证据报告
+- 生成聚合证据报告与结构化证据包
 - （可选）调用 LLM 生成 FINAL_REPORT.md
+- --fleet：多仓库模式，并发运行模块 B / C 并生成对比报告
+- --trace：记录各模块（含子进程）的嵌套耗时区间，输出 Chrome trace 并打印最慢区间
+- --profile-memory：记录各模块每个阶段的内存占用
+- --only collect / report：不重新运行模块 A / B / C，只校验已有交付物或重新生成报告
+- --timings：打印启动导入耗时（与 module_d.startup_budget_ms 对比）、配置解析次数与各阶段耗时
+- 每次运行生成 RUN_MANIFEST.json，汇总执行状态、内存画像与追踪文件
 """
 
+import time
+
+# 入口模块导入耗时的起点（--timings 使用）
+_T0 = time.perf_counter()
+
+import argparse
+import importlib.util
+import json
+import os
 import sys
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 
-from runner import run_modules
-from collector import collect_outputs
-from aggregator import generate_aggregated_report
-from utils import OUTPUT_DIR
+from .runner import run_modules
+from .collector import collect_outputs
+from .aggregator import generate_aggregated_report
+from .evidence import to_llm_payload, write_evidence_bundle
+from .manifest import previous_results, write_run_manifest
+from .utils import CONFIG, OUTPUT_DIR, PROJECT_ROOT
+from .. import config_utils
+from .. import lazy_imports
+from .. import memory_profile
+from .. import tracing
+from ..tracing import span
 
-# LLM 调用是可选的，失败也允许系统继续运行
+# LLM 调用是可选的，失败也允许系统继续运行（openai 延迟导入，这里只检查是否已安装）
 try:
-    from llm_client import call_llm
-    LLM_AVAILABLE = True
+    from .llm_client import call_llm
+    LLM_AVAILABLE = importlib.util.find_spec("openai") is not None
 except ImportError:
     LLM_AVAILABLE = False
 
+IMPORT_SECONDS = time.perf_counter() - _T0
+
+# 本次运行各阶段耗时（秒），--timings 打印
+STAGE_TIMINGS = {}
+
 
 # =========================
 # 路径约定
@@ -35,25 +64,66 @@ FINAL_REPORT_PATH = OUTPUT_DIR / "FINAL_REPORT.md"
 # 主流程
 # =========================
 
-def main():
+def main(argv=None):
+    args = _parse_args(argv)
+    trace_dir = _start_tracing(args.trace)
+    memory_dir = _start_memory_profile(args.profile_memory)
+
+    results = None
+    try:
+        if args.fleet:
+            from .fleet import run_fleet
+            with _stage("fleet"):
+                results = run_fleet(workers=args.workers)
+        else:
+            results = _run_pipeline(only=args.only)
+    finally:
+        trace_path = _report_tracing(trace_dir) if trace_dir else None
+        write_run_manifest(
+            results,
+            mode="fleet" if args.fleet else (args.only or "pipeline"),
+            memory_dir=memory_dir,
+            trace_path=trace_path,
+        )
+        if args.timings:
+            _print_timings()
+
+
+def _run_pipeline(only: str | None = None):
+    """
+    only 为 "collect" / "report" 时不重新运行模块 A / B / C，沿用上一次运行记录的执行状态：
+    - collect：只校验并收集已有交付物
+    - report：在已有交付物上重新生成聚合报告、证据包与最终报告
+    """
     print("\n" + "=" * 70)
     print(" RocketMQ Engineering Analysis – Module D ")
     print("=" * 70)
 
     # Step 1: 运行模块 A / B / C
-    run_results = run_modules()
+    if only:
+        run_results = previous_results()
+        print(f"[Module D] --only {only}: reusing deliverables from the previous run")
+    else:
+        with _stage("run_modules"):
+            run_results = run_modules()
 
     # Step 2: 收集交付物
-    collected = collect_outputs(run_results)
+    with _stage("collect_outputs"):
+        collected = collect_outputs(run_results)
+    if only == "collect":
+        return run_results
 
     # Step 3: 生成聚合证据报告
-    aggregated_report_path = generate_aggregated_report(collected)
+    with _stage("aggregate"):
+        aggregated_report_path = generate_aggregated_report(collected)
+        evidence_bundle_path = write_evidence_bundle(collected)
 
     # Step 4: 调用 LLM 生成最终报告（可降级）
     if LLM_AVAILABLE:
         print("\n[Module D] Generating FINAL_REPORT.md using LLM...")
         try:
-            _run_llm_stage(aggregated_report_path)
+            with _stage("llm_stage"):
+                _run_llm_stage(aggregated_report_path, evidence_bundle_path)
         except Exception as e:
             print("[WARN] LLM stage failed, falling back to evidence-only report")
             print(f"       Reason: {e}")
@@ -66,27 +136,152 @@ def main():
     print(f"[Module D] Final report path: {FINAL_REPORT_PATH}")
     print("=" * 70)
 
+    return run_results
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="模块 D：统一运行入口")
+    parser.add_argument("--fleet", action="store_true",
+                        help="多仓库模式：按 config.yaml 的 fleet.repositories 并发运行模块 B / C")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="fleet 模式的并发数（默认读取 fleet.workers）")
+    parser.add_argument("--trace", action="store_true",
+                        help="记录耗时区间并输出 Chrome trace（也可通过 tracing.enabled 开启）")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="记录每个阶段的峰值内存（也可通过 profiling.memory 开启）")
+    parser.add_argument("--only", choices=["collect", "report"], default=None,
+                        help="不重新运行模块 A / B / C：collect 只校验已有交付物，report 重新生成报告")
+    parser.add_argument("--timings", action="store_true",
+                        help="打印启动导入耗时、配置解析次数与各阶段耗时")
+    return parser.parse_args(argv)
+
+
+# =========================
+# 耗时统计
+# =========================
+
+@contextmanager
+def _stage(name: str):
+    """带追踪区间的阶段计时"""
+    start = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        STAGE_TIMINGS[name] = time.perf_counter() - start
+
+
+def _print_timings():
+    budget_ms = float(CONFIG.get("module_d", {}).get("startup_budget_ms", 1000))
+    import_ms = IMPORT_SECONDS * 1000
+    parses = config_utils.config_parse_count()
+
+    print("\n" + "=" * 70)
+    print("[Module D] Timings")
+    print("=" * 70)
+    status = "OK" if import_ms <= budget_ms else "OVER BUDGET"
+    print(f"  startup imports : {import_ms:8.1f} ms  (budget {budget_ms:.0f} ms, {status})")
+    print(f"  config parsed   : {parses} time(s)")
+    for name, seconds in sorted(lazy_imports.IMPORT_TIMINGS.items(), key=lambda kv: -kv[1]):
+        print(f"  lazy import     : {seconds * 1000:8.1f} ms  {name}")
+    for name, seconds in STAGE_TIMINGS.items():
+        print(f"  stage           : {seconds * 1000:8.1f} ms  {name}")
+    if import_ms > budget_ms:
+        print(f"[WARN] Startup imports took {import_ms:.0f} ms, over the {budget_ms:.0f} ms budget")
+
+
+# =========================
+# 追踪
+# =========================
+
+def _start_tracing(requested: bool) -> Path | None:
+    """
+    开启追踪时为本次运行创建追踪目录，并通过 RMQ_TRACE_DIR 传递给所有子进程
+
+    已设置 RMQ_TRACE_DIR 时沿用该目录
+    """
+    tracing_cfg = CONFIG.get("tracing", {})
+    if os.getenv(tracing.TRACE_DIR_ENV):
+        return Path(os.environ[tracing.TRACE_DIR_ENV])
+    if not (requested or tracing_cfg.get("enabled", False)):
+        return None
+
+    trace_dir = _run_dir(tracing_cfg.get("dir", "data/traces"))
+    os.environ[tracing.TRACE_DIR_ENV] = str(trace_dir)
+    print(f"[Module D] Tracing enabled: {trace_dir}")
+    return trace_dir
+
+
+def _report_tracing(trace_dir: Path) -> Path:
+    """合并各进程的追踪文件，打印耗时最长的区间，返回合并后的 trace 路径"""
+    tracing.flush()
+    trace_path = trace_dir / "trace.json"
+    events = tracing.merge_traces(trace_dir, trace_path)
+    top_n = int(CONFIG.get("tracing", {}).get("top_n", 15))
+
+    print("\n" + "=" * 70)
+    print(f"[Module D] Top {top_n} slowest spans ({len(events)} recorded)")
+    print("=" * 70)
+    print(tracing.format_slowest(events, top_n))
+    print(f"\n[Module D] Chrome trace written to: {trace_path}")
+    print("           (open in chrome://tracing or https://ui.perfetto.dev)")
+    return trace_path
+
+
+def _start_memory_profile(requested: bool) -> Path | None:
+    """
+    开启内存画像时为本次运行创建画像目录，并通过 RMQ_MEMORY_PROFILE 传递给所有子进程
+
+    已设置 RMQ_MEMORY_PROFILE 时沿用该目录
+    """
+    profiling_cfg = CONFIG.get("profiling", {})
+    if os.getenv(memory_profile.PROFILE_DIR_ENV):
+        return Path(os.environ[memory_profile.PROFILE_DIR_ENV])
+    if not (requested or profiling_cfg.get("memory", False)):
+        return None
+
+    memory_dir = _run_dir(profiling_cfg.get("dir", "data/profiles"))
+    os.environ[memory_profile.PROFILE_DIR_ENV] = str(memory_dir)
+    print(f"[Module D] Memory profiling enabled: {memory_dir}")
+    return memory_dir
+
+
+def _run_dir(base: str) -> Path:
+    """本次运行在 base 下的时间戳子目录（相对路径基于项目根目录）"""
+    base = Path(base)
+    if not base.is_absolute():
+        base = PROJECT_ROOT / base
+    return base / datetime.now().strftime("%Y%m%d-%H%M%S")
+
 
 # =========================
 # LLM 相关
 # =========================
 
-def _run_llm_stage(aggregated_report_path: Path):
+def _run_llm_stage(aggregated_report_path: Path, evidence_bundle_path: Path):
     """
     使用 LLM 生成 FINAL_REPORT.md
+
+    module_d.llm.evidence 为 "bundle" 时以紧凑的结构化证据包代替聚合报告原文作为上下文
     """
     FINAL_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
     # 1. 读取聚合报告内容作为上下文
-    print(f"  -> Reading context from {aggregated_report_path.name}...")
     content = aggregated_report_path.read_text(encoding="utf-8")
+    source = aggregated_report_path
+    if CONFIG.get('module_d', {}).get('llm', {}).get('evidence', "report") == "bundle":
+        from .token_budget import estimate_tokens
 
-    # 2. 调用 LLM 获取分析结果
-    print("  -> Sending request to LLM (this may take a while)...")
-    analysis_result = call_llm(content)
+        bundle = json.loads(evidence_bundle_path.read_text(encoding="utf-8"))
+        payload = to_llm_payload(bundle)
+        print(f"  -> Evidence bundle: ~{estimate_tokens(payload)} tokens "
+              f"(aggregated report: ~{estimate_tokens(content)} tokens)")
+        content, source = payload, evidence_bundle_path
+    print(f"  -> Reading context from {source.name}...")
 
-    # 3. 写入最终报告
-    FINAL_REPORT_PATH.write_text(analysis_result, encoding="utf-8")
+    # 2. 调用 LLM 获取分析结果（流式模式下边生成边写入 FINAL_REPORT.md）
+    print("  -> Sending request to LLM (this may take a while)...")
+    call_llm(content, output_path=FINAL_REPORT_PATH)
     print("  -> AI Analysis successfully written to FINAL_REPORT.md")
 
 
@@ -110,9 +305,14 @@ def _fallback_final_report(aggregated_report_path: Path):
 # CLI 入口
 # =========================
 
-if __name__ == "__main__":
+def cli():
+    """命令行入口（python main.py / python -m scripts.module_d.main / rocketmq-analysis）"""
     try:
         main()
     except KeyboardInterrupt:
         print("\n[Module D] 用户中断。")
         sys.exit(130)
+
+
+if __name__ == "__main__":
+    cli()
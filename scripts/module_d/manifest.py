@@ -0,0 +1,98 @@
+"""
+manifest.py
+
+负责生成 RUN_MANIFEST.json：
+- 记录本次运行的模式、各模块（或 fleet 各仓库）的执行状态与耗时
+- 开启内存画像时汇总各阶段的峰值 RSS / Python 堆峰值，并与上一次运行对比，
+  峰值上涨超过 profiling.regression_pct% 的阶段列入 regressions
+- 开启追踪时记录 Chrome trace 文件路径
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+from .. import memory_profile
+from .utils import CONFIG, DATA_DIR
+
+
+# =========================
+# 路径约定
+# =========================
+
+RUN_MANIFEST_PATH = DATA_DIR / "module_d/RUN_MANIFEST.json"
+
+
+# =========================
+# 核心函数
+# =========================
+
+def write_run_manifest(
+    results: Dict[str, dict] | None,
+    *,
+    mode: str,
+    memory_dir: Path | None = None,
+    trace_path: Path | None = None,
+) -> Path:
+    """
+    生成 RUN_MANIFEST.json 并返回其路径
+    """
+    profiling_cfg = CONFIG.get("profiling", {})
+
+    memory = None
+    if memory_dir is not None:
+        previous = _previous_manifest().get("memory") or {}
+        memory = memory_profile.summarize(
+            memory_profile.load_records(memory_dir),
+            previous=previous.get("stages"),
+            regression_pct=float(profiling_cfg.get("regression_pct", 20)),
+        )
+        memory["profile_dir"] = str(memory_dir)
+        _print_memory(memory)
+
+    manifest = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "mode": mode,
+        "results": results or {},
+        "memory": memory,
+        "trace": str(trace_path) if trace_path else None,
+    }
+
+    RUN_MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RUN_MANIFEST_PATH.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[Module D] Run manifest written to: {RUN_MANIFEST_PATH}")
+    return RUN_MANIFEST_PATH
+
+
+def previous_results() -> Dict[str, dict]:
+    """
+    上一次非 fleet 运行记录的各模块执行状态（--only collect / report 复用）
+    """
+    previous = _previous_manifest()
+    if previous.get("mode") == "fleet":
+        return {}
+    return previous.get("results") or {}
+
+
+# =========================
+# 辅助函数
+# =========================
+
+def _previous_manifest() -> dict:
+    try:
+        return json.loads(RUN_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _print_memory(memory: dict):
+    print("\n" + "=" * 70)
+    print(f"[Module D] Memory profile by stage (max peak RSS: {memory.get('max_peak_rss_mb')} MB)")
+    print("=" * 70)
+    print(memory_profile.format_summary(memory))
+
+    for key in memory.get("incomplete", []):
+        print(f"[WARN] Stage did not finish (killed or OOM?): {key}")
+    for r in memory.get("regressions", []):
+        print(f"[WARN] Memory regression in {r['stage']}: {r['metric']} {r['previous']} -> {r['current']} MB")
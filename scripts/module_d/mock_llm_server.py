@@ -0,0 +1,184 @@
+"""
+mock_llm_server.py
+
+本地 OpenAI 兼容的模拟大模型服务，用于离线运行与压测模块 D：
+- POST /v1/chat/completions：支持非流式与 SSE 流式（含 stream_options.include_usage）
+- GET  /v1/models
+- 可配置首 token 延迟、流式输出速率与每个 chunk 的字符数
+- 若请求命中 llm_recorder 录制的响应则原样回放，否则根据请求内容生成确定性的模拟报告
+
+用法:
+    python -m scripts.module_d.mock_llm_server --port 8765 --ttft 0.5 --chunks-per-sec 50
+    # 然后将 config.yaml 中 module_d.llm.base_url 指向 http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from . import llm_cache
+from . import llm_recorder
+from . import token_budget
+from .utils import CONFIG
+
+
+def synthesize_reply(messages: list[dict]) -> str:
+    """根据用户提示词中的标题与图片生成确定性的模拟报告"""
+    user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    headings = re.findall(r"^#{2,3} (.+)$", user, flags=re.MULTILINE)
+    figures = re.findall(r"`((?:\.\./)?figures/[^`]+\.png)`", user)
+
+    lines = ["# 模拟综合报告 (Mock LLM)", "", f"> 输入约 {token_budget.estimate_tokens(user)} tokens。", ""]
+    for heading in headings[:40]:
+        lines.extend([f"## {heading}", "", "- 基于现有证据的模拟结论。", ""])
+    for fig in figures[:40]:
+        lines.append(f"![{Path(fig).stem}]({fig})")
+    return "\n".join(lines) + "\n"
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "mock")
+        messages = request.get("messages", [])
+
+        recorded = None
+        if self.server.recordings:
+            key = llm_cache.cache_key(model, request.get("temperature"), messages)
+            recorded = llm_recorder.lookup(key, self.server.recordings)
+        text = recorded["text"] if recorded else synthesize_reply(messages)
+        usage = {
+            "prompt_tokens": sum(token_budget.estimate_tokens(m.get("content") or "") for m in messages),
+            "completion_tokens": token_budget.estimate_tokens(text),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        with self.server.lock:
+            self.server.requests += 1
+
+        time.sleep(self.server.ttft)
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+            self._stream(model, text, usage if include_usage else None)
+        else:
+            self._send_json(200, {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+    def _stream(self, model, text, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        size = max(1, self.server.chunk_chars)
+        interval = 1.0 / self.server.chunks_per_sec if self.server.chunks_per_sec > 0 else 0
+        base = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+
+        for i in range(0, len(text), size):
+            self._event({**base, "choices": [{"index": 0, "delta": {"content": text[i:i + size]}, "finish_reason": None}]})
+            if interval:
+                time.sleep(interval)
+        self._event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if usage:
+            self._event({**base, "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    *,
+    ttft: float = 0.0,
+    chunks_per_sec: float = 0.0,
+    chunk_chars: int = 8,
+    recordings: Path | None = None,
+    verbose: bool = False,
+) -> ThreadingHTTPServer:
+    """
+    在后台线程启动模拟服务（port=0 时自动分配端口），返回 server；
+    base_url 为 f"http://{host}:{server.server_port}/v1"，用完调用 server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.ttft = ttft
+    server.chunks_per_sec = chunks_per_sec
+    server.chunk_chars = chunk_chars
+    server.recordings = Path(recordings) if recordings else None
+    server.verbose = verbose
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    cfg = CONFIG.get("module_d", {}).get("mock_server", {})
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容的模拟大模型服务")
+    parser.add_argument("--host", default=cfg.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(cfg.get("port", 8765)))
+    parser.add_argument("--ttft", type=float, default=float(cfg.get("ttft_seconds", 0.5)), help="首 token 延迟（秒）")
+    parser.add_argument("--chunks-per-sec", type=float, default=float(cfg.get("chunks_per_second", 50)),
+                        help="流式输出速率（chunk/秒，0 表示不限速）")
+    parser.add_argument("--chunk-chars", type=int, default=int(cfg.get("chunk_chars", 8)), help="每个 chunk 的字符数")
+    parser.add_argument("--recordings", default=None, help="录制响应目录（默认读取 module_d.llm.replay.dir）")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    recordings = args.recordings or llm_recorder.recordings_dir()
+    server = start_server(
+        args.host, args.port,
+        ttft=args.ttft, chunks_per_sec=args.chunks_per_sec, chunk_chars=args.chunk_chars,
+        recordings=recordings, verbose=args.verbose,
+    )
+    print(f"[Module D] Mock LLM server listening on http://{args.host}:{server.server_port}/v1")
+    print(f"[Module D] ttft={args.ttft}s, {args.chunks_per_sec} chunks/s x {args.chunk_chars} chars, recordings={recordings}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\n[Module D] Mock LLM server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,36 +6,46 @@ runner.py
 - 严格按 A → B → C 顺序执行
 - 不因单个模块失败而中断（支持降级）
 - 统一输出结构化执行状态，供模块 D 后续使用
+- module_d.execution 为 "subprocess"（默认）时以 python -m 在子进程中运行各模块，
+  为 "inprocess" 时在当前进程内调用各模块的 main()，复用已导入的依赖
 """
 
+import importlib
+import importlib.util
 import subprocess
 import sys
 import time
+from datetime import datetime
 from pathlib import Path
 from typing import Dict
-from utils import PROJECT_ROOT, DATA_DIR, FIGURES_DIR
+from .utils import CONFIG, PROJECT_ROOT, DATA_DIR, FIGURES_DIR
+from .. import warehouse
+from ..tracing import span
 
 
 # =========================
 # 模块运行配置
 # =========================
 
+# 顶层包名（源码检出中为 scripts，安装后为 rocketmq_analysis）
+PACKAGE = __package__.rpartition(".")[0]
+
 MODULES = [
     {
         "name": "module_a",
-        "entry": PROJECT_ROOT / "scripts/module_a/main.py",
+        "entry": f"{PACKAGE}.module_a.main",
         "report": DATA_DIR / "module_a/REPORT.md",
         "figures": FIGURES_DIR / "module_a",
     },
     {
         "name": "module_b",
-        "entry": PROJECT_ROOT / "scripts/module_b/main.py",
+        "entry": f"{PACKAGE}.module_b.main",
         "report": DATA_DIR / "module_b/REPORT.md",
         "figures": FIGURES_DIR / "module_b",
     },
     {
         "name": "module_c",
-        "entry": PROJECT_ROOT / "scripts/module_c/main.py",
+        "entry": f"{PACKAGE}.module_c.main",
         "report": DATA_DIR / "module_c/REPORT.md",
         "figures": FIGURES_DIR / "module_c",
     },
@@ -63,9 +73,10 @@ def run_modules() -> Dict[str, dict]:
         }
     """
     results = {}
+    execution = CONFIG.get("module_d", {}).get("execution", "subprocess")
 
     print("=" * 60)
-    print("[Module D] Starting pipeline: A → B → C")
+    print(f"[Module D] Starting pipeline: A → B → C ({execution})")
     print("=" * 60)
 
     for module in MODULES:
@@ -75,9 +86,10 @@ def run_modules() -> Dict[str, dict]:
         print(f"\n[Module D] Running {name} ...")
 
         start_time = time.time()
+        started_at = datetime.now().isoformat(timespec="seconds")
 
-        if not entry.exists():
-            print(f"[ERROR] Entry script not found: {entry}")
+        if importlib.util.find_spec(entry) is None:
+            print(f"[ERROR] Entry module not found: {entry}")
             results[name] = _build_result(
                 executed=False,
                 exit_code=None,
@@ -86,14 +98,19 @@ def run_modules() -> Dict[str, dict]:
             )
             continue
         
-        # 使用当前 Python 解释器运行模块入口脚本
+        # 使用当前 Python 解释器运行模块入口
+        # 子进程继承 RMQ_TRACE_DIR，其内部的区间写入同一追踪目录
         try:
-            proc = subprocess.run(
-                [sys.executable, str(entry)],
-                stdout=sys.stdout,
-                stderr=sys.stderr,
-            )
-            exit_code = proc.returncode
+            with span(name):
+                if execution == "inprocess":
+                    exit_code = run_in_process(entry)
+                else:
+                    exit_code = subprocess.run(
+                        [sys.executable, "-m", entry],
+                        stdout=sys.stdout,
+                        stderr=sys.stderr,
+                        cwd=PROJECT_ROOT,
+                    ).returncode
         except Exception as e:
             print(f"[ERROR] Failed to execute {name}: {e}")
             exit_code = -1
@@ -108,6 +125,7 @@ def run_modules() -> Dict[str, dict]:
         )
 
         _print_summary(name, results[name])
+        _record_run(name, started_at, results[name])
 
     print("\n" + "=" * 60)
     print("[Module D] Pipeline finished")
@@ -116,6 +134,17 @@ def run_modules() -> Dict[str, dict]:
     return results
 
 
+def run_in_process(entry: str) -> int:
+    """
+    在当前进程内运行模块入口（如 scripts.module_b.main）的 main()，返回退出码
+    """
+    module = importlib.import_module(entry)
+    try:
+        return module.main([]) or 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+
+
 # =========================
 # 辅助函数
 # =========================
@@ -143,6 +172,19 @@ def _build_result(executed: bool, exit_code, module: dict, duration: float) -> d
     }
 
 
+def _record_run(name: str, started_at: str, result: dict):
+    """
+    将模块执行结果写入共享分析库（失败仅告警）
+    """
+    conn = warehouse.open_if_enabled()
+    if conn is None:
+        return
+    try:
+        warehouse.record_pipeline_run(conn, name, started_at, result)
+    finally:
+        conn.close()
+
+
 def _print_summary(name: str, result: dict):
     """
     打印模块执行摘要（用户友好）
@@ -0,0 +1,137 @@
+"""
+token_budget.py
+
+模块 D 的 token 预算：
+- 估算文本 token 数：安装了 tiktoken 时使用其分词器，否则按中日韩字符与其他字符分别校准估算
+- 按 config.yaml 的 module_d.llm.context_windows 查询模型上下文窗口，扣除输出预留得到输入预算
+- 按优先级在聚合报告各区块之间分配预算，在不超限的前提下尽量装入更多证据
+"""
+
+import re
+from typing import Dict
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from .utils import CONFIG
+
+
+# 未安装 tiktoken 时的校准系数：中文报告中汉字约 1 token/字，其余字符约 4 字符/token
+CJK_TOKENS_PER_CHAR = 1.0
+OTHER_CHARS_PER_TOKEN = 4.0
+
+_CJK = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+# 截断标记
+TRUNCATED_NOTICE = "\n\n(内容因超出 token 预算被截断...)"
+
+
+def _llm_cfg() -> dict:
+    return CONFIG.get("module_d", {}).get("llm", {})
+
+
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def estimate_tokens(text: str, model: str = "") -> int:
+    """估算文本的 token 数"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    cfg = _llm_cfg().get("token_estimate", {})
+    cjk = len(_CJK.findall(text))
+    other = len(text) - cjk
+    return int(
+        cjk * float(cfg.get("cjk_tokens_per_char", CJK_TOKENS_PER_CHAR))
+        + other / float(cfg.get("other_chars_per_token", OTHER_CHARS_PER_TOKEN))
+    ) + 1
+
+
+def context_window(model: str) -> int:
+    """模型上下文窗口（token），未登记的模型使用 default"""
+    windows = _llm_cfg().get("context_windows", {})
+    return int(windows.get(model, windows.get("default", 32000)))
+
+
+def prompt_budget(model: str) -> int:
+    """单次请求可用于输入的 token 数：上下文窗口 - 输出预留"""
+    reserved = int(_llm_cfg().get("max_output_tokens", 8000))
+    return max(0, context_window(model) - reserved)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "") -> str:
+    """截断文本使其不超过 max_tokens，尽量在行尾处截断"""
+    if estimate_tokens(text, model) <= max_tokens:
+        return text
+    limit = max_tokens - estimate_tokens(TRUNCATED_NOTICE, model)
+    if limit <= 0:
+        return ""
+
+    # 按字符二分查找满足预算的最长前缀
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid], model) <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    cut = text.rfind("\n", 0, lo)
+    if cut > lo // 2:
+        lo = cut
+    return text[:lo].rstrip() + TRUNCATED_NOTICE
+
+
+def allocate(needs: Dict[str, int], budget: int, priorities: Dict[str, float]) -> Dict[str, int]:
+    """
+    按优先级加权分配 token 预算
+
+    需求小于加权份额的区块获得全部所需，节省的预算再按权重分给其余区块，
+    直到剩余区块都需要截断为止。预算充足时每个区块都得到全部所需。
+
+    Args:
+        needs: 各区块完整装入所需的 token 数
+        budget: 总预算
+        priorities: 各区块权重（缺省为 1）
+    """
+    allocation: Dict[str, int] = {}
+    pending = dict(needs)
+    remaining = budget
+
+    while pending:
+        total_weight = sum(float(priorities.get(name, 1)) for name in pending)
+        shares = {name: remaining * float(priorities.get(name, 1)) / total_weight for name in pending}
+        satisfied = [name for name, need in pending.items() if need <= shares[name]]
+        if not satisfied:
+            for name in pending:
+                allocation[name] = int(shares[name])
+            break
+        for name in satisfied:
+            allocation[name] = pending.pop(name)
+            remaining -= allocation[name]
+
+    return allocation
+
+
+def pack_sections(sections: Dict[str, str], budget: int, model: str = "") -> Dict[str, str]:
+    """
+    在预算内装入各区块：装得下的原样保留，其余按 module_d.llm.section_priorities 分配后截断
+    """
+    priorities = _llm_cfg().get("section_priorities", {})
+    needs = {name: estimate_tokens(text, model) for name, text in sections.items()}
+    allocation = allocate(needs, budget, priorities)
+    return {
+        name: text if allocation[name] >= needs[name] else truncate_to_tokens(text, allocation[name], model)
+        for name, text in sections.items()
+    }
@@ -1,12 +1,9 @@
 import os
-import sys
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
 
-# 导入 config_utils
-sys.path.append(str(Path(__file__).parent.parent))
-from config_utils import load_config
+from ..config_utils import load_config
 
 # 初始化路径
 try:
@@ -18,6 +15,7 @@ try:
 except Exception as e:
     # 回退或报错
     print(f"Warning: Module D loading config failed: {e}")
+    CONFIG = {}
     PROJECT_ROOT = Path(__file__).parent.parent.parent
     DATA_DIR = PROJECT_ROOT / "data"
     FIGURES_DIR = PROJECT_ROOT / "figures"
@@ -1,10 +1,21 @@
 import json
 import os
+import random
+import re
+import time
 from typing import Any, Callable
 
 import requests
 from dotenv import load_dotenv
 
+from .config_utils import load_config
+from .memory_profile import measure
+from .tracing import span
+
+
+# 设置后流水线跳过数据拉取步骤（fleet 的 asyncio 执行方式已在调度进程中预先拉取）
+SKIP_FETCH_ENV = "RMQ_SKIP_FETCH"
+
 
 def repo_root_from(current_file: str) -> str:
     """获取项目根目录路径"""
@@ -16,11 +27,19 @@ def file_ready(path: str) -> bool:
     return os.path.exists(path) and os.path.getsize(path) > 0
 
 
-def run_step(step_no: int, total_steps: int, title: str, func: Callable[[], Any]) -> bool:
-    """运行流水线的一步，并处理异常"""
+def run_step(
+    step_no: int,
+    total_steps: int,
+    title: str,
+    func: Callable[[], Any],
+    *,
+    module_label: str = "",
+) -> bool:
+    """运行流水线的一步，并处理异常（开启内存画像时记录该步的内存占用）"""
     print(f"\n[Step {step_no}/{total_steps}] {title}")
     try:
-        func()
+        with span(title, step=step_no), measure(title, module=module_label):
+            func()
         return True
     except Exception as e:
         print(f"[Error] {title} 失败: {e}")
@@ -30,32 +49,38 @@ def run_step(step_no: int, total_steps: int, title: str, func: Callable[[], Any]
 def run_four_step_pipeline(
     *,
     module_label: str,
-    data_path_to_skip_fetch: str,
+    data_path_to_skip_fetch: str | None,
     fetch_func: Callable[[], Any],
     clean_func: Callable[[], Any],
     visualize_func: Callable[[], Any],
     report_func: Callable[[], Any],
 ) -> bool:
-    """运行标准的四步分析流水线 (Fetch -> Clean -> Visualize -> Report)"""
+    """
+    运行标准的四步分析流水线 (Fetch -> Clean -> Visualize -> Report)
+
+    data_path_to_skip_fetch 为 None 时总是执行拉取（适用于增量采集的模块）
+    """
     total_steps = 4
 
     print("=" * 60)
     print(f"{module_label} 分析流水线启动")
     print("=" * 60)
 
-    if file_ready(data_path_to_skip_fetch):
+    if os.getenv(SKIP_FETCH_ENV):
+        print("\n[Info] 数据已由调度进程预先拉取，跳过数据拉取")
+    elif data_path_to_skip_fetch and file_ready(data_path_to_skip_fetch):
         print("\n[Info] 检测到本地数据，跳过数据拉取")
     else:
-        if not run_step(1, total_steps, "数据爬取 (get_git_data)", fetch_func):
+        if not run_step(1, total_steps, "数据爬取 (get_git_data)", fetch_func, module_label=module_label):
             return False
 
-    if not run_step(2, total_steps, "数据清洗 (clean_git_data)", clean_func):
+    if not run_step(2, total_steps, "数据清洗 (clean_git_data)", clean_func, module_label=module_label):
         return False
 
-    if not run_step(3, total_steps, "可视化 (visualizer)", visualize_func):
+    if not run_step(3, total_steps, "可视化 (visualizer)", visualize_func, module_label=module_label):
         return False
 
-    if not run_step(4, total_steps, "报告生成 (report_generator)", report_func):
+    if not run_step(4, total_steps, "报告生成 (report_generator)", report_func, module_label=module_label):
         return False
 
     print("\n" + "=" * 60)
@@ -110,16 +135,79 @@ def github_headers(token: str) -> dict[str, str]:
     }
 
 
-def github_get_json(
-    url: str,
-    headers: dict[str, str],
-    params: dict[str, Any] | None = None,
-    timeout: int = 30,
-) -> Any:
-    """简单的 GitHub API GET 请求封装"""
-    resp = requests.get(url, headers=headers, params=params, timeout=timeout)
-    resp.raise_for_status()
-    return resp.json()
+_budget_conn = None
+
+
+def consume_api_budget(key: str | None = None) -> None:
+    """
+    fleet 模式下多个进程共享同一个 API 配额（存放于共享分析库）。
+    key 默认取环境变量 GITHUB_API_BUDGET_KEY，两者都为空时不做任何限制。
+    """
+    global _budget_conn
+
+    key = key or os.getenv("GITHUB_API_BUDGET_KEY")
+    if not key:
+        return
+
+    from . import warehouse
+
+    if _budget_conn is None:
+        _budget_conn = warehouse.connect()
+    if not warehouse.consume_api_budget(_budget_conn, key):
+        raise RuntimeError(f"GitHub API 配额已用尽 (budget: {key})")
+
+
+# 可重试的服务端错误
+RETRY_STATUS = {500, 502, 503, 504}
+
+DEFAULT_API_URL = "https://api.github.com"
+
+
+def github_api_url(path: str = "") -> str:
+    """
+    GitHub API 地址：环境变量 GITHUB_API_URL 优先，其次为 github.api_url，默认 https://api.github.com
+    （指向 mock_github_server 时可离线回放录制的响应）。path 为完整 URL 时原样返回
+    """
+    if path.startswith(("http://", "https://")):
+        return path
+    base = os.getenv("GITHUB_API_URL") or load_config().get("github", {}).get("api_url") or DEFAULT_API_URL
+    return base.rstrip("/") + path
+
+
+def rate_limit_wait(resp: requests.Response) -> float | None:
+    """
+    限流响应需要等待的秒数；不是限流响应时返回 None
+
+    优先使用 Retry-After（二级限流），否则按 X-RateLimit-Reset 计算到配额重置的时间
+    """
+    if resp.status_code not in (403, 429):
+        return None
+    retry_after = resp.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    if resp.headers.get("X-RateLimit-Remaining") == "0":
+        reset = resp.headers.get("X-RateLimit-Reset")
+        if reset and reset.isdigit():
+            return max(1.0, int(reset) - time.time() + 1)
+        return 60.0
+    return None
+
+
+def backoff_delay(backoff: float, attempt: int) -> float:
+    """第 attempt 次重试前的等待秒数（指数退避，带随机抖动）"""
+    return backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+
+
+def parse_last_page(link_header: str | None) -> int | None:
+    """从 Link 响应头中解析 rel="last" 的页码"""
+    if not link_header:
+        return None
+    for part in link_header.split(","):
+        if 'rel="last"' in part:
+            match = re.search(r"[?&]page=(\d+)", part)
+            if match:
+                return int(match.group(1))
+    return None
 
 
 def write_json(data: Any, path: str, indent: int = 2) -> None:
@@ -0,0 +1,167 @@
+"""
+tracing.py
+
+轻量级的流水线追踪：
+- span(name, **args) 记录嵌套的耗时区间（拉取分页、清洗、每张图、每次扫描、LLM 调用等）
+- 仅在设置环境变量 RMQ_TRACE_DIR 时启用，未设置时 span 几乎没有开销
+- 每个进程在退出时把自己的区间写入 RMQ_TRACE_DIR/trace-<pid>.json；
+  子进程继承环境变量，因此模块 A / B / C 的子进程会自动写入同一目录
+- merge_traces 把各进程的文件合并为一个 Chrome trace（chrome://tracing / Perfetto 可直接打开）
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+TRACE_DIR_ENV = "RMQ_TRACE_DIR"
+
+_events: List[dict] = []
+_lock = threading.Lock()
+# 当前的区间嵌套路径；用 ContextVar 保存，线程与 asyncio 任务各自独立
+_stack: contextvars.ContextVar[tuple] = contextvars.ContextVar("rmq_trace_stack", default=())
+_registered = False
+
+
+def enabled() -> bool:
+    """当前进程是否记录追踪"""
+    return bool(os.getenv(TRACE_DIR_ENV))
+
+
+@contextmanager
+def span(name: str, **args: Any):
+    """
+    记录一个耗时区间，可嵌套；args 作为附加信息写入 trace（需可 JSON 序列化）
+
+    用法:
+        with span("clean_git_data", rows=len(df)):
+            ...
+    """
+    if not enabled():
+        yield
+        return
+
+    stack = _stack.get() + (name,)
+    token = _stack.set(stack)
+    path = " > ".join(stack)
+
+    start_us = time.time_ns() // 1000
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration_us = int((time.perf_counter() - start) * 1_000_000)
+        _stack.reset(token)
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": start_us,
+            "dur": duration_us,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {"path": path, **args, **({"error": error} if error else {})},
+        }
+        _append(event)
+
+
+def traced(name: str | None = None) -> Callable:
+    """装饰器形式的 span，默认以函数名命名"""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*a, **kw):
+            with span(label):
+                return func(*a, **kw)
+        return wrapper
+    return decorator
+
+
+def flush() -> Path | None:
+    """把本进程记录的全部区间写入 RMQ_TRACE_DIR/trace-<pid>.json（可重复调用，后一次覆盖前一次）"""
+    trace_dir = os.getenv(TRACE_DIR_ENV)
+    with _lock:
+        events = list(_events)
+    if not trace_dir or not events:
+        return None
+
+    directory = Path(trace_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"trace-{os.getpid()}.json"
+    tmp = directory / f"trace-{os.getpid()}.json.tmp"
+    tmp.write_text(json.dumps({"traceEvents": events}, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def merge_traces(trace_dir: Path, output_path: Path | None = None) -> List[dict]:
+    """
+    合并目录下各进程的 trace-<pid>.json，按开始时间排序
+
+    output_path 不为空时写出合并后的 Chrome trace 文件
+    """
+    events: List[dict] = []
+    for path in sorted(Path(trace_dir).glob("trace-*.json")):
+        try:
+            events.extend(json.loads(path.read_text(encoding="utf-8")).get("traceEvents", []))
+        except (OSError, ValueError) as e:
+            print(f"[Warn] 无法读取追踪文件 {path}: {e}")
+    events.sort(key=lambda e: e.get("ts", 0))
+
+    if output_path is not None:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(output_path).write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+    return events
+
+
+def slowest_spans(events: List[dict], top_n: int = 15) -> List[Dict[str, Any]]:
+    """耗时最长的 top_n 个区间（秒）"""
+    ranked = sorted((e for e in events if e.get("ph") == "X"), key=lambda e: e.get("dur", 0), reverse=True)
+    return [
+        {
+            "path": e.get("args", {}).get("path", e.get("name")),
+            "pid": e.get("pid"),
+            "duration_sec": round(e.get("dur", 0) / 1_000_000, 3),
+        }
+        for e in ranked[:top_n]
+    ]
+
+
+def format_slowest(events: List[dict], top_n: int = 15) -> str:
+    """耗时最长区间的文本表格"""
+    rows = slowest_spans(events, top_n)
+    if not rows:
+        return "(no spans recorded)"
+
+    width = min(max(len(r["path"]) for r in rows), 90)
+    lines = [f"{'#':>3}  {'seconds':>9}  {'pid':>7}  span", f"{'-' * 3}  {'-' * 9}  {'-' * 7}  {'-' * width}"]
+    for i, r in enumerate(rows, 1):
+        path = r["path"] if len(r["path"]) <= width else "..." + r["path"][-(width - 3):]
+        lines.append(f"{i:>3}  {r['duration_sec']:>9.3f}  {r['pid']:>7}  {path}")
+    return "\n".join(lines)
+
+
+# =========================
+# 辅助函数
+# =========================
+
+def _append(event: dict) -> None:
+    global _registered
+    with _lock:
+        _events.append(event)
+        if not _registered:
+            atexit.register(flush)
+            _registered = True
@@ -0,0 +1,648 @@
+"""
+warehouse.py
+
+模块 A / B / C 共享的嵌入式分析库（单文件 SQLite，无需服务端）。
+
+职责：
+- 统一建表与索引（commits / functions / findings / pull_requests / workflow_runs / releases / scores / score_windows / pipeline_runs / sync_state / api_budget）
+- 为各模块的采集与清洗步骤提供幂等写入接口
+- 提供基于 SQL 的聚合查询，供报告、图表与跨模块分析使用
+"""
+import json
+import os
+import sqlite3
+from typing import Any, Iterable
+
+from .config_utils import load_config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    repo          TEXT NOT NULL,
+    sha           TEXT NOT NULL,
+    authored_utc  TEXT,
+    author_name   TEXT,
+    author_email  TEXT,
+    subject       TEXT,
+    message       TEXT,
+    is_merge      INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (repo, sha)
+);
+CREATE INDEX IF NOT EXISTS idx_commits_repo_time ON commits (repo, authored_utc);
+
+CREATE TABLE IF NOT EXISTS functions (
+    repository  TEXT NOT NULL,
+    file        TEXT,
+    function    TEXT,
+    nloc        INTEGER,
+    ccn         INTEGER,
+    token       INTEGER,
+    param       INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_functions_repo ON functions (repository);
+CREATE INDEX IF NOT EXISTS idx_functions_ccn ON functions (ccn);
+
+CREATE TABLE IF NOT EXISTS findings (
+    repository   TEXT NOT NULL,
+    file         TEXT,
+    line_number  INTEGER,
+    issue_type   TEXT,
+    issue_name   TEXT,
+    severity     TEXT,
+    confidence   TEXT,
+    description  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_findings_repo ON findings (repository);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings (severity);
+
+CREATE TABLE IF NOT EXISTS pull_requests (
+    repo                 TEXT NOT NULL,
+    number               INTEGER NOT NULL,
+    state                TEXT,
+    created_at           TEXT,
+    updated_at           TEXT,
+    closed_at            TEXT,
+    merged_at            TEXT,
+    body                 TEXT,
+    assignee             TEXT,
+    requested_reviewers  TEXT,
+    labels               TEXT,
+    PRIMARY KEY (repo, number)
+);
+CREATE INDEX IF NOT EXISTS idx_prs_repo_updated ON pull_requests (repo, updated_at);
+
+CREATE TABLE IF NOT EXISTS workflow_runs (
+    repo            TEXT NOT NULL,
+    id              INTEGER NOT NULL,
+    name            TEXT,
+    head_branch     TEXT,
+    event           TEXT,
+    status          TEXT,
+    conclusion      TEXT,
+    created_at      TEXT,
+    updated_at      TEXT,
+    run_started_at  TEXT,
+    PRIMARY KEY (repo, id)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_repo_created ON workflow_runs (repo, created_at);
+
+CREATE TABLE IF NOT EXISTS releases (
+    repo          TEXT NOT NULL,
+    id            INTEGER NOT NULL,
+    tag_name      TEXT,
+    published_at  TEXT,
+    PRIMARY KEY (repo, id)
+);
+CREATE INDEX IF NOT EXISTS idx_releases_repo_published ON releases (repo, published_at);
+
+CREATE TABLE IF NOT EXISTS scores (
+    repo          TEXT NOT NULL,
+    generated_at  TEXT NOT NULL,
+    total_score   REAL,
+    payload       TEXT,
+    PRIMARY KEY (repo, generated_at)
+);
+
+CREATE TABLE IF NOT EXISTS score_windows (
+    repo            TEXT NOT NULL,
+    freq            TEXT NOT NULL,
+    window_start    TEXT NOT NULL,
+    window_end      TEXT,
+    commits         INTEGER,
+    valid_commits   INTEGER,
+    commit_norm     REAL,
+    prs             INTEGER,
+    valid_prs       INTEGER,
+    pr_process      REAL,
+    effective_runs  INTEGER,
+    success_runs    INTEGER,
+    run_rate        REAL,
+    config_exist    REAL,
+    docs            REAL,
+    release_cycle   REAL,
+    test_config     REAL,
+    style_config    REAL,
+    total_score     REAL,
+    PRIMARY KEY (repo, freq, window_start)
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    repo        TEXT NOT NULL,
+    resource    TEXT NOT NULL,
+    watermark   TEXT NOT NULL,
+    PRIMARY KEY (repo, resource)
+);
+
+CREATE TABLE IF NOT EXISTS api_budget (
+    key        TEXT PRIMARY KEY,
+    total      INTEGER NOT NULL,
+    remaining  INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    module        TEXT NOT NULL,
+    started_at    TEXT NOT NULL,
+    success       INTEGER,
+    exit_code     INTEGER,
+    duration_sec  REAL,
+    PRIMARY KEY (module, started_at)
+);
+"""
+
+
+# =========================
+# 连接管理
+# =========================
+
+def is_enabled() -> bool:
+    """是否启用共享分析库（config.yaml 中 warehouse.enabled，默认启用）"""
+    return bool(load_config().get("warehouse", {}).get("enabled", True))
+
+
+def default_path() -> str:
+    """分析库文件的绝对路径"""
+    return load_config()["paths"]["warehouse"]
+
+
+def connect(db_path: str | None = None) -> sqlite3.Connection:
+    """
+    打开分析库并确保表结构存在。
+    多个模块（或 fleet 模式下的多个进程）可并发打开同一文件，写入由 SQLite 文件锁串行化。
+    """
+    path = db_path or default_path()
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if path != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def open_if_enabled() -> sqlite3.Connection | None:
+    """
+    供各模块流水线使用：未启用或打开失败时返回 None（仅告警，不中断流水线）
+    """
+    if not is_enabled():
+        return None
+    try:
+        return connect()
+    except sqlite3.Error as e:
+        print(f"[Warn] 分析库不可用，跳过写入: {e}")
+        return None
+
+
+# =========================
+# 写入接口（幂等）
+# =========================
+
+def upsert_commits(conn: sqlite3.Connection, repo: str, commits: Iterable[dict]) -> int:
+    """
+    写入提交记录（模块 B 的 CSV 行或模块 C 的 GitHub commit 对象均可）。
+    同一 sha 重复写入时合并字段，已有的非空值不会被覆盖为空。
+    """
+    rows = []
+    for c in commits:
+        if "commit" in c:
+            author = (c.get("commit", {}) or {}).get("author") or {}
+            message = (c.get("commit", {}) or {}).get("message") or ""
+            rows.append((
+                repo,
+                c.get("sha"),
+                author.get("date"),
+                author.get("name"),
+                author.get("email"),
+                message.splitlines()[0] if message else "",
+                message,
+                1 if len(c.get("parents") or []) > 1 else 0,
+            ))
+        else:
+            rows.append((
+                repo,
+                c.get("sha"),
+                c.get("authored_utc"),
+                c.get("author_name"),
+                c.get("author_email"),
+                c.get("subject"),
+                c.get("message"),
+                int(bool(c.get("is_merge"))),
+            ))
+
+    conn.executemany(
+        """
+        INSERT INTO commits (repo, sha, authored_utc, author_name, author_email, subject, message, is_merge)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (repo, sha) DO UPDATE SET
+            authored_utc = COALESCE(excluded.authored_utc, commits.authored_utc),
+            author_name  = COALESCE(excluded.author_name, commits.author_name),
+            author_email = COALESCE(excluded.author_email, commits.author_email),
+            subject      = COALESCE(excluded.subject, commits.subject),
+            message      = COALESCE(excluded.message, commits.message),
+            is_merge     = MAX(excluded.is_merge, commits.is_merge)
+        """,
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def mark_merge_subjects(conn: sqlite3.Connection, repo: str) -> int:
+    """按模块 B 的清洗口径，将 subject 为 Merge 的提交标记为 merge"""
+    cur = conn.execute(
+        """
+        UPDATE commits SET is_merge = 1
+        WHERE repo = ? AND is_merge = 0
+          AND (subject LIKE '%Merge pull request%' OR subject LIKE '%Merge branch%')
+        """,
+        (repo,),
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+def replace_functions(conn: sqlite3.Connection, rows: list[dict]) -> int:
+    """以仓库为单位整体替换 Lizard 函数级结果（每次扫描都是完整快照）"""
+    repos = {r.get("repository") for r in rows}
+    conn.executemany("DELETE FROM functions WHERE repository = ?", [(r,) for r in repos])
+    conn.executemany(
+        "INSERT INTO functions (repository, file, function, nloc, ccn, token, param) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (r.get("repository"), r.get("file"), r.get("function"),
+             r.get("nloc"), r.get("ccn"), r.get("token"), r.get("param"))
+            for r in rows
+        ],
+    )
+    conn.commit()
+    return len(rows)
+
+
+def replace_findings(conn: sqlite3.Connection, rows: list[dict]) -> int:
+    """以仓库为单位整体替换 Bandit 扫描结果"""
+    repos = {r.get("repository") for r in rows}
+    conn.executemany("DELETE FROM findings WHERE repository = ?", [(r,) for r in repos])
+    conn.executemany(
+        """
+        INSERT INTO findings (repository, file, line_number, issue_type, issue_name, severity, confidence, description)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (r.get("repository"), r.get("file"), r.get("line_number"), r.get("issue_type"),
+             r.get("issue_name"), r.get("severity"), r.get("confidence"), r.get("description"))
+            for r in rows
+        ],
+    )
+    conn.commit()
+    return len(rows)
+
+
+def upsert_pull_requests(conn: sqlite3.Connection, repo: str, prs: Iterable[dict]) -> int:
+    """写入 PR，仅保留评分所需字段（reviewers / labels 以 JSON 数组保存）"""
+    rows = [
+        (
+            repo,
+            pr.get("number"),
+            pr.get("state"),
+            pr.get("created_at"),
+            pr.get("updated_at"),
+            pr.get("closed_at"),
+            pr.get("merged_at"),
+            pr.get("body"),
+            (pr.get("assignee") or {}).get("login") if isinstance(pr.get("assignee"), dict) else pr.get("assignee"),
+            json.dumps([(u or {}).get("login") for u in pr.get("requested_reviewers") or []]),
+            json.dumps([(lb or {}).get("name") for lb in pr.get("labels") or []]),
+        )
+        for pr in prs
+    ]
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO pull_requests
+            (repo, number, state, created_at, updated_at, closed_at, merged_at, body, assignee, requested_reviewers, labels)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def upsert_workflow_runs(conn: sqlite3.Connection, repo: str, runs: Iterable[dict]) -> int:
+    """写入 GitHub Actions 运行记录"""
+    rows = [
+        (
+            repo, r.get("id"), r.get("name"), r.get("head_branch"), r.get("event"),
+            r.get("status"), r.get("conclusion"), r.get("created_at"), r.get("updated_at"),
+            r.get("run_started_at"),
+        )
+        for r in runs
+    ]
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO workflow_runs
+            (repo, id, name, head_branch, event, status, conclusion, created_at, updated_at, run_started_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def upsert_releases(conn: sqlite3.Connection, repo: str, releases: Iterable[dict]) -> int:
+    """写入发布记录"""
+    rows = [(repo, r.get("id"), r.get("tag_name"), r.get("published_at")) for r in releases]
+    conn.executemany(
+        "INSERT OR REPLACE INTO releases (repo, id, tag_name, published_at) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def insert_score(conn: sqlite3.Connection, repo: str, data: dict) -> None:
+    """保存一次模块 C 的评分结果（按生成时间留存历史）"""
+    conn.execute(
+        "INSERT OR REPLACE INTO scores (repo, generated_at, total_score, payload) VALUES (?, ?, ?, ?)",
+        (repo, data.get("generated_at"), data.get("total_score"), json.dumps(data, ensure_ascii=False)),
+    )
+    conn.commit()
+
+
+def upsert_score_windows(conn: sqlite3.Connection, repo: str, freq: str, rows: list[dict]) -> int:
+    """写入（或覆盖）评分时间序列的窗口行"""
+    columns = [
+        "window_start", "window_end", "commits", "valid_commits", "commit_norm", "prs", "valid_prs",
+        "pr_process", "effective_runs", "success_runs", "run_rate", "config_exist", "docs",
+        "release_cycle", "test_config", "style_config", "total_score",
+    ]
+    conn.executemany(
+        f"""
+        INSERT OR REPLACE INTO score_windows (repo, freq, {", ".join(columns)})
+        VALUES (?, ?, {", ".join("?" for _ in columns)})
+        """,
+        [(repo, freq, *(r.get(c) for c in columns)) for r in rows],
+    )
+    conn.commit()
+    return len(rows)
+
+
+def record_pipeline_run(conn: sqlite3.Connection, module: str, started_at: str, result: dict) -> None:
+    """记录模块 D 调度的一次模块执行"""
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO pipeline_runs (module, started_at, success, exit_code, duration_sec)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (module, started_at, int(bool(result.get("success"))), result.get("exit_code"), result.get("duration_sec")),
+    )
+    conn.commit()
+
+
+# =========================
+# 增量采集水位
+# =========================
+
+def get_watermark(conn: sqlite3.Connection, repo: str, resource: str) -> str | None:
+    """读取某资源上次成功采集到的时间点（ISO 8601 UTC）"""
+    row = conn.execute(
+        "SELECT watermark FROM sync_state WHERE repo = ? AND resource = ?",
+        (repo, resource),
+    ).fetchone()
+    return row["watermark"] if row else None
+
+
+def set_watermark(conn: sqlite3.Connection, repo: str, resource: str, watermark: str) -> None:
+    """采集成功后推进水位"""
+    conn.execute(
+        "INSERT OR REPLACE INTO sync_state (repo, resource, watermark) VALUES (?, ?, ?)",
+        (repo, resource, watermark),
+    )
+    conn.commit()
+
+
+# =========================
+# 跨进程共享的 API 配额
+# =========================
+
+def set_api_budget(conn: sqlite3.Connection, key: str, total: int) -> None:
+    """初始化（或重置）一个命名的 GitHub API 请求配额"""
+    conn.execute(
+        "INSERT OR REPLACE INTO api_budget (key, total, remaining) VALUES (?, ?, ?)",
+        (key, total, total),
+    )
+    conn.commit()
+
+
+def consume_api_budget(conn: sqlite3.Connection, key: str, n: int = 1) -> bool:
+    """
+    原子地扣减配额，余量不足时返回 False。
+    配额不存在时视为不限额。
+    """
+    cur = conn.execute(
+        "UPDATE api_budget SET remaining = remaining - ? WHERE key = ? AND remaining >= ?",
+        (n, key, n),
+    )
+    conn.commit()
+    if cur.rowcount:
+        return True
+    return conn.execute("SELECT 1 FROM api_budget WHERE key = ?", (key,)).fetchone() is None
+
+
+def api_budget_usage(conn: sqlite3.Connection, key: str) -> dict | None:
+    """查询配额使用情况"""
+    row = conn.execute("SELECT total, remaining FROM api_budget WHERE key = ?", (key,)).fetchone()
+    return dict(row) if row else None
+
+
+# =========================
+# 聚合查询
+# =========================
+
+def query(conn: sqlite3.Connection, sql: str, params: tuple | dict = ()) -> list[dict[str, Any]]:
+    """执行只读查询并以字典列表返回"""
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+# 提交时间窗口条件（since / until 为 None 时不限）；authored_utc 为 ISO 8601 UTC 字符串，可直接按字符串比较
+_COMMIT_WINDOW = """
+    AND (:since IS NULL OR authored_utc >= :since)
+    AND (:until IS NULL OR authored_utc <= :until)
+"""
+
+
+def commit_heatmap(
+    conn: sqlite3.Connection,
+    repo: str,
+    tz_offset_hours: int = 8,
+    *,
+    since: str | None = None,
+    until: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    按 (星期, 小时) 统计 [since, until] 内的非 merge 提交数，时间换算到 UTC+tz_offset。
+    weekday 与 pandas 一致：0 = 周一 ... 6 = 周日。
+    """
+    modifier = f"{tz_offset_hours:+d} hours"
+    return query(
+        conn,
+        f"""
+        SELECT (CAST(strftime('%w', authored_utc, :mod) AS INTEGER) + 6) % 7 AS weekday,
+               CAST(strftime('%H', authored_utc, :mod) AS INTEGER)          AS hour,
+               COUNT(*)                                                     AS commits
+        FROM commits
+        WHERE repo = :repo AND is_merge = 0 AND authored_utc IS NOT NULL {_COMMIT_WINDOW}
+        GROUP BY weekday, hour
+        ORDER BY weekday, hour
+        """,
+        {"repo": repo, "mod": modifier, "since": since, "until": until},
+    )
+
+
+def daily_commit_counts(
+    conn: sqlite3.Connection,
+    repo: str,
+    tz_offset_hours: int = 8,
+    *,
+    since: str | None = None,
+    until: str | None = None,
+) -> list[dict[str, Any]]:
+    """按本地日期统计 [since, until] 内的非 merge 提交数"""
+    modifier = f"{tz_offset_hours:+d} hours"
+    return query(
+        conn,
+        f"""
+        SELECT date(authored_utc, :mod) AS date, COUNT(*) AS commits
+        FROM commits
+        WHERE repo = :repo AND is_merge = 0 AND authored_utc IS NOT NULL {_COMMIT_WINDOW}
+        GROUP BY date
+        ORDER BY date
+        """,
+        {"repo": repo, "mod": modifier, "since": since, "until": until},
+    )
+
+
+def function_summary(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+    """按仓库汇总 Lizard 指标（与模块 A 报告的阈值一致）"""
+    return query(
+        conn,
+        """
+        SELECT repository,
+               COUNT(*)                                  AS functions,
+               ROUND(AVG(ccn), 2)                        AS avg_ccn,
+               ROUND(AVG(nloc), 2)                       AS avg_nloc,
+               SUM(CASE WHEN ccn > 15 THEN 1 ELSE 0 END)  AS high_complexity,
+               SUM(CASE WHEN nloc > 80 THEN 1 ELSE 0 END) AS too_long,
+               SUM(CASE WHEN param > 5 THEN 1 ELSE 0 END) AS too_many_params
+        FROM functions
+        GROUP BY repository
+        ORDER BY repository
+        """,
+    )
+
+
+def finding_severity_counts(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+    """按仓库与严重性统计 Bandit 问题数"""
+    return query(
+        conn,
+        """
+        SELECT repository, severity, COUNT(*) AS findings
+        FROM findings
+        GROUP BY repository, severity
+        ORDER BY repository, severity
+        """,
+    )
+
+
+def load_module_c_window(conn: sqlite3.Connection, repo: str, since: str) -> dict[str, list[dict]]:
+    """
+    读取模块 C 评分窗口内的全部数据，并还原为 calculate_scores 所需的 GitHub 对象结构。
+    模块 B 采集的提交没有完整 message 时以 subject 代替（评分只看首行）。
+    """
+    commits = [
+        {
+            "sha": r["sha"],
+            "commit": {"message": r["message"], "author": {"date": r["authored_utc"], "name": r["author_name"]}},
+        }
+        for r in query(
+            conn,
+            """
+            SELECT sha, authored_utc, author_name, COALESCE(message, subject, '') AS message
+            FROM commits
+            WHERE repo = ? AND authored_utc >= ?
+            ORDER BY authored_utc DESC
+            """,
+            (repo, since),
+        )
+    ]
+
+    prs = []
+    for r in query(
+        conn,
+        """
+        SELECT number, state, created_at, updated_at, closed_at, merged_at, body, assignee, requested_reviewers, labels
+        FROM pull_requests
+        WHERE repo = ? AND state = 'closed' AND updated_at >= ?
+        ORDER BY updated_at DESC
+        """,
+        (repo, since),
+    ):
+        r["requested_reviewers"] = json.loads(r["requested_reviewers"] or "[]")
+        r["labels"] = json.loads(r["labels"] or "[]")
+        prs.append(r)
+
+    runs = query(
+        conn,
+        "SELECT * FROM workflow_runs WHERE repo = ? AND created_at >= ? ORDER BY created_at DESC",
+        (repo, since),
+    )
+    return {"commits": commits, "prs": prs, "runs": runs, "releases": load_releases(conn, repo, since)}
+
+
+def load_releases(conn: sqlite3.Connection, repo: str, since: str) -> list[dict]:
+    """读取窗口起点之后的发布记录（按发布时间倒序）"""
+    return query(
+        conn,
+        """
+        SELECT id, tag_name, published_at FROM releases
+        WHERE repo = ? AND published_at >= ?
+        ORDER BY published_at DESC
+        """,
+        (repo, since),
+    )
+
+
+def last_score_window(conn: sqlite3.Connection, repo: str, freq: str) -> str | None:
+    """已持久化的最近一个评分窗口的起点"""
+    row = conn.execute(
+        "SELECT MAX(window_start) AS start FROM score_windows WHERE repo = ? AND freq = ?",
+        (repo, freq),
+    ).fetchone()
+    return row["start"]
+
+
+def load_score_windows(conn: sqlite3.Connection, repo: str, freq: str) -> list[dict]:
+    """读取完整评分时间序列（按窗口起点升序）"""
+    return query(
+        conn,
+        "SELECT * FROM score_windows WHERE repo = ? AND freq = ? ORDER BY window_start",
+        (repo, freq),
+    )
+
+
+def commit_count(conn: sqlite3.Connection, repo: str) -> int:
+    """统计某仓库的非 merge 提交数"""
+    row = conn.execute(
+        "SELECT COUNT(*) AS n FROM commits WHERE repo = ? AND is_merge = 0",
+        (repo,),
+    ).fetchone()
+    return int(row["n"])
+
+
+def latest_score(conn: sqlite3.Connection, repo: str) -> dict | None:
+    """读取某仓库最近一次的模块 C 评分"""
+    row = conn.execute(
+        "SELECT payload FROM scores WHERE repo = ? ORDER BY generated_at DESC LIMIT 1",
+        (repo,),
+    ).fetchone()
+    return json.loads(row["payload"]) if row else None
@@ -0,0 +1,183 @@
+"""
+测试共用的夹具：模块 C 的 GitHub 测试服务与采集入口、本地 git 仓库
+"""
+import asyncio
+import base64
+import json
+import subprocess
+
+import pytest
+
+from scripts.github_async import AsyncGitHub
+from scripts.module_c import get_git_data, raw_store
+
+from test_github_async import FakeTransport, response
+
+
+# =========================
+# 模块 C 采集
+# =========================
+
+POM = "<plugin>spotless-maven-plugin</plugin>"
+
+
+def _rest_handler(url, params):
+    path = url.split("/repos/apache/rocketmq")[1]
+    routes = {
+        "": {"full_name": "apache/rocketmq"},
+        "/commits": [{"sha": "a"}, {"sha": "b"}],
+        "/pulls": [{"number": 2, "updated_at": "2026-02-01T00:00:00Z"},
+                   {"number": 1, "updated_at": "2025-12-01T00:00:00Z"}],
+        "/actions/runs": {"workflow_runs": [{"id": 1}]},
+        "/releases": [{"tag_name": "v5", "published_at": "2026-03-01T00:00:00Z"}],
+        "/contents/pom.xml": {"content": base64.b64encode(POM.encode()).decode()},
+        "/contents/LICENSE": {},
+    }
+    if path in routes:
+        return response(routes[path])
+    return response({"message": "Not Found"}, status=404)
+
+
+def _graphql_handler(url, body):
+    """按查询变量返回分页结果：commits 两页，PR 与 release 各一页"""
+    if not url.endswith("/graphql"):
+        return _rest_handler(url, body)
+
+    v = body["variables"]
+    repo = {"defaultBranchRef": {"name": "develop"}}
+    if v["withRepo"]:
+        repo.update({"nameWithOwner": "apache/rocketmq", "licenseInfo": {"spdxId": "Apache-2.0"}})
+        for i, path in enumerate(get_git_data.FILES_TO_CHECK):
+            if path == "LICENSE":
+                repo[f"file_{i}"] = {"__typename": "Blob"}
+            elif path == "pom.xml":
+                repo[f"file_{i}"] = {"__typename": "Blob", "text": POM}
+            else:
+                repo[f"file_{i}"] = None
+    if v["withCommits"]:
+        second = v["commitsAfter"] == "c1"
+        repo["defaultBranchRef"]["target"] = {"history": {
+            "pageInfo": {"hasNextPage": not second, "endCursor": "c2" if second else "c1"},
+            "nodes": [{
+                "oid": "b" if second else "a",
+                "message": "fix: x",
+                "author": {"name": "dev", "email": "dev@example.com", "date": "2026-01-02T00:00:00Z"},
+                "parents": {"nodes": [{"oid": "p"}]},
+            }],
+        }}
+    if v["withPrs"]:
+        repo["pullRequests"] = {
+            "pageInfo": {"hasNextPage": True, "endCursor": "p1"},
+            "nodes": [
+                {"number": 2, "body": "", "updatedAt": "2026-02-01T00:00:00Z",
+                 "assignees": {"nodes": []}, "reviewRequests": {"nodes": [{"requestedReviewer": {"login": "r"}}]},
+                 "labels": {"nodes": [{"name": "bug"}]}},
+                {"number": 1, "body": "", "updatedAt": "2025-12-01T00:00:00Z"},
+            ],
+        }
+    if v["withReleases"]:
+        repo["releases"] = {
+            "pageInfo": {"hasNextPage": False, "endCursor": "r1"},
+            "nodes": [{"databaseId": 5, "tagName": "v5", "publishedAt": "2026-03-01T00:00:00Z"}],
+        }
+    return response({"data": {"repository": repo}})
+
+
+@pytest.fixture
+def rest_handler():
+    """模块 C REST 接口的测试服务"""
+    return _rest_handler
+
+
+@pytest.fixture
+def graphql_handler():
+    """模块 C GraphQL 接口的测试服务（非 GraphQL 请求转给 REST 测试服务）"""
+    return _graphql_handler
+
+
+@pytest.fixture
+def fetch(monkeypatch, tmp_path):
+    monkeypatch.setattr(get_git_data.warehouse, "open_if_enabled", lambda: None)
+
+    def run(handler, backend, pom_analysis=False):
+        config = {
+            "paths": {"data": str(tmp_path)},
+            "project": {},
+            "module_c": {"since_date": "2026-01-01", "backend": backend, "pom_analysis": pom_analysis},
+        }
+        transport = FakeTransport(handler)
+
+        async def main():
+            async with AsyncGitHub({}, transport=transport) as gh:
+                await get_git_data.fetch(gh, config)
+
+        asyncio.run(main())
+        out = tmp_path / "module_c"
+
+        def load(name):
+            if name.endswith(".json"):
+                return json.loads((out / name).read_text(encoding="utf-8"))
+            return raw_store.read_records(out, name)
+
+        return transport, load
+
+    return run
+
+
+# =========================
+# 本地 git 仓库
+# =========================
+
+ORIGIN = "https://github.com/apache/rocketmq.git"
+
+STYLED_POM = "<project><build><plugins><plugin>spotless-maven-plugin</plugin></plugins></build></project>"
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def _commit(repo, files, message="init"):
+    for path, text in files.items():
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_text(text, encoding="utf-8")
+    _git(repo, "add", "-A")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", message)
+
+
+@pytest.fixture
+def git():
+    """git(cwd, *args)：在 cwd 下执行 git 命令"""
+    return _git
+
+
+@pytest.fixture
+def git_commit():
+    """git_commit(repo, {路径: 内容}, message)：写入文件并提交"""
+    return _commit
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    repo = tmp_path / "upstream"
+    _git(tmp_path, "init", "-q", str(repo))
+    _commit(repo, {
+        "LICENSE": "Apache",
+        "README.md": "# RocketMQ",
+        "pom.xml": "<project><modules><module>broker</module></modules></project>",
+        "broker/pom.xml": STYLED_POM,
+        ".github/workflows/ci.yml": "on: push",
+    })
+    return repo
+
+
+@pytest.fixture
+def clone(tmp_path, upstream):
+    repo = tmp_path / "temp_repos" / "rocketmq"
+    _git(tmp_path, "clone", "-q", str(upstream), str(repo))
+    # origin 指向 GitHub，实际的 ls-remote / fetch 由 insteadOf 转到本地的 upstream
+    _git(repo, "remote", "set-url", "origin", ORIGIN)
+    _git(repo, "config", f"url.{upstream.as_uri()}.insteadOf", ORIGIN)
+    # 工作区中未提交的修改不影响结果
+    (repo / "CONTRIBUTING.md").write_text("untracked", encoding="utf-8")
+    return repo
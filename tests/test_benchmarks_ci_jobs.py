@@ -0,0 +1,17 @@
+"""
+测试 CI job 计时基准：重复采集只请求新完成的运行
+"""
+import asyncio
+
+from benchmarks import bench_ci_jobs, bench_github_backends
+
+
+def test_repeat_collect_only_fetches_new_runs(tmp_path):
+    simulated = bench_github_backends.SimulatedGitHub(0, 0, 0, latency=0, bandwidth_mbps=1e6, runs=50)
+    runs = simulated.rest["actions/runs"]
+
+    cold = asyncio.run(bench_ci_jobs.run_collect(simulated, runs[5:], tmp_path))
+    repeat = asyncio.run(bench_ci_jobs.run_collect(simulated, runs, tmp_path))
+
+    assert (cold["requests"], cold["fetched"]) == (45, 45)
+    assert (repeat["requests"], repeat["fetched"], repeat["cached"]) == (5, 5, 45)
@@ -0,0 +1,21 @@
+"""
+测试 REST / GraphQL 后端对比基准的模拟服务
+"""
+import asyncio
+
+from benchmarks import bench_github_backends as bench
+from scripts.module_c import get_git_data
+
+
+def test_simulated_backends_return_the_same_data():
+    simulated = bench.SimulatedGitHub(commits=250, prs=120, releases=5, latency=0, bandwidth_mbps=1e6)
+    sinces = {resource: "2013-01-01T00:00:00Z" for resource in get_git_data.RESOURCES}
+
+    rest = asyncio.run(bench.run_backend("rest", {}, simulated, bench.OWNER, bench.NAME, sinces))
+    graphql = asyncio.run(bench.run_backend("graphql", {}, simulated, bench.OWNER, bench.NAME, sinces))
+
+    for key in ("commits", "prs", "releases"):
+        assert rest[key] == graphql[key]
+    assert (rest["commits"], rest["prs"], rest["releases"]) == (250, 120, 5)
+    assert graphql["requests"] == 3
+    assert graphql["kib"] < rest["kib"]
@@ -0,0 +1,28 @@
+"""
+测试回放服务基准：合成夹具经本地服务回放后两个后端的数据一致
+"""
+import asyncio
+
+from benchmarks import bench_github_backends, bench_github_replay as bench
+from scripts import mock_github_server
+from scripts.module_c import get_git_data
+
+
+def test_simulated_fixtures_replay_without_misses(tmp_path, monkeypatch):
+    owner, name = bench_github_backends.OWNER, bench_github_backends.NAME
+    sinces = {resource: "2013-01-01T00:00:00Z" for resource in get_git_data.RESOURCES}
+    bench.simulate_fixtures(tmp_path, owner, name, sinces)
+
+    server = mock_github_server.start_server(fixtures=tmp_path)
+    monkeypatch.setenv("GITHUB_API_URL", server.base_url)
+    try:
+        rest = asyncio.run(bench.run_fetch("rest", {}, owner, name, sinces))
+        graphql = asyncio.run(bench.run_fetch("graphql", {}, owner, name, sinces))
+    finally:
+        server.shutdown()
+
+    assert server.misses == 0
+    for key in ("commits", "prs", "runs"):
+        assert rest[key] == graphql[key]
+    assert (rest["commits"], rest["runs"]) == (2000, 1000)
+    assert graphql["requests"] < rest["requests"]
@@ -0,0 +1,29 @@
+"""
+测试离线流水线基准：按 --stages 过滤时前置阶段在计时前执行
+"""
+from benchmarks import bench_pipeline
+
+
+def test_filtered_stage_runs_prerequisites_untimed(monkeypatch):
+    order = []
+    monkeypatch.setattr(bench_pipeline, "STAGE_BUILDERS", {"b": lambda n, work, plots: [
+        ("b.clean", lambda: order.append("clean"), ()),
+        ("b.load", lambda: order.append("load"), ("b.clean",)),
+        ("b.build", lambda: order.append("build"), ("b.load",)),
+        ("b.plot", lambda: order.append("plot"), ("b.load",)),
+    ]})
+
+    results = bench_pipeline.run([10], ["b.build", "b.plot"], repeat=2, plots=True)
+
+    # 前置阶段各执行一次且不计入结果
+    assert order == ["clean", "load", "build", "build", "plot", "plot"]
+    assert [r["stage"] for r in results] == ["b.build", "b.plot"]
+
+
+def test_module_b_stages_run_standalone(tmp_path):
+    stages = bench_pipeline.module_b_stages(200, tmp_path, plots=False)
+    done = set()
+    bench_pipeline.prepare("b.build_markdown", stages, done)
+
+    assert done == {"b.clean_commits_csv", "b.load_and_process_data"}
+    dict((name, fn) for name, fn, _ in stages)["b.build_markdown"]()
@@ -0,0 +1,45 @@
+"""
+测试基准合成数据 (benchmarks/synthetic.py) 与各阶段输入格式一致
+"""
+import pandas as pd
+
+from benchmarks import synthetic
+from scripts.module_b import clean_git_data as b_clean
+from scripts.module_c.clean_git_data import calculate_scores
+
+
+def test_parse_scale():
+    assert synthetic.parse_scale("10k") == 10_000
+    assert synthetic.parse_scale("1.5m") == 1_500_000
+    assert synthetic.parse_scale("2500") == 2500
+
+
+def test_commits_csv_feeds_module_b_cleaner(tmp_path):
+    raw, clean = tmp_path / "commits.csv", tmp_path / "clean_commits.csv"
+    synthetic.commits_csv(str(raw), 500)
+
+    b_clean.clean_commits_csv(str(raw), str(clean))
+    df = pd.read_csv(clean)
+
+    assert list(df.columns) == ["time", "name"]
+    assert 0 < len(df) < 500  # Merge 提交被过滤
+
+
+def test_github_payloads_feed_module_c_scoring():
+    data = calculate_scores(
+        synthetic.github_commits(300),
+        synthetic.github_prs(50),
+        synthetic.github_runs(100),
+        synthetic.github_releases(12),
+        synthetic.FILES_STATUS,
+        generated_at="2026-01-01 00:00:00",
+    )
+    assert 0 < data["version_control"]["commit_norm"] < 15
+    assert 0 < data["total_score"] <= 100
+
+
+def test_module_a_frames_are_reproducible():
+    a, b = synthetic.lizard_results(100, seed=1), synthetic.lizard_results(100, seed=1)
+    pd.testing.assert_frame_equal(a, b)
+    assert {"high_complexity", "too_long", "too_many_params"} <= set(a.columns)
+    assert set(synthetic.bandit_results(100)["severity"]) <= set(synthetic.SEVERITIES)
@@ -0,0 +1,132 @@
+"""
+测试异步 GitHub 客户端 (github_async.py) 的分页、并发上限与重试
+"""
+import asyncio
+import json
+
+import pytest
+import requests
+
+from scripts.github_async import AsyncGitHub, GitHubResponse
+
+
+class FakeTransport:
+    """
+    按 handler(url, params) 返回响应或抛出异常的传输层，记录请求与最大在途数
+    （POST 请求以请求体代替 params 传给 handler）
+    """
+    name = "fake"
+    transient_errors = (TimeoutError,)
+
+    def __init__(self, handler, delay=0.0):
+        self.handler = handler
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def request(self, method, url, headers, params, body, timeout):
+        params = body if method == "POST" else dict(params or {})
+        self.calls.append(params)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            result = self.handler(url, params)
+        finally:
+            self.in_flight -= 1
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def aclose(self):
+        pass
+
+
+def response(data, status=200, headers=None):
+    return GitHubResponse("https://api.github.com/x", status, headers or {}, json.dumps(data).encode())
+
+
+def paged(pages):
+    """第 page 页返回 pages[page - 1]，并带上 rel="last" 的 Link 头"""
+    link = f'<https://api.github.com/x?per_page=100&page={len(pages)}>; rel="last"'
+
+    def handler(url, params):
+        return response(pages[params["page"] - 1], headers={"Link": link} if len(pages) > 1 else {})
+
+    return handler
+
+
+def run(transport, coro_fn, **kwargs):
+    async def main():
+        async with AsyncGitHub({}, transport=transport, **kwargs) as gh:
+            return await coro_fn(gh)
+
+    return asyncio.run(main())
+
+
+def test_paginate_fetches_all_pages_in_order():
+    transport = FakeTransport(paged([[1, 2], [3, 4], [5, 6], [7]]))
+
+    items = run(transport, lambda gh: gh.paginate("https://api.github.com/x"))
+
+    assert items == [1, 2, 3, 4, 5, 6, 7]
+    assert sorted(c["page"] for c in transport.calls) == [1, 2, 3, 4]
+
+
+def test_paginate_stops_at_window_boundary():
+    pages = [
+        {"workflow_runs": [{"t": "2026-03"}, {"t": "2026-02"}]},
+        {"workflow_runs": [{"t": "2026-01"}, {"t": "2025-12"}]},
+        {"workflow_runs": [{"t": "2025-11"}]},
+        {"workflow_runs": [{"t": "2025-10"}]},
+    ]
+    transport = FakeTransport(paged(pages))
+
+    items = run(transport, lambda gh: gh.paginate(
+        "https://api.github.com/x",
+        item_key="workflow_runs",
+        window=1,
+        stop=lambda page: page[-1]["t"] < "2026-01",
+    ))
+
+    assert [i["t"] for i in items] == ["2026-03", "2026-02", "2026-01", "2025-12"]
+    assert [c["page"] for c in transport.calls] == [1, 2]
+
+
+def test_concurrency_is_bounded_by_semaphore():
+    transport = FakeTransport(paged([[i] for i in range(30)]), delay=0.01)
+
+    items = run(transport, lambda gh: gh.paginate("https://api.github.com/x"), concurrency=5)
+
+    assert items == list(range(30))
+    assert transport.max_in_flight == 5
+
+
+def test_get_retries_transient_errors_and_5xx():
+    script = [TimeoutError(), response({}, status=502), response({"ok": True})]
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    transport = FakeTransport(lambda url, params: script.pop(0))
+    data = run(transport, lambda gh: gh.get_json("https://api.github.com/x"), sleep=sleep)
+
+    assert data == {"ok": True}
+    assert len(transport.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_get_waits_for_rate_limit_then_raises_on_client_error():
+    script = [response({}, status=429, headers={"Retry-After": "7"}), response({}, status=404)]
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    transport = FakeTransport(lambda url, params: script.pop(0))
+    with pytest.raises(requests.HTTPError):
+        run(transport, lambda gh: gh.get("https://api.github.com/x"), sleep=sleep)
+
+    assert sleeps == [7.0]
@@ -0,0 +1,70 @@
+"""
+测试延迟导入 (lazy_imports.py) 与配置缓存 (config_utils.py)
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from scripts import config_utils
+from scripts.lazy_imports import IMPORT_TIMINGS, is_loaded, lazy_import
+
+repo_root = Path(__file__).parent.parent
+
+
+def test_lazy_import_defers_until_attribute_access():
+    sys.modules.pop("colorsys", None)
+    module = lazy_import("colorsys")
+    assert not is_loaded(module)
+
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert is_loaded(module)
+    assert "colorsys" in IMPORT_TIMINGS
+
+
+def test_load_config_is_parsed_once_per_env(monkeypatch):
+    monkeypatch.delenv("RMQ_REPO_OWNER", raising=False)
+    monkeypatch.delenv("RMQ_REPO_NAME", raising=False)
+    monkeypatch.delenv("RMQ_FLEET_NAMESPACE", raising=False)
+
+    first = config_utils.load_config()
+    assert config_utils.load_config() is first
+
+    monkeypatch.setenv("RMQ_REPO_OWNER", "apache")
+    monkeypatch.setenv("RMQ_REPO_NAME", "rocketmq-dashboard")
+    fleet = config_utils.load_config()
+    assert fleet is not first
+    assert fleet["project"]["repo_name"] == "rocketmq-dashboard"
+
+
+def test_module_d_startup_does_not_import_heavy_dependencies():
+    code = (
+        "import sys; import scripts.module_d.main; "
+        "heavy = [m for m in ('pandas', 'matplotlib', 'seaborn', 'openai') if m in sys.modules]; "
+        "print(','.join(heavy))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=repo_root,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_project_root_from_env_or_working_directory(tmp_path, monkeypatch):
+    # 模拟安装到 site-packages：包目录的上一级没有 config.yaml
+    monkeypatch.setattr(config_utils, "ROOT_DIR", tmp_path / "site-packages")
+    project = tmp_path / "project"
+    (project / "docs").mkdir(parents=True)
+    (project / "config.yaml").write_text("project:\n  name: demo\n", encoding="utf-8")
+    monkeypatch.delenv(config_utils.ROOT_ENV, raising=False)
+
+    monkeypatch.chdir(project / "docs")
+    assert config_utils.find_project_root() == project.resolve()
+    config = config_utils.load_config()
+    assert config["paths"]["data"] == str(project.resolve() / "data")
+
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError, match=config_utils.ROOT_ENV):
+        config_utils.load_config()
+
+    monkeypatch.setenv(config_utils.ROOT_ENV, str(project))
+    assert config_utils.load_config()["project"]["name"] == "demo"
@@ -0,0 +1,94 @@
+"""
+测试阶段内存画像 (memory_profile.py)
+"""
+import tracemalloc
+
+import pytest
+
+from scripts import memory_profile
+from scripts import module_utils
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(memory_profile.PROFILE_DIR_ENV, str(tmp_path))
+    monkeypatch.delenv("RMQ_FLEET_NAMESPACE", raising=False)
+    monkeypatch.setattr(memory_profile, "_records", [])
+    yield tmp_path
+    tracemalloc.stop()
+
+
+def test_measure_is_noop_when_disabled(tmp_path, monkeypatch):
+    monkeypatch.delenv(memory_profile.PROFILE_DIR_ENV, raising=False)
+    monkeypatch.setattr(memory_profile, "_records", [])
+    with memory_profile.measure("stage"):
+        pass
+    assert memory_profile._records == []
+
+
+def test_measure_records_stage_and_marks_running_stage(profile_dir):
+    with memory_profile.measure("alloc", module="Module B"):
+        data = [bytes(1024) for _ in range(5000)]
+        running = memory_profile.load_records(profile_dir)
+    del data
+
+    assert running[0]["status"] == "running"
+
+    record = memory_profile.load_records(profile_dir)[0]
+    assert record["module"] == "Module B"
+    assert record["status"] == "ok"
+    assert record["traced_peak_mb"] >= 4.0
+    assert record["top_allocations"]
+    assert record["peak_rss_mb"] is None or record["peak_rss_mb"] > 0
+
+
+def test_run_step_profiles_each_step(profile_dir):
+    assert module_utils.run_step(1, 2, "ok step", lambda: None, module_label="Module C")
+
+    def boom():
+        raise RuntimeError("x")
+
+    assert not module_utils.run_step(2, 2, "bad step", boom, module_label="Module C")
+
+    summary = memory_profile.summarize(memory_profile.load_records(profile_dir))
+    assert summary["stages"]["Module C / ok step"]["status"] == "ok"
+    assert summary["stages"]["Module C / bad step"]["status"] == "error: RuntimeError"
+
+
+def test_summarize_flags_regressions_and_incomplete_stages():
+    records = [
+        {"module": "Module B", "stage": "clean", "status": "ok", "peak_rss_mb": 300.0, "traced_peak_mb": 50.0},
+        {"module": "Module B", "stage": "plot", "status": "running", "rss_before_mb": 310.0},
+    ]
+    previous = {"Module B / clean": {"peak_rss_mb": 200.0, "traced_peak_mb": 48.0}}
+
+    summary = memory_profile.summarize(records, previous=previous, regression_pct=20)
+
+    assert summary["max_peak_rss_mb"] == 300.0
+    assert summary["incomplete"] == ["Module B / plot"]
+    assert summary["regressions"] == [
+        {"stage": "Module B / clean", "metric": "peak_rss_mb", "previous": 200.0, "current": 300.0}
+    ]
+    assert "Module B / plot" in memory_profile.format_summary(summary)
+
+
+def test_peak_rss_is_per_stage(profile_dir):
+    if memory_profile.current_rss() is None:
+        pytest.skip("无法读取 RSS")
+    with memory_profile.measure("heavy"):
+        data = b"\x01" * (100 * memory_profile._MB)
+    del data
+    with memory_profile.measure("light"):
+        pass
+
+    heavy, light = memory_profile.load_records(profile_dir)
+    assert heavy["peak_rss_mb"] >= heavy["rss_before_mb"] + 90
+    # 较轻的后续阶段不再继承进程级峰值
+    assert light["peak_rss_mb"] < heavy["peak_rss_mb"] - 50
+    if light["process_peak_rss_mb"] is not None:
+        assert light["process_peak_rss_mb"] > light["peak_rss_mb"] + 50
+
+    previous = {f"{light['module']} / light": {"peak_rss_mb": light["peak_rss_mb"],
+                                               "process_peak_rss_mb": 1.0}}
+    summary = memory_profile.summarize([light], previous=previous)
+    assert summary["regressions"] == []
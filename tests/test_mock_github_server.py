@@ -0,0 +1,151 @@
+"""
+测试本地 GitHub API 录制 / 回放服务 (mock_github_server.py, github_recorder.py)
+"""
+import asyncio
+import json
+
+import pytest
+import requests
+
+from scripts import github_recorder, mock_github_server
+from scripts.github_async import AsyncGitHub
+from scripts.module_utils import github_api_url
+
+UPSTREAM = "https://api.github.com"
+COMMITS = "/repos/apache/rocketmq/commits"
+
+
+def _record(directory, path, body, *, query="", method="GET", request_body=None, headers=None):
+    key = github_recorder.fixture_key(method, path, query, request_body)
+    github_recorder.record(
+        key, method=method, path=path, query=query, status=200, headers=headers or {},
+        content=json.dumps(body).encode(), upstream=UPSTREAM, directory=directory,
+    )
+
+
+def _get(path, params, headers=None, sleep=asyncio.sleep):
+    async def main():
+        async with AsyncGitHub(headers or {}, sleep=sleep) as gh:
+            return await gh.get(path, params=params)
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    directory = tmp_path / "fixtures"
+    _record(directory, COMMITS, [{"sha": "a"}], query="since=2026-01-01&page=1", headers={
+        "Link": f'<{UPSTREAM}{COMMITS}?since=2026-01-01&page=2>; rel="last"',
+        "ETag": 'W/"abc"',
+        "X-RateLimit-Remaining": "4999",
+        "Authorization-Echo": "secret",
+    })
+    return directory
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    servers = []
+
+    def start(**kwargs):
+        server = mock_github_server.start_server(**kwargs)
+        servers.append(server)
+        monkeypatch.setenv("GITHUB_API_URL", server.base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_api_url_is_configurable(monkeypatch):
+    monkeypatch.setenv("GITHUB_API_URL", "http://127.0.0.1:9/")
+    assert github_api_url(COMMITS) == f"http://127.0.0.1:9{COMMITS}"
+    assert github_api_url("https://example.com/x") == "https://example.com/x"
+    monkeypatch.delenv("GITHUB_API_URL")
+    assert github_api_url("/graphql") == "https://api.github.com/graphql"
+
+
+def test_replay_headers_etag_and_misses(serve, fixtures):
+    server = serve(fixtures=fixtures)
+
+    # 参数顺序与 until（随运行时间变化）不影响命中
+    resp = _get(COMMITS, {"page": 1, "since": "2026-01-01", "until": "2026-10-19T00:00:00Z"})
+    assert resp.json() == [{"sha": "a"}]
+    assert resp.headers["Link"] == f'<{server.base_url}{COMMITS}?since=2026-01-01&page=2>; rel="last"'
+    assert resp.headers["X-RateLimit-Remaining"] == "4999"
+    assert "Authorization-Echo" not in resp.headers
+
+    cached = requests.get(f"{server.base_url}{COMMITS}?since=2026-01-01&page=1",
+                          headers={"If-None-Match": 'W/"abc"'}, timeout=5)
+    assert cached.status_code == 304 and cached.content == b""
+
+    with pytest.raises(requests.HTTPError):
+        _get(COMMITS, {"page": 9})
+    assert (server.requests, server.not_modified, server.misses) == (3, 1, 1)
+
+
+def test_injected_errors_are_retried(serve, fixtures):
+    server = serve(fixtures=fixtures, error_rate=1.0)
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    with pytest.raises(requests.HTTPError) as err:
+        _get(COMMITS, {"since": "2026-01-01", "page": 1}, sleep=sleep)
+
+    assert err.value.response.status_code == 502
+    assert server.errors == len(delays) + 1 == 4
+
+
+def test_rate_limit_exhaustion_waits_for_reset(serve, fixtures):
+    server = serve(fixtures=fixtures, rate_limit=1, rate_limit_window=0.2)
+    params = {"since": "2026-01-01", "page": 1}
+    waits = []
+
+    async def sleep(wait):
+        waits.append(wait)
+        await asyncio.sleep(0.3)
+
+    first = _get(COMMITS, params)
+    assert first.headers["X-RateLimit-Remaining"] == "0"
+    second = _get(COMMITS, params, sleep=sleep)
+
+    assert second.json() == [{"sha": "a"}]
+    assert server.rate_limited == 1 and len(waits) == 1
+
+
+def test_record_mode_proxies_and_records(serve, fixtures, tmp_path):
+    upstream = serve(fixtures=fixtures)
+    recorded = tmp_path / "recorded"
+    recorder = serve(fixtures=recorded, upstream=upstream.base_url)
+
+    data = _get(COMMITS, {"since": "2026-01-01", "page": 1}, headers={"Authorization": "Bearer secret"}).json()
+    assert data == [{"sha": "a"}]
+    assert recorder.recorded == 1
+
+    (path,) = recorded.glob("*.json")
+    fixture = json.loads(path.read_text(encoding="utf-8"))
+    assert fixture["path"] == COMMITS and fixture["status"] == 200
+    assert "secret" not in path.read_text(encoding="utf-8")
+    assert fixture["headers"]["etag"] == 'W/"abc"'
+
+    replay = serve(fixtures=recorded)
+    resp = _get(COMMITS, {"since": "2026-01-01", "page": 1})
+    assert resp.json() == data
+    assert resp.headers["Link"].startswith(f"<{replay.base_url}{COMMITS}")
+
+
+def test_async_client_graphql_replay(serve, tmp_path):
+    query = "query { viewer { login } }"
+    body = json.dumps({"query": query, "variables": {}}).encode()
+    _record(tmp_path, "/graphql", {"data": {"viewer": {"login": "dev"}}}, method="POST", request_body=body)
+    server = serve(fixtures=tmp_path)
+
+    async def main():
+        async with AsyncGitHub({}) as gh:
+            return await gh.graphql(query)
+
+    assert asyncio.run(main()) == {"viewer": {"login": "dev"}}
+    assert server.requests == 1 and server.misses == 0
@@ -1,18 +1,10 @@
 """
 测试模块A的报告生成器
 """
-import os
-import sys
-from pathlib import Path
-
 import pandas as pd
 import pytest
 
-# 添加 scripts 目录到路径
-repo_root = Path(__file__).parent.parent
-sys.path.insert(0, str(repo_root / "scripts"))
-
-from module_a import report_generator
+from scripts.module_a import report_generator
 
 
 def test_safe_pct():
@@ -0,0 +1,98 @@
+"""
+测试 module_b/get_git_data.py 的断点续传
+"""
+import csv
+import json
+
+import pytest
+
+from scripts.github_async import AsyncGitHub
+from scripts.module_b import get_git_data
+
+from test_github_async import FakeTransport, response
+
+
+def _commit(sha, parents=1):
+    return {
+        "sha": sha,
+        "parents": [{}] * parents,
+        "commit": {
+            "author": {"date": "2026-01-01T00:00:00Z", "name": "dev", "email": "dev@example.com"},
+            "message": f"fix {sha}\n\nbody",
+        },
+    }
+
+
+@pytest.fixture
+def crawl(monkeypatch, tmp_path):
+    monkeypatch.setattr(get_git_data, "CONFIG", {"paths": {"data": str(tmp_path)}, "project": {}, "module_b": {}})
+    monkeypatch.setattr(get_git_data, "load_github_token", lambda **kwargs: "token")
+    monkeypatch.setattr(get_git_data.warehouse, "open_if_enabled", lambda: None)
+
+    def run(pages, fail_on=None):
+        def handler(url, params):
+            page = params["page"]
+            if page == fail_on:
+                return RuntimeError("502 Bad Gateway")
+            link = f'<{url}?page={len(pages)}>; rel="last"' if page < len(pages) else None
+            return response(pages[page - 1] if page <= len(pages) else [], headers={"Link": link} if link else {})
+
+        transport = FakeTransport(handler)
+        monkeypatch.setattr(get_git_data, "AsyncGitHub", lambda headers: AsyncGitHub(headers, transport=transport))
+        get_git_data.main()
+        return [(c["page"], c["until"]) for c in transport.calls]
+
+    return run, tmp_path / "module_b"
+
+
+def _shas(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["sha"] for row in csv.DictReader(f)]
+
+
+def test_failed_crawl_leaves_no_commits_csv_and_resumes(crawl):
+    run, data_dir = crawl
+    pages = [[_commit("a"), _commit("m", parents=2)], [_commit("b")], [_commit("c")]]
+
+    with pytest.raises(RuntimeError):
+        run(pages, fail_on=3)
+
+    assert not (data_dir / "commits.csv").exists()
+    checkpoint = json.loads((data_dir / get_git_data.CHECKPOINT_FILE).read_text(encoding="utf-8"))
+    assert checkpoint["page"] == 2
+    assert checkpoint["rows"] == 2
+
+    # 续传时分页发生偏移：第 3 页重新包含了已写入的 b
+    pages[2] = [_commit("b"), _commit("c")]
+    requested = run(pages)
+
+    assert requested[0] == (3, checkpoint["until"])
+    assert _shas(data_dir / "commits.csv") == ["a", "b", "c"]
+    assert not (data_dir / get_git_data.CHECKPOINT_FILE).exists()
+    assert not (data_dir / "commits.csv.partial").exists()
+
+
+def test_resume_discards_rows_written_after_checkpoint(crawl):
+    run, data_dir = crawl
+    pages = [[_commit("a")], [_commit("b")]]
+
+    with pytest.raises(RuntimeError):
+        run(pages, fail_on=2)
+    with open(data_dir / "commits.csv.partial", "a", encoding="utf-8") as f:
+        f.write("2026-01-01T00:00:00Z,half-writ")
+
+    run(pages)
+
+    assert _shas(data_dir / "commits.csv") == ["a", "b"]
+
+
+def test_checkpoint_for_other_repo_is_ignored(crawl):
+    run, data_dir = crawl
+    data_dir.mkdir(parents=True)
+    (data_dir / get_git_data.CHECKPOINT_FILE).write_text(
+        json.dumps({"repo": "other/repo", "since": "x", "until": "y", "page": 5, "offset": 0}), encoding="utf-8")
+
+    requested = run([[_commit("a")]])
+
+    assert requested[0][0] == 1
+    assert _shas(data_dir / "commits.csv") == ["a"]
@@ -1,15 +1,6 @@
-import os
-import sys
-
 import pandas as pd
 
-
-repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-scripts_dir = os.path.join(repo_root, "scripts")
-if scripts_dir not in sys.path:
-    sys.path.insert(0, scripts_dir)
-
-from module_b import report_generator
+from scripts.module_b import report_generator
 
 def _import_report_generator():
     return report_generator
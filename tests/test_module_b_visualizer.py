@@ -0,0 +1,76 @@
+"""
+测试模块 B 图表的分析库聚合与 clean_commits.csv 口径一致 (visualizer.py)
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from scripts import warehouse
+from scripts.module_b import get_git_data, visualizer
+from scripts.module_b.clean_git_data import clean_commits_csv
+
+REPO = "apache/rocketmq"
+
+B_COMMITS = [
+    {"authored_utc": "2026-02-01T20:00:00Z", "sha": "b1", "author_name": "alice", "subject": "fix: y"},
+    {"authored_utc": "2026-02-03T02:00:00Z", "sha": "b2", "author_name": "bob", "subject": "feat: x"},
+    {"authored_utc": "2026-02-04T12:30:00Z", "sha": "b3", "author_name": "bob", "subject": "Merge branch 'develop'"},
+]
+
+# 模块 C 在模块 B 采集之后写入：一条重复、一条窗口外的新提交、一条窗口外的 merge、一条窗口前的旧提交
+C_COMMITS = [
+    {"sha": "b1", "commit": {"message": "fix: y\n\nbody", "author": {"date": "2026-02-01T20:00:00Z"}}},
+    {"sha": "c1", "commit": {"message": "docs: z", "author": {"date": "2026-02-10T03:00:00Z"}}},
+    {"sha": "c2", "commit": {"message": "Merge pull request #1", "author": {"date": "2026-02-11T03:00:00Z"}},
+     "parents": [{"sha": "p1"}, {"sha": "p2"}]},
+    {"sha": "c3", "commit": {"message": "chore: old", "author": {"date": "2025-12-31T23:00:00Z"}}},
+]
+
+
+@pytest.fixture
+def module_b(tmp_path, monkeypatch):
+    db = tmp_path / "warehouse.db"
+    monkeypatch.setattr(warehouse, "open_if_enabled", lambda: warehouse.connect(db))
+    monkeypatch.setattr(visualizer, "CONFIG", {"project": {}, "module_b": {"since_date": "2026-01-01"}})
+
+    pd.DataFrame(B_COMMITS).to_csv(tmp_path / "commits.csv", index=False)
+    clean_commits_csv(str(tmp_path / "commits.csv"), str(tmp_path / "clean_commits.csv"))
+
+    conn = warehouse.connect(db)
+    warehouse.upsert_commits(conn, REPO, B_COMMITS)
+    warehouse.mark_merge_subjects(conn, REPO)
+    warehouse.upsert_commits(conn, REPO, C_COMMITS)
+    conn.close()
+    return tmp_path
+
+
+def _check_counts(df, heatmap, daily):
+    expected = pd.crosstab(df["weekday"], df["hour"])
+    cells = {(c["weekday"], c["hour"]): c["commits"] for c in heatmap}
+    assert cells == {(w, h): n for (w, h), n in expected.stack().items() if n}
+
+    per_day = df.groupby("date").size()
+    assert {c["date"]: c["commits"] for c in daily} == {str(d): n for d, n in per_day.items()}
+
+
+def test_counts_match_csv_with_recorded_window(module_b):
+    (module_b / get_git_data.WINDOW_FILE).write_text(json.dumps(
+        {"repo": REPO, "since": "2026-01-01T00:00:00Z", "until": "2026-02-05T00:00:00Z"}), encoding="utf-8")
+    df = visualizer.load_and_process_data(str(module_b / "clean_commits.csv"))
+
+    window = visualizer.commit_window(df, module_b)
+    assert window == ("2026-01-01T00:00:00Z", "2026-02-05T00:00:00Z")
+    _check_counts(df, *visualizer.load_warehouse_counts(*window))
+
+
+def test_counts_match_csv_without_recorded_window(module_b):
+    df = visualizer.load_and_process_data(str(module_b / "clean_commits.csv"))
+
+    window = visualizer.commit_window(df, module_b)
+    assert window == ("2026-01-01T00:00:00Z", "2026-02-03T02:00:00Z")
+    _check_counts(df, *visualizer.load_warehouse_counts(*window))
+
+    # 不限窗口时会混入模块 C 的提交
+    heatmap, _ = visualizer.load_warehouse_counts()
+    assert sum(c["commits"] for c in heatmap) == len(df) + 2
@@ -0,0 +1,174 @@
+"""
+测试模块 C 的 CI job 计时采集、缓存与统计 (ci_jobs.py)
+"""
+import asyncio
+
+from scripts import warehouse
+from scripts.github_async import AsyncGitHub
+from scripts.module_c import ci_jobs, get_git_data, report_generator
+
+from test_github_async import FakeTransport, response
+
+BASE = "https://api.github.com/repos/apache/rocketmq"
+
+
+def job(name, created, started, completed, conclusion="success", steps=()):
+    return {
+        "id": hash((name, started)), "name": name, "conclusion": conclusion, "runner_name": "GitHub Actions 2",
+        "created_at": created, "started_at": started, "completed_at": completed,
+        "steps": [{"name": s, "number": i, "conclusion": conclusion, "started_at": started, "completed_at": completed}
+                  for i, s in enumerate(steps)],
+    }
+
+
+JOBS = {
+    1: [job("build", "2026-01-01T00:00:00Z", "2026-01-01T00:00:10Z", "2026-01-01T00:05:10Z", steps=["mvn"]),
+        job("test", "2026-01-01T00:00:00Z", "2026-01-01T00:01:00Z", "2026-01-01T00:11:00Z", steps=["mvn"])],
+    2: [job("build", "2026-01-02T00:00:00Z", "2026-01-02T00:00:30Z", "2026-01-02T00:03:30Z")],
+    3: [job("build", "2026-01-03T00:00:00Z", "2026-01-03T00:02:00Z", "2026-01-03T00:02:00Z", conclusion="skipped")],
+}
+
+
+def run(run_id, created, status="completed", attempt=1):
+    return {"id": run_id, "run_attempt": attempt, "name": "CI", "status": status, "conclusion": "success",
+            "created_at": created}
+
+
+def collect(runs, cache, fail=(), **kwargs):
+    urls = []
+
+    def handler(url, params):
+        urls.append(url)
+        run_id = int(url.split("/runs/")[1].split("/")[0])
+        if run_id in fail:
+            return response({"message": "Not Found"}, status=404)
+        return response({"total_count": len(JOBS[run_id]), "jobs": JOBS[run_id]})
+
+    async def main():
+        async with AsyncGitHub({}, transport=FakeTransport(handler)) as gh:
+            return await ci_jobs.collect(gh, BASE, runs, cache, **kwargs)
+
+    return asyncio.run(main()), urls
+
+
+def test_collect_fetches_only_new_completed_runs(tmp_path):
+    runs = [run(2, "2026-01-02T00:00:00Z"), run(1, "2026-01-01T00:00:00Z"),
+            run(4, "2026-01-04T00:00:00Z", status="in_progress")]
+    cache = ci_jobs.load_cache(tmp_path)
+    counts, urls = collect(runs, cache)
+
+    assert sorted(urls) == [f"{BASE}/actions/runs/1/jobs", f"{BASE}/actions/runs/2/jobs"]
+    assert (counts["fetched"], counts["cached"]) == (2, 0)
+    # 只保留计时相关字段
+    assert set(cache["1:1"]["jobs"][0]) == {"id", "name", "conclusion", "created_at", "started_at", "completed_at",
+                                            "steps"}
+    assert set(cache["1:1"]["jobs"][0]["steps"][0]) == {"name", "conclusion", "started_at", "completed_at"}
+    ci_jobs.save_cache(tmp_path, cache, "gzip")
+
+    # 重复采集：已缓存的运行不再请求，重新运行（新的 run_attempt）重新采集
+    cache = ci_jobs.load_cache(tmp_path)
+    runs += [run(3, "2026-01-03T00:00:00Z"), run(2, "2026-01-02T00:00:00Z", attempt=2)]
+    counts, urls = collect(runs, cache)
+    assert sorted(urls) == [f"{BASE}/actions/runs/2/jobs", f"{BASE}/actions/runs/3/jobs"]
+    assert (counts["fetched"], counts["cached"]) == (2, 2)
+    assert set(cache) == {"1:1", "2:1", "2:2", "3:1"}
+
+
+def test_collect_defers_and_retries():
+    runs = [run(i, f"2026-01-0{i}T00:00:00Z") for i in (1, 2, 3)]
+    cache = {}
+    counts, urls = collect(runs, cache, fail={3}, max_new=2)
+
+    # 最新的两个运行先采集，其中失败的不写入缓存
+    assert sorted(urls) == [f"{BASE}/actions/runs/2/jobs", f"{BASE}/actions/runs/3/jobs"]
+    assert counts == {"completed": 3, "fetched": 1, "cached": 0, "failed": 1, "pending": 1}
+    assert set(cache) == {"2:1"}
+
+    counts, urls = collect(runs, cache)
+    assert len(urls) == 2 and set(cache) == {"1:1", "2:1", "3:1"}
+
+
+def test_deferred_runs_are_collected_by_next_fetch(tmp_path, monkeypatch, rest_handler):
+    db = tmp_path / "warehouse.db"
+    monkeypatch.setattr(get_git_data.warehouse, "open_if_enabled", lambda: warehouse.connect(db))
+    conn = warehouse.connect(db)
+    for resource in get_git_data.RESOURCES:
+        warehouse.set_watermark(conn, "apache/rocketmq", resource, "2026-01-02T00:00:00Z")
+    conn.close()
+
+    runs = [run(i, f"2026-01-0{i}T00:00:00Z") for i in (1, 2, 3)]
+    config = {
+        "paths": {"data": str(tmp_path)},
+        "project": {},
+        "module_c": {"since_date": "2025-06-01", "backend": "rest", "pom_analysis": False,
+                     "ci_jobs": {"max_new_runs": 2}},
+    }
+
+    def handler(url, params):
+        if url.endswith("/actions/runs"):
+            # 服务端按 created 过滤
+            created = params["created"].lstrip(">=")
+            return response({"workflow_runs": [r for r in runs if r["created_at"][:10] >= created]})
+        if "/actions/runs/" in url:
+            run_id = int(url.split("/runs/")[1].split("/")[0])
+            return response({"total_count": len(JOBS[run_id]), "jobs": JOBS[run_id]})
+        if url.endswith("/releases"):
+            return response([{"id": 5, "tag_name": "v5", "published_at": "2026-03-01T00:00:00Z"}])
+        return rest_handler(url, params)
+
+    def fetch():
+        async def main():
+            async with AsyncGitHub({}, transport=FakeTransport(handler)) as gh:
+                await get_git_data.fetch(gh, config)
+
+        asyncio.run(main())
+        conn = warehouse.connect(db)
+        marks = {r: warehouse.get_watermark(conn, "apache/rocketmq", r) for r in get_git_data.RESOURCES}
+        conn.close()
+        return set(ci_jobs.load_cache(tmp_path / "module_c")), marks
+
+    # 首次采集推迟最早的运行，workflow_runs 水位不推进
+    cached, marks = fetch()
+    assert cached == {"2:1", "3:1"}
+    assert marks["workflow_runs"] == "2026-01-02T00:00:00Z"
+    assert marks["commits"] > "2026-01-02T00:00:00Z"
+
+    # 下次采集的运行列表仍包含被推迟的运行
+    cached, marks = fetch()
+    assert cached == {"1:1", "2:1", "3:1"}
+    assert marks["workflow_runs"] > "2026-01-02T00:00:00Z"
+
+
+def test_timing_stats():
+    cache = {}
+    collect([run(i, f"2026-01-0{i}T00:00:00Z") for i in (1, 2, 3)], cache)
+    stats = ci_jobs.timing_stats(list(cache.values()))
+
+    assert (stats["runs"], stats["jobs"]) == (3, 4)
+    # 运行 1：00:00:10 -> 00:11:00；运行 2：00:00:30 -> 00:03:30；skipped 的运行 3 不计入执行耗时
+    assert stats["run_duration"] == {"count": 2, "mean": 415.0, "p50": 415.0, "p90": 603.0, "p95": 626.5, "max": 650.0}
+    assert stats["job_duration"]["count"] == 3 and stats["job_duration"]["max"] == 600.0
+    assert stats["queue"] == {"count": 4, "mean": 55.0, "p50": 45.0, "p90": 102.0, "p95": 111.0, "max": 120.0}
+    assert [j["name"] for j in stats["slowest_jobs"]] == ["test", "build"]
+    assert stats["slowest_steps"][0] == {"name": "test / mvn", "count": 1, "p50": 600.0, "p90": 600.0}
+
+    recent = ci_jobs.timing_stats(list(cache.values()), since="2026-01-02T00:00:00Z")
+    assert recent["runs"] == 2 and recent["run_duration"]["count"] == 1
+    assert ci_jobs.timing_stats([])["run_duration"] == {"count": 0}
+
+
+def test_report_includes_ci_timing(monkeypatch):
+    monkeypatch.setattr(report_generator, "now_str", lambda: "2026-02-01 00:00:00")
+    cache = {}
+    collect([run(i, f"2026-01-0{i}T00:00:00Z") for i in (1, 2)], cache)
+    data = {
+        "total_score": 50,
+        "version_control": {"total": 0, "commit_norm": 0, "pr_process": 0},
+        "ci_health": {"total": 0, "run_rate": 0, "config_exist": 0, "stats": "0/0",
+                      "timing": ci_jobs.timing_stats(list(cache.values()))},
+        "governance": {"total": 0, "docs": 0, "release_cycle": 0},
+        "code_quality": {"total": 0, "test_config": 0, "style_config": 0},
+    }
+
+    md = report_generator.build_markdown(data, figures_rel_dir="figures")
+    assert "运行时长 P50 6.9 分钟" in md and "`test` 10.0 分钟" in md
@@ -1,17 +1,4 @@
-import os
-import sys
-
-
-def _ensure_scripts_on_path():
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    scripts_dir = os.path.join(repo_root, "scripts")
-    if scripts_dir not in sys.path:
-        sys.path.insert(0, scripts_dir)
-
-
-_ensure_scripts_on_path()
-
-from module_c.clean_git_data import calculate_scores
+from scripts.module_c.clean_git_data import calculate_scores
 
 
 def test_calculate_scores_happy_path():
@@ -0,0 +1,63 @@
+"""
+测试模块 C 列式评分内核 (columnar.py)：结果必须与逐条判定的原始规则一致
+"""
+import pandas as pd
+
+from scripts.module_c.columnar import (
+    COMMIT_PATTERN,
+    commit_table,
+    compliant_pr_mask,
+    pr_table,
+    run_masks,
+    run_table,
+    valid_commit_mask,
+)
+
+
+def _valid_commit_reference(message):
+    first_line = message.splitlines()[0].strip() if message else ""
+    return bool(COMMIT_PATTERN.match(first_line))
+
+
+def test_valid_commit_mask_matches_row_rules():
+    messages = [
+        "feat: add x\n\nbody",
+        "FIX(core): upper case",
+        "  docs: leading spaces",
+        "\nfeat: starts with newline",
+        "[ISSUE #123] apache style",
+        "[ISSUE #abc] not a number",
+        "feat(scope) missing colon",
+        "chore: crlf\r\nbody",
+        "random message",
+        "revert: unicode sep\u2028tail",
+        "feat(a\u2028b): scope split by a line separator",
+        "\tfix:  tab indented",
+        "",
+        None,
+    ]
+    df = commit_table([{"commit": {"message": m}} for m in messages])
+
+    expected = [_valid_commit_reference(m) for m in messages]
+    assert valid_commit_mask(df["message"]).tolist() == expected
+
+
+def test_compliant_pr_mask_and_run_masks():
+    prs = pr_table([
+        {"body": "this is a detailed pr body"},
+        {"body": "   short    "},
+        {"body": None, "labels": [{"name": "bug"}]},
+        {"body": "", "requested_reviewers": []},
+    ])
+    assert compliant_pr_mask(prs["body"], prs["has_meta"]).tolist() == [True, False, True, False]
+
+    runs = run_table([{"conclusion": "SUCCESS"}, {"conclusion": "failure"}, {"conclusion": "cancelled"}, {}])
+    effective, success = run_masks(runs["conclusion"])
+    assert effective.tolist() == [True, True, False, True]
+    assert success.tolist() == [True, False, False, False]
+
+
+def test_empty_tables_keep_column_types():
+    df = commit_table([])
+    assert valid_commit_mask(df["message"]).dtype == bool
+    assert pd.api.types.is_datetime64_any_dtype(df["time"])
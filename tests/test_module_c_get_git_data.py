@@ -0,0 +1,103 @@
+"""
+测试 module_c/get_git_data.py 的 REST / GraphQL 采集后端
+"""
+from test_github_async import response
+
+
+def test_rest_backend_writes_all_resources(fetch, rest_handler):
+    _, load = fetch(rest_handler, "rest")
+
+    assert load("repo_info.json") == {"full_name": "apache/rocketmq"}
+    assert [c["sha"] for c in load("commits")] == ["a", "b"]
+    assert [pr["number"] for pr in load("pull_requests")] == [2]
+    assert load("workflow_runs") == [{"id": 1}]
+    assert [r["tag_name"] for r in load("releases")] == ["v5"]
+
+    files = load("files_structure.json")
+    assert files["LICENSE"] is True and files["pom.xml"] is True
+    assert files["README.md"] is False
+    assert files["pom_style_check"] is True
+
+
+def test_graphql_backend_matches_rest_shape(fetch, graphql_handler):
+    transport, load = fetch(graphql_handler, "graphql")
+
+    # 两轮 GraphQL（第二轮只翻 commits 的下一页）+ workflow runs 的 REST 请求
+    graphql_calls = [c for c in transport.calls if "query" in c]
+    assert len(graphql_calls) == 2
+    assert graphql_calls[1]["variables"]["withRepo"] is False
+    assert graphql_calls[1]["variables"]["withPrs"] is False
+    assert len(transport.calls) == 3
+
+    commits = load("commits")
+    assert [c["sha"] for c in commits] == ["a", "b"]
+    assert commits[0]["commit"]["message"] == "fix: x"
+    assert commits[0]["commit"]["author"]["date"] == "2026-01-02T00:00:00Z"
+
+    prs = load("pull_requests")
+    assert [pr["number"] for pr in prs] == [2]
+    assert prs[0]["requested_reviewers"] == [{"login": "r"}]
+    assert prs[0]["labels"] == [{"name": "bug"}]
+
+    assert load("releases") == [{"id": 5, "tag_name": "v5", "published_at": "2026-03-01T00:00:00Z"}]
+    assert load("workflow_runs") == [{"id": 1}]
+    assert load("repo_info.json")["license"] == {"spdx_id": "Apache-2.0"}
+
+    files = load("files_structure.json")
+    assert files["LICENSE"] is True and files["README.md"] is False
+    assert files["pom_style_check"] is True
+
+
+def test_graphql_errors_fall_back_to_rest(fetch, rest_handler):
+    def handler(url, body):
+        if url.endswith("/graphql"):
+            return response({"errors": [{"message": "Resource not accessible by integration"}]})
+        return rest_handler(url, body)
+
+    _, load = fetch(handler, "graphql")
+
+    assert [c["sha"] for c in load("commits")] == ["a", "b"]
+    assert load("files_structure.json")["LICENSE"] is True
+
+
+def test_graphql_commit_dates_are_normalized_to_utc(fetch, graphql_handler):
+    def handler(url, body):
+        data = graphql_handler(url, body).json()
+        if url.endswith("/graphql"):
+            # GitTimestamp 保留作者本地时区
+            for node in data["data"]["repository"]["defaultBranchRef"]["target"]["history"]["nodes"]:
+                node["author"]["date"] = "2026-01-02T08:00:00+08:00"
+        return response(data)
+
+    _, load = fetch(handler, "graphql")
+
+    assert [c["commit"]["author"]["date"] for c in load("commits")] == ["2026-01-02T00:00:00Z"] * 2
+
+
+def test_graphql_release_paging_skips_drafts(fetch, graphql_handler):
+    pages = {
+        None: ({"hasNextPage": True, "endCursor": "r1"}, [
+            {"databaseId": 6, "tagName": "v6", "createdAt": "2026-03-01T00:00:00Z", "publishedAt": "2026-03-01T00:00:00Z"},
+            {"databaseId": 7, "tagName": "v7-draft", "createdAt": "2026-02-15T00:00:00Z", "publishedAt": None},
+        ]),
+        "r1": ({"hasNextPage": True, "endCursor": "r2"}, [
+            {"databaseId": 5, "tagName": "v5", "createdAt": "2026-01-20T00:00:00Z", "publishedAt": "2026-01-21T00:00:00Z"},
+            {"databaseId": 4, "tagName": "v4", "createdAt": "2025-11-01T00:00:00Z", "publishedAt": "2025-11-01T00:00:00Z"},
+        ]),
+    }
+    release_cursors = []
+
+    def handler(url, body):
+        data = graphql_handler(url, body).json()
+        if url.endswith("/graphql") and body["variables"]["withReleases"]:
+            cursor = body["variables"]["releasesAfter"]
+            release_cursors.append(cursor)
+            page_info, nodes = pages[cursor]
+            data["data"]["repository"]["releases"] = {"pageInfo": page_info, "nodes": nodes}
+        return response(data)
+
+    _, load = fetch(handler, "graphql")
+
+    # 草稿没有 publishedAt，不能据此提前结束翻页；越过窗口起点（按 createdAt）后停止
+    assert release_cursors == [None, "r1"]
+    assert [r["tag_name"] for r in load("releases")] == ["v6", "v5"]
@@ -0,0 +1,124 @@
+"""
+测试模块 C 基于本地克隆的关键文件检查 (local_tree.py)
+"""
+import subprocess
+
+import pytest
+
+from scripts.module_c import get_git_data, local_tree
+
+
+def test_check_files_reads_every_pom(clone):
+    tree = local_tree.GitTree(clone)
+    status = local_tree.check_files(tree, get_git_data.FILES_TO_CHECK)
+
+    assert status["LICENSE"] and status["pom.xml"] and status[".github/workflows"]
+    assert not status["CONTRIBUTING.md"] and not status[".editorconfig"]
+    assert status["pom_style_check"] is True
+    assert (status["pom_files"], status["pom_style_files"]) == (2, 1)
+    assert tree.find("pom.xml") == ["pom.xml", "broker/pom.xml"]
+
+
+def test_bare_mirror_gives_same_answer(clone, git, tmp_path):
+    mirror = tmp_path / "mirror.git"
+    git(tmp_path, "clone", "-q", "--mirror", str(clone), str(mirror))
+
+    assert local_tree.check_files(local_tree.GitTree(mirror), get_git_data.FILES_TO_CHECK) == \
+        local_tree.check_files(local_tree.GitTree(clone), get_git_data.FILES_TO_CHECK)
+
+
+def test_find_local_repo_requires_matching_origin(clone, tmp_path):
+    config = {"paths": {"root": str(tmp_path)}, "module_c": {}}
+
+    assert local_tree.find_local_repo("apache", "rocketmq", config) == clone
+    assert local_tree.find_local_repo("someone", "rocketmq", config) is None
+    assert local_tree.find_local_repo("apache", "rocketmq", {**config, "module_c": {"local_checks": False}}) is None
+
+    explicit = {**config, "module_c": {"local_repo": "temp_repos/rocketmq"}}
+    assert local_tree.find_local_repo("someone", "rocketmq", explicit) == clone
+
+
+def test_fetch_skips_file_probes_with_local_clone(fetch, graphql_handler, clone, monkeypatch):
+    monkeypatch.setattr(local_tree, "find_local_repo", lambda owner, name, config: clone)
+    urls = []
+
+    def handler(url, body):
+        urls.append(url)
+        return graphql_handler(url, body)
+
+    transport, load = fetch(handler, "graphql")
+
+    queries = [c["query"] for c in transport.calls if "query" in c]
+    assert queries and all("object(expression" not in q for q in queries)
+    assert not any("/contents/" in url for url in urls)
+
+    files = load("files_structure.json")
+    assert files["README.md"] is True and files["CONTRIBUTING.md"] is False
+    assert files["pom_files"] == 2
+
+
+def test_missing_blobs_are_skipped(clone):
+    tree = local_tree.GitTree(clone)
+    # 部分克隆中缺失的 blob：cat-file 只返回 "<sha> missing"
+    tree.blobs["broker/pom.xml"] = "0" * 40
+
+    assert set(tree.read(["broker/pom.xml", "pom.xml", "README.md"])) == {"pom.xml", "README.md"}
+    with pytest.raises(local_tree.MissingBlobError):
+        local_tree.check_files(tree, get_git_data.FILES_TO_CHECK)
+
+
+def test_fetch_falls_back_to_api_when_blobs_are_missing(fetch, graphql_handler, clone, monkeypatch, capsys):
+    tree = local_tree.GitTree(clone)
+    tree.blobs["broker/pom.xml"] = "0" * 40
+    monkeypatch.setattr(local_tree, "open_local_tree", lambda owner, name, config: tree)
+    urls = []
+
+    def handler(url, body):
+        urls.append(url)
+        return graphql_handler(url, body)
+
+    _, load = fetch(handler, "graphql")
+
+    assert any("/contents/" in url for url in urls)
+    files = load("files_structure.json")
+    assert files["LICENSE"] is True and files["pom_style_check"] is True and "pom_files" not in files
+    assert "改用 API" in capsys.readouterr().out
+
+
+def test_unreadable_local_repo_falls_back(tmp_path, capsys):
+    config = {"paths": {"root": str(tmp_path)}, "module_c": {"local_repo": str(tmp_path / "missing")}}
+    assert local_tree.open_local_tree("apache", "rocketmq", config) is None
+    assert "[Warn]" in capsys.readouterr().out
+
+
+def test_stale_clone_is_fetched_before_checks(clone, upstream, git_commit, tmp_path, capsys):
+    local = local_tree.GitTree(clone).commit
+    git_commit(upstream, {"CONTRIBUTING.md": "# Contributing", "broker/pom.xml": "<project/>"}, "update")
+    head = local_tree.GitTree(upstream).commit
+    config = {"paths": {"root": str(tmp_path)}, "module_c": {}}
+
+    tree = local_tree.open_local_tree("apache", "rocketmq", config)
+    assert (tree.commit, local_tree.remote_head(clone)) == (head, head) and tree.commit != local
+    status = local_tree.check_files(tree, get_git_data.FILES_TO_CHECK)
+    assert status["CONTRIBUTING.md"] is True and status["pom_style_check"] is False
+    assert "落后于 origin" in capsys.readouterr().out
+    # 只更新对象库，不改动工作区与本地分支
+    assert local_tree.GitTree(clone).commit == local
+
+
+def test_unreachable_origin(clone, upstream, git, tmp_path, monkeypatch, capsys):
+    config = {"paths": {"root": str(tmp_path)}, "module_c": {}}
+    origin = subprocess.run(["git", "-C", str(clone), "config", "--get", "remote.origin.url"],
+                            check=True, capture_output=True, text=True).stdout.strip()
+    git(clone, "config", "--remove-section", f"url.{upstream.as_uri()}")
+    git(clone, "config", f"url.{(tmp_path / 'gone').as_uri()}.insteadOf", origin)
+
+    # 无法访问 origin：使用本地 HEAD 并警告
+    tree = local_tree.open_local_tree("apache", "rocketmq", config)
+    assert tree is not None and tree.commit == local_tree.GitTree(upstream).commit
+    assert "无法确认本地仓库" in capsys.readouterr().out
+
+    # 本地落后但拉取失败：回退到 API
+    monkeypatch.setattr(local_tree, "remote_head", lambda repo: "f" * 40)
+    assert local_tree.open_local_tree("apache", "rocketmq", config) is None
+    assert "关键文件检查改用 API" in capsys.readouterr().out
@@ -0,0 +1,179 @@
+"""
+测试模块 C 的多模块 pom.xml 分析 (pom_analyzer.py)
+"""
+import asyncio
+import base64
+import hashlib
+
+from scripts.github_async import AsyncGitHub
+from scripts.module_c import local_tree, pom_analyzer
+from scripts.module_c.clean_git_data import calculate_scores
+
+from test_github_async import FakeTransport, response
+
+NS = 'xmlns="http://maven.apache.org/POM/4.0.0"'
+
+POMS = {
+    "pom.xml": f"""<project {NS}>
+  <artifactId>rocketmq-all</artifactId>
+  <packaging>pom</packaging>
+  <modules><module>common</module><module>broker</module></modules>
+  <profiles><profile><modules><module>example</module></modules></profile></profiles>
+  <dependencies>
+    <dependency><groupId>junit</groupId><artifactId>junit</artifactId><scope>test</scope></dependency>
+  </dependencies>
+  <build>
+    <pluginManagement><plugins><plugin><artifactId>jacoco-maven-plugin</artifactId></plugin></plugins></pluginManagement>
+    <plugins><plugin><artifactId>spotless-maven-plugin</artifactId></plugin></plugins>
+  </build>
+</project>""",
+    "common/pom.xml": f"""<project {NS}>
+  <parent><artifactId>rocketmq-all</artifactId></parent>
+  <artifactId>rocketmq-common</artifactId>
+  <build><plugins><plugin><artifactId>jacoco-maven-plugin</artifactId></plugin></plugins></build>
+</project>""",
+    # 不继承聚合 POM：没有测试依赖与风格插件
+    "broker/pom.xml": """<project>
+  <parent><artifactId>other-parent</artifactId></parent>
+  <artifactId>rocketmq-broker</artifactId>
+</project>""",
+    "example/pom.xml": """<project>
+  <parent><artifactId>rocketmq-all</artifactId></parent>
+  <artifactId>rocketmq-example</artifactId>
+</project>""",
+    # 未被任何 <module> 引用
+    "orphan/pom.xml": "<project><artifactId>orphan</artifactId></project>",
+}
+
+
+def test_parse_pom_streams_coordinates_modules_and_plugins():
+    info = pom_analyzer.parse_pom(POMS["pom.xml"].encode())
+
+    assert (info["artifact_id"], info["packaging"], info["parent"]) == ("rocketmq-all", "pom", None)
+    assert info["modules"] == ["common", "broker", "example"]
+    assert info["plugins"] == ["spotless-maven-plugin"]  # pluginManagement 不计入
+    assert info["dependencies"] == [{"group_id": "junit", "artifact_id": "junit", "scope": "test"}]
+
+
+def test_module_pom_paths():
+    assert pom_analyzer._module_pom("pom.xml", "broker") == "broker/pom.xml"
+    assert pom_analyzer._module_pom("a/pom.xml", "../b/") == "b/pom.xml"
+    assert pom_analyzer._module_pom("a/pom.xml", "custom.xml") == "a/custom.xml"
+
+
+class DictSource:
+    def __init__(self, files):
+        self.files = {p: t.encode() for p, t in files.items()}
+        self.requests = 0
+        self.reads = []
+
+    async def shas(self):
+        return {p: hashlib.sha1(c).hexdigest() for p, c in self.files.items()}
+
+    async def read(self, paths):
+        self.reads.append(sorted(paths))
+        self.requests += len(paths)
+        return {p: self.files[p] for p in paths}
+
+
+def test_analyze_resolves_tree_with_inheritance():
+    source = DictSource(POMS)
+    result = asyncio.run(pom_analyzer.analyze(source, {}))
+
+    modules = {m["path"]: m for m in result["modules"]}
+    assert set(modules) == {"pom.xml", "common/pom.xml", "broker/pom.xml", "example/pom.xml"}
+    assert modules["common/pom.xml"]["tests"] and modules["common/pom.xml"]["style"] and modules["common/pom.xml"]["jacoco"]
+    assert not modules["broker/pom.xml"]["tests"] and not modules["broker/pom.xml"]["style"]
+    assert modules["example/pom.xml"]["style"] and not modules["example/pom.xml"]["jacoco"]
+    # 同一层的子 POM 一次读取
+    assert source.reads == [["pom.xml"], ["broker/pom.xml", "common/pom.xml", "example/pom.xml"]]
+    assert result["summary"] == {
+        "modules": 4, "code_modules": 3,
+        "test_coverage": 0.6667, "style_coverage": 0.6667, "jacoco_coverage": 0.3333,
+    }
+
+
+def test_cache_skips_unchanged_poms(tmp_path):
+    cache_path = tmp_path / "pom_cache.json"
+    asyncio.run(pom_analyzer.analyze(DictSource(POMS), cache := pom_analyzer.load_cache(cache_path)))
+    pom_analyzer.save_cache(cache_path, cache)
+
+    changed = {**POMS, "broker/pom.xml": POMS["broker/pom.xml"].replace("other-parent", "rocketmq-all")}
+    source = DictSource(changed)
+    result = asyncio.run(pom_analyzer.analyze(source, pom_analyzer.load_cache(cache_path)))
+
+    assert (result["parsed"], result["cache_hits"]) == (1, 3)
+    assert source.reads == [["broker/pom.xml"]]
+    assert result["summary"]["test_coverage"] == 1.0
+
+
+def test_no_root_pom_and_broken_child():
+    assert asyncio.run(pom_analyzer.analyze(DictSource({"README.md": "x"}), {})) is None
+
+    files = {**POMS, "common/pom.xml": "<project><unclosed></project>"}
+    result = asyncio.run(pom_analyzer.analyze(DictSource(files), {}))
+    assert "common/pom.xml" not in {m["path"] for m in result["modules"]}
+
+
+def test_local_source_matches_dict_source(tmp_path, git, git_commit):
+    repo = tmp_path / "repo"
+    git(tmp_path, "init", "-q", str(repo))
+    git_commit(repo, POMS)
+
+    source = pom_analyzer.LocalPomSource(local_tree.GitTree(repo))
+    local = asyncio.run(pom_analyzer.analyze(source, {}))
+    expected = asyncio.run(pom_analyzer.analyze(DictSource(POMS), {}))
+
+    assert local["modules"] == expected["modules"] and local["requests"] == 0
+
+
+def test_api_source_lists_tree_once_and_fetches_blobs():
+    blobs = {hashlib.sha1(t.encode()).hexdigest(): t for t in POMS.values()}
+    tree = [{"path": p, "type": "blob", "sha": hashlib.sha1(t.encode()).hexdigest()} for p, t in POMS.items()]
+    urls = []
+
+    def handler(url, params):
+        urls.append(url)
+        if "/git/trees/HEAD" in url:
+            return response({"tree": tree + [{"path": "common", "type": "tree", "sha": "t"}]})
+        sha = url.rsplit("/", 1)[1]
+        return response({"content": base64.b64encode(blobs[sha].encode()).decode(), "encoding": "base64"})
+
+    async def main():
+        async with AsyncGitHub({}, transport=FakeTransport(handler)) as gh:
+            source = pom_analyzer.ApiPomSource(gh, "https://api.github.com/repos/apache/rocketmq")
+            return await pom_analyzer.analyze(source, {})
+
+    result = asyncio.run(main())
+    assert result["requests"] == 5 and len(urls) == 5
+    assert sum("/git/trees/" in u for u in urls) == 1
+    assert result["summary"]["code_modules"] == 3
+
+
+def test_scores_follow_module_coverage():
+    files = {"pom.xml": True}
+    assert calculate_scores([], [], [], [], files, generated_at="t")["code_quality"]["total"] == 25
+
+    summary = {"modules": 4, "code_modules": 3, "test_coverage": 0.5, "style_coverage": 0.2, "jacoco_coverage": 0}
+    quality = calculate_scores([], [], [], [], {**files, "pom_analysis": summary}, generated_at="t")["code_quality"]
+    assert (quality["test_config"], quality["style_config"]) == (5.0, 3.0)
+    assert quality["modules"] == summary
+
+    quality = calculate_scores([], [], [], [], {**files, ".editorconfig": True, "pom_analysis": summary},
+                               generated_at="t")["code_quality"]
+    assert quality["style_config"] == 15
+
+
+def test_fetch_falls_back_when_analysis_fails(fetch, graphql_handler):
+    _, load = fetch(graphql_handler, "graphql", pom_analysis=True)
+
+    # 测试服务没有 git/trees 接口：分析失败时按根 pom.xml 计分，采集照常完成
+    assert "pom_analysis" not in load("files_structure.json")
+
+
+def test_fetch_analyzes_local_clone(fetch, graphql_handler, clone, monkeypatch):
+    monkeypatch.setattr(local_tree, "find_local_repo", lambda owner, name, config: clone)
+    _, load = fetch(graphql_handler, "graphql", pom_analysis=True)
+
+    assert load("files_structure.json")["pom_analysis"]["modules"] == 2
+    assert [m["path"] for m in load("pom_analysis.json")["modules"]] == ["pom.xml", "broker/pom.xml"]
@@ -0,0 +1,88 @@
+"""
+测试模块 C 原始数据的字段投影与 NDJSON 压缩存储 (raw_store.py)
+"""
+import json
+
+import pytest
+
+from benchmarks import bench_github_backends as bench
+from benchmarks import synthetic
+from scripts.module_c import raw_store
+from scripts.module_c.clean_git_data import calculate_scores
+
+
+def test_project_keeps_nested_and_list_fields():
+    record = {
+        "sha": "a",
+        "url": "https://api.github.com/...",
+        "commit": {"author": {"name": "dev", "date": "2026-01-01", "avatar": "x"}, "message": "fix: y", "tree": {}},
+        "parents": [{"sha": "p1", "url": "u"}, {"sha": "p2"}],
+        "assignee": None,
+    }
+    fields = ["sha", "commit.author.name", "commit.author.date", "commit.message", "parents.sha",
+              "assignee.login", "missing.field"]
+
+    assert raw_store.project(record, fields) == {
+        "sha": "a",
+        "commit": {"author": {"name": "dev", "date": "2026-01-01"}, "message": "fix: y"},
+        "parents": [{"sha": "p1"}, {"sha": "p2"}],
+        "assignee": None,
+    }
+    assert raw_store.project(record, None) is record
+
+
+def test_fields_config_overrides_defaults():
+    assert raw_store.fields_for("releases", {}) == raw_store.DEFAULT_FIELDS["releases"]
+    assert raw_store.fields_for("releases", {"fields": {"releases": ["id"]}}) == ["id"]
+    assert raw_store.fields_for("releases", {"fields": {"releases": "*"}}) is None
+
+
+@pytest.mark.parametrize("compression", ["gzip", "none"])
+def test_round_trip_replaces_stale_files(tmp_path, compression):
+    (tmp_path / "commits.json").write_text(json.dumps([{"sha": "old"}]), encoding="utf-8")
+    (tmp_path / "commits.ndjson.zst").write_bytes(b"stale")
+    records = [{"sha": "a", "commit": {"message": "多行\n提交"}}, {"sha": "b"}]
+
+    path = raw_store.write_records(records, tmp_path, "commits", compression)
+
+    assert path.name == "commits" + raw_store.SUFFIXES[compression]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name]
+    assert raw_store.read_records(tmp_path, "commits") == records
+
+
+def test_reads_legacy_json_and_reports_missing(tmp_path):
+    (tmp_path / "releases.json").write_text(json.dumps([{"id": 1}], indent=2), encoding="utf-8")
+    assert raw_store.read_records(tmp_path, "releases") == [{"id": 1}]
+
+    with pytest.raises(FileNotFoundError):
+        raw_store.read_records(tmp_path, "commits")
+
+
+def test_resolve_compression(monkeypatch):
+    monkeypatch.setattr(raw_store, "zstandard", None)
+    assert raw_store.resolve_compression("auto") == "gzip"
+    assert raw_store.resolve_compression("zstd") == "gzip"
+    assert raw_store.resolve_compression("none") == "none"
+    with pytest.raises(ValueError):
+        raw_store.resolve_compression("brotli")
+
+
+def test_projected_records_score_identically_and_shrink(tmp_path):
+    repo = bench._repo()
+    full = {
+        "commits": [bench.rest_commit(c) for c in synthetic.github_commits(300)],
+        "pull_requests": [bench.rest_pr(pr, repo) for pr in synthetic.github_prs(120)],
+        "workflow_runs": synthetic.github_runs(200),
+        "releases": [bench.rest_release(r, i) for i, r in enumerate(synthetic.github_releases(10))],
+    }
+    projected = {k: raw_store.project_all(v, raw_store.fields_for(k, {})) for k, v in full.items()}
+    files = synthetic.FILES_STATUS
+    args = ("commits", "pull_requests", "workflow_runs", "releases")
+
+    expected = calculate_scores(*(full[k] for k in args), files, generated_at="t")
+    assert calculate_scores(*(projected[k] for k in args), files, generated_at="t") == expected
+
+    full_size = len(json.dumps(full["commits"]) + json.dumps(full["pull_requests"]))
+    path_c = raw_store.write_records(projected["commits"], tmp_path, "commits", "gzip")
+    path_p = raw_store.write_records(projected["pull_requests"], tmp_path, "pull_requests", "gzip")
+    assert path_c.stat().st_size + path_p.stat().st_size < full_size / 10
@@ -1,19 +1,6 @@
-import os
-import sys
-
 import pytest
 
-
-def _ensure_scripts_on_path():
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    scripts_dir = os.path.join(repo_root, "scripts")
-    if scripts_dir not in sys.path:
-        sys.path.insert(0, scripts_dir)
-
-
-_ensure_scripts_on_path()
-
-from module_c import report_generator
+from scripts.module_c import report_generator
 
 
 def test_load_data_missing_file_raises(tmp_path):
@@ -0,0 +1,106 @@
+"""
+测试模块 C 评分时间序列 (score_series.py)
+"""
+import pytest
+
+from scripts import warehouse
+from scripts.module_c import score_series
+from scripts.module_c.clean_git_data import calculate_scores
+
+
+REPO = "apache/rocketmq"
+# files_structure.json 的真实键：CI 配置存在、2 / 4 个关键文档、根 pom.xml 存在（无模块分析结果）
+FILES_STATUS = {
+    ".github/workflows": True,
+    "LICENSE": True,
+    "README.md": True,
+    "CONTRIBUTING.md": False,
+    "CODE_OF_CONDUCT.md": False,
+    "pom.xml": True,
+    ".editorconfig": False,
+}
+
+
+def _seed(conn):
+    warehouse.upsert_commits(conn, REPO, [
+        {"sha": "a1", "commit": {"message": "feat: a", "author": {"date": "2024-01-05T00:00:00Z"}}},
+        {"sha": "a2", "commit": {"message": "random", "author": {"date": "2024-01-20T00:00:00Z"}}},
+        {"sha": "a3", "commit": {"message": "[ISSUE #1] b", "author": {"date": "2024-02-03T00:00:00Z"}}},
+    ])
+    warehouse.upsert_pull_requests(conn, REPO, [
+        {"number": 1, "state": "closed", "closed_at": "2024-01-10T00:00:00Z", "updated_at": "2024-01-10T00:00:00Z",
+         "body": "a detailed description"},
+        {"number": 2, "state": "closed", "closed_at": "2024-02-10T00:00:00Z", "updated_at": "2024-02-10T00:00:00Z",
+         "body": ""},
+    ])
+    warehouse.upsert_workflow_runs(conn, REPO, [
+        {"id": 1, "created_at": "2024-01-02T00:00:00Z", "conclusion": "success"},
+        {"id": 2, "created_at": "2024-01-03T00:00:00Z", "conclusion": "failure"},
+        {"id": 3, "created_at": "2024-02-03T00:00:00Z", "conclusion": "cancelled"},
+        {"id": 4, "created_at": "2024-02-04T00:00:00Z", "conclusion": "success"},
+    ])
+    warehouse.upsert_releases(conn, REPO, [
+        {"id": 1, "published_at": "2023-10-01T00:00:00Z"},
+        {"id": 2, "published_at": "2024-01-15T00:00:00Z"},
+    ])
+
+
+@pytest.fixture
+def conn():
+    c = warehouse.connect(":memory:")
+    _seed(c)
+    yield c
+    c.close()
+
+
+def test_window_scores_match_snapshot_rules(conn):
+    series = score_series.update_series(conn, REPO, "2024-01-01T00:00:00Z", FILES_STATUS)
+
+    assert list(series["window_start"]) == ["2024-01-01", "2024-02-01"]
+    jan, feb = series.to_dict("records")
+    assert jan["commit_norm"] == 7.5
+    assert jan["pr_process"] == 10.0
+    assert jan["run_rate"] == 7.5
+    assert feb["commit_norm"] == 15.0
+    assert feb["pr_process"] == 0.0
+    assert feb["run_rate"] == 15.0  # cancelled 不计入
+
+    # 文件类得分取当前快照，各窗口相同
+    for row in (jan, feb):
+        assert row["config_exist"] == 5
+        assert row["docs"] == 7.5
+        assert (row["test_config"], row["style_config"]) == (10, 15)
+
+    # 缺少 CI 配置与 pom.xml 时相应维度为 0
+    bare = score_series.update_series(conn, REPO, "2024-01-01T00:00:00Z", {"README.md": True})
+    assert bare.iloc[-1][["config_exist", "docs", "test_config", "style_config"]].tolist() == [0, 3.75, 0, 0]
+
+    # 单窗口得分应与快照评分一致
+    window = warehouse.load_module_c_window(conn, REPO, "2024-02-01T00:00:00Z")
+    window["releases"] = warehouse.load_releases(conn, REPO, "2024-01-01T00:00:00Z")
+    snapshot = calculate_scores(
+        window["commits"], window["prs"], window["runs"], window["releases"], FILES_STATUS, generated_at=""
+    )
+    assert feb["total_score"] == pytest.approx(snapshot["total_score"], abs=0.01)
+    assert snapshot["ci_health"]["config_exist"] == feb["config_exist"]
+    assert snapshot["governance"]["docs"] == feb["docs"]
+    assert snapshot["code_quality"]["total"] == feb["test_config"] + feb["style_config"] == 25
+
+
+def test_rerun_only_recomputes_latest_window(conn):
+    score_series.update_series(conn, REPO, "2024-01-01T00:00:00Z", FILES_STATUS)
+    conn.execute("UPDATE score_windows SET total_score = -1 WHERE window_start = '2024-01-01'")
+
+    warehouse.upsert_commits(conn, REPO, [
+        {"sha": "a4", "commit": {"message": "oops", "author": {"date": "2024-02-20T00:00:00Z"}}},
+    ])
+    series = score_series.update_series(conn, REPO, "2024-01-01T00:00:00Z", FILES_STATUS)
+
+    # 已结束的 1 月窗口保持不变，2 月窗口按新数据重算
+    assert series.iloc[0]["total_score"] == -1
+    assert series.iloc[1]["commit_norm"] == 7.5
+
+
+def test_empty_window_returns_empty_series():
+    frames = score_series.to_frames({"commits": [], "prs": [], "runs": [], "releases": []})
+    assert score_series.compute_window_scores(frames, {}).empty
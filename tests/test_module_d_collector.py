@@ -1,17 +1,9 @@
 """
 测试模块 D 的收集器 (collector.py)
 """
-import sys
-from pathlib import Path
 import pytest
 
-# 添加 scripts 目录到路径，以便导入 module_d
-repo_root = Path(__file__).parent.parent
-sys.path.insert(0, str(repo_root / "scripts"))
-# 添加 scripts/module_d 目录到路径，以便 collector.py 能找到同级 utils
-sys.path.insert(0, str(repo_root / "scripts" / "module_d"))
-
-from module_d import collector
+from scripts.module_d import collector
 
 @pytest.fixture
 def mock_workspace(tmp_path):
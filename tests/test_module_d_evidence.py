@@ -0,0 +1,75 @@
+"""
+测试模块 D 的结构化证据包 (evidence.py)
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.module_d import evidence
+
+
+def _write_module_outputs(data_dir: Path):
+    a = data_dir / "module_a"
+    a.mkdir(parents=True)
+    pd.DataFrame({"repository": ["r/x", "r/x", "r/y"], "file": ["a.py", "b.py", "c.py"]}).to_csv(a / "python_files.csv", index=False)
+    pd.DataFrame({
+        "repository": ["r/x", "r/y"], "severity": ["HIGH", "LOW"], "confidence": ["HIGH", "MEDIUM"],
+        "issue_name": ["exec_used", "assert_used"],
+    }).to_csv(a / "bandit_results.csv", index=False)
+    pd.DataFrame({
+        "repository": ["r/x", "r/x"], "function": ["f", "g"], "ccn": [20, 3], "nloc": [100, 10], "param": [6, 1],
+    }).to_csv(a / "lizard_results.csv", index=False)
+
+    b = data_dir / "module_b"
+    b.mkdir(parents=True)
+    # 2026-02-02 周一 09:00（工作日非核心时段）、14:00（核心时段）；2026-02-07 周六
+    pd.DataFrame({
+        "time": ["2026-02-02 09:00:00", "2026-02-02 14:00:00", "2026-02-07 14:00:00"],
+        "name": ["alice", "bob", "alice"],
+    }).to_csv(b / "clean_commits.csv", index=False)
+
+    c = data_dir / "module_c"
+    c.mkdir(parents=True)
+    (c / "clean_scores.json").write_text(
+        json.dumps({"generated_at": "2026-02-01 00:00:00", "total_score": 80.5}), encoding="utf-8"
+    )
+
+
+def test_build_evidence_bundle_from_structured_outputs(tmp_path, monkeypatch):
+    _write_module_outputs(tmp_path)
+    monkeypatch.setattr(evidence, "DATA_DIR", tmp_path)
+
+    collected = {
+        "module_a": {"executed": True, "success": True, "issues": [], "figures": [str(evidence.PROJECT_ROOT / "figures/module_a/a.png")]},
+        "module_b": {"executed": True, "success": True, "issues": []},
+        "module_c": {"executed": True, "success": True, "issues": []},
+    }
+    bundle = evidence.build_evidence_bundle(collected)
+    a, b, c = (bundle["modules"][m] for m in ("module_a", "module_b", "module_c"))
+
+    assert a["figures"] == ["figures/module_a/a.png"]
+    assert a["metrics"]["bandit"]["by_severity"] == {"HIGH": 1, "LOW": 1}
+    assert a["metrics"]["lizard"]["high_complexity"] == 1
+    assert a["metrics"]["per_repository"]["x"] == {"files": 2, "issues": 1, "functions": 2}
+
+    assert b["metrics"]["commits"] == 3
+    assert b["metrics"]["authors"] == 2
+    assert b["metrics"]["holiday_or_weekend_pct"] == 33.3
+    assert b["metrics"]["workday_off_core_hours_pct"] == 50.0
+
+    assert c["metrics"] == {"total_score": 80.5}
+    assert bundle["thresholds"]["module_a"]["ccn"] == 15
+
+
+def test_missing_module_data_is_reported_not_raised(tmp_path, monkeypatch):
+    monkeypatch.setattr(evidence, "DATA_DIR", tmp_path)
+    bundle = evidence.build_evidence_bundle({})
+
+    for module in bundle["modules"].values():
+        assert module["metrics"] is None
+        assert module["issues"][0].startswith("structured data unavailable")
+
+    payload = evidence.to_llm_payload(bundle)
+    assert "generated_at" not in payload
+    assert '"module_a":{' in payload
@@ -0,0 +1,119 @@
+"""
+测试多仓库模式的调度、共享 API 配额与对比报告 (fleet.py)
+"""
+import json
+
+import pytest
+
+from scripts import warehouse
+from scripts.module_d import fleet
+
+REPOS = [
+    {"owner": "apache", "name": "rocketmq"},
+    {"owner": "apache", "name": "rocketmq-dashboard"},
+    {"owner": "apache", "name": "rocketmq-clients"},
+]
+
+SCORES = {
+    "apache/rocketmq": 72.5,
+    "apache/rocketmq-dashboard": 81.0,
+}
+
+
+@pytest.fixture
+def fleet_env(tmp_path, monkeypatch):
+    db = str(tmp_path / "warehouse.db")
+    monkeypatch.setattr(warehouse, "default_path", lambda: db)
+    monkeypatch.setattr(warehouse, "is_enabled", lambda: False)
+    monkeypatch.setattr(fleet, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(fleet, "FLEET_REPORT_PATH", tmp_path / "module_d" / "FLEET_REPORT.md")
+    monkeypatch.setattr(fleet, "CONFIG", {
+        "fleet": {"workers": 2, "executor": "subprocess", "api_budget": 10, "repositories": REPOS},
+    })
+
+    calls = []
+
+    def run_repo(repo, budget_key, skip_fetch=False):
+        key = f"{repo['owner']}/{repo['name']}"
+        calls.append((key, budget_key, skip_fetch))
+        conn = warehouse.connect()
+        granted = warehouse.consume_api_budget(conn, budget_key, 4)
+        warehouse.upsert_commits(conn, key, [{"sha": f"{key}-{i}", "authored_utc": "2026-01-01T00:00:00Z"}
+                                             for i in range(len(repo["name"]))])
+        conn.close()
+
+        if granted and key in SCORES:
+            out = tmp_path / "fleet" / fleet.namespace_of(repo) / "module_c"
+            out.mkdir(parents=True)
+            dims = {"total": 10.0}
+            (out / "clean_scores.json").write_text(json.dumps({
+                "total_score": SCORES[key], "version_control": dims, "ci_health": dims,
+                "governance": dims, "code_quality": dims,
+            }), encoding="utf-8")
+        return {"success": granted and key in SCORES, "duration_sec": 1.5, "modules": {"module_b": 0}}
+
+    monkeypatch.setattr(fleet, "_run_repo", run_repo)
+    return tmp_path, calls
+
+
+def test_run_fleet_shares_budget_and_writes_report(fleet_env, capsys):
+    tmp_path, calls = fleet_env
+    results = fleet.run_fleet()
+
+    # 三个仓库共用一个配额：10 次请求只够两个仓库各用 4 次
+    budget_keys = {key for _, key, _ in calls}
+    assert len(calls) == 3 and len(budget_keys) == 1 and None not in budget_keys
+    conn = warehouse.connect()
+    usage = warehouse.api_budget_usage(conn, budget_keys.pop())
+    conn.close()
+    assert usage == {"total": 10, "remaining": 2}
+    assert sum(r["success"] for r in results.values()) <= 2
+
+    out = capsys.readouterr().out
+    assert "API budget used: 8 / 10" in out
+    assert "warehouse.enabled 为 false" in out
+
+    report = fleet.FLEET_REPORT_PATH.read_text(encoding="utf-8")
+    rows = [line for line in report.splitlines() if line.startswith("| apache/")]
+    assert len(rows) == 3
+    # 按综合得分降序，缺失得分的仓库排在最后；分析库未启用时提交数为 "-"
+    cells = [[c.strip() for c in row.strip("|").split("|")] for row in rows]
+    totals = [float(c[4]) for c in cells if c[4] != "-"]
+    assert totals == sorted(totals, reverse=True) and len(totals) == sum(r["success"] for r in results.values())
+    assert all(c[4] != "-" for c in cells[:len(totals)])
+    for c in cells:
+        assert c[1] == ("SUCCESS" if results[c[0]]["success"] else "FAILED")
+        assert c[2] == "1.5" and c[3] == "-"
+
+
+def test_report_counts_commits_when_warehouse_enabled(fleet_env, monkeypatch):
+    tmp_path, _ = fleet_env
+    monkeypatch.setattr(warehouse, "is_enabled", lambda: True)
+    monkeypatch.setattr(fleet, "CONFIG", {"fleet": {"workers": 1, "repositories": REPOS[:2]}})
+
+    results = fleet.run_fleet()
+
+    assert all(r["success"] for r in results.values())
+    report = fleet.FLEET_REPORT_PATH.read_text(encoding="utf-8")
+    rows = [[c.strip() for c in line.strip("|").split("|")]
+            for line in report.splitlines() if line.startswith("| apache/")]
+    assert [(r[0], r[3], r[4]) for r in rows] == [
+        ("apache/rocketmq-dashboard", str(len("rocketmq-dashboard")), "81.0"),
+        ("apache/rocketmq", str(len("rocketmq")), "72.5"),
+    ]
+
+
+def test_spawn_executor_uses_fresh_pool_per_repo_on_python_310(fleet_env, monkeypatch):
+    _, calls = fleet_env
+    monkeypatch.setattr(fleet.sys, "version_info", (3, 10, 14))
+    monkeypatch.setattr(fleet, "CONFIG", {"fleet": {"workers": 2, "executor": "spawn", "repositories": REPOS}})
+    fresh = []
+
+    def run_in_fresh_worker(repo, budget_key, skip_fetch=False):
+        fresh.append(repo["name"])
+        return fleet._run_repo(repo, budget_key, skip_fetch)
+
+    monkeypatch.setattr(fleet, "_run_repo_in_fresh_worker", run_in_fresh_worker)
+    fleet.run_fleet()
+
+    assert sorted(fresh) == sorted(r["name"] for r in REPOS) and len(calls) == 3
@@ -0,0 +1,42 @@
+"""
+测试模块 D 的 LLM 响应缓存 (llm_cache.py)
+"""
+import os
+import time
+
+from scripts.module_d import llm_cache
+
+
+def _messages(body):
+    return [{"role": "system", "content": "sys"}, {"role": "user", "content": body}]
+
+
+def test_cache_key_ignores_generated_at_lines():
+    a = llm_cache.cache_key("m", 0.2, _messages("生成时间：2026-01-01 00:00:00\n得分 80"))
+    b = llm_cache.cache_key("m", 0.2, _messages("生成时间：2026-02-02 12:00:00\n得分 80"))
+    c = llm_cache.cache_key("m", 0.2, _messages("生成时间：2026-02-02 12:00:00\n得分 81"))
+    d = llm_cache.cache_key("other", 0.2, _messages("生成时间：2026-01-01 00:00:00\n得分 80"))
+
+    assert a == b
+    assert a != c
+    assert a != d
+
+
+def test_put_get_and_ttl(tmp_path):
+    key = llm_cache.cache_key("m", 0.2, _messages("x"))
+    assert llm_cache.get(key, 24, cache_dir=tmp_path) is None
+
+    llm_cache.put(key, "报告", {"completion_tokens": 3}, cache_dir=tmp_path)
+    entry = llm_cache.get(key, 24, cache_dir=tmp_path)
+    assert entry["text"] == "报告"
+    assert entry["usage"] == {"completion_tokens": 3}
+
+    # 模拟两天前写入的条目
+    path = tmp_path / f"{key}.json"
+    old = time.time() - 48 * 3600
+    path.write_text(path.read_text(encoding="utf-8").replace(str(entry["created_at"]), str(old)), encoding="utf-8")
+    os.utime(path, (old, old))
+
+    assert llm_cache.get(key, 24, cache_dir=tmp_path) is None
+    assert llm_cache.evict_expired(24, cache_dir=tmp_path) == 1
+    assert not path.exists()
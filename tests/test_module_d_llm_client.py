@@ -0,0 +1,219 @@
+"""
+测试模块 D 的流式 LLM 输出 (llm_client.stream_completion)
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.module_d import llm_client
+
+
+def _chunk(text=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text is not None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def _stream(*texts, fail=False, usage=None):
+    for t in texts:
+        yield _chunk(t)
+    if fail:
+        raise ConnectionError("connection reset")
+    if usage:
+        yield _chunk(usage=SimpleNamespace(completion_tokens=usage))
+
+
+def test_stream_writes_tokens_incrementally(tmp_path):
+    out = tmp_path / "FINAL_REPORT.md"
+    seen = []
+
+    def create(messages):
+        for chunk in _stream("# 报告", "\n正文", usage=5):
+            yield chunk
+            seen.append(out.read_text(encoding="utf-8"))
+
+    text = llm_client.stream_completion(create, [{"role": "user", "content": "x"}], output_path=out)
+
+    assert text == "# 报告\n正文"
+    assert out.read_text(encoding="utf-8") == text
+    # 每个 chunk 到达后文件中已包含此前的全部内容
+    assert seen[0] == "# 报告"
+
+
+def test_stream_resumes_after_disconnect(tmp_path):
+    out = tmp_path / "FINAL_REPORT.md"
+    requests = []
+    streams = iter([_stream("第一段", fail=True), _stream("第二段")])
+
+    def create(messages):
+        requests.append(messages)
+        return next(streams)
+
+    text = llm_client.stream_completion(create, [{"role": "user", "content": "x"}], output_path=out)
+
+    assert text == "第一段第二段"
+    assert out.read_text(encoding="utf-8") == text
+    # 续写请求携带已生成的内容
+    assert requests[1][-2] == {"role": "assistant", "content": "第一段"}
+
+
+def test_stream_keeps_partial_result_when_resumes_exhausted(tmp_path):
+    out = tmp_path / "FINAL_REPORT.md"
+
+    def create(messages):
+        return _stream("部分", fail=True)
+
+    text = llm_client.stream_completion(create, [], output_path=out, max_resumes=1)
+
+    assert text.startswith("部分部分")
+    assert text.endswith(llm_client.PARTIAL_NOTICE)
+    assert out.read_text(encoding="utf-8") == text
+
+
+def test_stream_error_before_first_token_is_raised():
+    def create(messages):
+        return _stream(fail=True)
+
+    with pytest.raises(ConnectionError):
+        llm_client.stream_completion(create, [])
+
+
+def test_split_sections_only_on_module_headings():
+    from scripts.module_d.aggregator import MODULE_TITLES, split_sections
+
+    report = (
+        "# Aggregated\n\n## 0. Pipeline Execution Overview\n\n| a |\n\n---\n\n"
+        f"## {MODULE_TITLES['module_a']}\n\n### Status\n\n## 内部子标题\n\nA 证据\n\n---\n\n"
+        f"## {MODULE_TITLES['module_c']}\n\nC 证据\n"
+    )
+    sections = split_sections(report)
+
+    assert list(sections) == ["overview", "module_a", "module_c"]
+    assert "## 内部子标题" in sections["module_a"]
+    assert sections["module_c"].endswith("C 证据\n")
+    assert "".join(sections.values()) == report
+
+
+def test_summarize_sections_bounded_concurrency_and_fallback():
+    import threading
+    import time
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def complete(messages):
+        prompt = messages[-1]["content"]
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if "B 证据" in prompt:
+            raise RuntimeError("timeout")
+        return f"摘要({prompt[-4:]})", {"prompt_tokens": 10, "completion_tokens": 2}
+
+    sections = {"overview": "概览", "module_a": "A 证据", "module_b": "B 证据", "module_c": "C 证据"}
+    usages = []
+    condensed = llm_client.summarize_sections(
+        complete, "sys", "{module_title}\n{section_content}", sections, max_workers=2, usages=usages
+    )
+
+    assert peak[0] == 2
+    # 顺序保持：概览 -> A -> B -> C；B 摘要失败时保留原文
+    assert list(condensed) == ["overview", "module_a", "module_b", "module_c"]
+    assert condensed["overview"] == "概览"
+    assert condensed["module_a"].startswith("摘要(A 证据)")
+    assert condensed["module_b"] == "B 证据"
+    assert sum(u.get("prompt_tokens", 0) for u in usages) == 20
+
+
+def test_bundled_prompts_pass_validation():
+    prompts = llm_client.load_prompts()
+    assert set(prompts) == {"system", "user_template", "section_summary"}
+
+
+def test_load_prompts_reports_missing_placeholder(tmp_path):
+    (tmp_path / "system.md").write_text("sys", encoding="utf-8")
+    (tmp_path / "user_template.md").write_text("没有占位符", encoding="utf-8")
+    (tmp_path / "section_summary.md").write_text("{module_title}{section_content}", encoding="utf-8")
+
+    with pytest.raises(llm_client.LLMConfigError, match="aggregated_content"):
+        llm_client.load_prompts(tmp_path)
+
+
+def test_with_retries_backs_off_on_transient_errors(monkeypatch):
+    monkeypatch.setattr(llm_client, "TRANSIENT_ERRORS", (ConnectionError,))
+    delays = []
+    calls = iter([ConnectionError("reset"), ConnectionError("reset"), "ok"])
+
+    def fn():
+        result = next(calls)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    result, attempts = llm_client.with_retries(fn, retries=3, backoff=1.0, sleep=delays.append)
+
+    assert (result, attempts) == ("ok", 3)
+    assert len(delays) == 2
+    assert 0.5 <= delays[0] <= 1.0 and 1.0 <= delays[1] <= 2.0
+
+
+def test_with_retries_gives_up_and_skips_permanent_errors(monkeypatch):
+    monkeypatch.setattr(llm_client, "TRANSIENT_ERRORS", (ConnectionError,))
+
+    def flaky():
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        llm_client.with_retries(flaky, retries=2, sleep=lambda _: None)
+
+    def broken():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        llm_client.with_retries(broken, retries=2, sleep=lambda _: pytest.fail("should not retry"))
+
+
+def _failing_client(tmp_path, monkeypatch, *errors):
+    """create 依次抛出 errors 中的异常的客户端（不访问网络）"""
+    monkeypatch.setattr(llm_client, "TRANSIENT_ERRORS", (ConnectionError,))
+    monkeypatch.setenv("LLM_API_KEY", "test")
+    client = llm_client.LLMClient({
+        "retries": 2, "backoff_seconds": 0, "cache": {"enabled": False},
+        "replay": {"mode": "off", "dir": str(tmp_path / "recordings")},
+    })
+    calls = iter(errors)
+
+    def create(**kwargs):
+        raise next(calls)
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client
+
+
+def test_failed_calls_record_actual_attempts(tmp_path, monkeypatch):
+    client = _failing_client(tmp_path, monkeypatch, ValueError("bad request"),
+                             ConnectionError("reset"), ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        client.complete([{"role": "user", "content": "x"}])
+    # 非瞬时错误不重试，只记录一次尝试
+    assert client.metrics[-1]["attempts"] == 1 and client.metrics[-1]["error"] == "bad request"
+
+    with pytest.raises(ValueError):
+        client.stream_to([{"role": "user", "content": "x"}], label="final")
+    # 流式调用失败同样记录指标：一次瞬时错误重试后遇到非瞬时错误
+    assert client.metrics[-1]["label"] == "final"
+    assert client.metrics[-1]["attempts"] == 2 and client.metrics[-1]["error"] == "bad request"
+
+
+def test_with_retries_reports_attempts_on_failure(monkeypatch):
+    monkeypatch.setattr(llm_client, "TRANSIENT_ERRORS", (ConnectionError,))
+
+    def flaky():
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError) as exc:
+        llm_client.with_retries(flaky, retries=2, sleep=lambda _: None)
+    assert exc.value.attempts == 3
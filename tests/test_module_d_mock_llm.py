@@ -0,0 +1,60 @@
+"""
+测试模块 D 的本地模拟大模型服务与录制 / 回放 (mock_llm_server.py, llm_recorder.py)
+"""
+import pytest
+
+from scripts.module_d import llm_client
+from scripts.module_d import mock_llm_server
+
+
+@pytest.fixture
+def server():
+    srv = mock_llm_server.start_server(ttft=0.01, chunks_per_sec=0, chunk_chars=16)
+    yield srv
+    srv.shutdown()
+
+
+def _client(server, tmp_path, **overrides):
+    cfg = {
+        "model": "mock",
+        "base_url": f"http://127.0.0.1:{server.server_port}/v1",
+        "retries": 0,
+        "cache": {"enabled": False},
+        "replay": {"mode": "off", "dir": str(tmp_path / "recordings")},
+    }
+    cfg.update(overrides)
+    return llm_client.LLMClient(cfg)
+
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "## Module A\n\n`figures/module_a/x.png`"}]
+
+
+def test_mock_server_stream_and_complete_agree(server, tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_API_KEY", "mock")
+    client = _client(server, tmp_path)
+    out = tmp_path / "FINAL_REPORT.md"
+
+    text, usage = client.complete(MESSAGES)
+    streamed = client.stream_to(MESSAGES, out)
+
+    assert text == streamed == out.read_text(encoding="utf-8")
+    assert "## Module A" in text and "figures/module_a/x.png" in text
+    assert usage["completion_tokens"] > 0
+    assert client.metrics[-1]["ttft_sec"] is not None
+    assert server.requests == 2
+
+
+def test_record_then_replay_offline(server, tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_API_KEY", "mock")
+    recorder = _client(server, tmp_path, replay={"mode": "record", "dir": str(tmp_path / "recordings")})
+    recorded, _ = recorder.complete(MESSAGES)
+    assert len(list((tmp_path / "recordings").glob("*.json"))) == 1
+
+    server.shutdown()
+    monkeypatch.delenv("LLM_API_KEY")
+    replayer = _client(server, tmp_path, replay={"mode": "replay", "dir": str(tmp_path / "recordings")})
+
+    assert replayer.client is None
+    assert replayer.complete(MESSAGES)[0] == recorded
+    with pytest.raises(llm_client.LLMConfigError):
+        replayer.complete([{"role": "user", "content": "未录制的请求"}])
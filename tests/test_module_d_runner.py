@@ -0,0 +1,36 @@
+"""
+测试模块 D 的运行器 (runner.py) 的进程内执行与包内导入
+"""
+import re
+from pathlib import Path
+
+from scripts.module_d import runner
+
+repo_root = Path(__file__).parent.parent
+
+
+def test_entries_are_importable_package_modules():
+    assert runner.PACKAGE == "scripts"
+    assert [m["entry"] for m in runner.MODULES] == [
+        "scripts.module_a.main", "scripts.module_b.main", "scripts.module_c.main",
+    ]
+
+
+def test_run_in_process_returns_exit_code(tmp_path, monkeypatch):
+    (tmp_path / "fake_entry_ok.py").write_text("def main(argv=None):\n    return 0\n", encoding="utf-8")
+    (tmp_path / "fake_entry_exit.py").write_text(
+        "import sys\ndef main(argv=None):\n    sys.exit(3)\n", encoding="utf-8"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert runner.run_in_process("fake_entry_ok") == 0
+    assert runner.run_in_process("fake_entry_exit") == 3
+
+
+def test_package_modules_do_not_modify_sys_path():
+    offenders = [
+        str(p.relative_to(repo_root))
+        for p in (repo_root / "scripts").rglob("*.py")
+        if re.search(r"sys\.path\.(append|insert)", p.read_text(encoding="utf-8"))
+    ]
+    assert offenders == []
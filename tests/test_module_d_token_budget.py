@@ -0,0 +1,47 @@
+"""
+测试模块 D 的 token 预算 (token_budget.py)
+"""
+import pytest
+
+from scripts.module_d import token_budget
+
+
+@pytest.fixture(autouse=True)
+def calibrated_estimator(monkeypatch):
+    # 固定使用校准估算，与是否安装 tiktoken 无关
+    monkeypatch.setattr(token_budget, "tiktoken", None)
+
+
+def test_estimate_counts_cjk_characters_separately():
+    chinese = "代码质量与潜在风险分析" * 100   # 1100 个汉字
+    english = "code quality and risk " * 50   # 1100 个 ASCII 字符
+
+    assert token_budget.estimate_tokens(chinese) > 3 * token_budget.estimate_tokens(english)
+    assert token_budget.estimate_tokens("") == 0
+
+
+def test_allocate_gives_small_sections_their_need_and_splits_the_rest_by_priority():
+    needs = {"overview": 100, "module_a": 5000, "module_b": 5000, "module_c": 5000}
+    allocation = token_budget.allocate(needs, 3100, {"module_c": 2})
+
+    assert allocation["overview"] == 100
+    assert allocation["module_a"] == allocation["module_b"] == 750
+    assert allocation["module_c"] == 1500
+    assert sum(allocation.values()) <= 3100
+
+    # 预算充足时全部装入
+    assert token_budget.allocate(needs, 20000, {}) == needs
+
+
+def test_pack_sections_stays_within_budget():
+    sections = {
+        "overview": "# 概览\n\n",
+        "module_a": "\n".join(f"第 {i} 行：圈复杂度统计" for i in range(500)),
+        "module_c": "短区块\n",
+    }
+    packed = token_budget.pack_sections(sections, 800)
+
+    assert packed["overview"] == sections["overview"]
+    assert packed["module_c"] == sections["module_c"]
+    assert packed["module_a"].endswith(token_budget.TRUNCATED_NOTICE)
+    assert sum(token_budget.estimate_tokens(t) for t in packed.values()) <= 800
@@ -0,0 +1,26 @@
+"""
+测试公共工具 (module_utils.py) 的限流等待与分页解析
+"""
+from scripts import module_utils
+
+
+def test_parse_last_page():
+    link = (
+        '<https://api.github.com/x?per_page=100&page=2>; rel="next", '
+        '<https://api.github.com/x?per_page=100&page=34>; rel="last"'
+    )
+    assert module_utils.parse_last_page(link) == 34
+    assert module_utils.parse_last_page(None) is None
+
+
+class _StatusResponse:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+def test_rate_limit_wait():
+    assert module_utils.rate_limit_wait(_StatusResponse(404)) is None
+    assert module_utils.rate_limit_wait(_StatusResponse(403)) is None
+    assert module_utils.rate_limit_wait(_StatusResponse(403, {"X-RateLimit-Remaining": "0"})) == 60.0
+    assert module_utils.rate_limit_wait(_StatusResponse(429, {"Retry-After": "30"})) == 30.0
@@ -0,0 +1,88 @@
+"""
+测试流水线追踪 (tracing.py)
+"""
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from scripts import tracing
+
+repo_root = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def trace_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(tracing.TRACE_DIR_ENV, str(tmp_path))
+    monkeypatch.setattr(tracing, "_events", [])
+    return tmp_path
+
+
+def test_span_is_noop_when_disabled(monkeypatch):
+    monkeypatch.delenv(tracing.TRACE_DIR_ENV, raising=False)
+    monkeypatch.setattr(tracing, "_events", [])
+    with tracing.span("outer"):
+        pass
+    assert tracing._events == []
+    assert tracing.flush() is None
+
+
+def test_concurrent_tasks_keep_their_own_span_path(trace_dir):
+    async def fetch(repo):
+        with tracing.span(repo):
+            await asyncio.sleep(0.01)
+            with tracing.span("github_get"):
+                await asyncio.sleep(0.01)
+
+    async def main():
+        with tracing.span("prefetch"):
+            await asyncio.gather(fetch("a"), fetch("b"))
+
+    asyncio.run(main())
+
+    paths = sorted(e["args"]["path"] for e in tracing._events)
+    assert paths == ["prefetch", "prefetch > a", "prefetch > a > github_get", "prefetch > b", "prefetch > b > github_get"]
+
+
+def test_nested_spans_record_path_and_errors(trace_dir):
+    @tracing.traced()
+    def plot():
+        pass
+
+    with tracing.span("module_b", repo="apache/rocketmq"):
+        with tracing.span("clean"):
+            plot()
+        with pytest.raises(ValueError):
+            with tracing.span("report"):
+                raise ValueError("boom")
+
+    by_name = {e["name"]: e for e in tracing._events}
+    assert by_name["plot"]["args"]["path"] == "module_b > clean > plot"
+    assert by_name["report"]["args"]["error"] == "ValueError"
+    assert by_name["module_b"]["args"]["repo"] == "apache/rocketmq"
+    outer, inner = by_name["module_b"], by_name["clean"]
+    assert outer["ts"] <= inner["ts"] and inner["dur"] <= outer["dur"]
+
+
+def test_subprocess_spans_are_merged(trace_dir):
+    with tracing.span("parent"):
+        code = (
+            "from scripts import tracing\n"
+            "with tracing.span('child'):\n    pass\n"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=repo_root, check=True)
+    tracing.flush()
+
+    output = trace_dir / "trace.json"
+    events = tracing.merge_traces(trace_dir, output)
+
+    assert {e["name"] for e in events} == {"parent", "child"}
+    assert len({e["pid"] for e in events}) == 2
+    assert json.loads(output.read_text(encoding="utf-8"))["traceEvents"] == events
+
+    top = tracing.slowest_spans(events, top_n=1)
+    assert top[0]["path"] == "parent"
+    assert "parent" in tracing.format_slowest(events, top_n=5)
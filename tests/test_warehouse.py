@@ -0,0 +1,118 @@
+"""
+测试共享分析库 (warehouse.py)
+"""
+import pytest
+
+from scripts import warehouse
+
+
+@pytest.fixture
+def conn():
+    c = warehouse.connect(":memory:")
+    yield c
+    c.close()
+
+
+def test_upsert_commits_merges_module_b_and_c_rows(conn):
+    repo = "apache/rocketmq"
+    warehouse.upsert_commits(conn, repo, [
+        {"sha": "a1", "authored_utc": "2026-02-02T01:00:00Z", "author_name": "alice", "subject": "feat: x"},
+    ])
+    # 模块 C 的 GitHub commit 对象补充完整 message
+    warehouse.upsert_commits(conn, repo, [
+        {"sha": "a1", "commit": {"message": "feat: x\n\nbody", "author": {"date": "2026-02-02T01:00:00Z"}}},
+    ])
+
+    rows = warehouse.query(conn, "SELECT * FROM commits")
+    assert len(rows) == 1
+    assert rows[0]["author_name"] == "alice"
+    assert rows[0]["message"] == "feat: x\n\nbody"
+
+
+def test_commit_heatmap_uses_local_time_and_skips_merges(conn):
+    repo = "apache/rocketmq"
+    warehouse.upsert_commits(conn, repo, [
+        # 2026-02-01 是周日，UTC 20:00 对应北京时间周一 04:00
+        {"sha": "a1", "authored_utc": "2026-02-01T20:00:00Z", "subject": "fix: y"},
+        {"sha": "a2", "authored_utc": "2026-02-01T20:30:00Z", "subject": "Merge branch 'develop'"},
+    ])
+    assert warehouse.mark_merge_subjects(conn, repo) == 1
+
+    cells = warehouse.commit_heatmap(conn, repo)
+    assert cells == [{"weekday": 0, "hour": 4, "commits": 1}]
+
+    daily = warehouse.daily_commit_counts(conn, repo)
+    assert daily == [{"date": "2026-02-02", "commits": 1}]
+
+
+def test_replace_functions_and_summary(conn):
+    warehouse.replace_functions(conn, [
+        {"repository": "r1", "function": "f", "nloc": 100, "ccn": 20, "param": 6},
+        {"repository": "r1", "function": "g", "nloc": 10, "ccn": 2, "param": 1},
+    ])
+    # 再次扫描同一仓库应整体替换而非追加
+    warehouse.replace_functions(conn, [
+        {"repository": "r1", "function": "f", "nloc": 100, "ccn": 20, "param": 6},
+    ])
+
+    summary = warehouse.function_summary(conn)
+    assert summary == [{
+        "repository": "r1", "functions": 1, "avg_ccn": 20.0, "avg_nloc": 100.0,
+        "high_complexity": 1, "too_long": 1, "too_many_params": 1,
+    }]
+
+
+def test_pull_requests_and_scores_roundtrip(conn):
+    repo = "apache/rocketmq"
+    warehouse.upsert_pull_requests(conn, repo, [
+        {"number": 1, "body": "desc", "assignee": {"login": "bob"},
+         "requested_reviewers": [{"login": "carol"}], "labels": [{"name": "bug"}]},
+    ])
+    row = warehouse.query(conn, "SELECT assignee, requested_reviewers, labels FROM pull_requests")[0]
+    assert row == {"assignee": "bob", "requested_reviewers": '["carol"]', "labels": '["bug"]'}
+
+    warehouse.insert_score(conn, repo, {"generated_at": "2026-02-01 00:00:00", "total_score": 80})
+    warehouse.insert_score(conn, repo, {"generated_at": "2026-02-02 00:00:00", "total_score": 85})
+    assert warehouse.latest_score(conn, repo)["total_score"] == 85
+
+
+def test_api_budget_is_shared_and_exhausts(conn):
+    assert warehouse.consume_api_budget(conn, "unknown") is True  # 未设置配额时不限额
+
+    warehouse.set_api_budget(conn, "fleet-1", 2)
+    assert warehouse.consume_api_budget(conn, "fleet-1") is True
+    assert warehouse.consume_api_budget(conn, "fleet-1") is True
+    assert warehouse.consume_api_budget(conn, "fleet-1") is False
+    assert warehouse.api_budget_usage(conn, "fleet-1") == {"total": 2, "remaining": 0}
+
+
+def test_load_module_c_window_filters_by_since(conn):
+    repo = "apache/rocketmq"
+    warehouse.upsert_commits(conn, repo, [
+        {"sha": "old", "commit": {"message": "fix: old", "author": {"date": "2023-06-01T00:00:00Z"}}},
+        {"sha": "new", "commit": {"message": "feat: new\n\nbody", "author": {"date": "2024-06-01T00:00:00Z"}}},
+        # 仅由模块 B 采集、没有完整 message 的提交以 subject 参与评分
+        {"sha": "b-only", "authored_utc": "2024-07-01T00:00:00Z", "subject": "[ISSUE #1] x"},
+    ])
+    warehouse.upsert_pull_requests(conn, repo, [
+        {"number": 1, "state": "closed", "updated_at": "2024-02-01T00:00:00Z", "labels": [{"name": "bug"}]},
+        {"number": 2, "state": "open", "updated_at": "2024-02-01T00:00:00Z"},
+    ])
+    warehouse.upsert_releases(conn, repo, [
+        {"id": 1, "published_at": "2024-01-10T00:00:00Z"},
+        {"id": 2, "published_at": "2024-03-10T00:00:00Z"},
+    ])
+
+    window = warehouse.load_module_c_window(conn, repo, "2024-01-01T00:00:00Z")
+
+    assert [c["sha"] for c in window["commits"]] == ["b-only", "new"]
+    assert window["commits"][0]["commit"]["message"] == "[ISSUE #1] x"
+    assert [pr["number"] for pr in window["prs"]] == [1]
+    assert window["prs"][0]["labels"] == ["bug"]
+    assert [r["id"] for r in window["releases"]] == [2, 1]
+
+
+def test_watermark_roundtrip(conn):
+    assert warehouse.get_watermark(conn, "a/b", "commits") is None
+    warehouse.set_watermark(conn, "a/b", "commits", "2026-02-01T00:00:00Z")
+    assert warehouse.get_watermark(conn, "a/b", "commits") == "2026-02-01T00:00:00Z"